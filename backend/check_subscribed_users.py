@@ -1,16 +1,17 @@
 import sys
-from config import db
+from config import get_db
 
 def check_subscribed_users():
     """
     FREE ACCESS MODE: Check if any users exist with job preferences.
     Previously checked for subscribed status, now checks for any users.
     """
-    # FREE MODE: Get all users with job preferences instead of checking subscription
-    users_ref = db.collection("users").stream()
+    # FREE MODE: Get all users with job preferences instead of checking subscription.
+    # Only the two preference fields are fetched - this is a preflight check.
+    users_ref = get_db().collection("users").select(["jobTitles", "jobLocations"]).stream()
     users = [
         user for user in users_ref
-        if user.to_dict().get("jobTitles") and user.to_dict().get("jobLocations")
+        if (user.to_dict() or {}).get("jobTitles") and (user.to_dict() or {}).get("jobLocations")
     ]
 
     if not users:
@@ -20,4 +21,4 @@ def check_subscribed_users():
     sys.exit(0)
 
 if __name__ == "__main__":
-    check_subscribed_users()
\ No newline at end of file
+    check_subscribed_users()
@@ -1,36 +1,79 @@
 import os
 import json
 from dotenv import load_dotenv
-import firebase_admin
-from firebase_admin import credentials, firestore
 
 load_dotenv()
 
-firebase_json = os.getenv("FIREBASE_CREDENTIALS_JSON")
-
-if firebase_json:
-    try:
-        firebase_credentials = json.loads(firebase_json)
-        firebase_credentials_path = "/tmp/firebase_credentials.json"
-        with open(firebase_credentials_path, "w") as f:
-            json.dump(firebase_credentials, f)
-    except json.JSONDecodeError:
-        raise ValueError("❌ Invalid FIREBASE_CREDENTIALS_JSON format!")
-else:
+# Firebase is initialised lazily on first use so entry points that never touch
+# Firestore (or only need it late) don't pay for firebase_admin/grpc at import.
+_db = None
+
+
+def get_firebase_credentials():
+    """
+    Resolve Firebase service account credentials from the environment.
+
+    FIREBASE_CREDENTIALS_JSON (inline JSON) wins over FIREBASE_CREDENTIALS_PATH.
+
+    :return: Credentials dictionary or path to a credentials file
+    """
+    firebase_json = os.getenv("FIREBASE_CREDENTIALS_JSON")
+
+    if firebase_json:
+        try:
+            return json.loads(firebase_json)
+        except json.JSONDecodeError:
+            raise ValueError("❌ Invalid FIREBASE_CREDENTIALS_JSON format!")
+
     firebase_credentials_path = os.getenv("FIREBASE_CREDENTIALS_PATH")
+    if not firebase_credentials_path:
+        raise ValueError("❌ FIREBASE_CREDENTIALS_PATH is missing!")
+
+    return firebase_credentials_path
+
+
+def get_db():
+    """
+    Return the shared Firestore client, initialising Firebase on first call.
 
-if not firebase_credentials_path:
-    raise ValueError("❌ FIREBASE_CREDENTIALS_PATH is missing!")
+    :return: firestore.Client
+    """
+    global _db
 
-if not firebase_admin._apps:
-    cred = credentials.Certificate(firebase_credentials_path)
-    firebase_admin.initialize_app(cred)
+    if _db is None:
+        import firebase_admin
+        from firebase_admin import credentials, firestore
 
-db = firestore.client()
+        if not firebase_admin._apps:
+            cred = credentials.Certificate(get_firebase_credentials())
+            firebase_admin.initialize_app(cred)
+
+        _db = firestore.client()
+
+    return _db
+
+
+def __getattr__(name):
+    # Backwards compatibility for `from config import db`
+    if name == "db":
+        return get_db()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Location-based search configurations
 MAX_SEARCH_RADIUS_KM = 50  # Default search radius
 
+# "text" (substring match on location strings) or "radius" (geocoded distance, see utils/spatial_index.py)
+LOCATION_MATCH_MODE = os.getenv("LOCATION_MATCH_MODE", "text").lower()
+
+# "substring" (title contained in the job title) or "fuzzy" (normalised, typo-tolerant, see matching/title_normalizer.py)
+TITLE_MATCH_MODE = os.getenv("TITLE_MATCH_MODE", "substring").lower()
+
+# Only match new jobs against users whose preferences haven't changed (see matching/incremental.py)
+INCREMENTAL_MATCHING = os.getenv("INCREMENTAL_MATCHING", "false").lower() == "true"
+
+# How daemon.py keeps its user index current: "listen" (snapshot listener), "poll" (updatedAt diff) or "off"
+USER_INDEX_MODE = os.getenv("USER_INDEX_MODE", "listen").lower()
+
 LOCATION_FALLBACK_REGIONS = {
     "london": ["reading", "oxford", "cambridge", "bristol", "basingstoke", "slough", "watford", "staines", "high wycombe", "gillingham"],
     "manchester": ["liverpool", "leeds", "sheffield", "bolton", "stockport", "salford", "oldham", "bury", "rochdale", "bury"],
@@ -54,7 +97,7 @@ LOCATION_FALLBACK_REGIONS = {
 
 def get_subscribed_users():
     """Fetches all users who are subscribed or on trial."""
-    users_ref = db.collection("users").stream()
+    users_ref = get_db().collection("users").stream()
     subscribed_users = []
 
     for user_doc in users_ref:
@@ -0,0 +1,255 @@
+# daemon.py
+
+"""
+Long-running scheduler around main.job_cycle.
+
+Instead of a cold process every 8 hours, one process stays up and runs short
+cycles whenever a source is due. Each source has its own cadence, so the
+light LinkedIn search can poll often while the IfYouCould full sweep runs a
+few times a day:
+
+    python daemon.py
+    SOURCE_CADENCES="linkedin=60,unjobs=360,ifyoucould=480" python daemon.py
+
+Between cycles the process keeps its warm state: the user preference index
+(kept current by a Firestore listener, see store/user_index.py), the
+scrapers' HTTP sessions, the location resolver and geocode caches, the
+IfYouCould detail cache and any pooled browsers. When each source last ran
+is persisted to DAEMON_STATE_FILE, so a restart picks up the same schedule
+instead of hitting every source at once.
+
+Emails don't follow the source cadences: a cycle that stores jobs only marks
+a digest as pending, and it is sent at most once every NOTIFY_CADENCE_MINUTES
+(daily by default), so an hourly LinkedIn poll doesn't mean hourly emails.
+Matches stay unsent in user_job_matches until then. DAEMON_NOTIFY=false
+leaves emails to another process.
+"""
+
+import os
+import json
+import time
+import signal
+import logging
+from datetime import datetime, timedelta
+
+import schedule
+
+from config import get_db, USER_INDEX_MODE
+from fetch.registry import get_enabled_sources
+from store.user_index import UserPreferenceIndex
+from main import get_subscribed_users, job_cycle, send_email_notifications
+from utils.log import configure_logging
+
+logger = logging.getLogger(__name__)
+
+DAEMON_STATE_FILE = os.path.join(os.path.dirname(__file__), "daemon_state.json")
+DEFAULT_CADENCE_MINUTES = {"linkedin": 60, "unjobs": 360, "ifyoucould": 480}
+FALLBACK_CADENCE_MINUTES = 480  # Sources without a cadence keep the old cron interval
+SOURCE_CADENCES = os.getenv("SOURCE_CADENCES", "")
+DAEMON_TICK_MINUTES = int(os.getenv("DAEMON_TICK_MINUTES", "5"))
+USER_REFRESH_MINUTES = int(os.getenv("USER_REFRESH_MINUTES", "15"))
+DAEMON_NOTIFY = os.getenv("DAEMON_NOTIFY", "true").lower() == "true"
+NOTIFY_CADENCE_MINUTES = int(os.getenv("NOTIFY_CADENCE_MINUTES", "1440"))
+
+
+def parse_cadences(spec):
+    """
+    Parse "source=minutes,..." into a dictionary.
+
+    :param spec: Cadence string, e.g. "linkedin=60,ifyoucould=480"
+    :return: Dictionary of source name -> minutes
+    """
+    cadences = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        name, _, minutes = item.partition("=")
+        try:
+            cadences[name.strip().lower()] = int(minutes)
+        except ValueError:
+            logger.warning(f"⚠️ Ignoring invalid cadence '{item.strip()}' (expected source=minutes)")
+    return cadences
+
+
+class JobDaemon:
+    """Runs job cycles for whichever sources are due, keeping state warm between them."""
+
+    def __init__(self, sources=None, cadences=None, state_file=DAEMON_STATE_FILE, clock=datetime.now,
+                 user_index=None, notify_cadence=NOTIFY_CADENCE_MINUTES):
+        """
+        :param sources: ScraperSources to schedule (default: enabled sources)
+        :param cadences: Dictionary of source name -> minutes (default: SOURCE_CADENCES over the defaults)
+        :param state_file: JSON file recording when each source last ran (None for memory only)
+        :param clock: Callable returning the current datetime
+        :param user_index: Started UserPreferenceIndex (None to re-read users every USER_REFRESH_MINUTES)
+        :param notify_cadence: Minutes between email digests
+        """
+        self.sources = get_enabled_sources() if sources is None else sources
+        if cadences is None:
+            cadences = {**DEFAULT_CADENCE_MINUTES, **parse_cadences(SOURCE_CADENCES)}
+        self.cadences = {
+            source.name: timedelta(minutes=cadences.get(source.name, FALLBACK_CADENCE_MINUTES))
+            for source in self.sources
+        }
+        self.notify_cadence = timedelta(minutes=notify_cadence)
+        self.state_file = state_file
+        self.clock = clock
+        self.user_index = user_index
+        self.state = self._load_state()
+        self._users = None
+        self._users_loaded_at = None
+        self._stopping = False
+
+    def _load_state(self):
+        state = {"last_run": {}, "cycles": 0, "last_notified": None, "notify_pending": False}
+        if self.state_file and os.path.exists(self.state_file):
+            try:
+                with open(self.state_file, "r") as f:
+                    state.update(json.load(f))
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"Error loading daemon state: {e}. Treating every source as due.")
+        return state
+
+    def _save_state(self):
+        if not self.state_file:
+            return
+        try:
+            tmp_file = f"{self.state_file}.tmp"
+            with open(tmp_file, "w") as f:
+                json.dump(self.state, f, indent=2)
+            os.replace(tmp_file, self.state_file)
+        except OSError as e:
+            logger.error(f"Error saving daemon state: {e}")
+
+    def users(self):
+        """Users with preferences, from the index or re-read at most every USER_REFRESH_MINUTES."""
+        if self.user_index is not None:
+            self.user_index.refresh()  # No-op when the index is listening
+            return self.user_index.users_list()
+
+        now = self.clock()
+        if self._users is None or now - self._users_loaded_at >= timedelta(minutes=USER_REFRESH_MINUTES):
+            self._users = get_subscribed_users()
+            self._users_loaded_at = now
+        return self._users
+
+    def due_sources(self):
+        """Sources whose cadence has elapsed since they last ran (or that never ran)."""
+        now = self.clock()
+        due = []
+        for source in self.sources:
+            last_run = self.state["last_run"].get(source.name)
+            if last_run is None or now - datetime.fromisoformat(last_run) >= self.cadences[source.name]:
+                due.append(source)
+        return due
+
+    def tick(self):
+        """
+        Run one cycle for the sources that are due, if any, then send the email digest if due.
+
+        :return: True if a cycle ran and stored jobs
+        """
+        processed = self.run_due_sources()
+        self.notify_if_due()
+        return processed
+
+    def run_due_sources(self):
+        """
+        :return: True if a cycle ran and stored jobs
+        """
+        due = self.due_sources()
+        if not due:
+            return False
+
+        users = self.users()
+        if not users:
+            logger.warning("❌ No users with job preferences found. Waiting for the next tick.")
+            return False
+
+        started = self.clock()
+        names = ", ".join(source.name for source in due)
+        logger.info(f"⏰ Cycle {self.state['cycles'] + 1}: {names} due")
+
+        processed = False
+        try:
+            processed = job_cycle(users, due)
+            if processed:
+                self.state["notify_pending"] = True
+        except Exception as e:
+            logger.exception(f"❌ Cycle for {names} failed: {e}")
+        finally:
+            # Recorded even on failure, so a broken source waits for its next slot instead of retrying every tick
+            for source in due:
+                self.state["last_run"][source.name] = started.isoformat()
+            self.state["cycles"] += 1
+            self._save_state()
+            self._flush_caches()
+
+        elapsed = (self.clock() - started).total_seconds()
+        logger.info(f"🕒 Cycle {self.state['cycles']} ({names}) finished in {elapsed:.2f}s")
+        return processed
+
+    def notify_if_due(self):
+        """
+        Send the email digest when a cycle has stored jobs since the last one
+        and NOTIFY_CADENCE_MINUTES have passed.
+
+        :return: True if emails were sent
+        """
+        if not DAEMON_NOTIFY or not self.state.get("notify_pending"):
+            return False
+        now = self.clock()
+        last_notified = self.state.get("last_notified")
+        if last_notified and now - datetime.fromisoformat(last_notified) < self.notify_cadence:
+            return False
+
+        sent = send_email_notifications(self.users())
+        # Recorded even on failure, so a broken mailer is retried at the next slot, not every tick
+        self.state["last_notified"] = now.isoformat()
+        self.state["notify_pending"] = not sent
+        self._save_state()
+        return sent
+
+    def _flush_caches(self):
+        # Warm caches normally reach disk at exit; persist them after every cycle instead
+        try:
+            from utils.geocode_cache import get_geocode_store
+            get_geocode_store().save()
+        except Exception as e:
+            logger.error(f"Error saving geocode cache: {e}")
+
+    def stop(self, *_):
+        logger.info("🛑 Stopping after the current cycle...")
+        self._stopping = True
+
+    def run_forever(self):
+        """Tick every DAEMON_TICK_MINUTES until SIGINT/SIGTERM."""
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        logger.info("🚀 Job daemon started: " + ", ".join(
+            f"{name} every {int(cadence.total_seconds() // 60)}m" for name, cadence in self.cadences.items()))
+
+        schedule.every(DAEMON_TICK_MINUTES).minutes.do(self.tick)
+        # Catch up straight away on sources that fell due while stopped
+        self.tick()
+
+        try:
+            while not self._stopping:
+                schedule.run_pending()
+                time.sleep(1)
+        finally:
+            schedule.clear()
+            if self.user_index is not None:
+                self.user_index.stop()
+            from fetch.browser_pool import shutdown_browser_pool
+            shutdown_browser_pool()
+            logger.info("👋 Job daemon stopped")
+
+
+if __name__ == "__main__":
+    configure_logging()
+    user_index = None
+    if USER_INDEX_MODE != "off":
+        user_index = UserPreferenceIndex(get_db().collection("users"), mode=USER_INDEX_MODE).start()
+    JobDaemon(user_index=user_index).run_forever()
@@ -1,32 +1,27 @@
 import os
+import sys
 import hashlib
-import firebase_admin
-from firebase_admin import credentials, firestore
+import heapq
+from firebase_admin import firestore
 from dotenv import load_dotenv
 from collections import defaultdict
 from datetime import datetime
 import random
 from resend import Emails, Email
 
+# Ensure script finds `config.py` when run as `python email_service/send_email.py`
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from config import get_db
+from matching.ranking import job_limit
+
 # Load environment variables
 load_dotenv()
 
-FIREBASE_CREDENTIALS_PATH = os.getenv("FIREBASE_CREDENTIALS_PATH")
-
-if not FIREBASE_CREDENTIALS_PATH:
-    raise ValueError("Missing FIREBASE_CREDENTIALS_PATH in environment variables. Please set it in the .env file.")
-
-if not firebase_admin._apps:
-    cred = credentials.Certificate(FIREBASE_CREDENTIALS_PATH)
-    firebase_admin.initialize_app(cred)
-
-db = firestore.client()
-
 def generate_document_id(job_url):
     return hashlib.md5(job_url.encode()).hexdigest()
 
 def get_unsent_jobs():
-    jobs_collection = db.collection("jobs_compiled")
+    jobs_collection = get_db().collection("jobs_compiled")
     unsent_jobs_query = jobs_collection.where("sent", "==", False)
     unsent_jobs = unsent_jobs_query.stream()
     jobs = [job.to_dict() for job in unsent_jobs]
@@ -34,22 +29,24 @@ def get_unsent_jobs():
     return jobs
 
 def get_unnotified_jobs_for_user(user_id):
-    matches_ref = db.collection("user_job_matches") \
+    matches_ref = get_db().collection("user_job_matches") \
         .where("user_id", "==", user_id) \
         .where("notified", "==", False)
-    return [
+    matches = [
         {
             "id": match.id,
             **match.to_dict()
         }
         for match in matches_ref.stream()
     ]
+    # Postings that closed since they matched (flagged by liveness.py) are not emailed
+    return [match for match in matches if not (match.get("job_details") or {}).get("is_expired")]
 
 def mark_jobs_as_sent(jobs):
     for job in jobs:
         try:
             doc_id = generate_document_id(job["url"])
-            job_ref = db.collection("jobs_compiled").document(doc_id)
+            job_ref = get_db().collection("jobs_compiled").document(doc_id)
             job_doc = job_ref.get()
 
             if job_doc.exists:
@@ -105,13 +102,14 @@ def get_subscribed_users():
     Filters by emailNotificationsEnabled field (defaults to true if field doesn't exist).
     """
     # FREE MODE: Get ALL users with job preferences and email notifications enabled
-    users_ref = db.collection("users").stream()
+    users_ref = get_db().collection("users").stream()
     return [
         {
             "id": user.id,
             "email": user.to_dict().get("email", ""),
             "jobTitles": user.to_dict().get("jobTitles", []),
-            "jobLocations": user.to_dict().get("jobLocations", [])
+            "jobLocations": user.to_dict().get("jobLocations", []),
+            "maxJobsPerCycle": user.to_dict().get("maxJobsPerCycle")
         }
         for user in users_ref
         # Only include users with job preferences AND email notifications enabled
@@ -386,8 +384,15 @@ Unsubscribe: https://next-gig.co.uk/unsubscribe?email={recipient_email}
         return False
     
 
-def send_job_emails():
-    users = get_subscribed_users()
+def send_job_emails(users=None):
+    """
+    :param users: Users already loaded by the caller (e.g. the pipeline); only those
+                  with email notifications enabled are emailed. Read from Firestore if None.
+    """
+    if users is None:
+        users = get_subscribed_users()
+    else:
+        users = [user for user in users if user.get("emailNotificationsEnabled", True)]
     if not users:
         print("❌ No subscribed users found. Skipping email.")
         return False
@@ -406,24 +411,33 @@ def send_job_emails():
             continue
 
         users_with_matching_jobs += 1
+        # Only the most relevant unsent matches go in the email; the rest stay in the app
+        limit = job_limit(user)
+        email_jobs = user_jobs
+        if limit and len(user_jobs) > limit:
+            email_jobs = heapq.nlargest(
+                limit, user_jobs, key=lambda job: job.get("job_details", {}).get("relevance_score") or 0
+            )
+            print(f"🏅 Emailing the top {limit} of {len(user_jobs)} matches to {user['email']}")
+
         jobs_by_platform = defaultdict(lambda: defaultdict(list))
-        for job in user_jobs:
+        for job in email_jobs:
             job_details = job.get("job_details", {})
             platform = get_source_platform(job_details.get("url", ""))
             company = job_details.get("company", "Unknown Company")
             jobs_by_platform[platform][company].append(job_details)
 
-        html_content = generate_html_email(jobs_by_platform, len(user_jobs), user["email"])
-        success = send_email_to_user(user["email"], html_content, len(user_jobs), jobs_by_platform)
+        html_content = generate_html_email(jobs_by_platform, len(email_jobs), user["email"])
+        success = send_email_to_user(user["email"], html_content, len(email_jobs), jobs_by_platform)
 
         if success:
             total_emails_sent += 1
-            print(f"✅ Sent {len(user_jobs)} job listings to {user['email']}")
-            # Mark these matches as notified
+            print(f"✅ Sent {len(email_jobs)} job listings to {user['email']}")
+            # Mark every match as notified, including those left out, so they don't pile up
             for job in user_jobs:
                 match_id = job.get("id")
                 if match_id:
-                    db.collection("user_job_matches").document(match_id).update({"notified": True})
+                    get_db().collection("user_job_matches").document(match_id).update({"notified": True})
         else:
             print(f"❌ Failed to send email to {user['email']}")
 
@@ -442,7 +456,7 @@ def debug_user_job_matches():
         titles = [t.lower() for t in user.get("jobTitles", [])]
         locations = [l.lower() for l in user.get("jobLocations", [])]
         matches = []
-        for job in db.collection("jobs_compiled").stream():
+        for job in get_db().collection("jobs_compiled").stream():
             job_data = job.to_dict()
             if any(t in job_data.get("title", "").lower() for t in titles) and \
                any(l in job_data.get("location", "").lower() for l in locations):
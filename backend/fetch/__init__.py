@@ -1,20 +1,40 @@
-from .glassdoor import *
-from .ifyoucould import *
-from .linkedin import *
-from .unjobs import fetch_unjobs_parallel, fetch_unjobs_sync  # Update this line
-from .workable import *
-from .ziprecruiter import *
-from .run_scrapers import run_scrapers
+import importlib
 
-JOB_SOURCES = ["glassdoor", "ifyoucould", "linkedin", "unjobs", "workable", "ziprecruiter"]
+from .registry import SOURCES, get_enabled_sources
+
+JOB_SOURCES = list(SOURCES)
+
+# Scrapers are imported on first attribute access (PEP 562) so that importing
+# `fetch` doesn't pull in Selenium/webdriver_manager for disabled sources.
+_LAZY_ATTRS = {
+    "fetch_glassdoor_jobs": ("glassdoor", "fetch_glassdoor_jobs"),
+    "fetch_unjobs_parallel": ("unjobs", "fetch_unjobs_parallel"),
+    "fetch_unjobs_sync": ("unjobs", "fetch_unjobs_sync"),
+    "run_scrapers": ("run_scrapers", "run_scrapers"),
+}
 
 __all__ = [
-    "fetch_glassdoor_jobs", 
-    "ifyoucould", 
-    "linkedin", 
-    "fetch_unjobs_parallel", 
-    "fetch_unjobs_sync",     
-    "workable", 
-    "ziprecruiter", 
-    "run_scrapers"
-]
\ No newline at end of file
+    "fetch_glassdoor_jobs",
+    "ifyoucould",
+    "linkedin",
+    "fetch_unjobs_parallel",
+    "fetch_unjobs_sync",
+    "workable",
+    "ziprecruiter",
+    "run_scrapers",
+    "SOURCES",
+    "get_enabled_sources"
+]
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRS:
+        module_name, attr = _LAZY_ATTRS[name]
+        value = getattr(importlib.import_module(f".{module_name}", __name__), attr)
+    elif name in JOB_SOURCES:
+        value = importlib.import_module(f".{name}", __name__)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    globals()[name] = value
+    return value
@@ -0,0 +1,292 @@
+# fetch/browser_pool.py
+
+"""
+Shared pool of long-lived headless Chrome instances for Selenium-based sources.
+
+Starting Chrome costs seconds and hundreds of MB, so ZipRecruiter and Workable
+borrow a warm driver from the pool for each search instead of launching their own.
+The pool size is capped by BROWSER_MEMORY_CAP_MB, images and fonts are blocked,
+and helpers wait on page conditions rather than fixed sleeps.
+
+Usage:
+
+    with get_browser_pool().browser() as driver:
+        driver.get(url)
+        wait_for_element(driver, By.CSS_SELECTOR, ".job-card")
+"""
+
+import os
+import queue
+import atexit
+import shutil
+import logging
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+MAX_BROWSERS = int(os.getenv("MAX_BROWSERS", "4"))
+BROWSER_MEMORY_CAP_MB = int(os.getenv("BROWSER_MEMORY_CAP_MB", "1200"))
+BROWSER_MEMORY_PER_INSTANCE_MB = int(os.getenv("BROWSER_MEMORY_PER_INSTANCE_MB", "300"))
+MAX_USES_PER_BROWSER = 50  # Recycle instances periodically; Chrome leaks memory over long sessions
+PAGE_LOAD_TIMEOUT = 30
+DEFAULT_WAIT_TIMEOUT = 15
+
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+# Resources we never need for scraping listings
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm",
+]
+
+
+def build_chrome_options(block_resources=True):
+    """
+    Build headless Chrome options shared by all pooled instances.
+
+    :param block_resources: Disable image loading via Chrome preferences
+    :return: selenium ChromeOptions
+    """
+    from selenium.webdriver.chrome.options import Options
+
+    options = Options()
+    options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--disable-extensions")
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    options.add_argument("--window-size=1920,1080")
+    options.add_argument(f"--user-agent={USER_AGENT}")
+    # Return control once the DOM is ready; callers wait for the elements they need
+    options.page_load_strategy = "eager"
+
+    if block_resources:
+        options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+        })
+
+    return options
+
+
+def create_driver(block_resources=True):
+    """
+    Launch a headless Chrome instance.
+
+    Uses a chromedriver on PATH when present, otherwise Selenium Manager resolves one.
+
+    :param block_resources: Block images and fonts
+    :return: selenium WebDriver
+    """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+
+    chromedriver_path = shutil.which("chromedriver")
+    service = Service(chromedriver_path) if chromedriver_path else Service()
+
+    driver = webdriver.Chrome(service=service, options=build_chrome_options(block_resources))
+    driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+
+    if block_resources:
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+        except Exception as e:
+            logger.debug(f"Could not enable resource blocking: {e}")
+
+    return driver
+
+
+class BrowserPool:
+    """
+    Fixed-size pool of reusable WebDriver instances.
+
+    Instances are created on demand up to `size` and handed out one per thread;
+    a driver that fails its health check after an error is discarded and replaced.
+    """
+
+    def __init__(self, max_browsers=MAX_BROWSERS, memory_cap_mb=BROWSER_MEMORY_CAP_MB,
+                 per_browser_mb=BROWSER_MEMORY_PER_INSTANCE_MB, driver_factory=None,
+                 max_uses=MAX_USES_PER_BROWSER):
+        """
+        :param max_browsers: Upper bound on concurrent instances
+        :param memory_cap_mb: Total memory budget for Chrome
+        :param per_browser_mb: Estimated memory per instance
+        :param driver_factory: Callable returning a new driver (default: create_driver)
+        :param max_uses: Recycle an instance after this many checkouts
+        """
+        self.size = max(1, min(max_browsers, memory_cap_mb // max(per_browser_mb, 1)))
+        self.driver_factory = driver_factory or create_driver
+        self.max_uses = max_uses
+        self._idle = queue.LifoQueue()  # Most recently used first - warmest caches
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self._uses = {}
+        self._closed = False
+        self.created = 0
+
+    @contextmanager
+    def browser(self):
+        """Borrow a driver for the duration of the `with` block."""
+        if self._closed:
+            raise RuntimeError("Browser pool is closed")
+
+        self._slots.acquire()
+        driver = None
+        healthy = True
+        try:
+            driver = self._checkout()
+            yield driver
+        except Exception:
+            healthy = driver is not None and self._is_alive(driver)
+            raise
+        finally:
+            if driver is not None:
+                self._checkin(driver, healthy)
+            self._slots.release()
+
+    def map(self, fn, items):
+        """
+        Run fn(driver, item) for each item across the pool, preserving order.
+
+        :param fn: Callable taking (driver, item)
+        :param items: Iterable of work items
+        :return: List of results
+        """
+        def run(item):
+            with self.browser() as driver:
+                return fn(driver, item)
+
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            return list(executor.map(run, items))
+
+    def close(self):
+        """Quit every idle instance and refuse further checkouts."""
+        self._closed = True
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._quit(driver)
+
+    def _checkout(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            logger.info(f"🚀 Launching headless browser ({self.created + 1}/{self.size})")
+            driver = self.driver_factory()
+            with self._lock:
+                self.created += 1
+                self._uses[id(driver)] = 0
+            return driver
+
+    def _checkin(self, driver, healthy):
+        with self._lock:
+            self._uses[id(driver)] = self._uses.get(id(driver), 0) + 1
+            worn_out = self._uses[id(driver)] >= self.max_uses
+
+        if not healthy or worn_out or self._closed:
+            self._quit(driver)
+            return
+
+        try:
+            # Drop per-search state so the next borrower starts clean
+            driver.delete_all_cookies()
+            driver.get("about:blank")
+        except Exception:
+            self._quit(driver)
+            return
+
+        self._idle.put(driver)
+
+    def _is_alive(self, driver):
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def _quit(self, driver):
+        with self._lock:
+            self._uses.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.debug(f"Error quitting browser: {e}")
+
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_browser_pool():
+    """Return the process-wide browser pool, creating it on first use."""
+    global _shared_pool
+
+    with _shared_pool_lock:
+        if _shared_pool is None or _shared_pool._closed:
+            _shared_pool = BrowserPool()
+            atexit.register(_shared_pool.close)
+        return _shared_pool
+
+
+def shutdown_browser_pool():
+    """Quit all pooled browsers (e.g. at the end of a scrape stage)."""
+    global _shared_pool
+
+    with _shared_pool_lock:
+        if _shared_pool is not None:
+            _shared_pool.close()
+            _shared_pool = None
+
+
+def wait_for_element(driver, by, selector, timeout=DEFAULT_WAIT_TIMEOUT):
+    """
+    Wait until an element is present instead of sleeping for a fixed time.
+
+    :return: The element, or None on timeout
+    """
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import TimeoutException
+
+    try:
+        return WebDriverWait(driver, timeout).until(EC.presence_of_element_located((by, selector)))
+    except TimeoutException:
+        return None
+
+
+def wait_for_clickable(driver, by, selector, timeout=DEFAULT_WAIT_TIMEOUT):
+    """
+    Wait until an element is clickable.
+
+    :return: The element, or None on timeout
+    """
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import TimeoutException
+
+    try:
+        return WebDriverWait(driver, timeout).until(EC.element_to_be_clickable((by, selector)))
+    except TimeoutException:
+        return None
+
+
+def wait_for_count_above(driver, by, selector, count, timeout=DEFAULT_WAIT_TIMEOUT):
+    """
+    Wait until more than `count` elements match, e.g. after clicking "load more".
+
+    :return: True if new elements appeared before the timeout
+    """
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.common.exceptions import TimeoutException
+
+    try:
+        WebDriverWait(driver, timeout).until(lambda d: len(d.find_elements(by, selector)) > count)
+        return True
+    except TimeoutException:
+        return False
@@ -11,20 +11,13 @@ from urllib3.util.retry import Retry
 from datetime import datetime
 from typing import List, Dict, Optional
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("glassdoor_scraper.log"),
-        logging.StreamHandler()
-    ]
-)
-logger = logging.getLogger("GlassdoorScraper")
+# Handlers are configured once by the entry point (see utils/log.py)
+logger = logging.getLogger(__name__)
 
 # Ensure script finds `config.py`
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 import config
+from utils.location_resolver import matches_any_location
 
 # Constants - OPTIMIZED FOR SPEED
 BASE_URL = "https://www.glassdoor.com/Job/jobs.htm"
@@ -43,14 +36,6 @@ USER_AGENTS = [
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.1 Safari/605.1.15",
 ]
 
-# Location aliases for matching
-LOCATION_ALIASES = {
-    "uk": ["united kingdom", "gb", "britain"],
-    "london": ["greater london", "london"],
-    "remote": ["work from home", "wfh", "telecommute", "telework", "virtual", "home-based"],
-}
-
-
 def create_session():
     """Create a requests session with automatic retries and connection pooling."""
     session = requests.Session()
@@ -209,21 +194,7 @@ def extract_jobs_from_page(html: str) -> List[Dict]:
 
 def location_matches(job_location: str, target_locations: List[str]) -> bool:
     """Check if job location matches any of the target locations."""
-    job_loc_lower = job_location.lower()
-    
-    for target_loc in target_locations:
-        target_lower = target_loc.lower()
-        
-        # Direct match
-        if target_lower in job_loc_lower:
-            return True
-        
-        # Check aliases
-        for alias in LOCATION_ALIASES.get(target_lower, []):
-            if alias in job_loc_lower:
-                return True
-    
-    return False
+    return matches_any_location(job_location, target_locations)
 
 
 def fetch_glassdoor_jobs(job_titles: Optional[List[str]] = None, locations: Optional[List[str]] = None) -> List[Dict]:
@@ -232,8 +203,12 @@ def fetch_glassdoor_jobs(job_titles: Optional[List[str]] = None, locations: Opti
 
     Uses sophisticated retry logic, delays, and header rotation.
     """
-    job_titles = job_titles or config.JOB_KEYWORDS
+    job_titles = job_titles or []
     locations = locations or ["london", "remote", "uk"]
+
+    if not job_titles:
+        logger.warning("No job titles provided for Glassdoor search. Skipping.")
+        return []
     normalized_locations = [loc.lower() for loc in locations]
 
     logger.info("Starting Glassdoor job scraper with anti-detection measures")
@@ -297,6 +272,9 @@ def fetch_glassdoor_jobs(job_titles: Optional[List[str]] = None, locations: Opti
 
 
 if __name__ == "__main__":
+    from utils.log import configure_logging
+    configure_logging()
+
     jobs = fetch_glassdoor_jobs(
         job_titles=["Software Engineer"],
         locations=["London", "Remote", "UK"]
@@ -10,6 +10,7 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 import config
+from utils.location_resolver import matches_any_location
 
 logger = logging.getLogger(__name__)
 
@@ -22,23 +23,25 @@ CACHE_FILE = os.path.join(os.path.dirname(__file__), "..", "ifyoucould_cache.jso
 CACHE_TTL_HOURS = 6
 MAX_WORKERS = 15  # Number of concurrent workers for parallel fetching
 
-def parse_job_location(location):
-    """Normalize job location strings for matching."""
-    location = location.lower().strip()
-    replacements = {
-        'united kingdom': 'uk',
-        'greater london': 'london',
-    }
-    for full, short in replacements.items():
-        location = location.replace(full, short)
-    return location
+# Shared connection pool sized for the detail-page workers, reused across runs in one process
+SESSION = requests.Session()
+SESSION.mount("https://", requests.adapters.HTTPAdapter(pool_connections=2, pool_maxsize=MAX_WORKERS))
+
+_cache = None  # Cache loaded from disk, kept in memory for later runs in the same process
 
 def load_cache():
     """
-    Load cache from file.
+    Load cache from file (only once per process; later calls reuse the in-memory copy).
 
     :return: Dictionary with cached job details
     """
+    global _cache
+    if _cache is not None:
+        return _cache
+    _cache = _load_cache_file()
+    return _cache
+
+def _load_cache_file():
     try:
         if os.path.exists(CACHE_FILE):
             with open(CACHE_FILE, 'r') as f:
@@ -58,6 +61,9 @@ def save_cache(cache):
 
     :param cache: Dictionary with job details to cache
     """
+    # Drop expired entries so the in-memory cache doesn't grow for the life of the daemon
+    for job_url in [url for url, cached_data in cache.items() if not is_cache_valid(cached_data)]:
+        del cache[job_url]
     try:
         with open(CACHE_FILE, 'w') as f:
             json.dump(cache, f, indent=2)
@@ -101,7 +107,7 @@ def fetch_with_retry(url, headers=None, max_retries=RETRY_ATTEMPTS):
     for attempt in range(max_retries):
         try:
             logger.info(f"Fetching {url} (attempt {attempt + 1}/{max_retries})")
-            response = requests.get(url, headers=default_headers, timeout=REQUEST_TIMEOUT)
+            response = SESSION.get(url, headers=default_headers, timeout=REQUEST_TIMEOUT)
 
             if response.status_code == 200:
                 return response
@@ -249,25 +255,7 @@ def matches_user_location(job_location, user_locations):
     if not user_locations:
         return True  # If no locations specified, accept all
 
-    job_loc_normalized = parse_job_location(job_location)
-
-    for user_loc in user_locations:
-        user_loc_normalized = parse_job_location(user_loc)
-
-        # Check for direct match
-        if user_loc_normalized in job_loc_normalized or job_loc_normalized in user_loc_normalized:
-            return True
-
-        # Special handling for remote jobs
-        if 'remote' in job_loc_normalized:
-            return True
-
-        # Special handling for UK variations
-        if any(uk_term in user_loc_normalized for uk_term in ['uk', 'united kingdom', 'london', 'england']):
-            if any(uk_term in job_loc_normalized for uk_term in ['uk', 'united kingdom', 'london', 'england', 'remote']):
-                return True
-
-    return False
+    return matches_any_location(job_location, user_locations)
 
 def fetch_job_details_parallel(filtered_jobs, cache, max_workers=MAX_WORKERS):
     """
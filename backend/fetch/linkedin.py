@@ -1,9 +1,14 @@
 import time
 import random
+import logging
 import requests
 from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
 
+from utils.log import EventAggregator
+
+logger = logging.getLogger(__name__)
+
 # ✅ LinkedIn Request Headers (mimics a browser to avoid detection)
 HEADERS = {
     "authority": "www.linkedin.com",
@@ -14,7 +19,11 @@ HEADERS = {
     "user-agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
 }
 
-DATE_THRESHOLD = datetime.today() - timedelta(days=14) 
+MAX_JOB_AGE_DAYS = 14  # Skip postings older than this (measured on every fetch, not at import)
+
+# One session per process so connections to LinkedIn are reused across searches
+# (and across cycles when running under daemon.py)
+SESSION = requests.Session()
 
 def parse_relative_date(date_text):
     today = datetime.today()
@@ -47,14 +56,14 @@ def fetch_all_linkedin_jobs(job_titles, locations, max_jobs=20, max_per_title=10
     if not isinstance(locations, list):
         locations = [locations]
 
-    print(f"🔍 Starting LinkedIn job search for {len(job_titles)} job titles across {len(locations)} locations")
-    print(f"🎯 Target: Up to {max_jobs} jobs per title-location combination")
+    logger.info(f"🔍 Starting LinkedIn job search for {len(job_titles)} job titles across {len(locations)} locations")
+    logger.info(f"🎯 Target: Up to {max_jobs} jobs per title-location combination")
 
     for location in locations:
-        print(f"\n🌍 Scraping jobs in {location}...")
+        logger.info(f"🌍 Scraping jobs in {location}...")
 
         for job_title in job_titles:
-            print(f"🔍 Searching LinkedIn for: {job_title} in {location}")
+            logger.debug(f"🔍 Searching LinkedIn for: {job_title} in {location}")
 
             jobs = fetch_linkedin_jobs(
                 search_term=job_title,
@@ -66,19 +75,19 @@ def fetch_all_linkedin_jobs(job_titles, locations, max_jobs=20, max_per_title=10
             total_api_calls += (len(jobs) // 25) + 1  # Estimate API calls
 
             if jobs:
-                print(f"✅ Found {len(jobs)} jobs for {job_title} in {location}")
+                logger.info(f"✅ Found {len(jobs)} jobs for {job_title} in {location}")
                 all_jobs.extend(jobs)
             else:
-                print(f"❌ No jobs found for {job_title} in {location}")
+                logger.info(f"❌ No jobs found for {job_title} in {location}")
 
     # Add statistics at the end
     elapsed_time = time.time() - start_time
-    print(f"\n📊 LINKEDIN SCRAPER STATISTICS:")
-    print(f"✅ Total jobs found: {len(all_jobs)}")
-    print(f"🔍 Total search combinations: {len(job_titles) * len(locations)}")
-    print(f"📡 Estimated API calls: {total_api_calls}")
-    print(f"⏱️ Total time: {elapsed_time:.2f} seconds")
-    print(f"⚡ Rate: {len(all_jobs)/elapsed_time:.2f} jobs/second")
+    logger.info(f"📊 LINKEDIN SCRAPER STATISTICS:")
+    logger.info(f"✅ Total jobs found: {len(all_jobs)}")
+    logger.info(f"🔍 Total search combinations: {len(job_titles) * len(locations)}")
+    logger.info(f"📡 Estimated API calls: {total_api_calls}")
+    logger.info(f"⏱️ Total time: {elapsed_time:.2f} seconds")
+    logger.info(f"⚡ Rate: {len(all_jobs)/elapsed_time:.2f} jobs/second")
 
     return all_jobs
 
@@ -98,8 +107,9 @@ def fetch_linkedin_jobs(search_term, location, max_jobs=20, max_per_title=10):
     job_title_counts = {}  # Track count per job title
     page_count = 0
     max_pages = 3  # Limit to reasonable number of pages (8 pages = 200 potential listings)
+    date_threshold = datetime.today() - timedelta(days=MAX_JOB_AGE_DAYS)
 
-    print(f"🔎 Searching for: {search_term} in {location}")
+    events = EventAggregator(logger, f"linkedin[{search_term} @ {location}]")
 
     while len(jobs) < max_jobs and start < 1000 and page_count < max_pages:
         page_count += 1
@@ -115,30 +125,30 @@ def fetch_linkedin_jobs(search_term, location, max_jobs=20, max_per_title=10):
         time.sleep(random.uniform(2.0, 4.0))
         
         try:
-            print(f"📄 Fetching page {page_count} (results {start}-{start+25})...")
-            response = requests.get(url, headers=HEADERS, timeout=15)
+            logger.debug(f"📄 Fetching page {page_count} (results {start}-{start+25})...")
+            response = SESSION.get(url, headers=HEADERS, timeout=15)
             
             if response.status_code == 429:
-                print(f"⚠️ Rate limited! Waiting longer before retry...")
+                logger.warning(f"⚠️ Rate limited! Waiting longer before retry...")
                 time.sleep(random.uniform(30, 60))  # Longer wait on rate limit
-                response = requests.get(url, headers=HEADERS, timeout=15)
+                response = SESSION.get(url, headers=HEADERS, timeout=15)
             
             if response.status_code != 200:
-                print(f"❌ LinkedIn request failed: {response.status_code}")
+                logger.warning(f"❌ LinkedIn request failed: {response.status_code}")
                 break
 
             soup = BeautifulSoup(response.text, "html.parser")
             job_cards = soup.find_all("div", class_="base-search-card")
 
             if not job_cards:
-                print(f"📭 No more job listings found on page {page_count}.")
+                logger.debug(f"📭 No more job listings found on page {page_count}.")
                 break
                 
-            print(f"📑 Found {len(job_cards)} job cards on page {page_count}")
+            logger.debug(f"📑 Found {len(job_cards)} job cards on page {page_count}")
 
             for job_card in job_cards:
                 if len(jobs) >= max_jobs:
-                    print(f"🛑 Reached maximum of {max_jobs} jobs for this search")
+                    logger.debug(f"🛑 Reached maximum of {max_jobs} jobs for this search")
                     break
 
                 # Extract Job URL
@@ -180,12 +190,13 @@ def fetch_linkedin_jobs(search_term, location, max_jobs=20, max_per_title=10):
                         relative_date_text = date_tag.get_text(strip=True).lower()
                         job_date = parse_relative_date(relative_date_text)
 
-                    if job_date < DATE_THRESHOLD:
-                        print(f"⏳ Skipping old job: {title} (Posted {job_date.date()})")
+                    if job_date < date_threshold:
+                        events.record("too_old", "⏳ Skipping old job: %s (Posted %s)", title, job_date.date())
                         continue
 
                 # Limit identical job titles
                 if job_title_counts.get(title, 0) >= max_per_title:
+                    events.record("title_cap")
                     continue
 
                 # Job passed all filters - add to results
@@ -202,21 +213,20 @@ def fetch_linkedin_jobs(search_term, location, max_jobs=20, max_per_title=10):
                 })
 
                 job_title_counts[title] = job_title_counts.get(title, 0) + 1
-                print(f"✅ Added: {title} at {company_name}")
+                events.record("added", "✅ Added: %s at %s", title, company_name)
 
             # If we didn't find any new jobs on this page, break
             if len(jobs) == 0 and page_count > 1:
-                print("🔍 No new matching jobs found. Ending search.")
+                logger.debug("🔍 No new matching jobs found. Ending search.")
                 break
 
             # Move to next page
             start += 25
             
         except Exception as e:
-            print(f"❌ Error processing page {page_count}: {str(e)}")
+            logger.error(f"❌ Error processing page {page_count}: {str(e)}")
             break
 
-    print(f"🏁 Completed search for '{search_term}' in {location}")
-    print(f"📊 Found {len(jobs)} jobs across {page_count} pages")
+    events.summary(pages=page_count)
     
     return jobs
\ No newline at end of file
@@ -0,0 +1,156 @@
+# fetch/registry.py
+
+"""
+Declarative registry of job scraper sources.
+
+Each source declares how it is queried and what it costs, and the orchestrator in
+fetch/run_scrapers.py plans work from these declarations instead of hard-coding
+one block per scraper. Scraper modules are only imported when a source actually
+runs, so disabled Selenium sources never load their dependencies.
+
+Enable or disable sources without code changes:
+
+    SCRAPER_SOURCES=linkedin,unjobs     # run exactly these
+    DISABLED_SOURCES=unjobs             # run the defaults minus these
+"""
+
+import os
+import time
+import logging
+import importlib
+from threading import Lock
+
+logger = logging.getLogger(__name__)
+
+# Query granularity - how a source is searched
+TITLE_LOCATION = "title_location"  # fn(search_term, location), once per unique pair
+TITLE_ONLY = "title_only"          # fn(job_titles, locations), once with all unique titles
+GLOBAL_LISTING = "global_listing"  # fn(user_locations=...), one sweep of the whole board
+
+
+class RateLimiter:
+    """Thread-safe minimum interval between calls."""
+
+    def __init__(self, min_interval_seconds=0.0):
+        self.min_interval_seconds = min_interval_seconds
+        self._lock = Lock()
+        self._next_at = 0.0
+
+    def wait(self):
+        """Block until the next call is allowed."""
+        if not self.min_interval_seconds:
+            return
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_at - now
+            self._next_at = max(now, self._next_at) + self.min_interval_seconds
+        if delay > 0:
+            time.sleep(delay)
+
+
+class ScraperSource:
+    """Declaration of a single scraper source and its capabilities."""
+
+    def __init__(self, name, module, function, granularity, enabled=True,
+                 needs_browser=False, min_interval_seconds=0.0, max_concurrency=1,
+                 cacheable=False, cache_ttl_hours=0, notes=""):
+        """
+        :param name: Source key used in job dictionaries ("linkedin", ...)
+        :param module: Dotted module path, imported lazily
+        :param function: Fetch function name in that module
+        :param granularity: TITLE_LOCATION, TITLE_ONLY or GLOBAL_LISTING
+        :param enabled: Whether the source runs by default
+        :param needs_browser: Whether the source drives a headless browser
+        :param min_interval_seconds: Minimum spacing between calls to this source
+        :param max_concurrency: Maximum concurrent calls to this source
+        :param cacheable: Whether results/details are cached between runs
+        :param cache_ttl_hours: How long cached results stay valid
+        :param notes: Free text, e.g. why a source is disabled
+        """
+        self.name = name
+        self.module = module
+        self.function = function
+        self.granularity = granularity
+        self.enabled = enabled
+        self.needs_browser = needs_browser
+        self.min_interval_seconds = min_interval_seconds
+        self.max_concurrency = max_concurrency
+        self.cacheable = cacheable
+        self.cache_ttl_hours = cache_ttl_hours
+        self.notes = notes
+        self.rate_limiter = RateLimiter(min_interval_seconds)
+        self._fetch = None
+
+    def load(self):
+        """Import the scraper module and return its fetch function."""
+        if self._fetch is None:
+            self._fetch = getattr(importlib.import_module(self.module), self.function)
+        return self._fetch
+
+    def fetch(self, *args, **kwargs):
+        """Call the scraper, honouring the declared rate limit."""
+        fetch = self.load()
+        self.rate_limiter.wait()
+        return fetch(*args, **kwargs)
+
+    def __repr__(self):
+        return f"ScraperSource({self.name!r}, granularity={self.granularity!r}, enabled={self.enabled})"
+
+
+SOURCES = {}
+
+
+def register_source(source):
+    """Add (or replace) a source in the registry."""
+    SOURCES[source.name] = source
+    return source
+
+
+register_source(ScraperSource(
+    "linkedin", "fetch.linkedin", "fetch_linkedin_jobs", TITLE_LOCATION,
+    max_concurrency=1,  # Guest API rate limits hard; the scraper already sleeps 2-4s per page
+))
+register_source(ScraperSource(
+    "unjobs", "fetch.unjobs", "fetch_unjobs_parallel", TITLE_ONLY,
+    cacheable=True, cache_ttl_hours=24,
+))
+register_source(ScraperSource(
+    "ifyoucould", "fetch.ifyoucould", "fetch_ifyoucould_jobs", GLOBAL_LISTING,
+    cacheable=True, cache_ttl_hours=6,
+))
+register_source(ScraperSource(
+    "glassdoor", "fetch.glassdoor", "fetch_glassdoor_jobs", TITLE_ONLY,
+    enabled=False, notes="Glassdoor is blocking requests and HTML parsing is unreliable",
+))
+register_source(ScraperSource(
+    "ziprecruiter", "fetch.ziprecruiter", "fetch_ziprecruiter_jobs", TITLE_LOCATION,
+    enabled=False, needs_browser=True, min_interval_seconds=2.0, max_concurrency=3,  # Bounded by the browser pool
+))
+register_source(ScraperSource(
+    "workable", "fetch.workable", "fetch_workable_jobs", TITLE_LOCATION,
+    enabled=False, needs_browser=True, min_interval_seconds=2.0, max_concurrency=3,  # Bounded by the browser pool
+))
+
+
+def _env_list(name):
+    return [item.strip().lower() for item in os.getenv(name, "").split(",") if item.strip()]
+
+
+def get_enabled_sources():
+    """
+    Return the sources that should run, in registry order.
+
+    SCRAPER_SOURCES (explicit list) takes precedence over the declared defaults;
+    DISABLED_SOURCES is then removed from whichever set applies.
+    """
+    explicit = _env_list("SCRAPER_SOURCES")
+    disabled = set(_env_list("DISABLED_SOURCES"))
+
+    for name in explicit + list(disabled):
+        if name not in SOURCES:
+            logger.warning(f"⚠️ Unknown scraper source in environment: {name}")
+
+    return [
+        source for name, source in SOURCES.items()
+        if (name in explicit if explicit else source.enabled) and name not in disabled
+    ]
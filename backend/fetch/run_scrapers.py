@@ -1,91 +1,121 @@
 # fetch/run_scrapers.py
 
-import json
-from fetch import ifyoucould, linkedin, unjobs
-
-def fetch_jobs(job_location_pairs):
-    print(f"\n⏳ Running job scrapers for {len(job_location_pairs)} job title + location combinations...")
-
-    jobs = {
-        "linkedin": [],
-        "ifyoucould": [],
-        "unjobs": [],
-        "glassdoor": [],
-        # "ziprecruiter": [],
-        # "workable": [],
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from fetch.registry import get_enabled_sources, TITLE_LOCATION, TITLE_ONLY, GLOBAL_LISTING
+
+logger = logging.getLogger(__name__)
+
+def plan_source_calls(source, job_location_pairs):
+    """
+    Turn the unique search pairs into the calls a source needs, based on its
+    declared query granularity.
+
+    :param source: ScraperSource from fetch.registry
+    :param job_location_pairs: List of unique (job_title, location) pairs
+    :return: List of (args, kwargs) tuples, one per scraper call
+    """
+    pairs = sorted(set(job_location_pairs))
+    if not pairs:
+        # Nothing to search for (e.g. a shard with no keys for this source)
+        return []
+    titles = sorted({title for title, _ in pairs})
+    locations = sorted({location for _, location in pairs})
+
+    if source.granularity == TITLE_LOCATION:
+        return [((title, location), {}) for title, location in pairs]
+    if source.granularity == TITLE_ONLY:
+        # One call covering every title; the scraper filters by all locations
+        return [((titles, locations), {})] if titles else []
+    if source.granularity == GLOBAL_LISTING:
+        # Sweep the whole board once, pre-filtered by location
+        return [((), {"user_locations": locations})]
+
+    logger.warning(f"⚠️ Unknown granularity '{source.granularity}' for source {source.name}")
+    return []
+
+def run_source(source, calls):
+    """
+    Execute all planned calls for one source and validate the source field.
+
+    :param source: ScraperSource from fetch.registry
+    :param calls: List of (args, kwargs) tuples from plan_source_calls
+    :return: List of job dictionaries
+    """
+    def run_call(call):
+        args, kwargs = call
+        try:
+            return source.fetch(*args, **kwargs) or []
+        except Exception as e:
+            logger.error(f"❌ {source.name} scraper failed for {args or kwargs}: {e}")
+            return []
+
+    results = []
+    if source.max_concurrency > 1 and len(calls) > 1:
+        with ThreadPoolExecutor(max_workers=min(source.max_concurrency, len(calls))) as executor:
+            for call_results in executor.map(run_call, calls):
+                results.extend(call_results)
+    else:
+        for call in calls:
+            results.extend(run_call(call))
+
+    mismatched = 0
+    for job in results:
+        if job.get('source') != source.name:
+            mismatched += 1
+            job['source'] = source.name
+    if mismatched:
+        logger.debug(f"⚠️ Set missing/incorrect source on {mismatched} {source.name} jobs")
+
+    return results
+
+def fetch_jobs(job_location_pairs, sources=None, pairs_by_source=None):
+    """
+    Run every enabled scraper source for the given search pairs.
+
+    Independent HTTP sources run side by side; browser-backed sources share a
+    single lane so only one of them holds Chrome instances at a time.
+
+    :param job_location_pairs: List of unique (job_title, location) pairs
+    :param sources: Optional list of ScraperSource (default: enabled sources)
+    :param pairs_by_source: Optional dictionary of source name -> pairs, overriding
+                            job_location_pairs per source (used by sharded cycles)
+    :return: Dictionary of source name -> list of jobs
+    """
+    sources = get_enabled_sources() if sources is None else sources
+    logger.info(f"⏳ Running {len(sources)} job scrapers ({', '.join(s.name for s in sources)}) "
+                f"for {len(job_location_pairs)} job title + location combinations...")
+
+    jobs = {source.name: [] for source in sources}
+    pairs_by_source = pairs_by_source or {}
+    plans = {
+        source.name: plan_source_calls(source, pairs_by_source.get(source.name, job_location_pairs))
+        for source in sources
     }
+    for source in sources:
+        logger.info(f"🗓️ {source.name}: {len(plans[source.name])} calls ({source.granularity})")
 
-    # 🔁 Run LinkedIn, UNJobs per search pair
-    for job_title, location in job_location_pairs:
-        print(f"🔍 Scraping for: '{job_title}' in '{location}'...")
-
-        # Fetch and validate LinkedIn jobs
-        linkedin_results = linkedin.fetch_linkedin_jobs(job_title, location)
-        for job in linkedin_results:
-            if job.get('source') != 'linkedin':
-                print(f"⚠️ LinkedIn job missing correct source: {job.get('title')}")
-                job['source'] = 'linkedin'
-        jobs["linkedin"].extend(linkedin_results)
-
-        # UN Jobs scraper - matches jobs by country
-        un_results = unjobs.fetch_unjobs_parallel([job_title], [location])
-        for job in un_results:
-            if job.get('source') != 'unjobs':
-                print(f"⚠️ UN job missing correct source: {job.get('title')}")
-                job['source'] = 'unjobs'
-        jobs["unjobs"].extend(un_results)
-
-        # # Temporarily disabled: Glassdoor is blocking requests and HTML parsing is unreliable
-        # # TODO: Investigate alternative Glassdoor API or scraping method
-        # gd_results = glassdoor.fetch_glassdoor_jobs([job_title], [location])
-        # for job in gd_results:
-        #     if job.get('source') != 'glassdoor':
-        #         print(f"⚠️ Glassdoor job missing correct source: {job.get('title')}")
-        #         job['source'] = 'glassdoor'
-        # jobs["glassdoor"].extend(gd_results)
-
-        # # Uncomment to enable ZipRecruiter
-        # zip_results = ziprecruiter.fetch_ziprecruiter_jobs(job_title, location)
-        # for job in zip_results:
-        #     if job.get('source') != 'ziprecruiter':
-        #         print(f"⚠️ ZipRecruiter job missing correct source: {job.get('title')}")
-        #         job['source'] = 'ziprecruiter'
-        # jobs["ziprecruiter"].extend(zip_results)
-
-        # # Uncomment to enable Workable
-        # workable_results = workable.fetch_workable_jobs([job_title], [location])
-        # for job in workable_results:
-        #     if job.get('source') != 'workable':
-        #         print(f"⚠️ Workable job missing correct source: {job.get('title')}")
-        #         job['source'] = 'workable'
-        # jobs["workable"].extend(workable_results)
-
-    # ✅ Fetch all IfYouCould jobs ONCE with location filtering
-    # Extract unique locations from job_location_pairs for early filtering
-    user_locations = list(set([location for _, location in job_location_pairs])) if job_location_pairs else []
-
-    print(f"📥 Collecting If You Could jobs with smart location filtering ({len(user_locations)} unique locations)...")
-    all_ifyoucould_jobs = ifyoucould.fetch_ifyoucould_jobs(user_locations=user_locations)
-
-    # Set source for all IfYouCould jobs
-    # Note: Scraper now filters by location BEFORE fetching detail pages (70-80% faster!)
-    for job in all_ifyoucould_jobs:
-        job['source'] = 'ifyoucould'
-
-    jobs["ifyoucould"] = all_ifyoucould_jobs
-    print(f"✅ Collected {len(all_ifyoucould_jobs)} If You Could jobs (pre-filtered by location)")
-
-    # Summary with validation
+    lanes = [[source] for source in sources if not source.needs_browser]
+    browser_sources = [source for source in sources if source.needs_browser]
+    if browser_sources:
+        lanes.append(browser_sources)
+
+    def run_lane(lane):
+        return {source.name: run_source(source, plans[source.name]) for source in lane}
+
+    if lanes:
+        with ThreadPoolExecutor(max_workers=len(lanes)) as executor:
+            for lane_results in executor.map(run_lane, lanes):
+                jobs.update(lane_results)
+
+    # Summary
     total_jobs = sum(len(jobs[source]) for source in jobs)
-    print(f"✅ Completed scraping. Found {total_jobs} total jobs:")
+    logger.info(f"✅ Completed scraping. Found {total_jobs} total jobs:")
     for source, job_list in jobs.items():
-        print(f"  - {source}: {len(job_list)} jobs")
-        # Validate all jobs have correct source
-        mismatched = [j for j in job_list if j.get('source') != source]
-        if mismatched:
-            print(f"    ⚠️ WARNING: {len(mismatched)} jobs have incorrect source!")
+        logger.info(f"  - {source}: {len(job_list)} jobs")
 
     return jobs
 
-def run_scrapers(job_location_pairs):
-    return fetch_jobs(job_location_pairs)
\ No newline at end of file
+def run_scrapers(job_location_pairs, sources=None):
+    return fetch_jobs(job_location_pairs, sources)
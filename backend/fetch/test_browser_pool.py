@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared headless browser pool.
+
+Pool mechanics run against a fake driver. The scraper tests load local HTML
+fixtures (fetch/fixtures/) from a local HTTP server and are skipped when Chrome
+is not available.
+
+Run with: python -m pytest fetch/test_browser_pool.py
+"""
+
+import os
+import sys
+import threading
+import functools
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from fetch.browser_pool import BrowserPool, create_driver
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+class FakeDriver:
+    def __init__(self):
+        self.alive = True
+        self.quit_called = False
+        self.visited = []
+
+    @property
+    def current_url(self):
+        if not self.alive:
+            raise RuntimeError("browser crashed")
+        return self.visited[-1] if self.visited else "about:blank"
+
+    def get(self, url):
+        self.visited.append(url)
+
+    def delete_all_cookies(self):
+        pass
+
+    def quit(self):
+        self.quit_called = True
+
+
+def test_pool_reuses_warm_instances():
+    created = []
+    pool = BrowserPool(max_browsers=2, driver_factory=lambda: created.append(FakeDriver()) or created[-1])
+
+    for _ in range(5):
+        with pool.browser() as driver:
+            driver.get("http://example.test/search")
+
+    assert len(created) == 1
+    pool.close()
+    assert created[0].quit_called
+
+
+def test_pool_size_is_capped_by_memory():
+    pool = BrowserPool(max_browsers=8, memory_cap_mb=900, per_browser_mb=300, driver_factory=FakeDriver)
+    assert pool.size == 3
+
+
+def test_pool_map_runs_in_parallel_up_to_size():
+    created = []
+    active = []
+    peak = []
+    lock = threading.Lock()
+    pool = BrowserPool(max_browsers=2, driver_factory=lambda: created.append(FakeDriver()) or created[-1])
+
+    def visit(driver, item):
+        with lock:
+            active.append(item)
+            peak.append(len(active))
+        threading.Event().wait(0.05)
+        with lock:
+            active.remove(item)
+        return item * 2
+
+    assert pool.map(visit, range(6)) == [0, 2, 4, 6, 8, 10]
+    assert max(peak) <= 2
+    assert len(created) <= 2
+
+
+def test_pool_replaces_crashed_instance():
+    created = []
+    pool = BrowserPool(max_browsers=1, driver_factory=lambda: created.append(FakeDriver()) or created[-1])
+
+    with pytest.raises(RuntimeError):
+        with pool.browser() as driver:
+            driver.alive = False
+            raise RuntimeError("page blew up")
+
+    with pool.browser() as driver:
+        assert driver is not created[0]
+
+    assert created[0].quit_called
+    assert len(created) == 2
+
+
+def test_pool_recycles_worn_out_instance():
+    created = []
+    pool = BrowserPool(max_browsers=1, max_uses=2, driver_factory=lambda: created.append(FakeDriver()) or created[-1])
+
+    for _ in range(3):
+        with pool.browser():
+            pass
+
+    assert len(created) == 2
+
+
+# Chrome-backed tests against local fixtures
+
+@pytest.fixture(scope="module")
+def fixture_server():
+    handler = functools.partial(QuietHandler, directory=FIXTURES_DIR)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    requested = []
+
+    def do_GET(self):
+        QuietHandler.requested.append(self.path)
+        super().do_GET()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def chrome_pool():
+    try:
+        driver = create_driver()
+    except Exception as e:
+        pytest.skip(f"Chrome not available: {e}")
+
+    pool = BrowserPool(max_browsers=1, driver_factory=lambda: driver)
+    yield pool
+    pool.close()
+
+
+def test_ziprecruiter_fixture(fixture_server, chrome_pool, monkeypatch):
+    from fetch import ziprecruiter
+
+    monkeypatch.setattr(ziprecruiter, "get_browser_pool", lambda: chrome_pool)
+    monkeypatch.setattr(ziprecruiter, "SEARCH_URL", fixture_server + "/ziprecruiter_search.html?q={query}&l={location}")
+
+    jobs = ziprecruiter.fetch_ziprecruiter_jobs("UX Designer", "London")
+
+    assert [job["title"] for job in jobs] == ["Senior UX Designer", "UX Designer"]
+    assert jobs[0]["company"] == "Acme Ltd"
+    assert all(job["source"] == "ziprecruiter" for job in jobs)
+    # Images and fonts are blocked before they reach the server
+    assert not any(path.endswith((".png", ".woff2")) for path in QuietHandler.requested)
+
+
+def test_workable_fixture_load_more(fixture_server, chrome_pool, monkeypatch):
+    from fetch import workable
+
+    monkeypatch.setattr(workable, "get_browser_pool", lambda: chrome_pool)
+    monkeypatch.setattr(workable, "BASE_URL", fixture_server + "/workable_search.html?query={query}&location={location}")
+
+    jobs = workable.fetch_workable_jobs("UX Designer", "London")
+
+    assert sorted(job["title"] for job in jobs) == ["Lead UX Designer", "Senior UX Designer", "UX Designer"]
+    assert all(job["url"].startswith(fixture_server + "/view/") for job in jobs)
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -13,20 +13,13 @@ import hashlib
 import concurrent.futures
 from threading import Lock
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("unjobs_scraper.log"),
-        logging.StreamHandler()
-    ]
-)
-logger = logging.getLogger("UNJobsScraper")
+# Handlers are configured once by the entry point (see utils/log.py)
+logger = logging.getLogger(__name__)
 
 # Ensure script finds `config.py`
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 import config
+from utils.location_resolver import resolve_location, mentioned_location_ids
 
 # Constants
 BASE_URL = "https://unjobs.org/search/{query}"
@@ -36,36 +29,6 @@ MAX_WORKERS = 10  # Number of concurrent workers (OPTIMIZED: increased from 3 to
 REQUEST_TIMEOUT = 15  # HTTP request timeout in seconds
 RETRY_ATTEMPTS = 3  # Number of retry attempts
 
-# Location aliases for better matching
-LOCATION_ALIASES = {
-    "uk": ["united kingdom", "britain", "england", "scotland", "wales", "northern ireland", "england, united kingdom"],
-    "london": ["greater london", "london"],
-    "remote": ["work from home", "wfh", "telecommute", "telework", "virtual", "home-based"],
-}
-
-# Country mapping - extracts country name from location string
-COUNTRY_MAP = {
-    "uk": ["united kingdom", "britain", "england", "scotland", "wales", "northern ireland"],
-    "united states": ["usa", "united states", "us"],
-    "canada": ["canada"],
-    "australia": ["australia"],
-    "new zealand": ["new zealand"],
-    "india": ["india"],
-    "south africa": ["south africa"],
-    "france": ["france"],
-    "germany": ["germany"],
-    "netherlands": ["netherlands"],
-    "belgium": ["belgium"],
-    "switzerland": ["switzerland"],
-    "sweden": ["sweden"],
-    "norway": ["norway"],
-    "denmark": ["denmark"],
-    "singapore": ["singapore"],
-    "hong kong": ["hong kong"],
-    "japan": ["japan"],
-    "thailand": ["thailand"],
-}
-
 # User-Agent Rotation - More diverse browser signatures
 USER_AGENTS = [
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/110.0.0.0 Safari/537.36",
@@ -100,11 +63,25 @@ class ThreadSafeCache:
         return {}
     
     def save_cache(self):
-        """Save cache to file"""
+        """
+        Save cache to file.
+
+        Shard workers in other processes save the same file, so entries they
+        wrote since this cache was loaded are merged in, and the file is
+        replaced atomically from a per-process temp file rather than
+        rewritten in place (a reader never sees half a file).
+        """
         with self.lock:
+            # Drop expired entries so the cache file doesn't grow forever
+            cutoff = datetime.now().timestamp() - CACHE_EXPIRY_HOURS * 3600
+            on_disk = self._load_cache()
+            merged = {**on_disk, **self.cache}
+            self.cache = {key: item for key, item in merged.items() if item.get('timestamp', 0) >= cutoff}
             try:
-                with open(self.cache_file, 'w') as f:
+                tmp_file = f"{self.cache_file}.{os.getpid()}.tmp"
+                with open(tmp_file, 'w') as f:
                     json.dump(self.cache, f)
+                os.replace(tmp_file, self.cache_file)
                 logger.info(f"Saved {len(self.cache)} items to cache")
             except Exception as e:
                 logger.error(f"Error saving cache: {e}")
@@ -132,52 +109,43 @@ class ThreadSafeCache:
 def extract_country_from_location(location_str):
     """
     Extract the country name from a location string.
-    E.g., "London" -> "uk", "New York" -> "united states"
+    E.g., "London" -> "uk", "New York, USA" -> "united states"
 
     :param location_str: Location string (e.g., "London", "UK", "India")
     :return: Country name or the original string if not recognized
     """
-    location_lower = location_str.lower().strip()
-
-    # Check against our country map
-    for country, aliases in COUNTRY_MAP.items():
-        for alias in aliases:
-            if alias in location_lower:
-                return country
+    resolved = resolve_location(location_str)
+    if resolved.country:
+        return resolved.country
+    if resolved.remote:
+        return "remote"
 
     # If no country mapping found, return the location itself
-    return location_lower
+    return location_str.lower().strip()
 
 def location_matches(job_text, target_locations):
     """
     Check if job matches any of the target locations.
-    Matches by extracting the country from both the target location and job location.
+    UN postings are matched at country level: the countries mentioned in the job
+    text are resolved once and compared with each target's country.
 
     :param job_text: Job location text
     :param target_locations: List of target locations to match against
     :return: True if job location matches any target location
     """
-    job_text = job_text.lower()
+    mentioned = mentioned_location_ids(job_text)
 
     for location in target_locations:
-        # Extract country from target location
         target_country = extract_country_from_location(location)
 
-        # Check if target country appears in job text (direct match)
-        if target_country in job_text:
-            return True
-
-        # Check location aliases
-        for alias in LOCATION_ALIASES.get(target_country, []):
-            if alias in job_text:
+        if target_country == "remote":
+            if "remote" in mentioned:
                 return True
-
-        # Check country map aliases for the target country
-        for country, aliases in COUNTRY_MAP.items():
-            if country == target_country:
-                for alias in aliases:
-                    if alias in job_text:
-                        return True
+        elif f"country:{target_country}" in mentioned:
+            return True
+        # Countries the resolver doesn't know fall back to a direct text match
+        elif resolve_location(location).country is None and target_country in job_text.lower():
+            return True
 
     return False
 
@@ -446,9 +414,13 @@ def fetch_unjobs_parallel(job_titles=None, locations=None, max_workers=MAX_WORKE
     :return: List of job dictionaries
     """
     # Use provided parameters or defaults
-    job_titles = job_titles or config.JOB_KEYWORDS
+    job_titles = job_titles or []
     locations = locations or ['london', 'remote', 'uk']
 
+    if not job_titles:
+        logger.warning("No job titles provided for UN Jobs search. Skipping.")
+        return []
+
     logger.info(f"🔍 Starting OPTIMIZED UN Jobs scraping with {max_workers} workers")
     logger.info(f"Job titles: {job_titles}")
     logger.info(f"Locations: {locations}")
@@ -513,6 +485,9 @@ def fetch_unjobs_sync(job_titles=None, locations=None):
 fetch_unjobs = fetch_unjobs_parallel
 
 if __name__ == "__main__":
+    from utils.log import configure_logging
+    configure_logging()
+
     # Test the parallel scraper with appropriate worker count
     job_titles = ['Frontend Engineer', 'UX Designer', 'Software Developer']
     worker_count = min(MAX_WORKERS, len(job_titles))
@@ -1,69 +1,68 @@
-import sys
 import os
-import time
+import sys
+import logging
 from datetime import datetime
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 
-# ✅ Ensure script finds `config.py`
+# Ensure script finds the `fetch` package when run directly
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-import config  # Import the config file
+from fetch.browser_pool import get_browser_pool, wait_for_element, wait_for_clickable, wait_for_count_above
 
-BASE_URL = "https://jobs.workable.com/search?location=London&query={query}&employment_type=full_time&day_range=30"
+logger = logging.getLogger(__name__)
 
-def fetch_workable_jobs():
-    """Scrapes job listings from Workable Jobs using Selenium"""
-    print("🔍 Starting Workable Jobs Scraper...")
+BASE_URL = "https://jobs.workable.com/search?location={location}&query={query}&employment_type=full_time&day_range=30"
+JOB_CARD_SELECTOR = ".jobCardDetails__job-breakdown--AnIQr"
+MAX_LOAD_MORE_CLICKS = 3
 
-    # Set up Chrome options
-    options = Options()
-    options.add_argument("--headless")  # Run in background
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
+def fetch_workable_jobs(search_term, location="London"):
+    """
+    Scrapes job listings from Workable Jobs using a pooled headless browser.
 
-    print("🚀 Launching Chrome Browser...")
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+    :param search_term: Job title to search for
+    :param location: Location to search in (default: London)
+    :return: List of job dictionaries
+    """
+    query_url = BASE_URL.format(query=search_term.replace(" ", "+"), location=location.replace(" ", "+"))
+    logger.info(f"🌍 Navigating to {query_url} (Query: {search_term})")
 
     jobs = []
 
-    for keyword in config.JOB_KEYWORDS:
-        query = keyword.replace(" ", "+")  # Format search query
-        query_url = BASE_URL.format(query=query)  # Insert formatted query into the URL
-        print(f"🌍 Navigating to {query_url} (Query: {keyword})")
+    with get_browser_pool().browser() as driver:
         driver.get(query_url)
-        time.sleep(5)  # Wait for JavaScript to load jobs
+
+        # Wait for JavaScript to render the first job cards
+        if not wait_for_element(driver, By.CSS_SELECTOR, JOB_CARD_SELECTOR, timeout=15):
+            logger.info(f"📭 No Workable jobs rendered for '{search_term}' in {location}")
+            return []
 
         # ✅ Handle Cookie Popup
-        try:
-            print("🍪 Checking for cookie popup...")
-            cookie_button = driver.find_element(By.CSS_SELECTOR, "button[data-ui='cookie-consent-decline']")
-            cookie_button.click()
-            print("✅ Cookie popup declined!")
-            time.sleep(2)  # Wait after clicking
-        except Exception:
-            print("⚠️ No cookie popup found or already dismissed.")
-
-        # ✅ Click "Show More Jobs" Up to 10 Times
-        max_clicks = 3
+        cookie_button = wait_for_clickable(driver, By.CSS_SELECTOR, "button[data-ui='cookie-consent-decline']", timeout=2)
+        if cookie_button:
+            try:
+                cookie_button.click()
+                logger.debug("✅ Cookie popup declined!")
+            except Exception:
+                logger.debug("⚠️ Cookie popup could not be dismissed.")
+
+        # ✅ Click "Show More Jobs" up to MAX_LOAD_MORE_CLICKS times, waiting for new cards each time
         click_count = 0
+        while click_count < MAX_LOAD_MORE_CLICKS:
+            show_more_button = wait_for_clickable(driver, By.CSS_SELECTOR, "button[data-ui='load-more-button']", timeout=3)
+            if not show_more_button:
+                break
 
-        while click_count < max_clicks:
+            card_count = len(driver.find_elements(By.CSS_SELECTOR, JOB_CARD_SELECTOR))
             try:
-                show_more_button = driver.find_element(By.CSS_SELECTOR, "button[data-ui='load-more-button']")
                 show_more_button.click()
-                click_count += 1
-                print(f"🔽 Clicked 'Show More Jobs' button #{click_count}...")
-                time.sleep(3)  # Allow time for new jobs to load
             except Exception:
-                print("✅ No more 'Show More Jobs' button found or end of jobs reached.")
-                break  # Exit loop when no button is found
+                break
+            click_count += 1
 
-        print(f"🔍 Searching for job elements after {click_count} load-more clicks...")
-        job_elements = driver.find_elements(By.CSS_SELECTOR, ".jobCardDetails__job-breakdown--AnIQr")
-        print(f"📌 Found {len(job_elements)} job elements for '{keyword}'.")
+            if not wait_for_count_above(driver, By.CSS_SELECTOR, JOB_CARD_SELECTOR, card_count, timeout=10):
+                break
+
+        job_elements = driver.find_elements(By.CSS_SELECTOR, JOB_CARD_SELECTOR)
+        logger.info(f"📌 Found {len(job_elements)} job elements for '{search_term}' after {click_count} load-more clicks.")
 
         for job in job_elements:
             try:
@@ -80,30 +79,27 @@ def fetch_workable_jobs():
                 full_job_link = f"https://jobs.workable.com{job_link}" if job_link.startswith("/") else job_link
 
                 # ✅ Strict Title Filtering (Ensures Job Title Matches Keywords)
-                if not any(kw.lower() in title.lower() for kw in config.JOB_KEYWORDS):
-                    print(f"⚠️ Skipping '{title}' - Does Not Match Exact Keyword '{keyword}'")
+                if search_term.lower() not in title.lower():
+                    logger.debug(f"⚠️ Skipping '{title}' - Does Not Match Exact Keyword '{search_term}'")
                     continue
 
-                print(f"🆕 Job Found: {title} at {company}")
-                print(f"🔗 Job Link: {full_job_link}")
-
                 jobs.append({
                     "title": title,
                     "company": company,
-                    "location": "London",
+                    "location": location,
                     "url": full_job_link,  # ✅ Stores the full job URL
                     "date_added": datetime.utcnow().strftime("%Y-%m-%d"),  # ✅ New field
                     "has_applied": False,  # ✅ New field
+                    "source": "workable",
                 })
 
             except Exception as e:
-                print(f"⚠️ Skipping a job due to error: {e}")
+                logger.debug(f"⚠️ Skipping a job due to error: {e}")
                 continue  # Skip if any element is missing
 
-    driver.quit()
-    print(f"✅ Finished scraping Workable. Total jobs found: {len(jobs)}")
+    logger.info(f"✅ Finished scraping Workable. Total jobs found: {len(jobs)}")
     return jobs
 
 # ✅ Test Run
 if __name__ == "__main__":
-    fetch_workable_jobs()
\ No newline at end of file
+    fetch_workable_jobs("UX Designer", "London")
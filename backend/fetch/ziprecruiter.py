@@ -1,50 +1,34 @@
-import time
-import shutil
 import os
+import sys
+import logging
 from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 
+# Ensure script finds the `fetch` package when run directly
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from fetch.browser_pool import get_browser_pool, wait_for_element
+
+SEARCH_URL = "https://www.ziprecruiter.co.uk/jobs/search?q={query}&l={location}"
 EXCLUDED_KEYWORDS = ["video", "social media"]
 
+logger = logging.getLogger(__name__)
+
 def fetch_ziprecruiter_jobs(search_term, location, max_jobs=50):
     """
-    Uses headless Chrome to scrape job listings from ZipRecruiter UK.
+    Uses a pooled headless Chrome to scrape job listings from ZipRecruiter UK.
     """
-    url = f"https://www.ziprecruiter.co.uk/jobs/search?q={search_term.replace(' ', '+')}&l={location.replace(' ', '+')}"
-    print(f"🌍 Launching headless browser for: {url}")
-
-    chrome_options = Options()
-    chrome_options.add_argument("--headless=new")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-    chrome_options.add_argument("--window-size=1920,1080")
-    chrome_options.add_argument("--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
-
-    chrome_path = shutil.which("chromedriver") or "/usr/bin/chromedriver"
-    if not os.path.exists(chrome_path):
-        raise FileNotFoundError("Chromedriver not found. Please install in CI environment.")
-
-    driver = webdriver.Chrome(options=chrome_options)
-    driver.get(url)
-
-    try:
-        # Wait for the job titles to load
-        WebDriverWait(driver, 15).until(
-            EC.presence_of_element_located((By.CLASS_NAME, "jobList-title"))
-        )
-        time.sleep(2)  # extra buffer for JS to finish
-    except Exception as e:
-        print("⚠️ Page took too long to load or is blocked.")
-        driver.quit()
-        return []
-
-    html = driver.page_source
-    driver.quit()
+    url = SEARCH_URL.format(query=search_term.replace(' ', '+'), location=location.replace(' ', '+'))
+    logger.info(f"🌍 Loading in pooled headless browser: {url}")
+
+    with get_browser_pool().browser() as driver:
+        driver.get(url)
+
+        # Wait for the job titles to render rather than sleeping
+        if not wait_for_element(driver, By.CLASS_NAME, "jobList-title", timeout=15):
+            logger.warning("⚠️ Page took too long to load or is blocked.")
+            return []
+
+        html = driver.page_source
 
     return parse_ziprecruiter_html(html, max_jobs)
 
@@ -94,10 +78,11 @@ def parse_ziprecruiter_html(html, max_jobs):
             "url": job_url,
             "salary": salary,
             "date_posted": date_posted,
+            "source": "ziprecruiter",
         })
 
         if len(jobs) >= max_jobs:
             break
 
-    print(f"✅ Parsed {len(jobs)} job(s) from UK layout.")
+    logger.info(f"✅ Parsed {len(jobs)} job(s) from UK layout.")
     return jobs
@@ -0,0 +1,295 @@
+# instant_search.py
+
+"""
+Instant search: jobs for one user right away instead of at the next cycle.
+
+Every cycle records the jobs it scraped in a local index of recent jobs
+(RECENT_JOBS_FILE, kept for RECENT_JOBS_TTL_DAYS). A new user's preferences
+are matched against that index with the same title/location rules as the
+cycle; only when the index has nothing for them does a single targeted live
+scrape run (INSTANT_LIVE_SOURCES, at most INSTANT_LIVE_MAX_PAIRS searches).
+At most INSTANT_LIVE_MAX_CONCURRENT live scrapes run at once; when they are
+all busy the search is turned away ("busy", HTTP 503 with Retry-After) rather
+than queueing more browsers and scraper requests.
+Matches are written to users/{id}/jobs through store_jobs, so they show up
+in the app and in the next email like any other job.
+
+As a function:
+
+    instant_search("uid123")
+
+As a small HTTP service (POST /instant-search {"userId": "uid123"}):
+
+    python instant_search.py --port 8080
+"""
+
+import os
+import json
+import time
+import logging
+import argparse
+from datetime import datetime, timedelta
+from threading import Lock, BoundedSemaphore
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from config import get_db, TITLE_MATCH_MODE
+from store.store_jobs import store_jobs, generate_job_id
+from store.user_index import user_from_document
+from matching.job_table import JobTable
+from matching.parallel import match_job_indices
+from matching.ranking import ranked_by_source
+from matching.title_normalizer import make_title_matcher
+
+logger = logging.getLogger(__name__)
+
+RECENT_JOBS_FILE = os.path.join(os.path.dirname(__file__), "recent_jobs.json")
+RECENT_JOBS_TTL_DAYS = 7
+INSTANT_LIVE_SOURCES = [s.strip() for s in os.getenv("INSTANT_LIVE_SOURCES", "linkedin").split(",") if s.strip()]
+INSTANT_LIVE_MAX_PAIRS = int(os.getenv("INSTANT_LIVE_MAX_PAIRS", "2"))
+INSTANT_LIVE_MAX_CONCURRENT = int(os.getenv("INSTANT_LIVE_MAX_CONCURRENT", "2"))
+INSTANT_LIVE_RETRY_AFTER = 30  # Seconds a turned-away client should wait
+INSTANT_SEARCH_TOKEN = os.getenv("INSTANT_SEARCH_TOKEN", "")  # Bearer token required when set
+INSTANT_SEARCH_HOST = os.getenv("INSTANT_SEARCH_HOST", "127.0.0.1")
+
+
+class RecentJobsIndex:
+    """Jobs scraped in recent cycles, persisted locally and matched as one JobTable."""
+
+    def __init__(self, jobs_file=RECENT_JOBS_FILE):
+        """
+        :param jobs_file: JSON file to persist to (None for memory only)
+        """
+        self.jobs_file = jobs_file
+        self.jobs = {}  # job ID -> {"source", "job", "seen"}
+        self._table = None
+        self._loaded_mtime = None
+        self._lock = Lock()
+        self.reload()
+
+    def reload(self):
+        """Re-read the file if another process (the cycle) has written it since."""
+        if not self.jobs_file or not os.path.exists(self.jobs_file):
+            return
+        mtime = os.path.getmtime(self.jobs_file)
+        if mtime == self._loaded_mtime:
+            return
+        try:
+            with open(self.jobs_file, "r") as f:
+                jobs = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Error loading recent jobs: {e}. Keeping the current index.")
+            return
+        with self._lock:
+            self.jobs = jobs
+            self._table = None
+            self._loaded_mtime = mtime
+
+    def add_jobs(self, jobs_by_source):
+        """
+        Record a cycle's (or a live scrape's) jobs.
+
+        :param jobs_by_source: Dictionary of jobs by source
+        """
+        seen = datetime.now().date().isoformat()
+        with self._lock:
+            for source, source_jobs in jobs_by_source.items():
+                for job in source_jobs:
+                    if isinstance(job.get('url'), str) and job['url']:
+                        self.jobs[generate_job_id(job)] = {"source": source, "job": job, "seen": seen}
+            self._table = None
+
+    def save(self):
+        """Prune jobs older than RECENT_JOBS_TTL_DAYS and write atomically."""
+        if not self.jobs_file:
+            return
+        cutoff = (datetime.now() - timedelta(days=RECENT_JOBS_TTL_DAYS)).date().isoformat()
+        with self._lock:
+            self.jobs = {job_id: entry for job_id, entry in self.jobs.items() if entry["seen"] >= cutoff}
+            self._table = None
+            try:
+                tmp_file = f"{self.jobs_file}.tmp"
+                with open(tmp_file, "w") as f:
+                    json.dump(self.jobs, f)
+                os.replace(tmp_file, self.jobs_file)
+                self._loaded_mtime = os.path.getmtime(self.jobs_file)
+            except OSError as e:
+                logger.error(f"Error saving recent jobs: {e}")
+
+    def table(self):
+        """JobTable over every recent job (rebuilt only after changes)."""
+        with self._lock:
+            if self._table is None:
+                by_source = {}
+                for entry in self.jobs.values():
+                    by_source.setdefault(entry["source"], []).append(entry["job"])
+                self._table = JobTable(by_source)
+            return self._table
+
+    def search(self, user):
+        """
+        :param user: User dictionary with jobTitles and jobLocations
+        :return: The user's best matched jobs by source
+        """
+        table = self.table()
+        title_matcher = make_title_matcher(user.get('jobTitles', []), TITLE_MATCH_MODE)
+        return ranked_by_source(table, user, match_job_indices(table, user, title_matcher))
+
+
+_shared_index = None
+_shared_index_lock = Lock()
+_live_slots = BoundedSemaphore(INSTANT_LIVE_MAX_CONCURRENT)
+
+
+def get_recent_jobs_index():
+    """Return the process-wide recent jobs index, loading it on first use."""
+    global _shared_index
+
+    with _shared_index_lock:
+        if _shared_index is None:
+            _shared_index = RecentJobsIndex()
+        return _shared_index
+
+
+def live_search(user, index=None):
+    """
+    One targeted scrape for a user the index has nothing for.
+
+    :param user: User dictionary
+    :param index: RecentJobsIndex to add the results to
+    :return: The user's best matched jobs by source, or None when
+             INSTANT_LIVE_MAX_CONCURRENT live scrapes are already running
+    """
+    if not _live_slots.acquire(blocking=False):
+        return None
+    try:
+        return _live_search(user, index)
+    finally:
+        _live_slots.release()
+
+
+def _live_search(user, index):
+    from fetch.registry import SOURCES
+    from fetch.run_scrapers import fetch_jobs
+
+    sources = [SOURCES[name] for name in INSTANT_LIVE_SOURCES if name in SOURCES]
+    pairs = [(title, location) for title in user["jobTitles"] for location in user["jobLocations"]]
+    pairs = pairs[:INSTANT_LIVE_MAX_PAIRS]
+    if not sources or not pairs:
+        return {}
+
+    jobs = fetch_jobs(pairs, sources)
+    if index is not None:
+        index.add_jobs(jobs)
+        index.save()
+        return index.search(user)
+    table = JobTable(jobs)
+    title_matcher = make_title_matcher(user['jobTitles'], TITLE_MATCH_MODE)
+    return ranked_by_source(table, user, match_job_indices(table, user, title_matcher))
+
+
+def instant_search(user_id, job_titles=None, job_locations=None, live=True, store=True, index=None):
+    """
+    Find and store jobs for one user now.
+
+    :param user_id: User ID
+    :param job_titles: Titles to search for (default: read from the user's document)
+    :param job_locations: Locations to search in (default: read from the user's document)
+    :param live: Allow a live scrape when the index has no matches
+    :param store: Write matches to users/{id}/jobs
+    :param index: RecentJobsIndex (default: the shared one)
+    :return: Dictionary with counts and where the results came from
+    """
+    start_time = time.time()
+    index = index or get_recent_jobs_index()
+    index.reload()
+
+    data = {}
+    if job_titles is None or job_locations is None:
+        snapshot = get_db().collection("users").document(user_id).get()
+        data = (snapshot.to_dict() or {}) if snapshot.exists else {}
+    if job_titles is not None:
+        data["jobTitles"] = job_titles
+    if job_locations is not None:
+        data["jobLocations"] = job_locations
+    user = user_from_document(user_id, data)
+    if user is None:
+        return {"user_id": user_id, "matched": 0, "new": 0, "source": None, "error": "no job preferences"}
+
+    user_jobs = index.search(user)
+    origin = "index"
+    if not user_jobs and live:
+        logger.info(f"🔎 No recent jobs for {user_id}, running a live search")
+        user_jobs = live_search(user, index)
+        origin = "live"
+        if user_jobs is None:
+            logger.warning(f"⏳ Live searches busy, turning away {user_id}")
+            return {"user_id": user_id, "matched": 0, "new": 0, "source": None, "error": "busy",
+                    "retry_after": INSTANT_LIVE_RETRY_AFTER}
+
+    matched = sum(len(source_jobs) for source_jobs in user_jobs.values())
+    new_count = dup_count = 0
+    if store and user_jobs:
+        new_count, dup_count = store_jobs(user_id, user_jobs)
+
+    elapsed = time.time() - start_time
+    logger.info(f"⚡ Instant search for {user_id}: {matched} matches from {origin}, {new_count} new in {elapsed:.2f}s")
+    return {"user_id": user_id, "matched": matched, "new": new_count, "duplicates": dup_count,
+            "source": origin, "seconds": round(elapsed, 2)}
+
+
+class InstantSearchHandler(BaseHTTPRequestHandler):
+    """POST /instant-search with {"userId", optional "jobTitles"/"jobLocations"}."""
+
+    def _reply(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/instant-search":
+            return self._reply(404, {"error": "not found"})
+        if INSTANT_SEARCH_TOKEN and self.headers.get("Authorization") != f"Bearer {INSTANT_SEARCH_TOKEN}":
+            return self._reply(401, {"error": "unauthorized"})
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            request = json.loads(self.rfile.read(length) or b"{}")
+            user_id = request["userId"]
+        except (ValueError, KeyError, TypeError):
+            return self._reply(400, {"error": "expected JSON body with userId"})
+
+        try:
+            result = instant_search(user_id, request.get("jobTitles"), request.get("jobLocations"))
+        except Exception as e:
+            logger.exception(f"❌ Instant search failed for {user_id}: {e}")
+            return self._reply(500, {"error": "instant search failed"})
+        if result.get("error") == "busy":
+            return self._reply(503, result, {"Retry-After": str(result["retry_after"])})
+        return self._reply(200 if "error" not in result else 422, result)
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def serve(port=8080, host=INSTANT_SEARCH_HOST):
+    if not INSTANT_SEARCH_TOKEN and host not in ("127.0.0.1", "localhost"):
+        logger.warning("⚠️ INSTANT_SEARCH_TOKEN is not set - anyone who can reach this port can trigger searches")
+    server = ThreadingHTTPServer((host, port), InstantSearchHandler)
+    logger.info(f"⚡ Instant search listening on {host}:{port}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    from utils.log import configure_logging
+    parser = argparse.ArgumentParser(description="Serve instant job searches for new users")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8080")))
+    args = parser.parse_args()
+    configure_logging()
+    serve(args.port)
@@ -0,0 +1,384 @@
+# liveness.py
+
+"""
+Revalidate stored job postings and mark the ones that have closed.
+
+Stored jobs are never rechecked otherwise, so users keep clicking through to
+listings that were filled weeks ago. Each run checks a bounded sample of
+users/{id}/jobs:
+
+1. saved and applied jobs, then recently viewed ones (last_viewed_at, when set)
+2. the rest in a rolling sweep by age: every run continues through added_at
+   from where the last one stopped (LIVENESS_STATE_FILE) and wraps around,
+   taking the sample round-robin across sources so no board crowds out the others
+
+Jobs checked within LIVENESS_RECHECK_HOURS, already expired, or younger than
+LIVENESS_MIN_AGE_HOURS are skipped. Each distinct URL is requested once, however
+many users have it, with a cheap HEAD (GET only when a site refuses HEAD).
+Requests are conditional on the ETag / Last-Modified of the previous check, go
+through one pooled session and are spaced per host (LIVENESS_HOST_INTERVAL). 404/410,
+or a redirect away from the posting to a search or home page, marks the job
+expired; rate limits and server errors leave it for a later run. Results are
+written back with batched updates. Expired jobs are also dropped from the
+user's feed (store/user_feed.py) and their unsent notification records are
+flagged (job_details.is_expired), so neither the dashboard nor the email
+shows them; store/retention.py prunes them early.
+
+    python liveness.py --limit 500
+    python pipeline.py --stages revalidate
+
+Sampling uses collection group queries on jobs, which need collection-group
+scope single-field indexes on is_saved, has_applied, last_viewed_at and added_at.
+"""
+
+import os
+import json
+import time
+import logging
+import argparse
+from collections import Counter, OrderedDict
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from fetch.registry import RateLimiter
+from store.batching import ChunkedBatch
+from store.user_feed import remove_from_feed, USER_FEED_ENABLED
+
+logger = logging.getLogger(__name__)
+
+LIVENESS_LIMIT = int(os.getenv("LIVENESS_LIMIT", "300"))  # Jobs checked per run
+LIVENESS_WORKERS = int(os.getenv("LIVENESS_WORKERS", "8"))
+LIVENESS_HOST_INTERVAL = float(os.getenv("LIVENESS_HOST_INTERVAL", "1.0"))  # Seconds between requests to one host
+LIVENESS_TIMEOUT = 10
+LIVENESS_RECHECK_HOURS = 24
+LIVENESS_MIN_AGE_HOURS = 24  # Just-scraped jobs are live
+VIEWED_WINDOW_DAYS = 7
+LIVENESS_STATE_FILE = os.path.join(os.path.dirname(__file__), "liveness_state.json")
+
+LIVE, EXPIRED, UNKNOWN = "live", "expired", "unknown"
+
+USER_AGENT = "Mozilla/5.0 (compatible; NextGigLinkCheck/1.0)"
+EXPIRED_STATUSES = {404, 410}
+# Sites that answer HEAD with these get a GET instead (body not downloaded)
+HEAD_REFUSED_STATUSES = {400, 403, 405, 501}
+# A posting that redirects to one of these paths has been taken down
+LISTING_PATHS = {"/", "/jobs", "/jobs/search", "/search", "/careers"}
+
+
+class CheckResult:
+    """Outcome of checking one URL."""
+
+    __slots__ = ("state", "http_status", "etag", "last_modified")
+
+    def __init__(self, state, http_status=None, etag=None, last_modified=None):
+        self.state = state
+        self.http_status = http_status
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def __repr__(self):
+        return f"CheckResult({self.state!r}, http_status={self.http_status!r})"
+
+
+def classify(url, response):
+    """
+    :param url: URL that was requested
+    :param response: requests.Response (redirects followed)
+    :return: LIVE, EXPIRED or UNKNOWN
+    """
+    status = response.status_code
+    if status in EXPIRED_STATUSES:
+        return EXPIRED
+    if status == 304:
+        return LIVE
+    if 200 <= status < 300:
+        if response.history:
+            # Redirected: to a listing/home page, or to an "expired" page, means taken down
+            final = urlsplit(response.url or url)
+            final_path = final.path.rstrip("/") or "/"
+            if final_path != (urlsplit(url).path.rstrip("/") or "/") and final_path in LISTING_PATHS:
+                return EXPIRED
+            if "expired" in final.path.lower() or "expired=true" in final.query.lower():
+                return EXPIRED
+        return LIVE
+    return UNKNOWN
+
+
+class LivenessClient:
+    """Pooled, per-host rate-limited HEAD/GET checker."""
+
+    def __init__(self, workers=LIVENESS_WORKERS, host_interval=LIVENESS_HOST_INTERVAL,
+                 timeout=LIVENESS_TIMEOUT, session=None):
+        """
+        :param workers: Concurrent requests (and pooled connections per host)
+        :param host_interval: Minimum seconds between requests to the same host
+        :param timeout: Request timeout in seconds
+        :param session: requests.Session to use (default: a new pooled one)
+        """
+        self.workers = workers
+        self.host_interval = host_interval
+        self.timeout = timeout
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers["User-Agent"] = USER_AGENT
+        self.session = session
+        self._limiters = {}
+
+    def _limiter(self, host):
+        # setdefault is atomic, so concurrent first requests to a host share one limiter
+        return self._limiters.get(host) or self._limiters.setdefault(host, RateLimiter(self.host_interval))
+
+    def _request(self, method, url, headers):
+        self._limiter(urlsplit(url).netloc).wait()
+        response = self.session.request(method, url, headers=headers, timeout=self.timeout,
+                                        allow_redirects=True, stream=(method == "GET"))
+        response.close()  # Status and headers are all that's needed
+        return response
+
+    def check(self, url, etag=None, last_modified=None):
+        """
+        :param url: Posting URL
+        :param etag: ETag from the previous check
+        :param last_modified: Last-Modified from the previous check
+        :return: CheckResult
+        """
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        try:
+            response = self._request("HEAD", url, headers)
+            if response.status_code in HEAD_REFUSED_STATUSES:
+                response = self._request("GET", url, headers)
+        except requests.RequestException as e:
+            logger.debug(f"Liveness check failed for {url}: {e}")
+            return CheckResult(UNKNOWN)
+        return CheckResult(classify(url, response), response.status_code,
+                           response.headers.get("ETag") or etag,
+                           response.headers.get("Last-Modified") or last_modified)
+
+    def check_many(self, requests_by_url):
+        """
+        :param requests_by_url: Dictionary of url -> (etag, last_modified)
+        :return: Dictionary of url -> CheckResult
+        """
+        urls = list(requests_by_url)
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            results = executor.map(lambda url: self.check(url, *requests_by_url[url]), urls)
+            return dict(zip(urls, results))
+
+
+def _aware(value):
+    if isinstance(value, datetime) and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def needs_check(job, now):
+    """Whether a stored job is due for a check."""
+    if job.get("is_expired") or not isinstance(job.get("url"), str) or not job["url"].startswith("http"):
+        return False
+    checked_at = _aware(job.get("liveness_checked_at"))
+    if isinstance(checked_at, datetime) and now - checked_at < timedelta(hours=LIVENESS_RECHECK_HOURS):
+        return False
+    added_at = _aware(job.get("added_at"))
+    if isinstance(added_at, datetime) and now - added_at < timedelta(hours=LIVENESS_MIN_AGE_HOURS):
+        return False
+    return True
+
+
+def _load_state(state_file):
+    if not state_file or not os.path.exists(state_file):
+        return {}
+    try:
+        with open(state_file, "r") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"Error loading liveness state: {e}. Starting the sweep from the oldest jobs.")
+        return {}
+
+
+def _save_state(state_file, state):
+    if not state_file:
+        return
+    tmp_file = f"{state_file}.tmp"
+    with open(tmp_file, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_file, state_file)
+
+
+def _round_robin_by_source(docs, limit):
+    by_source = OrderedDict()
+    for doc in docs:
+        by_source.setdefault((doc.to_dict() or {}).get("source"), []).append(doc)
+    picked = []
+    queues = [iter(source_docs) for source_docs in by_source.values()]
+    while queues and len(picked) < limit:
+        for queue in list(queues):
+            doc = next(queue, None)
+            if doc is None:
+                queues.remove(queue)
+            elif len(picked) < limit:
+                picked.append(doc)
+    return picked
+
+
+def sample_jobs(db, limit, now, state):
+    """
+    Pick the stored jobs to check this run.
+
+    :param db: Firestore client
+    :param limit: Maximum jobs
+    :param now: Current time (aware datetime)
+    :param state: Sweep state dict ({"cursor": {"added_at": ISO date, "path": document path}}); updated in place
+    :return: List of DocumentSnapshots, priority jobs first
+    """
+    jobs = db.collection_group("jobs")
+    picked = OrderedDict()  # Document path -> snapshot
+
+    def take(docs, room):
+        for doc in docs:
+            if room <= 0:
+                return
+            if doc.reference.path not in picked and needs_check(doc.to_dict() or {}, now):
+                picked[doc.reference.path] = doc
+                room -= 1
+
+    # Jobs users care about first
+    take(jobs.where("is_saved", "==", True).limit(limit).stream(), limit - len(picked))
+    take(jobs.where("has_applied", "==", True).limit(limit).stream(), limit - len(picked))
+    viewed = jobs.where("last_viewed_at", ">=", now - timedelta(days=VIEWED_WINDOW_DAYS))
+    take(viewed.order_by("last_viewed_at", direction="DESCENDING").limit(limit).stream(), limit - len(picked))
+
+    # Then a rolling sweep by age, spread across sources
+    room = limit - len(picked)
+    if room > 0:
+        # Jobs stored in one batch share an added_at, so the document name breaks ties
+        sweep = jobs.where("added_at", "<", now - timedelta(hours=LIVENESS_MIN_AGE_HOURS)) \
+            .order_by("added_at").order_by("__name__")
+        cursor = state.get("cursor")
+        page_size = room * 2  # Headroom for skipped and over-represented sources
+        query = sweep
+        if isinstance(cursor, dict):
+            query = sweep.start_after({"added_at": datetime.fromisoformat(cursor["added_at"]),
+                                       "__name__": db.document(cursor["path"])})
+        docs = list(query.limit(page_size).stream())
+        if len(docs) < page_size:
+            state.pop("cursor", None)  # Reached the newest jobs - wrap around next run
+        elif docs:
+            state["cursor"] = {
+                "added_at": _aware((docs[-1].to_dict() or {}).get("added_at")).isoformat(),
+                "path": docs[-1].reference.path,
+            }
+        candidates = [doc for doc in docs if doc.reference.path not in picked and needs_check(doc.to_dict() or {}, now)]
+        for doc in _round_robin_by_source(candidates, room):
+            picked[doc.reference.path] = doc
+
+    return list(picked.values())
+
+
+def flag_expired_notifications(db, docs, dry_run=False):
+    """
+    Mark the unsent notification records of expired jobs, so emails leave them out.
+
+    :param db: Firestore client
+    :param docs: DocumentSnapshots of expired users/{id}/jobs documents
+    :param dry_run: Count without writing
+    :return: Number of notification records flagged
+    """
+    with ChunkedBatch(db, dry_run=dry_run) as batch:
+        for doc in docs:
+            user_id, job_id = doc.reference.path.split("/")[1::2]
+            pending = db.collection("user_job_matches").where("user_id", "==", user_id) \
+                .where("job_id", "==", job_id).where("notified", "==", False)
+            for match in pending.select([]).stream():
+                batch.update(match.reference, {"job_details.is_expired": True})
+        return batch.writes
+
+
+def revalidate_jobs(db=None, limit=LIVENESS_LIMIT, client=None, dry_run=False, state_file=LIVENESS_STATE_FILE, now=None):
+    """
+    Check a sample of stored jobs and record which have expired.
+
+    :param db: Firestore client (default: config.get_db())
+    :param limit: Maximum jobs to check
+    :param client: LivenessClient (default: a new pooled one)
+    :param dry_run: Check but don't write
+    :param state_file: Where the sweep cursor is kept (None: don't persist)
+    :param now: Current time (default: now, UTC)
+    :return: Counter of stats
+    """
+    if db is None:
+        from config import get_db
+        db = get_db()
+    client = client or LivenessClient()
+    now = now or datetime.now(timezone.utc)
+    start_time = time.time()
+    stats = Counter()
+
+    state = _load_state(state_file)
+    docs = sample_jobs(db, limit, now, state)
+    stats["jobs"] = len(docs)
+
+    # One request per distinct URL, whoever stored it
+    docs_by_url = OrderedDict()
+    for doc in docs:
+        docs_by_url.setdefault(doc.to_dict()["url"], []).append(doc)
+    validators = {}
+    for url, url_docs in docs_by_url.items():
+        job = url_docs[0].to_dict()
+        validators[url] = (job.get("liveness_etag"), job.get("liveness_last_modified"))
+    results = client.check_many(validators)
+
+    with ChunkedBatch(db, max_in_flight=2, dry_run=dry_run) as batch:
+        for url, result in results.items():
+            stats[result.state] += 1
+            update = {"liveness_checked_at": now, "liveness_status": result.state}
+            if result.etag:
+                update["liveness_etag"] = result.etag
+            if result.last_modified:
+                update["liveness_last_modified"] = result.last_modified
+            if result.state == EXPIRED:
+                update.update({"is_expired": True, "expired_at": now})
+            for doc in docs_by_url[url]:
+                batch.update(doc.reference, update)
+        stats["writes"] = batch.writes
+
+    # Closed postings leave the pending emails and the users' feeds too
+    expired = [doc for url, result in results.items() if result.state == EXPIRED for doc in docs_by_url[url]]
+    if expired:
+        stats["notifications_flagged"] = flag_expired_notifications(db, expired, dry_run)
+    if expired and USER_FEED_ENABLED and not dry_run:
+        expired_by_user = OrderedDict()
+        for doc in expired:
+            user_id, job_id = doc.reference.path.split("/")[1::2]
+            expired_by_user.setdefault(user_id, []).append(job_id)
+        for user_id, job_ids in expired_by_user.items():
+            stats["feed_entries_removed"] += remove_from_feed(db, user_id, job_ids)
+
+    if not dry_run:
+        _save_state(state_file, state)
+
+    logger.info(f"🔗 Checked {len(results)} URLs for {stats['jobs']} jobs in {time.time() - start_time:.1f}s: "
+                f"{stats[LIVE]} live, {stats[EXPIRED]} expired, {stats[UNKNOWN]} unknown")
+    return stats
+
+
+if __name__ == "__main__":
+    from utils.log import configure_logging
+
+    parser = argparse.ArgumentParser(description="Revalidate stored job postings and mark closed ones")
+    parser.add_argument("--limit", type=int, default=LIVENESS_LIMIT, help="Jobs to check this run")
+    parser.add_argument("--dry-run", action="store_true", help="Check without writing results")
+    args = parser.parse_args()
+    configure_logging()
+
+    revalidate_jobs(limit=args.limit, dry_run=args.dry_run)
@@ -6,39 +6,39 @@ import hashlib
 from datetime import datetime
 import logging
 
-from config import db
+from config import get_db, LOCATION_MATCH_MODE, MAX_SEARCH_RADIUS_KM, INCREMENTAL_MATCHING, TITLE_MATCH_MODE
 from fetch.run_scrapers import run_scrapers
-from store.store_jobs import store_jobs
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("job_cycle.log"),
-        logging.StreamHandler()
-    ]
-)
+from store.store_jobs import store_jobs, generate_job_id
+from store.user_index import user_from_document
+from matching.title_normalizer import make_title_matcher
+from matching.job_table import JobTable
+from matching.parallel import match_job_indices, match_users
+from matching.incremental import MatchLedger
+from matching.ranking import ranked_by_source, rank_jobs, job_limit
+from matching.dedup import FingerprintStore, dedupe_jobs
+from instant_search import RecentJobsIndex
+
+from utils.log import configure_logging, EventAggregator
+
+# Configure logging (queue-based, see utils/log.py)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 def get_subscribed_users():
     """
     FREE ACCESS MODE: Fetch all users (no subscription check).
     Previously only fetched subscribed users, now fetches all active users.
+
+    Also carries the email opt-in flag, so the notify stage can reuse this one
+    read of the users collection instead of streaming it again.
     """
     try:
         # FREE MODE: Get ALL users, not just subscribed ones
-        users_ref = db.collection("users").stream()
+        users_ref = get_db().collection("users").stream()
         users = [
-            {
-                "id": user.id,
-                "jobTitles": user.to_dict().get("jobTitles", []),
-                "jobLocations": user.to_dict().get("jobLocations", []),
-                "email": user.to_dict().get("email", "")
-            }
-            for user in users_ref
+            user for user in (user_from_document(doc.id, doc.to_dict()) for doc in users_ref)
             # Only include users with job preferences set
-            if user.to_dict().get("jobTitles") and user.to_dict().get("jobLocations")
+            if user is not None
         ]
         logger.info(f"🔍 Found {len(users)} users with job preferences in database (FREE MODE - all users included)")
         return users
@@ -60,7 +60,7 @@ def get_unique_job_location_pairs(users):
         job_locations = user.get("jobLocations", [])
         
         if job_titles and job_locations:
-            logger.info(f"  - User {user.get('email')}: {len(job_titles)} job titles × {len(job_locations)} locations")
+            logger.debug(f"  - User {user.get('email')}: {len(job_titles)} job titles × {len(job_locations)} locations")
             for title in job_titles:
                 for location in job_locations:
                     pairs.add((title, location))
@@ -68,41 +68,54 @@ def get_unique_job_location_pairs(users):
     logger.info(f"✅ Identified {len(pairs)} unique job title + location pairs from {len(users)} subscribed users")
     return list(pairs)
 
-def simple_job_matching(all_jobs, user):
+def simple_job_matching(all_jobs, user, table=None, title_matcher=None):
     """
     Simple job matching based on title and location text matching.
 
     UPDATED: Now properly filters IfYouCould jobs by BOTH title and location.
     The IfYouCould scraper has been enhanced to fetch actual job titles from detail pages.
 
+    Callers matching several users should build the JobTable (and title
+    matcher) once per cycle and pass it in, as match_jobs does; without one
+    a table is built from all_jobs for this call alone.
+
     :param all_jobs: Dictionary of jobs from all sources
     :param user: User dictionary
+    :param table: JobTable over all_jobs for the cycle (optional)
+    :param title_matcher: Title matcher over the cycle's user titles (optional, built for this user when None)
     :return: Matched jobs for the user
     """
-    user_titles = [t.lower() for t in user.get('jobTitles', [])]
-    user_locations = [l.lower() for l in user.get('jobLocations', [])]
-
-    matched_jobs = []
+    if table is None:
+        table = JobTable(all_jobs)
+    if title_matcher is None:
+        if table.rows_by_pattern is not None:
+            raise ValueError("an indexed JobTable needs the title matcher it was indexed with")
+        title_matcher = make_title_matcher(user.get('jobTitles', []), TITLE_MATCH_MODE)
+    matched_jobs = table.rows(match_job_indices(table, user, title_matcher))
 
-    for source, source_jobs in all_jobs.items():
-        for job in source_jobs:
-            job_title = job.get('title', '').lower()
-            job_location = job.get('location', '').lower()
+    logger.debug("User %s - Found %d matched jobs", user.get('email'), len(matched_jobs))
+    return matched_jobs
 
-            # Match both title and location for ALL sources (including IfYouCould)
-            title_match = any(title in job_title for title in user_titles)
-            location_match = any(loc in job_location for loc in user_locations)
+def radius_job_matching(spatial_index, user):
+    """
+    Match jobs by title and geocoded distance to the user's locations
+    (and their fallback towns), using an index built once per cycle.
 
-            # Enhanced location matching: also accept "remote", "uk", or "united kingdom" jobs for UK locations
-            if not location_match and any(loc in job_location for loc in ['remote', 'uk', 'united kingdom']):
-                location_match = any('uk' in user_loc or 'united kingdom' in user_loc or 'london' in user_loc for user_loc in user_locations)
+    :param spatial_index: JobSpatialIndex over every job in the cycle
+    :param user: User dictionary
+    :return: Matched jobs for the user, nearest first
+    """
+    from utils.location_matcher import find_matching_jobs
 
-            if title_match and location_match:
-                job_with_source = job.copy()
-                job_with_source['source'] = source
-                matched_jobs.append(job_with_source)
+    preferences = {
+        "job_titles": user.get('jobTitles', []),
+        "locations": user.get('jobLocations', []),
+    }
+    matched_jobs = find_matching_jobs(
+        spatial_index.jobs, preferences, max_radius_km=MAX_SEARCH_RADIUS_KM, spatial_index=spatial_index
+    )
 
-    logger.info(f"User {user.get('email')} - Found {len(matched_jobs)} matched jobs")
+    logger.debug("User %s - Found %d matched jobs within %dkm", user.get('email'), len(matched_jobs), MAX_SEARCH_RADIUS_KM)
     return matched_jobs
 
 def categorize_matched_jobs(matched_jobs, all_jobs):
@@ -137,77 +150,188 @@ def categorize_matched_jobs(matched_jobs, all_jobs):
     
     return categorized_jobs
 
-def job_cycle():
+def scrape_jobs(users, sources=None):
     """
-    Fetch new jobs for all subscribed users and store them in a scalable structure.
+    Run the scrapers for every unique title + location pair and drop duplicate postings.
+
+    :param users: List of users
+    :param sources: Optional list of ScraperSource to run (default: enabled sources)
+    :return: Dictionary of jobs by source, or None if there was nothing to scrape or nothing found
     """
-    logger.info("\n🚀 Starting job cycle")
-    
-    # Get subscribed users
-    users = get_subscribed_users()
-    if not users:
-        logger.warning("❌ No subscribed users found. Skipping scraper.")
-        return False
-    
     # Get unique job search combinations
     job_location_pairs = get_unique_job_location_pairs(users)
     if not job_location_pairs:
         logger.warning("❌ No job search criteria found. Skipping scraper.")
-        return False
-    
+        return None
+
     # Run scrapers for all unique combinations
     logger.info(f"\n🔄 Fetching jobs for {len(job_location_pairs)} unique search combinations")
-    jobs = run_scrapers(job_location_pairs)
-    
+    jobs = run_scrapers(job_location_pairs, sources)
+
     if not any(jobs.values()):
         logger.warning("❌ No jobs found in this cycle.")
-        return False
-    
-    logger.info("✅ Scraping complete. Storing results per user...")
-    
-    # Process jobs for each user
-    for user in users:
+        return None
+
+    # Collapse the same posting reached via different URLs, sources or reposts
+    fingerprint_store = FingerprintStore()
+    jobs, _ = dedupe_jobs(jobs, fingerprint_store)
+    fingerprint_store.save()
+
+    # Recent jobs for instant searches by new users (see instant_search.py)
+    recent_jobs = RecentJobsIndex()
+    recent_jobs.add_jobs(jobs)
+    recent_jobs.save()
+
+    logger.info("✅ Scraping complete.")
+    return jobs
+
+def match_jobs(jobs, users, incremental=None):
+    """
+    Match the cycle's jobs against every user.
+
+    :param jobs: Dictionary of jobs by source
+    :param users: List of users
+    :param incremental: Use the match ledger (default: INCREMENTAL_MATCHING)
+    :return: (list of matched jobs by source per user - None where matching failed,
+              MatchLedger or None, list of job IDs or None)
+    """
+    ledger = None
+    job_ids = None
+
+    # Radius mode geocodes every job once up front and reuses the index for all users
+    if LOCATION_MATCH_MODE == "radius":
+        from utils.location_matcher import build_spatial_index
+        spatial_index = build_spatial_index([job for source_jobs in jobs.values() for job in source_jobs])
+
+        matches = []
+        for user in users:
+            try:
+                # Best jobs first; store_matched_jobs caps the new ones per user (see matching/ranking.py)
+                matched_jobs = rank_jobs(radius_job_matching(spatial_index, user), user, limit=0)
+                # Categorize matched jobs by source
+                matches.append(categorize_matched_jobs(matched_jobs, jobs) if matched_jobs else {})
+            except Exception as e:
+                logger.exception(f"Error matching jobs for user {user.get('email', 'Unknown')}: {e}")
+                matches.append(None)
+        return matches, ledger, job_ids
+
+    # Compact job table; every title is scanned once against all users' titles
+    table = JobTable(jobs)
+    title_matcher = make_title_matcher((t for user in users for t in user.get('jobTitles', [])), TITLE_MATCH_MODE)
+    table.index_titles(title_matcher)
+    logger.info(f"🔤 Indexed {len(table)} jobs against {len(title_matcher)} distinct user titles "
+                f"({len(table.distinct_locations)} distinct locations)")
+
+    # Incremental mode: users with unchanged preferences only see jobs new since last cycle
+    restrict = None
+    if INCREMENTAL_MATCHING if incremental is None else incremental:
+        ledger = MatchLedger()
+        job_ids = [generate_job_id({"url": url if isinstance(url, str) else ""}) for url in table.urls]
+        new_ids = ledger.new_job_ids(job_ids)
+        new_rows = frozenset(row for row, job_id in enumerate(job_ids) if job_id in new_ids)
+        restrict = [None if ledger.needs_full_match(user) else new_rows for user in users]
+        logger.info(f"📒 Incremental matching: {len(new_rows)}/{len(table)} new jobs, "
+                    f"{sum(rows is None for rows in restrict)}/{len(users)} users need a full match")
+
+    # Match all users up front (across CPU cores for large user bases)
+    matches_by_user = match_users(table, users, title_matcher, restrict)
+
+    # Every match is ranked, best first; store_matched_jobs keeps each user's top
+    # new ones, so jobs the user already has don't use up the cap (see matching/ranking.py).
+    # Job dicts are only built here, at the storage boundary
+    matches = [ranked_by_source(table, user, rows, limit=0) for user, rows in zip(users, matches_by_user)]
+    logger.info(f"🏅 Ranked {sum(len(rows) for rows in matches_by_user)} matches for {len(users)} users")
+    return matches, ledger, job_ids
+
+def store_matched_jobs(users, matches, ledger=None, job_ids=None):
+    """
+    Store each user's matched jobs and record the cycle in the match ledger.
+
+    :param users: List of users
+    :param matches: Matched jobs by source per user, as returned by match_jobs
+    :param ledger: MatchLedger from match_jobs (None when not matching incrementally)
+    :param job_ids: Job IDs of the cycle from match_jobs
+    """
+    logger.info("💾 Storing results per user...")
+    events = EventAggregator(logger, "job_cycle.users", sample_every=50)
+
+    for user, user_jobs in zip(users, matches):
+        user_id = user.get('id')
+        email = user.get('email', 'Unknown')
         try:
-            user_id = user.get('id')
-            email = user.get('email', 'Unknown')
-            
-            logger.info(f"\n🔍 Processing jobs for user: {email}")
-            
-            # Simple job matching
-            matched_jobs = simple_job_matching(jobs, user)
-            
-            if not matched_jobs:
-                logger.info(f"⚠️ No matching jobs found for {email}")
+            if user_jobs is None:
+                raise RuntimeError("matching failed")
+
+            if not user_jobs:
+                events.record("no_matches", "⚠️ No matching jobs found for %s", email)
+                if ledger:
+                    ledger.mark_user(user)
                 continue
-            
-            # Categorize matched jobs by source
-            user_jobs = categorize_matched_jobs(matched_jobs, jobs)
-            
-            # Log categorization results
-            logger.info(f"📊 Categorized jobs for {email}:")
-            for source, source_jobs in user_jobs.items():
-                logger.info(f"  - {source}: {len(source_jobs)} jobs")
-            
-            # Store matched jobs
-            new_count, dup_count = store_jobs(user_id, user_jobs)
-            logger.info(f"💾 Updated jobs for {email} ({user_id}): {new_count} new, {dup_count} duplicates skipped")
-        
+
+            # Store the user's best jobs they don't have yet
+            new_count, dup_count = store_jobs(user_id, user_jobs, limit=job_limit(user))
+            events.counts["jobs_new"] += new_count
+            events.counts["jobs_duplicate"] += dup_count
+            events.record(
+                "stored",
+                "💾 Updated jobs for %s (%s): %d new, %d duplicates skipped (%s)",
+                email, user_id, new_count, dup_count,
+                ", ".join(f"{source}={len(source_jobs)}" for source, source_jobs in user_jobs.items()),
+            )
+            if ledger:
+                if new_count + dup_count < sum(len(source_jobs) for source_jobs in user_jobs.values()):
+                    # The cap left matches unstored; look at the full pool again next cycle
+                    ledger.mark_truncated(user)
+                ledger.mark_user(user)
+
         except Exception as e:
-            logger.error(f"Error processing jobs for user {email}: {e}")
-            import traceback
-            traceback.print_exc()
-    
+            events.record("failed")
+            logger.exception(f"Error processing jobs for user {email}: {e}")
+            if ledger:
+                # Re-match this user against the full pool next cycle
+                ledger.forget_user(user)
+
+    events.summary()
+
+    if ledger:
+        ledger.mark_jobs(job_ids)
+        ledger.save()
+
+def job_cycle(users=None, sources=None):
+    """
+    Fetch new jobs for all subscribed users and store them in a scalable structure.
+
+    :param users: Users already loaded by the caller (read from Firestore if None)
+    :param sources: Optional list of ScraperSource to run (default: enabled sources)
+    """
+    logger.info("\n🚀 Starting job cycle")
+
+    # Get subscribed users
+    if users is None:
+        users = get_subscribed_users()
+    if not users:
+        logger.warning("❌ No subscribed users found. Skipping scraper.")
+        return False
+
+    jobs = scrape_jobs(users, sources)
+    if not jobs:
+        return False
+
+    matches, ledger, job_ids = match_jobs(jobs, users)
+    store_matched_jobs(users, matches, ledger, job_ids)
     return True
 
-def send_email_notifications():
+def send_email_notifications(users=None):
     """
     Send email notifications for new jobs
+
+    :param users: Users already loaded by the caller (read from Firestore if None)
     """
     try:
         logger.info("📧 Sending email notifications...")
         # Import here to avoid circular imports
         from email_service import send_job_emails
-        send_job_emails()
+        send_job_emails(users)
         logger.info("✅ Email notifications sent successfully")
         return True
     except Exception as e:
@@ -0,0 +1,280 @@
+# matching/dedup.py
+
+"""
+Collapse duplicate job postings before matching.
+
+The same posting often arrives more than once: with tracking parameters, via a
+LinkedIn regional host (uk.linkedin.com vs www.linkedin.com), from two sources,
+or reposted under a new URL. Three checks run in order and the first
+occurrence wins:
+
+1. normalised URL
+2. content fingerprint - normalised title, company and canonical location
+3. near-duplicate title/company text in the same location (MinHash + LSH)
+
+Checks 1 and 2 also run against a local record of earlier cycles, so a repost
+under a new URL is not stored and emailed a second time. Checks 2 and 3 are
+skipped for jobs whose company is a source-wide placeholder (unjobs labels
+every vacancy "UN Jobs"), since two "Consultant" roles in Geneva are not the
+same posting; those are deduplicated by URL only.
+
+Job ids hash the raw URL (store.store_jobs.generate_job_id), so a posting that
+comes back under another form of the same URL (a different LinkedIn host or
+tracking parameters) is given the raw URL recorded when it was first seen.
+It then keeps its job id and isn't stored and emailed a second time.
+"""
+
+import os
+import re
+import json
+import zlib
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import numpy as np
+
+from utils.location_resolver import resolve_location
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_FILE = os.path.join(os.path.dirname(__file__), "..", "job_fingerprints.json")
+FINGERPRINT_TTL_DAYS = 30  # Reposts within this window count as the same posting
+
+# Query parameters that only track the visitor, never identify the job
+TRACKING_PARAMS = {
+    "refid", "trackingid", "trk", "trkinfo", "position", "pagenum", "originalsubdomain",
+    "gclid", "fbclid", "msclkid", "src", "source", "ref", "referrer", "from", "lipi",
+}
+LINKEDIN_JOB_PATH = re.compile(r"^/jobs/view/(?:[^/]*-)?(\d+)/?$")
+COMPANY_SUFFIXES = re.compile(r"\b(ltd|limited|plc|llp|inc|llc|gmbh|co|company|group)\b")
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+# Company names a source puts on every job (normalised) - they don't identify the employer
+PLACEHOLDER_COMPANIES = {"un jobs"}
+
+# MinHash / LSH parameters: 16 bands x 4 rows catches pairs above ~0.75 Jaccard
+NUM_PERM = 64
+LSH_BANDS = 16
+NEAR_DUPLICATE_THRESHOLD = 0.9
+SHINGLE_SIZE = 4
+_PRIME = (1 << 31) - 1
+_rng = np.random.RandomState(20261019)
+_PERM_A = _rng.randint(1, _PRIME, NUM_PERM).astype(np.uint64)
+_PERM_B = _rng.randint(0, _PRIME, NUM_PERM).astype(np.uint64)
+
+
+def normalize_url(url):
+    """
+    Canonical form of a job URL for duplicate detection.
+
+    :param url: Raw URL
+    :return: Lowercased host without www./regional prefix, no tracking params, fragment or trailing slash
+    """
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    path = parts.path.rstrip("/") or "/"
+
+    if host.endswith("linkedin.com"):
+        # uk.linkedin.com/jobs/view/ux-designer-at-acme-123 -> linkedin.com/jobs/view/123
+        host = "linkedin.com"
+        match = LINKEDIN_JOB_PATH.match(path)
+        if match:
+            path = f"/jobs/view/{match.group(1)}"
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith("utm_")
+    )
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+
+def _normalise_text(text):
+    return _NON_WORD.sub(" ", (text or "").lower()).strip()
+
+
+def content_fingerprint(job):
+    """
+    Hash of what makes two postings the same job, independent of URL and source.
+
+    The scrape date is left out on purpose - a repost only differs by date.
+
+    :param job: Job dictionary
+    :return: Hex digest, or None when the company is a placeholder (see PLACEHOLDER_COMPANIES)
+    """
+    if _normalise_text(job.get('company')) in PLACEHOLDER_COMPANIES:
+        return None
+    title = _normalise_text(job.get('title'))
+    company = _normalise_text(COMPANY_SUFFIXES.sub(" ", (job.get('company') or "").lower()))
+    location = resolve_location(job.get('location') or "").scope or _normalise_text(job.get('location'))
+    return hashlib.sha1(f"{title}|{company}|{location}".encode()).hexdigest()
+
+
+def minhash_signature(text):
+    """
+    MinHash signature of a string's character shingles.
+
+    :param text: Normalised text
+    :return: numpy array of NUM_PERM uint64 values
+    """
+    text = f" {text} "
+    shingles = {zlib.crc32(text[i:i + SHINGLE_SIZE].encode()) for i in range(max(1, len(text) - SHINGLE_SIZE + 1))}
+    values = np.fromiter(shingles, dtype=np.uint64, count=len(shingles))
+    return ((np.outer(values, _PERM_A) + _PERM_B) % _PRIME).min(axis=0)
+
+
+class NearDuplicateIndex:
+    """LSH index over MinHash signatures; candidates are confirmed by estimated Jaccard."""
+
+    def __init__(self, threshold=NEAR_DUPLICATE_THRESHOLD, bands=LSH_BANDS):
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = NUM_PERM // bands
+        self.buckets = {}
+        self.signatures = {}
+
+    def add(self, key, text, block=""):
+        """
+        Add a document unless it near-duplicates one already indexed.
+
+        :param key: Identifier for this document
+        :param text: Normalised text to compare
+        :param block: Only documents with the same block are compared (e.g. location)
+        :return: Key of the existing near-duplicate, or None if added
+        """
+        signature = minhash_signature(text)
+        band_keys = [
+            (block, band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+            for band in range(self.bands)
+        ]
+
+        candidates = set()
+        for band_key in band_keys:
+            candidates.update(self.buckets.get(band_key, ()))
+        for candidate in candidates:
+            if np.mean(self.signatures[candidate] == signature) >= self.threshold:
+                return candidate
+
+        self.signatures[key] = signature
+        for band_key in band_keys:
+            self.buckets.setdefault(band_key, []).append(key)
+        return None
+
+
+class FingerprintStore:
+    """Normalised URLs and content fingerprints seen in earlier cycles."""
+
+    def __init__(self, fingerprint_file=FINGERPRINT_FILE):
+        """
+        :param fingerprint_file: JSON file to persist to (None for memory only)
+        """
+        self.fingerprint_file = fingerprint_file
+        # normalised URL or fingerprint -> [canonical normalised URL, ISO date last seen, first raw URL]
+        self.seen = {}
+        if fingerprint_file and os.path.exists(fingerprint_file):
+            try:
+                with open(fingerprint_file, "r") as f:
+                    self.seen = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"Error loading job fingerprints: {e}. Starting fresh.")
+
+    def canonical(self, key):
+        """Canonical normalised URL recorded for a URL/fingerprint key, or None."""
+        entry = self.seen.get(key)
+        return entry[0] if entry else None
+
+    def raw_url(self, key):
+        """Raw URL the posting had when first recorded under a key, or None."""
+        entry = self.seen.get(key)
+        return entry[2] if entry and len(entry) > 2 else None
+
+    def record(self, key, canonical_url, raw_url=None):
+        """
+        :param key: Normalised URL or content fingerprint
+        :param canonical_url: Normalised URL of the posting
+        :param raw_url: Its raw URL (the first one recorded for the posting is kept)
+        """
+        if self.canonical(key) == canonical_url:
+            raw_url = self.raw_url(key) or raw_url
+        entry = [canonical_url, datetime.now().date().isoformat()]
+        self.seen[key] = entry + [raw_url] if raw_url else entry
+
+    def save(self):
+        """Prune entries older than FINGERPRINT_TTL_DAYS and write atomically."""
+        if not self.fingerprint_file:
+            return
+        cutoff = (datetime.now() - timedelta(days=FINGERPRINT_TTL_DAYS)).date().isoformat()
+        self.seen = {key: entry for key, entry in self.seen.items() if entry[1] >= cutoff}
+        try:
+            tmp_file = f"{self.fingerprint_file}.tmp"
+            with open(tmp_file, "w") as f:
+                json.dump(self.seen, f)
+            os.replace(tmp_file, self.fingerprint_file)
+        except OSError as e:
+            logger.error(f"Error saving job fingerprints: {e}")
+
+
+def dedupe_jobs(all_jobs, store=None):
+    """
+    Drop duplicate postings within this cycle and reposts of earlier ones.
+
+    :param all_jobs: Dictionary of jobs from all sources (sources earlier in the dict win ties)
+    :param store: FingerprintStore for cross-cycle checks (None to only dedupe this cycle)
+    :return: (deduplicated dictionary of jobs, dictionary of drop counts by reason)
+    """
+    seen_urls = {}  # normalised URL -> raw URL kept
+    seen_fingerprints = {}
+    near_index = NearDuplicateIndex()
+    dropped = {"url": 0, "fingerprint": 0, "near_duplicate": 0, "repost": 0}
+    deduped = {}
+
+    for source, source_jobs in all_jobs.items():
+        kept = deduped.setdefault(source, [])
+        for job in source_jobs:
+            url = normalize_url(job.get('url'))
+            fingerprint = content_fingerprint(job)
+
+            if url in seen_urls:
+                dropped["url"] += 1
+                continue
+            if fingerprint is not None and fingerprint in seen_fingerprints:
+                dropped["fingerprint"] += 1
+                continue
+
+            if store is not None:
+                earlier = store.canonical(url) or (fingerprint and store.canonical(fingerprint))
+                if earlier and earlier != url:
+                    logger.debug(f"♻️ Repost of {earlier}: {job.get('title')} ({job.get('url')})")
+                    dropped["repost"] += 1
+                    continue
+                first_url = store.raw_url(url)
+                if first_url and first_url != job.get('url'):
+                    # Same posting under another host or tracking parameters: keep its job id
+                    job = dict(job, url=first_url)
+
+            if fingerprint is not None:
+                text = f"{_normalise_text(job.get('title'))} {_normalise_text(job.get('company'))}"
+                block = resolve_location(job.get('location') or "").scope or ""
+                if near_index.add(url, text, block) is not None:
+                    dropped["near_duplicate"] += 1
+                    continue
+                seen_fingerprints[fingerprint] = url
+
+            seen_urls[url] = job.get('url')
+            kept.append(job)
+
+    if store is not None:
+        for url, raw_url in seen_urls.items():
+            store.record(url, url, raw_url)
+        for fingerprint, url in seen_fingerprints.items():
+            store.record(fingerprint, url)
+
+    total_dropped = sum(dropped.values())
+    if total_dropped:
+        logger.info(f"🧹 Dropped {total_dropped} duplicate jobs ("
+                    + ", ".join(f"{reason}={count}" for reason, count in dropped.items() if count) + ")")
+    return deduped, dropped
@@ -0,0 +1,131 @@
+# matching/incremental.py
+
+"""
+Incremental matching ledger.
+
+Remembers which jobs have already been matched against every user and a
+fingerprint of each user's preferences at that time. Next cycle:
+
+- users whose preferences are unchanged are only matched against jobs that
+  are new since the last cycle
+- users who are new, changed their preferences (titles, locations, job
+  limit) or were matched under different settings (TITLE_MATCH_MODE,
+  LOCATION_MATCH_MODE, MATCH_RULES_VERSION) are matched against the full pool
+- users whose matches were cut by top-K ranking get a full match again next
+  cycle, so jobs that lost out this time are reconsidered
+
+so steady-state matching (and the duplicate-check reads in store_jobs) scales
+with churn instead of total volume. The ledger lives in a local JSON file;
+if it's missing every user simply gets a full match.
+"""
+
+import os
+import json
+import hashlib
+import logging
+from datetime import datetime, timedelta
+
+from config import TITLE_MATCH_MODE, LOCATION_MATCH_MODE
+from matching.ranking import job_limit
+
+logger = logging.getLogger(__name__)
+
+MATCH_LEDGER_FILE = os.path.join(os.path.dirname(__file__), "..", "match_ledger.json")
+JOB_LEDGER_TTL_DAYS = 30  # Forget jobs not seen for this long
+# Bump when matching rules change (e.g. utils/location_resolver.py) so every user is re-matched
+MATCH_RULES_VERSION = 2
+
+
+def preference_fingerprint(user):
+    """
+    Stable hash of the preferences and settings that affect matching.
+
+    :param user: User dictionary with jobTitles, jobLocations and maxJobsPerCycle
+    :return: Hex digest
+    """
+    titles = sorted({t.lower().strip() for t in user.get('jobTitles', [])})
+    locations = sorted({l.lower().strip() for l in user.get('jobLocations', [])})
+    settings = [TITLE_MATCH_MODE, LOCATION_MATCH_MODE, MATCH_RULES_VERSION, job_limit(user)]
+    payload = json.dumps([titles, locations, settings], separators=(",", ":"))
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+class MatchLedger:
+    """Job ids already evaluated plus per-user preference fingerprints."""
+
+    def __init__(self, ledger_file=MATCH_LEDGER_FILE):
+        """
+        :param ledger_file: JSON file to persist to (None for memory only)
+        """
+        self.ledger_file = ledger_file
+        self.jobs = {}   # job_id -> ISO date last seen
+        self.users = {}  # user_id -> preference fingerprint
+        self.truncated = set()  # user_ids with matches left unstored by the per-cycle cap
+        self._load()
+
+    def _load(self):
+        if not self.ledger_file or not os.path.exists(self.ledger_file):
+            return
+        try:
+            with open(self.ledger_file, "r") as f:
+                data = json.load(f)
+            self.jobs = data.get("jobs", {})
+            self.users = data.get("users", {})
+            logger.info(f"📒 Loaded match ledger: {len(self.jobs)} jobs, {len(self.users)} users")
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Error loading match ledger: {e}. Every user gets a full match.")
+
+    def prune(self, today=None):
+        """
+        Forget jobs not seen for JOB_LEDGER_TTL_DAYS.
+
+        :param today: Date to measure from (default: today)
+        """
+        cutoff = ((today or datetime.now().date()) - timedelta(days=JOB_LEDGER_TTL_DAYS)).isoformat()
+        self.jobs = {job_id: seen for job_id, seen in self.jobs.items() if seen >= cutoff}
+
+    def save(self):
+        """Prune stale jobs and write the ledger atomically."""
+        if not self.ledger_file:
+            return
+        self.prune()
+        try:
+            tmp_file = f"{self.ledger_file}.tmp"
+            with open(tmp_file, "w") as f:
+                json.dump({"jobs": self.jobs, "users": self.users}, f)
+            os.replace(tmp_file, self.ledger_file)
+        except OSError as e:
+            logger.error(f"Error saving match ledger: {e}")
+
+    def new_job_ids(self, job_ids):
+        """
+        :param job_ids: Iterable of job ids from this cycle
+        :return: Set of those not evaluated in an earlier cycle
+        """
+        return {job_id for job_id in job_ids if job_id not in self.jobs}
+
+    def needs_full_match(self, user):
+        """Whether the user is new or changed preferences since the last cycle."""
+        return self.users.get(user['id']) != preference_fingerprint(user)
+
+    def mark_truncated(self, user):
+        """Record that the per-cycle cap left some of the user's matches unstored."""
+        self.truncated.add(user['id'])
+
+    def mark_user(self, user):
+        """Record that the user has been matched against everything up to now."""
+        if user['id'] in self.truncated:
+            # Jobs cut this cycle would never be seen again as "new"
+            self.forget_user(user)
+            return
+        self.users[user['id']] = preference_fingerprint(user)
+
+    def forget_user(self, user):
+        """Force a full match for the user next cycle (e.g. after a failed store)."""
+        self.users.pop(user['id'], None)
+
+    def mark_jobs(self, job_ids):
+        """Record job ids as evaluated against every user."""
+        today = datetime.now().date().isoformat()
+        for job_id in job_ids:
+            self.jobs[job_id] = today
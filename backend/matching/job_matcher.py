@@ -1,8 +1,47 @@
-def get_unmatched_jobs():
-    # Retrieve jobs from jobs_compiled that haven't been matched
-    jobs_collection = db.collection("jobs_compiled")
-    unmatched_jobs_query = jobs_collection.where("matched", "==", False)
-    return [job.to_dict() for job in unmatched_jobs_query.stream()]
+import os
+import sys
+import logging
+
+from firebase_admin import firestore
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from config import get_db
+from store.batching import ChunkedBatch
+from matching.title_automaton import UserTitleIndex
+from utils.location_resolver import matches_any_location
+
+logger = logging.getLogger(__name__)
+
+# Unmatched jobs are read in pages of this size, so memory stays bounded on any backlog
+PAGE_SIZE = 500
+
+def iter_unmatched_job_pages(page_size=PAGE_SIZE):
+    """
+    Page through jobs_compiled documents that haven't been matched yet, in document id order.
+
+    Jobs marked matched while paging simply drop out of later pages; the cursor is the
+    last document id, so nothing is skipped.
+
+    :param page_size: Documents per page
+    :return: Generator of lists of DocumentSnapshots
+    """
+    query = (
+        get_db().collection("jobs_compiled")
+        .where("matched", "==", False)
+        .order_by("__name__")
+        .limit(page_size)
+    )
+    last_doc = None
+
+    while True:
+        page_query = query.start_after(last_doc) if last_doc is not None else query
+        docs = list(page_query.stream())
+        if not docs:
+            return
+        yield docs
+        if len(docs) < page_size:
+            return
+        last_doc = docs[-1]
 
 def get_active_users():
     """
@@ -10,7 +49,7 @@ def get_active_users():
     Previously only fetched subscribed users, now fetches all users.
     """
     # FREE MODE: Get ALL users with job preferences
-    users_ref = db.collection("users").stream()
+    users_ref = get_db().collection("users").stream()
     return [
         {
             "id": user.id,
@@ -21,59 +60,67 @@ def get_active_users():
         if user.to_dict().get("jobTitles") and user.to_dict().get("jobLocations")
     ]
 
-def filter_jobs_for_user(user, unmatched_jobs):
-    matching_jobs = []
-    user_job_titles = [title.lower() for title in user.get('jobTitles', [])]
-    user_job_locations = [loc.lower() for loc in user.get('jobLocations', [])]
-    
-    for job in unmatched_jobs:
-        job_title = job.get('title', '').lower()
-        job_location = job.get('location', '').lower()
-        
-        title_match = any(title in job_title for title in user_job_titles)
-        location_match = any(loc in job_location for loc in user_job_locations)
-        
-        if title_match and location_match:
-            matching_jobs.append(job)
-    
-    return matching_jobs
-
-def create_user_job_matches(user_id, matching_jobs):
-    # Create matches in a new user_job_matches collection
-    batch = db.batch()
-    
-    for job in matching_jobs:
-        job_id = generate_job_id(job)
-        
-        # Reference to user job matches
-        match_ref = db.collection("user_job_matches").document()
-        
-        # Create match document
-        match_data = {
-            "user_id": user_id,
-            "job_id": job_id,
-            "job_details": job,
-            "matched_at": firestore.SERVER_TIMESTAMP,
-            "notified": False
-        }
-        
-        # Add to batch
-        batch.set(match_ref, match_data)
-        
-        # Mark job as matched in original collection
-        job_ref = db.collection("jobs_compiled").document(job_id)
-        batch.update(job_ref, {"matched": True})
-    
-    # Commit batch
-    batch.commit()
-
-def match_jobs_to_users():
-    # Main matching function
-    unmatched_jobs = get_unmatched_jobs()
+def interested_users_for_job(job, title_index, users_by_id):
+    """
+    Scan the job title once with the automaton over every user's titles,
+    then check location only for the users whose titles it contains.
+
+    :return: List of matching user IDs
+    """
+    return [
+        user_id for user_id in title_index.interested_users(job.get('title', ''))
+        if matches_any_location(job.get('location', ''), users_by_id[user_id].get('jobLocations', []))
+    ]
+
+def add_user_job_match(batch, user_id, job_id, job):
+    """
+    Queue one match document. The id is deterministic, so re-running a page after
+    an interruption overwrites instead of duplicating.
+    """
+    match_ref = get_db().collection("user_job_matches").document(f"{user_id}_{job_id}")
+    batch.set(match_ref, {
+        "user_id": user_id,
+        "job_id": job_id,
+        "job_details": job,
+        "matched_at": firestore.SERVER_TIMESTAMP,
+        "notified": False
+    })
+
+def match_jobs_to_users(page_size=PAGE_SIZE):
+    """
+    Match the unmatched backlog page by page against every user.
+
+    Each job is written as a match for every interested user and then marked
+    matched exactly once, whether or not anyone matched it, so it isn't scanned again.
+
+    :return: Dictionary of counts (jobs, matches, commits)
+    """
     active_users = get_active_users()
-    
-    for user in active_users:
-        matching_jobs = filter_jobs_for_user(user, unmatched_jobs)
-        
-        if matching_jobs:
-            create_user_job_matches(user['id'], matching_jobs)
\ No newline at end of file
+    title_index = UserTitleIndex(active_users)
+    users_by_id = {user['id']: user for user in active_users}
+    jobs_collection = get_db().collection("jobs_compiled")
+
+    total_jobs = 0
+    total_matches = 0
+
+    with ChunkedBatch(get_db()) as batch:
+        for page in iter_unmatched_job_pages(page_size):
+            for doc in page:
+                job = doc.to_dict() or {}
+                for user_id in interested_users_for_job(job, title_index, users_by_id):
+                    add_user_job_match(batch, user_id, doc.id, job)
+                    total_matches += 1
+                batch.update(jobs_collection.document(doc.id), {"matched": True})
+
+            total_jobs += len(page)
+            # Finish the page before reading the next one
+            batch.flush()
+            logger.info(f"📄 Matched {total_jobs} jobs so far ({total_matches} matches)")
+
+    logger.info(f"✅ Matched {total_jobs} jobs to {len(active_users)} users: {total_matches} matches in {batch.commits} commits")
+    return {"jobs": total_jobs, "matches": total_matches, "commits": batch.commits}
+
+if __name__ == "__main__":
+    from utils.log import configure_logging
+    configure_logging()
+    match_jobs_to_users()
@@ -0,0 +1,124 @@
+# matching/job_table.py
+
+"""
+Compact column store for the jobs scraped in one cycle.
+
+Instead of every match carrying its own copy of a job dict, each job becomes an
+integer row in a set of parallel columns. Repeated strings (source, company,
+location, date) are interned, lowercased titles are computed once, and each
+distinct location string is stored once with every row pointing at it. Matches
+are lists of row numbers; job dicts are only built at the storage boundary by
+rows() / by_source().
+"""
+
+import sys
+from array import array
+from collections import defaultdict
+
+# Fields with their own column; anything else a scraper adds goes in `extras`
+COLUMNS = ("title", "company", "location", "url", "date_added", "has_applied")
+_MISSING = object()
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class JobTable:
+    """All jobs from a cycle, addressed by row number."""
+
+    def __init__(self, all_jobs):
+        """
+        :param all_jobs: Dictionary of jobs from all sources
+        """
+        self.sources = []
+        self.titles = []
+        self.title_lower = []
+        self.companies = []
+        self.urls = []
+        self.dates = []
+        self.applied = []
+        self.extras = []  # dict of other fields, or None
+        self.location_ids = array('I')
+        self.distinct_locations = []
+        self.rows_by_pattern = None
+
+        location_index = {}
+        for source, source_jobs in all_jobs.items():
+            source = sys.intern(source)
+            for job in source_jobs:
+                title = job.get('title', _MISSING)
+                location = job.get('location', _MISSING)
+
+                self.sources.append(source)
+                self.titles.append(title)
+                self.title_lower.append(title.lower() if isinstance(title, str) else "")
+                self.companies.append(_intern(job.get('company', _MISSING)))
+                self.urls.append(job.get('url', _MISSING))
+                self.dates.append(_intern(job.get('date_added', _MISSING)))
+                self.applied.append(job.get('has_applied', _MISSING))
+
+                location_id = location_index.get(location)
+                if location_id is None:
+                    location_id = location_index[location] = len(self.distinct_locations)
+                    self.distinct_locations.append(location)
+                self.location_ids.append(location_id)
+
+                extras = {key: value for key, value in job.items() if key not in COLUMNS and key != 'source'}
+                self.extras.append(extras or None)
+
+    def __len__(self):
+        return len(self.titles)
+
+    def location(self, row):
+        """Location string for a row ('' if the job had none)."""
+        location = self.distinct_locations[self.location_ids[row]]
+        return location if isinstance(location, str) else ""
+
+    def index_titles(self, matcher):
+        """
+        Scan every title once with a TitleMatcher and record which rows
+        contain each pattern.
+
+        :param matcher: TitleMatcher over all users' titles
+        """
+        rows_by_pattern = defaultdict(lambda: array('I'))
+        for row, title in enumerate(self.title_lower):
+            for pid in matcher.search(title):
+                rows_by_pattern[pid].append(row)
+        self.rows_by_pattern = dict(rows_by_pattern)
+        return self.rows_by_pattern
+
+    def row(self, row):
+        """
+        Build the job dictionary for one row.
+
+        :param row: Row number
+        :return: New job dict with 'source' set
+        """
+        values = (self.titles[row], self.companies[row], self.distinct_locations[self.location_ids[row]],
+                  self.urls[row], self.dates[row], self.applied[row])
+        job = {key: value for key, value in zip(COLUMNS, values) if value is not _MISSING}
+        if self.extras[row]:
+            job.update(self.extras[row])
+        job['source'] = self.sources[row]
+        return job
+
+    def rows(self, rows):
+        """
+        :param rows: Iterable of row numbers
+        :return: List of job dicts
+        """
+        return [self.row(row) for row in rows]
+
+    def by_source(self, rows):
+        """
+        Build job dicts grouped by source, ready for store_jobs().
+
+        :param rows: Iterable of row numbers
+        :return: Dictionary of source -> list of job dicts
+        """
+        grouped = {}
+        for row in rows:
+            grouped.setdefault(self.sources[row], []).append(self.row(row))
+        return grouped
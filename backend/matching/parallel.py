@@ -0,0 +1,141 @@
+# matching/parallel.py
+
+"""
+Per-user job matching, serially or across CPU cores.
+
+Users are matched against a JobTable (matching/job_table.py) and each match is
+an array of table row numbers rather than copies of job dicts. When the table's
+titles have been indexed with the cycle's TitleMatcher, a user's candidates are
+just the union of the rows for their titles; location is then checked once per
+distinct location string.
+
+For large user bases the table and title automaton are placed in a module
+global before worker processes are forked, so every worker inherits them
+read-only instead of receiving a pickled copy. Workers get shards of users and
+send back one compact row array per user. Workers swap the inherited queue
+log handler for a plain stderr one (utils.log.configure_worker_logging), as
+the queue's listener thread only runs in the parent.
+
+    MATCH_WORKERS=4                 # worker processes (default: CPU count)
+    PARALLEL_MATCH_MIN_USERS=200    # below this, matching stays in-process
+"""
+
+import os
+import logging
+import multiprocessing
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.log import configure_worker_logging
+from utils.location_resolver import matches_any_location
+
+logger = logging.getLogger(__name__)
+
+MATCH_WORKERS = int(os.getenv("MATCH_WORKERS", "0")) or os.cpu_count() or 1
+PARALLEL_MATCH_MIN_USERS = int(os.getenv("PARALLEL_MATCH_MIN_USERS", "200"))
+SHARDS_PER_WORKER = 4  # Smaller shards even out users with many titles/locations
+
+# Read-only state inherited by forked workers
+_shared = {}
+
+
+def match_job_indices(table, user, title_matcher=None, rows=None):
+    """
+    Match one user against the cycle's jobs on title and location.
+
+    :param table: JobTable for the cycle
+    :param user: User dictionary
+    :param title_matcher: TitleMatcher/FuzzyTitleMatcher, used via table.index_titles() when indexed (optional)
+    :param rows: Only consider these rows (e.g. jobs new since the last cycle); None for all
+    :return: array of matching row numbers, in table order
+    """
+    user_titles = [t.lower() for t in user.get('jobTitles', [])]
+    user_locations = user.get('jobLocations', [])
+
+    if title_matcher is not None and table.rows_by_pattern is not None:
+        # Titles were scanned once for every user's titles - union this user's rows
+        candidates = set()
+        for pid in title_matcher.pattern_ids(user_titles):
+            candidates.update(table.rows_by_pattern.get(pid, ()))
+        if rows is not None:
+            candidates &= rows
+        candidates = sorted(candidates)
+    elif title_matcher is not None:
+        # Titles not indexed (single-user paths): scan each one with the matcher
+        wanted = title_matcher.pattern_ids(user_titles)
+        candidates = [
+            row for row, job_title in enumerate(table.title_lower)
+            if (rows is None or row in rows) and not wanted.isdisjoint(title_matcher.search(job_title))
+        ]
+    else:
+        candidates = [
+            row for row, job_title in enumerate(table.title_lower)
+            if (rows is None or row in rows) and any(title in job_title for title in user_titles)
+        ]
+
+    # Canonical location match: same town, a wider area containing the user's
+    # location ("United Kingdom" for London), or unrestricted remote for
+    # users in REMOTE_HOME_COUNTRY (see location_matches).
+    # Decided once per distinct location string.
+    location_ok = {}
+    matched = array('I')
+    for row in candidates:
+        location_id = table.location_ids[row]
+        ok = location_ok.get(location_id)
+        if ok is None:
+            ok = location_ok[location_id] = matches_any_location(table.location(row), user_locations)
+        if ok:
+            matched.append(row)
+
+    return matched
+
+
+def _match_shard(shard):
+    """Worker entry point: match a shard of (user position, user) pairs."""
+    table = _shared["table"]
+    title_matcher = _shared["title_matcher"]
+    return [
+        (position, match_job_indices(table, user, title_matcher, rows))
+        for position, user, rows in shard
+    ]
+
+
+def match_users(table, users, title_matcher=None, restrict=None, workers=MATCH_WORKERS):
+    """
+    Match every user, in parallel when the user base is large enough.
+
+    :param table: JobTable for the cycle
+    :param users: List of user dictionaries
+    :param title_matcher: TitleMatcher used for table.index_titles() (optional)
+    :param restrict: Optional list aligned with users of row sets to consider (None entries = all rows)
+    :param workers: Number of worker processes
+    :return: List of row number arrays, aligned with users
+    """
+    restrict = restrict or [None] * len(users)
+    can_fork = "fork" in multiprocessing.get_all_start_methods()
+    if workers <= 1 or len(users) < PARALLEL_MATCH_MIN_USERS or not can_fork:
+        return [match_job_indices(table, user, title_matcher, rows) for user, rows in zip(users, restrict)]
+
+    # Only the fields matching needs cross the process boundary
+    slim_users = [
+        (position, {"jobTitles": user.get('jobTitles', []), "jobLocations": user.get('jobLocations', [])}, rows)
+        for position, (user, rows) in enumerate(zip(users, restrict))
+    ]
+    shard_size = max(1, -(-len(slim_users) // (workers * SHARDS_PER_WORKER)))
+    shards = [slim_users[i:i + shard_size] for i in range(0, len(slim_users), shard_size)]
+
+    logger.info(f"🧮 Matching {len(users)} users across {workers} processes ({len(shards)} shards)")
+
+    results = [None] * len(users)
+    _shared.update(table=table, title_matcher=title_matcher)
+    try:
+        # Workers are forked after _shared is populated and inherit it copy-on-write
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork"),
+                                 initializer=configure_worker_logging) as executor:
+            for shard_results in executor.map(_match_shard, shards):
+                for position, indices in shard_results:
+                    results[position] = indices
+    finally:
+        _shared.clear()
+
+    return results
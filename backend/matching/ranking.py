@@ -0,0 +1,247 @@
+# matching/ranking.py
+
+"""
+Relevance scoring and top-K selection of a user's matched jobs.
+
+A broad title ("Designer") can match hundreds of jobs in one cycle, and every
+one of them costs a Firestore write and a line in the email. Matches are
+scored instead and only each user's best K are kept:
+
+    score = 0.5 * title + 0.2 * location + 0.2 * recency + 0.1 * source
+
+- title: closest of the user's titles (title_similarity, 1.0 for an exact title)
+- location: distance between the job and the nearest user location when both
+  are gazetteer towns (or known from radius matching), otherwise how specific
+  the shared area is
+- recency: halves every RECENCY_HALF_LIFE_DAYS since date_posted (date_added
+  when the source gives no parseable posting date)
+- source: SOURCE_WEIGHTS
+
+K is the user's maxJobsPerCycle field when set, else MAX_JOBS_PER_CYCLE, never
+above MAX_JOBS_PER_CYCLE_CEILING; 0 turns the cap off. Selection with a limit
+uses a bounded heap (heapq.nlargest), so it costs O(n log K) per user, not a
+full sort.
+
+The cycle counts K in new jobs only: match_jobs ranks every match (limit=0)
+and store_jobs stores the best K the user doesn't already have. Capping before
+that would pick the same already-stored top K every cycle and never reach new
+matches ranked below them.
+
+    MAX_JOBS_PER_CYCLE=50
+    SOURCE_WEIGHTS="linkedin=1.0,unjobs=0.9"
+"""
+
+import os
+import math
+import heapq
+from datetime import date, datetime
+
+from matching.title_normalizer import title_similarity
+from utils.location_resolver import resolve_location
+from utils.uk_gazetteer import UK_PLACES
+
+MAX_JOBS_PER_CYCLE = int(os.getenv("MAX_JOBS_PER_CYCLE", "50"))
+MAX_JOBS_PER_CYCLE_CEILING = 500  # Highest limit a user can ask for
+RECENCY_HALF_LIFE_DAYS = 7
+DISTANCE_SCALE_KM = 25  # Distance at which the distance bonus halves
+
+WEIGHTS = {"title": 0.5, "location": 0.2, "recency": 0.2, "source": 0.1}
+DEFAULT_SOURCE_WEIGHT = 0.8
+SOURCE_WEIGHTS = {
+    "linkedin": 1.0,
+    "workable": 0.9,
+    "unjobs": 0.9,
+    "ifyoucould": 0.8,
+    "glassdoor": 0.8,
+    "ziprecruiter": 0.7,
+}
+for _pair in os.getenv("SOURCE_WEIGHTS", "").split(","):
+    if "=" in _pair:
+        _name, _weight = _pair.split("=", 1)
+        SOURCE_WEIGHTS[_name.strip()] = float(_weight)
+
+# Location score by the most specific area a job shares with the user
+SHARED_AREA_SCORES = {"city": 1.0, "region": 0.7, "country": 0.5}
+REMOTE_SCORE = 0.6
+UNKNOWN_LOCATION_SCORE = 0.3
+UNKNOWN_DATE_SCORE = 0.5
+
+
+def job_limit(user):
+    """
+    :param user: User dictionary (optional maxJobsPerCycle field)
+    :return: Maximum jobs to keep for the user per cycle, or None for no cap
+    """
+    limit = user.get('maxJobsPerCycle')
+    if not isinstance(limit, int) or isinstance(limit, bool) or limit <= 0:
+        limit = MAX_JOBS_PER_CYCLE
+    if limit <= 0:
+        return None
+    return min(limit, MAX_JOBS_PER_CYCLE_CEILING)
+
+
+def _parse_date(value):
+    if not isinstance(value, str):
+        return None
+    try:
+        return datetime.strptime(value[:10], "%Y-%m-%d").date()
+    except ValueError:
+        return None
+
+
+def _haversine_km(a, b):
+    lat1, lon1, lat2, lon2 = map(math.radians, (a[0], a[1], b[0], b[1]))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * 6371 * math.asin(math.sqrt(h))
+
+
+class RelevanceScorer:
+    """Scores jobs for one user. Location scores are cached per distinct location string."""
+
+    def __init__(self, user, today=None):
+        """
+        :param user: User dictionary with jobTitles and jobLocations
+        :param today: Date recency is measured from (default: today)
+        """
+        self.titles = [t for t in user.get('jobTitles', []) if isinstance(t, str) and t.strip()]
+        self.locations = [resolve_location(l) for l in user.get('jobLocations', []) if isinstance(l, str)]
+        self.today = today or date.today()
+        self._location_scores = {}
+
+    def title_score(self, title):
+        if not isinstance(title, str) or not self.titles:
+            return 0.0
+        return max(title_similarity(user_title, title) for user_title in self.titles)
+
+    def location_score(self, location, distance_km=None):
+        """
+        :param location: Raw job location string
+        :param distance_km: Known distance to the nearest user location (radius matching)
+        :return: Score in [0, 1]
+        """
+        if distance_km is not None:
+            return 1 / (1 + distance_km / DISTANCE_SCALE_KM)
+        score = self._location_scores.get(location)
+        if score is None:
+            score = self._location_scores[location] = self._location_score(location)
+        return score
+
+    def _location_score(self, location):
+        job = resolve_location(location if isinstance(location, str) else "")
+        if job.remote and job.country is None:
+            return REMOTE_SCORE
+
+        best = UNKNOWN_LOCATION_SCORE
+        job_coords = UK_PLACES.get(job.city) if job.country == "uk" else None
+        for user in self.locations:
+            user_coords = UK_PLACES.get(user.city) if user.country == "uk" else None
+            if job_coords and user_coords:
+                # Both UK towns: the shared-country score plus a bonus that falls with distance
+                distance_bonus = 1 / (1 + _haversine_km(job_coords, user_coords) / DISTANCE_SCALE_KM)
+                country = SHARED_AREA_SCORES["country"]
+                score = country + (1 - country) * distance_bonus
+            else:
+                score = next(
+                    (value for level, value in SHARED_AREA_SCORES.items()
+                     if getattr(job, level) and getattr(job, level) == getattr(user, level)),
+                    REMOTE_SCORE if job.remote else UNKNOWN_LOCATION_SCORE,
+                )
+            best = max(best, score)
+        return best
+
+    def recency_score(self, date_posted=None, date_added=None):
+        posted = _parse_date(date_posted) or _parse_date(date_added)
+        if posted is None:
+            return UNKNOWN_DATE_SCORE
+        age_days = max(0, (self.today - posted).days)
+        return 0.5 ** (age_days / RECENCY_HALF_LIFE_DAYS)
+
+    def score(self, title, location, source, date_posted=None, date_added=None, distance_km=None):
+        """
+        :return: Relevance in [0, 1]
+        """
+        return (
+            WEIGHTS["title"] * self.title_score(title)
+            + WEIGHTS["location"] * self.location_score(location, distance_km)
+            + WEIGHTS["recency"] * self.recency_score(date_posted, date_added)
+            + WEIGHTS["source"] * SOURCE_WEIGHTS.get(source, DEFAULT_SOURCE_WEIGHT)
+        )
+
+    def score_job(self, job):
+        """
+        :param job: Job dictionary
+        :return: Relevance in [0, 1]
+        """
+        return self.score(job.get('title'), job.get('location'), job.get('source'),
+                          job.get('date_posted'), job.get('date_added'), job.get('distance_km'))
+
+
+def rank_rows(table, user, rows, limit=None, today=None):
+    """
+    Score a user's matched rows and keep the best.
+
+    :param table: JobTable for the cycle
+    :param user: User dictionary
+    :param rows: Matched row numbers
+    :param limit: Keep at most this many (None: job_limit(user))
+    :param today: Date recency is measured from (default: today)
+    :return: List of (score, row), best first
+    """
+    limit = job_limit(user) if limit is None else limit
+    scorer = RelevanceScorer(user, today)
+
+    def scored():
+        for row in rows:
+            extras = table.extras[row]
+            yield scorer.score(table.titles[row], table.location(row), table.sources[row],
+                               extras.get('date_posted') if extras else None, table.dates[row]), row
+
+    if limit:
+        # Bounded heap of size limit; ties keep table order
+        return heapq.nlargest(limit, scored(), key=lambda item: item[0])
+    return sorted(scored(), key=lambda item: item[0], reverse=True)
+
+
+def ranked_by_source(table, user, rows, limit=None, today=None):
+    """
+    Build the user's best jobs grouped by source, each with its relevance_score.
+
+    :param table: JobTable for the cycle
+    :param user: User dictionary
+    :param rows: Matched row numbers
+    :param limit: Keep at most this many (None: job_limit(user))
+    :param today: Date recency is measured from (default: today)
+    :return: Dictionary of source -> list of job dicts, best first
+    """
+    grouped = {}
+    for score, row in rank_rows(table, user, rows, limit, today):
+        job = table.row(row)
+        job['relevance_score'] = round(score, 4)
+        grouped.setdefault(table.sources[row], []).append(job)
+    return grouped
+
+
+def rank_jobs(jobs, user, limit=None, today=None):
+    """
+    Score job dicts (e.g. radius matches, which carry distance_km) and keep the best.
+
+    :param jobs: List of job dicts
+    :param user: User dictionary
+    :param limit: Keep at most this many (None: job_limit(user))
+    :param today: Date recency is measured from (default: today)
+    :return: List of job dicts with relevance_score, best first
+    """
+    limit = job_limit(user) if limit is None else limit
+    scorer = RelevanceScorer(user, today)
+    scored = ((scorer.score_job(job), position) for position, job in enumerate(jobs))
+    if limit:
+        best = heapq.nlargest(limit, scored, key=lambda item: item[0])
+    else:
+        best = sorted(scored, key=lambda item: item[0], reverse=True)
+
+    ranked = []
+    for score, position in best:
+        job = dict(jobs[position])
+        job['relevance_score'] = round(score, 4)
+        ranked.append(job)
+    return ranked
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Tests for cross-source and cross-cycle job deduplication.
+
+Run with: python -m pytest matching/test_dedup.py
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from matching.dedup import normalize_url, content_fingerprint, dedupe_jobs, FingerprintStore
+from store.store_jobs import generate_job_id
+
+
+def job(title, company, location, url):
+    return {"title": title, "company": company, "location": location, "url": url}
+
+
+def test_normalize_url_strips_tracking_and_regional_hosts():
+    assert normalize_url("https://uk.linkedin.com/jobs/view/ux-designer-at-acme-3812345678?refId=abc&trackingId=x") == \
+        normalize_url("https://www.linkedin.com/jobs/view/3812345678/")
+    assert normalize_url("https://unjobs.org/vacancies/123?utm_source=feed#apply") == "https://unjobs.org/vacancies/123"
+    assert normalize_url("https://example.test/job?id=2&page=1") == normalize_url("https://example.test/job?page=1&id=2")
+
+
+def test_content_fingerprint_ignores_url_and_company_suffix():
+    a = job("UX Designer", "Acme Ltd", "London, England, United Kingdom", "https://a.test/1")
+    b = job("UX  designer", "ACME", "London Area", "https://b.test/2")
+    assert content_fingerprint(a) == content_fingerprint(b)
+
+
+def test_dedupe_within_cycle():
+    all_jobs = {
+        "linkedin": [
+            job("UX Designer", "Acme", "London", "https://www.linkedin.com/jobs/view/1?trk=x"),
+            job("UX Designer", "Acme", "London", "https://uk.linkedin.com/jobs/view/1"),
+            job("Data Analyst", "Acme", "Leeds", "https://www.linkedin.com/jobs/view/2"),
+        ],
+        "ifyoucould": [
+            job("UX Designer", "Acme Limited", "London, UK", "https://ifyoucould.test/acme"),
+            job("Graphic Designer (Maternity Cover)", "Studio", "Bristol", "https://ifyoucould.test/studio-1"),
+            job("Graphic Designer - Maternity Cover", "Studios", "Bristol", "https://ifyoucould.test/studio-2"),
+        ],
+    }
+    deduped, dropped = dedupe_jobs(all_jobs)
+
+    assert [j["url"] for j in deduped["linkedin"]] == [all_jobs["linkedin"][0]["url"], all_jobs["linkedin"][2]["url"]]
+    assert [j["url"] for j in deduped["ifyoucould"]] == ["https://ifyoucould.test/studio-1"]
+    assert dropped == {"url": 1, "fingerprint": 1, "near_duplicate": 1, "repost": 0}
+
+
+def test_repost_in_later_cycle_is_dropped():
+    store = FingerprintStore(fingerprint_file=None)
+    first = {"workable": [job("Programme Officer", "UNICEF", "Nairobi, Kenya", "https://jobs.workable.test/1")]}
+    dedupe_jobs(first, store)
+
+    again, _ = dedupe_jobs(first, store)
+    repost, dropped = dedupe_jobs({"workable": [job("Programme Officer", "UNICEF", "Nairobi, Kenya", "https://jobs.workable.test/9")]}, store)
+
+    assert len(again["workable"]) == 1
+    assert repost["workable"] == [] and dropped["repost"] == 1
+
+
+def test_placeholder_company_jobs_are_only_deduplicated_by_url():
+    store = FingerprintStore(fingerprint_file=None)
+    vacancies = {"unjobs": [
+        job("Consultant", "UN Jobs", "Geneva", "https://unjobs.org/vacancies/101"),
+        job("Consultant", "UN Jobs", "Geneva", "https://unjobs.org/vacancies/102"),
+        job("Consultant", "UN Jobs", "Geneva", "https://unjobs.org/vacancies/101?utm_source=feed"),
+    ]}
+    deduped, dropped = dedupe_jobs(vacancies, store)
+    later, later_dropped = dedupe_jobs({"unjobs": [job("Consultant", "UN Jobs", "Geneva", "https://unjobs.org/vacancies/103")]}, store)
+
+    assert [j["url"] for j in deduped["unjobs"]] == ["https://unjobs.org/vacancies/101", "https://unjobs.org/vacancies/102"]
+    assert dropped == {"url": 1, "fingerprint": 0, "near_duplicate": 0, "repost": 0}
+    assert len(later["unjobs"]) == 1 and later_dropped["repost"] == 0
+
+
+def test_same_posting_under_another_host_keeps_its_first_url(tmp_path):
+    fingerprint_file = str(tmp_path / "fingerprints.json")
+    first_url = "https://uk.linkedin.com/jobs/view/ux-designer-at-acme-3812345678?refId=abc"
+    store = FingerprintStore(fingerprint_file)
+    dedupe_jobs({"linkedin": [job("UX Designer", "Acme", "London", first_url)]}, store)
+    store.save()
+
+    store = FingerprintStore(fingerprint_file)
+    later_job = job("UX Designer", "Acme", "London", "https://www.linkedin.com/jobs/view/3812345678/")
+    later, dropped = dedupe_jobs({"linkedin": [later_job]}, store)
+
+    assert later["linkedin"][0]["url"] == first_url
+    assert generate_job_id(later["linkedin"][0]) == generate_job_id({"url": first_url})
+    assert later_job["url"] != first_url  # The scraped dict itself is left alone
+    assert dropped["repost"] == 0
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-v"]))
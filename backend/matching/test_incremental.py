@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Tests for the incremental matching ledger.
+
+Run with: python -m pytest matching/test_incremental.py
+"""
+
+import os
+import sys
+from datetime import date
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import main
+from matching import incremental
+from matching.incremental import MatchLedger
+
+USER = {"id": "u1", "email": "u1@example.test", "jobTitles": ["UX Designer"], "jobLocations": ["London"]}
+
+
+def test_new_user_needs_full_match(tmp_path):
+    ledger = MatchLedger(str(tmp_path / "ledger.json"))
+    assert ledger.needs_full_match(USER)
+
+    ledger.mark_user(USER)
+    ledger.mark_jobs(["a", "b"])
+    ledger.save()
+
+    reloaded = MatchLedger(str(tmp_path / "ledger.json"))
+    assert not reloaded.needs_full_match(USER)
+    assert reloaded.new_job_ids(["a", "b", "c"]) == {"c"}
+
+
+def test_changed_preferences_and_settings_need_full_match(monkeypatch):
+    ledger = MatchLedger(None)
+    ledger.mark_user(USER)
+
+    assert not ledger.needs_full_match(dict(USER, jobTitles=["ux designer "]))
+    assert ledger.needs_full_match(dict(USER, jobTitles=["Product Designer"]))
+    assert ledger.needs_full_match(dict(USER, jobLocations=["Leeds"]))
+    assert ledger.needs_full_match(dict(USER, maxJobsPerCycle=5))
+
+    monkeypatch.setattr(incremental, "TITLE_MATCH_MODE", "fuzzy")
+    assert ledger.needs_full_match(USER)
+    monkeypatch.undo()
+    monkeypatch.setattr(incremental, "MATCH_RULES_VERSION", incremental.MATCH_RULES_VERSION + 1)
+    assert ledger.needs_full_match(USER)
+
+
+def test_truncated_user_is_rematched():
+    ledger = MatchLedger(None)
+    ledger.mark_user(USER)
+    ledger.mark_truncated(USER)
+    ledger.mark_user(USER)
+    assert ledger.needs_full_match(USER)
+
+
+def test_failed_store_forgets_user(monkeypatch):
+    ledger = MatchLedger(None)
+    ledger.mark_user(USER)
+
+    def failing_store(user_id, user_jobs, limit=None):
+        raise RuntimeError("Firestore unavailable")
+
+    monkeypatch.setattr(main, "store_jobs", failing_store)
+    main.store_matched_jobs([USER], [{"linkedin": [{"title": "UX Designer"}]}], ledger, ["a"])
+
+    assert ledger.needs_full_match(USER)
+    assert ledger.new_job_ids(["a"]) == set()
+
+
+def test_prune_forgets_jobs_past_ttl():
+    ledger = MatchLedger(None)
+    ledger.jobs = {"old": "2026-01-01", "edge": "2026-01-31", "recent": "2026-02-25"}
+    ledger.prune(today=date(2026, 3, 2))
+    assert set(ledger.jobs) == {"edge", "recent"}
+    assert incremental.JOB_LEDGER_TTL_DAYS == 30
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Tests for paging through unmatched jobs and writing matches.
+
+Run with: python -m pytest matching/test_job_matcher.py
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from matching import job_matcher
+from store.fake_firestore import FakeFirestore
+
+
+def make_db(monkeypatch, count=7):
+    docs = {
+        f"jobs_compiled/j{i}": {"title": "UX Designer" if i % 2 else "Chef", "location": "London",
+                                "matched": i == 3}
+        for i in range(count)
+    }
+    docs["users/u1"] = {"jobTitles": ["ux designer"], "jobLocations": ["London"]}
+    docs["users/u2"] = {"jobTitles": ["chef"], "jobLocations": ["Leeds"]}
+    db = FakeFirestore(docs)
+    monkeypatch.setattr(job_matcher, "get_db", lambda: db)
+    return db
+
+
+def test_pages_follow_the_cursor_over_unmatched_jobs(monkeypatch):
+    make_db(monkeypatch)
+    pages = [[doc.id for doc in page] for page in job_matcher.iter_unmatched_job_pages(page_size=2)]
+    assert pages == [["j0", "j1"], ["j2", "j4"], ["j5", "j6"]]
+
+
+def test_jobs_marked_matched_while_paging_are_not_skipped(monkeypatch):
+    db = make_db(monkeypatch)
+    seen = []
+    for page in job_matcher.iter_unmatched_job_pages(page_size=2):
+        seen += [doc.id for doc in page]
+        for doc in page:
+            db.docs[doc.reference.path]["matched"] = True
+    assert seen == ["j0", "j1", "j2", "j4", "j5", "j6"]
+
+
+def test_every_job_is_matched_once(monkeypatch):
+    db = make_db(monkeypatch)
+
+    counts = job_matcher.match_jobs_to_users(page_size=2)
+
+    assert counts["jobs"] == 6
+    # j1 and j5 are UX Designer jobs in London; j3 was already matched
+    assert db.ids("user_job_matches") == ["u1_j1", "u1_j5"]
+    assert all(db.docs[f"jobs_compiled/j{i}"]["matched"] for i in range(7))
+    assert counts["commits"] == len(db.commits) == 3
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-cycle job column store.
+
+Run with: python -m pytest matching/test_job_table.py
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from matching.job_table import JobTable
+
+ALL_JOBS = {
+    "linkedin": [
+        {"title": "UX Designer", "company": "Acme", "location": "London", "url": "https://example.test/1",
+         "date_added": "2026-10-19", "has_applied": False},
+    ],
+    "ifyoucould": [
+        {"title": "Designer", "company": "Studio", "location": "London", "url": "https://example.test/2",
+         "company_name": "Studio", "description": "Brand work"},
+    ],
+}
+
+
+def test_rows_round_trip_original_fields():
+    table = JobTable(ALL_JOBS)
+
+    assert len(table) == 2
+    assert table.row(0) == {**ALL_JOBS["linkedin"][0], "source": "linkedin"}
+    assert table.row(1) == {**ALL_JOBS["ifyoucould"][0], "source": "ifyoucould"}
+    # Missing columns are not invented
+    assert "date_added" not in table.row(1)
+
+
+def test_locations_are_stored_once():
+    table = JobTable(ALL_JOBS)
+
+    assert table.distinct_locations == ["London"]
+    assert list(table.location_ids) == [0, 0]
+
+
+def test_by_source_builds_fresh_dicts():
+    table = JobTable(ALL_JOBS)
+    first = table.by_source([0, 1])
+    second = table.by_source([0])
+
+    assert set(first) == {"linkedin", "ifyoucould"}
+    assert first["linkedin"][0] == second["linkedin"][0]
+    assert first["linkedin"][0] is not second["linkedin"][0]
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Tests for serial and process-parallel user matching.
+
+Run with: python -m pytest matching/test_parallel.py
+"""
+
+import os
+import sys
+import queue
+import logging
+import logging.handlers
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from matching import parallel
+from matching.job_table import JobTable
+from matching.title_automaton import TitleMatcher
+from utils.log import configure_worker_logging
+
+ALL_JOBS = {
+    "linkedin": [
+        {"title": "Senior UX Designer", "location": "London, England, United Kingdom", "url": "https://example.test/1"},
+        {"title": "Chef", "location": "London", "url": "https://example.test/2"},
+    ],
+    "unjobs": [
+        {"title": "Data Analyst", "location": "Manchester", "url": "https://example.test/3"},
+        {"title": "UX designer", "location": "Remote", "url": "https://example.test/4"},
+    ],
+}
+
+
+def make_users(count):
+    titles = [["UX Designer"], ["Data Analyst"], ["Chef", "designer"]]
+    locations = [["London"], ["Manchester"], ["Leeds"]]
+    return [
+        {"id": str(i), "jobTitles": titles[i % 3], "jobLocations": locations[(i // 3) % 3]}
+        for i in range(count)
+    ]
+
+
+def test_parallel_matches_equal_serial(monkeypatch):
+    users = make_users(60)
+    table = JobTable(ALL_JOBS)
+    matcher = TitleMatcher(t for user in users for t in user["jobTitles"])
+    table.index_titles(matcher)
+
+    serial = parallel.match_users(table, users, matcher, workers=1)
+    monkeypatch.setattr(parallel, "PARALLEL_MATCH_MIN_USERS", 1)
+    forked = parallel.match_users(table, users, matcher, workers=2)
+
+    assert [list(indices) for indices in forked] == [list(indices) for indices in serial]
+    assert list(serial[0]) == [0, 3]  # UX Designer in London: London job plus unrestricted remote
+
+
+def test_simple_job_matching_reuses_the_cycle_table(monkeypatch):
+    import main
+
+    users = make_users(9)
+    table = JobTable(ALL_JOBS)
+    matcher = TitleMatcher(t for user in users for t in user["jobTitles"])
+    table.index_titles(matcher)
+    built = []
+    monkeypatch.setattr(main, "JobTable", lambda all_jobs: built.append(all_jobs) or JobTable(all_jobs))
+
+    shared = [main.simple_job_matching(ALL_JOBS, user, table, matcher) for user in users]
+
+    assert built == []
+    assert shared == [main.simple_job_matching(ALL_JOBS, user) for user in users]
+    assert len(built) == len(users)
+
+
+def test_indexed_titles_match_plain_scan():
+    users = make_users(9)
+    table = JobTable(ALL_JOBS)
+    matcher = TitleMatcher(t for user in users for t in user["jobTitles"])
+    table.index_titles(matcher)
+
+    for user in users:
+        assert list(parallel.match_job_indices(table, user, matcher)) == list(parallel.match_job_indices(JobTable(ALL_JOBS), user))
+
+
+def test_forked_workers_log_to_stderr(capfd, monkeypatch):
+    # As after configure_logging(): root logs to a queue only the parent's listener reads
+    root = logging.getLogger()
+    monkeypatch.setattr(root, "handlers", [logging.handlers.QueueHandler(queue.SimpleQueue())])
+
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("fork"),
+                             initializer=configure_worker_logging) as executor:
+        executor.submit(logging.getLogger("matching.worker").warning, "worker record").result()
+
+    assert "worker record" in capfd.readouterr().err
+    assert isinstance(root.handlers[0], logging.handlers.QueueHandler)
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-v"]))
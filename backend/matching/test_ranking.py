@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Tests for relevance scoring and per-user top-K selection.
+
+Run with: python -m pytest matching/test_ranking.py
+"""
+
+import os
+import sys
+from datetime import date
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from matching import ranking
+from matching.job_table import JobTable
+
+TODAY = date(2026, 3, 20)
+USER = {"jobTitles": ["UX Designer"], "jobLocations": ["London"]}
+
+
+def job(title, location="London", date_added="2026-03-20", **fields):
+    return {"title": title, "location": location, "url": f"https://example.test/{title}/{location}",
+            "date_added": date_added, **fields}
+
+
+def test_closer_title_location_and_newer_jobs_rank_higher():
+    scorer = ranking.RelevanceScorer(USER, TODAY)
+
+    assert scorer.title_score("UX Designer") > scorer.title_score("Senior UX Designer (Fintech, Hybrid)")
+    assert scorer.location_score("London") > scorer.location_score("Reading") > scorer.location_score("Leeds")
+    assert scorer.location_score("Leeds") > scorer.location_score("Paris, France")
+    assert scorer.recency_score("2026-03-19") > scorer.recency_score("2026-02-01")
+    # Unparseable posting dates fall back to date_added
+    assert scorer.recency_score("3 days ago", "2026-03-20") == 1.0
+
+
+def test_top_k_per_user():
+    table = JobTable({
+        "linkedin": [job(f"Designer {i}", date_added="2026-01-01") for i in range(100)]
+                    + [job("UX Designer")],
+        "ziprecruiter": [job("UX Designer", location="Leeds", date_posted="2026-03-18")],
+    })
+    rows = list(range(len(table)))
+
+    ranked = ranking.rank_rows(table, dict(USER, maxJobsPerCycle=3), rows, today=TODAY)
+    assert len(ranked) == 3
+    assert ranked[0][1] == 100
+    assert [score for score, _ in ranked] == sorted((score for score, _ in ranked), reverse=True)
+
+    grouped = ranking.ranked_by_source(table, USER, rows, limit=2, today=TODAY)
+    assert [j["title"] for j in grouped["linkedin"]] == ["UX Designer"]
+    assert grouped["ziprecruiter"][0]["relevance_score"] < grouped["linkedin"][0]["relevance_score"]
+
+
+def test_job_limit(monkeypatch):
+    monkeypatch.setattr(ranking, "MAX_JOBS_PER_CYCLE", 50)
+    assert ranking.job_limit({}) == 50
+    assert ranking.job_limit({"maxJobsPerCycle": 10}) == 10
+    assert ranking.job_limit({"maxJobsPerCycle": "lots"}) == 50
+    assert ranking.job_limit({"maxJobsPerCycle": 10 ** 6}) == ranking.MAX_JOBS_PER_CYCLE_CEILING
+
+    monkeypatch.setattr(ranking, "MAX_JOBS_PER_CYCLE", 0)
+    assert ranking.job_limit({}) is None
+    assert len(ranking.rank_jobs([job(f"UX Designer {i}") for i in range(80)], USER, today=TODAY)) == 80
+
+
+def test_rank_jobs_uses_known_distance():
+    near = job("UX Designer", location="Somewhere", distance_km=2)
+    far = job("UX Designer", location="Elsewhere", distance_km=45)
+
+    ranked = ranking.rank_jobs([far, near], USER, limit=1, today=TODAY)
+    assert [j["location"] for j in ranked] == ["Somewhere"]
+    assert "relevance_score" not in near
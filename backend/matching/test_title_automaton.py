@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Tests for the Aho-Corasick title matcher.
+
+Run with: python -m pytest matching/test_title_automaton.py
+"""
+
+import os
+import sys
+import random
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from matching.title_automaton import TitleMatcher, UserTitleIndex
+
+
+def test_search_matches_substring_semantics():
+    patterns = ["designer", "ux designer", "product designer", "sign", "design", "data scientist", "scientist"]
+    matcher = TitleMatcher(patterns)
+
+    for title in ["Senior UX Designer", "Product Design Lead", "Lead Data Scientist", "Signage Fitter", "Chef"]:
+        expected = {p for p in patterns if p in title.lower()}
+        assert {matcher.patterns[pid] for pid in matcher.search(title)} == expected
+
+
+def test_search_agrees_with_naive_scan_on_random_input():
+    rng = random.Random(7)
+    alphabet = "ab c"
+    patterns = ["".join(rng.choice(alphabet) for _ in range(rng.randint(1, 5))) for _ in range(40)]
+    matcher = TitleMatcher(patterns)
+
+    for _ in range(500):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+        expected = {p.strip() for p in patterns if p.strip() and p.strip() in text}
+        assert {matcher.patterns[pid] for pid in matcher.search(text)} == expected
+
+
+def test_user_title_index_reports_interested_users():
+    users = [
+        {"id": "a", "jobTitles": ["UX Designer"]},
+        {"id": "b", "jobTitles": ["designer", "Illustrator"]},
+        {"id": "c", "jobTitles": ["Data Analyst"]},
+    ]
+    index = UserTitleIndex(users)
+
+    assert index.interested_users("Senior UX Designer") == {"a", "b"}
+    assert index.interested_users("Freelance Illustrator") == {"b"}
+    assert index.interested_users("Chef") == set()
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-v"]))
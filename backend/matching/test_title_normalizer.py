@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Tests for title normalisation and the fuzzy title matcher.
+
+Run with: python -m pytest matching/test_title_normalizer.py
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from matching import title_normalizer
+from matching.title_normalizer import FuzzyTitleMatcher, normalize_title, title_similarity
+from matching.job_table import JobTable
+from matching.parallel import match_job_indices
+
+
+def matches(pattern, title):
+    matcher = FuzzyTitleMatcher([pattern])
+    return bool(matcher.search(title))
+
+
+def test_normalisation():
+    assert normalize_title("Sr. UX Designer").tokens == normalize_title("Senior UX designer").tokens
+    assert normalize_title("Sr. UX Designer").seniority == "senior"
+    assert normalize_title("Front-end Developer").tokens == {"frontend", "developer"}
+    assert normalize_title("Front End Dev").tokens == {"frontend", "developer"}
+    assert normalize_title("Head of Design").tokens == {"head", "design"}
+    assert normalize_title("Intern").tokens == {"intern"}
+    assert normalize_title("Lead UX / UI Designer").positions == (frozenset({"ux", "ui"}), frozenset({"designer"}))
+
+
+def test_variants_match():
+    assert matches("Senior UX Designer", "Sr. UX Designer")
+    assert matches("Frontend Developer", "Front-End Developer (React)")
+    assert matches("UX Designer", "Lead UX/UI Designer")
+    assert matches("Graphic Designer", "Graphic Desinger")  # Typo
+    assert matches("Software Engineers", "Software Engineer")
+
+
+def test_no_matches_inside_words_or_across_seniority():
+    assert not matches("Intern", "International Sales Manager")
+    assert not matches("Senior UX Designer", "Junior UX Designer")
+    assert not matches("Product Designer", "Product Manager")
+    assert not matches("Manager", "Management Accountant")
+
+
+def test_tokens_must_be_adjacent_and_in_order():
+    assert not matches("Product Manager", "Product Marketing Manager")
+    assert not matches("Data Engineer", "Engineer, Data Platform")
+    assert matches("Product Manager", "Senior Product Manager, Payments")
+    assert matches("Head of Design", "Head of Design")
+    assert matches("UI Designer", "UX/UI Designer")
+
+
+def test_one_word_titles_need_the_whole_title():
+    assert matches("Designer", "Senior Designer")
+    assert not matches("Designer", "Interior Designer")
+    assert not matches("Designer", "Senior Interior Designer - Hospitality Projects")
+    assert matches("Intern", "Marketing Intern")  # Seniority-only titles still match that seniority
+
+
+def test_only_blocked_candidates_are_scored(monkeypatch):
+    patterns = [f"Role{i} Specialist" for i in range(500)] + ["UX Designer"]
+    matcher = FuzzyTitleMatcher(patterns)
+    scored = []
+    original = title_normalizer.containment_score
+
+    def counting(pattern, title):
+        scored.append(pattern)
+        return original(pattern, title)
+
+    monkeypatch.setattr(title_normalizer, "containment_score", counting)
+    assert matcher.search("Senior UX Designer") == {matcher.ids["ux designer"]}
+    assert len(scored) == 1
+
+
+def test_plugs_into_job_table_matching():
+    table = JobTable({"linkedin": [
+        {"title": "Sr. Front-end Developer", "location": "London", "url": "https://example.test/1"},
+        {"title": "Internal Auditor", "location": "London", "url": "https://example.test/2"},
+        {"title": "Marketing Intern", "location": "London", "url": "https://example.test/3"},
+    ]})
+    user = {"jobTitles": ["Senior Frontend Developer", "Intern"], "jobLocations": ["London"]}
+    matcher = FuzzyTitleMatcher(user["jobTitles"])
+
+    assert list(match_job_indices(table, user, matcher)) == [0, 2]
+    table.index_titles(matcher)
+    assert list(match_job_indices(table, user, matcher)) == [0, 2]
+
+
+def test_title_similarity_orders_closer_titles_first():
+    exact = title_similarity("UX Designer", "UX Designer")
+    close = title_similarity("UX Designer", "Senior UX Designer")
+    broad = title_similarity("Designer", "Senior Interior Designer - Hospitality Projects")
+    assert exact == 1.0
+    assert exact >= close > broad
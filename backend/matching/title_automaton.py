@@ -0,0 +1,106 @@
+# matching/title_automaton.py
+
+"""
+Aho-Corasick automaton for job title containment checks.
+
+Built once per cycle from every user's job titles, it scans a job title a single
+time and reports every user title contained in it - the same answer as running
+`title in job_title` for each user title, but in time linear in the length of
+the job title no matter how many distinct titles users have saved.
+"""
+
+from collections import defaultdict, deque
+
+
+class TitleMatcher:
+    """Multi-pattern substring matcher over lowercased titles."""
+
+    def __init__(self, patterns):
+        """
+        :param patterns: Iterable of title strings (lowercased, empty strings ignored)
+        """
+        self.patterns = list(dict.fromkeys(p.lower().strip() for p in patterns if p and p.strip()))
+        self.ids = {pattern: pid for pid, pattern in enumerate(self.patterns)}
+
+        # Trie: per-node transitions, failure links and output pattern ids
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+
+        for pid, pattern in enumerate(self.patterns):
+            node = 0
+            for ch in pattern:
+                child = self._goto[node].get(ch)
+                if child is None:
+                    child = len(self._goto)
+                    self._goto[node][ch] = child
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                node = child
+            self._out[node] += (pid,)
+
+        # Breadth-first pass to set failure links; outputs inherit along them
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(ch, 0)
+                self._out[child] += self._out[self._fail[child]]
+                queue.append(child)
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def search(self, text):
+        """
+        Find every pattern contained in text.
+
+        :param text: Job title (any case)
+        :return: Set of pattern ids
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        found = set()
+        for ch in (text or "").lower():
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                found.update(out[node])
+        return found
+
+    def pattern_ids(self, titles):
+        """
+        :param titles: A user's job titles
+        :return: frozenset of the ids of those titles known to this matcher
+        """
+        return frozenset(self.ids[t] for t in (t.lower().strip() for t in titles) if t in self.ids)
+
+
+class UserTitleIndex:
+    """A TitleMatcher over all users' titles plus which users saved each title."""
+
+    def __init__(self, users):
+        """
+        :param users: List of user dictionaries with 'id' and 'jobTitles'
+        """
+        self.matcher = TitleMatcher(t for user in users for t in user.get('jobTitles', []))
+        self.users_by_pattern = defaultdict(set)
+        for user in users:
+            for pid in self.matcher.pattern_ids(user.get('jobTitles', [])):
+                self.users_by_pattern[pid].add(user['id'])
+
+    def interested_users(self, job_title):
+        """
+        :param job_title: Job title to scan once
+        :return: Set of ids of users whose titles appear in it
+        """
+        users = set()
+        for pid in self.matcher.search(job_title):
+            users |= self.users_by_pattern[pid]
+        return users
+
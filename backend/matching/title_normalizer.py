@@ -0,0 +1,287 @@
+# matching/title_normalizer.py
+
+"""
+Normalised, fuzzy job title matching.
+
+Substring containment misses variants ("Sr. UX Designer" vs "Senior UX
+Designer", "Front-end" vs "Frontend", "desinger") and matches inside words
+("intern" in "International"). Here titles are reduced to a canonical form
+first:
+
+- abbreviations expanded and variants canonicalised (sr -> senior, mgr -> manager)
+- hyphenated and split compounds joined (front-end, front end -> frontend)
+- seniority pulled out into its own field (senior, junior, lead, ...)
+- stopwords dropped, leaving the core tokens in title order, where words
+  joined by a slash ("UX/UI") share one position
+
+A user title matches a job title when its core tokens appear in the job's, in
+the same order and at adjacent positions, each exactly or within
+TOKEN_SIMILARITY (Levenshtein ratio), and a seniority the user asked for is
+the job's seniority. So "Product Manager" matches "Senior Product Manager"
+and "Lead UX/UI Designer" is a "UX Designer", but "Product Marketing Manager"
+is not a "Product Manager". A one-word user title has no qualifier to anchor
+it, so it only matches a job title with that one core word: "Designer"
+matches "Senior Designer" but not "Interior Designer".
+
+FuzzyTitleMatcher has the same interface as TitleMatcher, so JobTable and
+match_job_indices use it unchanged. Edit distance is only computed between
+single tokens that share a blocking key (first or last three letters), for
+patterns whose longest token shares one - never pairwise across all titles -
+and normalised forms and token comparisons are cached, so the whole user x job
+space stays close to linear.
+"""
+
+import re
+from functools import lru_cache
+
+import Levenshtein
+
+TITLE_MATCH_THRESHOLD = 0.9  # Average token similarity a user title needs
+TOKEN_SIMILARITY = 0.85      # Levenshtein ratio for two tokens to count as the same word
+BLOCK_SIZE = 3
+
+ABBREVIATIONS = {
+    "sr": "senior", "snr": "senior", "jr": "junior", "jnr": "junior",
+    "mgr": "manager", "mngr": "manager", "eng": "engineer", "engr": "engineer",
+    "dev": "developer", "asst": "assistant", "assoc": "associate", "exec": "executive",
+    "coord": "coordinator", "dir": "director", "spec": "specialist", "rep": "representative",
+    "admin": "administrator", "administrative": "administrator",
+    "swe": "software engineer", "vp": "vice president", "hr": "human resources",
+}
+COMPOUNDS = {
+    ("front", "end"): "frontend", ("back", "end"): "backend", ("full", "stack"): "fullstack",
+    ("dev", "ops"): "devops", ("e", "commerce"): "ecommerce", ("co", "ordinator"): "coordinator",
+}
+SENIORITY = {
+    "senior": "senior", "junior": "junior", "lead": "lead", "principal": "principal",
+    "graduate": "graduate", "trainee": "trainee", "intern": "intern", "internship": "intern",
+    "apprentice": "apprentice", "entry": "entry", "mid": "mid",
+}
+STOPWORDS = {"of", "and", "the", "for", "in", "a", "an", "to", "with", "at", "level", "role"}
+
+_HYPHEN_IN_WORD = re.compile(r"(?<=[a-z])-(?=[a-z])")
+_SLASH = re.compile(r"\s*/\s*")
+_NON_WORD = re.compile(r"[^a-z0-9/]+")
+
+
+class NormalizedTitle:
+    """Canonical form of a title: core tokens (as a set and in order) plus seniority."""
+
+    __slots__ = ("tokens", "positions", "seniority")
+
+    def __init__(self, positions, seniority):
+        """
+        :param positions: Tuple of frozensets of tokens, one per position in the title
+                          (words joined by a slash share a position)
+        :param seniority: Seniority word, or None
+        """
+        self.positions = positions
+        self.tokens = frozenset().union(*positions)
+        self.seniority = seniority
+
+    @property
+    def text(self):
+        return " ".join(sorted(self.tokens))
+
+    def __repr__(self):
+        return f"NormalizedTitle({sorted(self.tokens)!r}, seniority={self.seniority!r})"
+
+
+@lru_cache(maxsize=65536)
+def normalize_title(title):
+    """
+    :param title: Raw job title
+    :return: NormalizedTitle
+    """
+    text = _HYPHEN_IN_WORD.sub("", (title or "").lower())
+    text = _SLASH.sub(" / ", text)
+
+    # (word, whether a slash joins it to the word before)
+    words = []
+    slash = False
+    for word in _NON_WORD.sub(" ", text).split():
+        if word == "/":
+            slash = bool(words)
+            continue
+        for i, part in enumerate(ABBREVIATIONS.get(word, word).split()):
+            words.append((part, slash and i == 0))
+        slash = False
+
+    joined = []
+    for word, alternative in words:
+        if joined and not alternative and (joined[-1][0], word) in COMPOUNDS:
+            joined[-1] = (COMPOUNDS[(joined[-1][0], word)], joined[-1][1])
+        else:
+            joined.append((word, alternative))
+
+    seniority = None
+    positions = []
+    previous_kept = False
+    for word, alternative in joined:
+        if word in SENIORITY and seniority is None:
+            seniority = SENIORITY[word]
+            previous_kept = False
+        elif word not in STOPWORDS and word not in SENIORITY:
+            if alternative and previous_kept:
+                positions[-1].add(word)
+            else:
+                positions.append({word})
+            previous_kept = True
+        else:
+            previous_kept = False
+
+    if not positions and seniority:
+        # A title that is only a seniority word ("Intern") is its own core token
+        positions, seniority = [{seniority}], None
+    return NormalizedTitle(tuple(frozenset(position) for position in positions), seniority)
+
+
+@lru_cache(maxsize=262144)
+def token_similarity(a, b):
+    """Levenshtein ratio of two tokens (1.0 when equal, 0 when their lengths differ by more than one)."""
+    if a == b:
+        return 1.0
+    if abs(len(a) - len(b)) > 1:
+        return 0.0  # A typo or plural, not a different word ("intern" / "internal")
+    return Levenshtein.ratio(a, b)
+
+
+def blocking_keys(token):
+    """Keys two tokens must share to be compared: their first and last BLOCK_SIZE letters."""
+    if len(token) <= BLOCK_SIZE:
+        return (token,)
+    return (f"^{token[:BLOCK_SIZE]}", f"{token[-BLOCK_SIZE:]}$")
+
+
+def _position_similarity(wanted, found):
+    """Best similarity between any alternative of one position and any of another."""
+    if not wanted.isdisjoint(found):
+        return 1.0
+    return max(token_similarity(a, b) for a in wanted for b in found)
+
+
+def containment_score(pattern, title):
+    """
+    How completely a user title's tokens appear, in order and adjacent, in a job title.
+
+    :param pattern: NormalizedTitle of the user's title
+    :param title: NormalizedTitle of the job title
+    :return: Average token similarity of the best matching run in [0, 1]
+             (0 when seniority conflicts or no run of adjacent positions matches)
+    """
+    if pattern.seniority and pattern.seniority != title.seniority:
+        return 0.0
+    if not pattern.positions:
+        return 0.0
+    if len(pattern.positions) == 1 and title.seniority in pattern.positions[0]:
+        # A seniority-only title ("Intern") matches that seniority
+        return 1.0
+
+    size = len(pattern.positions)
+    if size == 1 and len(title.positions) != 1:
+        # A one-word title ("Designer") is too broad to find inside a longer one ("Interior Designer")
+        return 0.0
+    best = 0.0
+    for start in range(len(title.positions) - size + 1):
+        total = 0.0
+        for wanted, found in zip(pattern.positions, title.positions[start:start + size]):
+            similarity = _position_similarity(wanted, found)
+            if similarity < TOKEN_SIMILARITY:
+                break
+            total += similarity
+        else:
+            best = max(best, total / size)
+            if best == 1.0:
+                break
+    return best
+
+
+def title_similarity(a, b):
+    """
+    Symmetric similarity of two titles, for ranking.
+
+    :param a: Title string
+    :param b: Title string
+    :return: Score in [0, 1]
+    """
+    first, second = normalize_title(a), normalize_title(b)
+    if not first.tokens or not second.tokens:
+        return 0.0
+    matched = sum(
+        max((token_similarity(token, other) for other in second.tokens), default=0.0)
+        for token in first.tokens
+    )
+    score = 2 * matched / (len(first.tokens) + len(second.tokens))
+    if first.seniority and second.seniority and first.seniority != second.seniority:
+        score *= 0.8
+    return min(1.0, score)
+
+
+class FuzzyTitleMatcher:
+    """Normalised fuzzy title matcher with the TitleMatcher interface."""
+
+    def __init__(self, patterns, threshold=TITLE_MATCH_THRESHOLD):
+        """
+        :param patterns: Iterable of user title strings (empty strings ignored)
+        :param threshold: Minimum containment_score for a match
+        """
+        self.patterns = list(dict.fromkeys(p.lower().strip() for p in patterns if p and p.strip()))
+        self.ids = {pattern: pid for pid, pattern in enumerate(self.patterns)}
+        self.threshold = threshold
+        self.normalized = [normalize_title(pattern) for pattern in self.patterns]
+
+        # Each pattern is filed under the blocking keys of its longest (most selective) token
+        self._blocks = {}
+        for pid, normalized in enumerate(self.normalized):
+            if not normalized.tokens:
+                continue
+            anchor = max(sorted(normalized.tokens), key=len)
+            for key in blocking_keys(anchor):
+                self._blocks.setdefault(key, []).append(pid)
+        self._cache = {}
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def search(self, text):
+        """
+        Find every pattern that matches a job title.
+
+        :param text: Job title (any case)
+        :return: Set of pattern ids
+        """
+        title = normalize_title(text or "")
+        key = (title.positions, title.seniority)
+        found = self._cache.get(key)
+        if found is not None:
+            return set(found)
+
+        candidates = set()
+        for token in title.tokens | ({title.seniority} - {None}):
+            for block in blocking_keys(token):
+                candidates.update(self._blocks.get(block, ()))
+        found = frozenset(
+            pid for pid in candidates
+            if containment_score(self.normalized[pid], title) >= self.threshold
+        )
+        self._cache[key] = found
+        return set(found)
+
+    def pattern_ids(self, titles):
+        """
+        :param titles: A user's job titles
+        :return: frozenset of the ids of those titles known to this matcher
+        """
+        return frozenset(self.ids[t] for t in (t.lower().strip() for t in titles) if t in self.ids)
+
+
+def make_title_matcher(patterns, mode="substring"):
+    """
+    :param patterns: Iterable of user title strings
+    :param mode: "substring" (TitleMatcher) or "fuzzy" (FuzzyTitleMatcher)
+    :return: Matcher for JobTable.index_titles / match_job_indices
+    """
+    if mode == "fuzzy":
+        return FuzzyTitleMatcher(patterns)
+    from matching.title_automaton import TitleMatcher
+    return TitleMatcher(patterns)
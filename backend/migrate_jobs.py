@@ -1,91 +1,122 @@
 # migrate_jobs.py
 
+import os
+import sys
+import logging
+import hashlib
+
 import firebase_admin
 from firebase_admin import firestore
-import hashlib
 
-# Ensure Firebase is initialized
-from config import db
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Firebase is initialised lazily on first use
+from config import get_db
+from store.batching import existing_document_ids
+from migrations.runner import MigrationRunner, migration_arg_parser, DEFAULT_PAGE_SIZE, DEFAULT_MAX_IN_FLIGHT
+
+logger = logging.getLogger(__name__)
 
 def generate_job_id(job):
     """Generate a unique identifier for a job."""
     unique_string = f"{job['url']}_{job['title']}"
     return hashlib.md5(job["url"].encode()).hexdigest()
 
-def migrate_to_new_structure():
+def migrate_to_new_structure(dry_run=False, restart=False, page_size=DEFAULT_PAGE_SIZE,
+                             max_in_flight=DEFAULT_MAX_IN_FLIGHT):
     """
     Migrate existing job data to the new collection-based structure.
     This preserves all existing job data while setting up the new schema.
+
+    Users are read a page at a time; whether each page's jobs already exist in
+    jobs_compiled is checked with one bulk read instead of a get() per job, and
+    writes go out in 500-operation batches. Progress is checkpointed per page,
+    so an interrupted run resumes where it stopped.
+
+    :param dry_run: Count what would be written without writing
+    :param restart: Ignore any checkpoint from an interrupted run
+    :param page_size: Users read per page
+    :param max_in_flight: Batch commits allowed to run concurrently
+    :return: Counter of stats
     """
     print("🔄 Starting migration to new job storage structure...")
-    
-    # Get all users
-    users = db.collection("users").stream()
-    total_users = 0
-    total_jobs = 0
-    
-    # Process each user
-    for user in users:
-        total_users += 1
-        user_id = user.id
-        user_data = user.to_dict()
-        
-        # Skip users without jobs
-        if "jobs" not in user_data:
-            print(f"⏩ User {user_id} has no jobs to migrate")
-            continue
-            
-        print(f"🔄 Migrating jobs for user {user_id}...")
-        
-        # Get all existing jobs by source
-        existing_jobs = user_data.get("jobs", {})
-        user_job_count = 0
-        
-        # Initialize a batch write for efficiency
-        batch = db.batch()
-        
-        # Create a reference to the user's job subcollection
-        user_jobs_ref = db.collection("users").document(user_id).collection("jobs")
-        
-        # Process each job source
-        for source, jobs_list in existing_jobs.items():
-            for job in jobs_list:
-                # Generate consistent ID
-                job_id = generate_job_id(job)
-                
-                # Add job to main collection if not already there
-                main_job_ref = db.collection("jobs_compiled").document(job_id)
-                
-                # Add to the batch
-                if not main_job_ref.get().exists:
-                    job["source"] = source
-                    job["first_seen"] = firestore.SERVER_TIMESTAMP
-                    job["sent"] = True  # Assume already notified for existing jobs
-                    batch.set(main_job_ref, job)
-                
-                # Add to user's subcollection
-                user_job_ref = user_jobs_ref.document(job_id)
-                batch.set(user_job_ref, {
-                    "job_id": job_id,
+
+    db = get_db()
+    jobs_compiled = db.collection("jobs_compiled")
+    # Jobs created earlier in this run (reads can't see writes still in flight)
+    created_job_ids = set()
+
+    def process_page(users, batch, stats):
+        # Collect the page's jobs first so existence is checked in bulk
+        page_jobs = []
+        for user in users:
+            user_data = user.to_dict() or {}
+
+            # Skip users without jobs
+            if "jobs" not in user_data:
+                logger.debug(f"⏩ User {user.id} has no jobs to migrate")
+                stats["users_without_jobs"] += 1
+                continue
+
+            for source, jobs_list in user_data.get("jobs", {}).items():
+                for job in jobs_list:
+                    if not job.get("url"):
+                        stats["jobs_skipped"] += 1
+                        continue
+                    page_jobs.append((user.id, source, job, generate_job_id(job)))
+
+        candidate_ids = {job_id for _, _, _, job_id in page_jobs} - created_job_ids
+        existing = existing_document_ids(db, [jobs_compiled.document(job_id) for job_id in sorted(candidate_ids)])
+
+        for user_id, source, job, job_id in page_jobs:
+            # Add job to main collection if not already there
+            if job_id not in existing and job_id not in created_job_ids:
+                batch.set(jobs_compiled.document(job_id), {
+                    **job,
                     "source": source,
-                    "title": job.get("title", ""),
-                    "company": job.get("company", ""),
-                    "url": job.get("url", ""),
-                    "location": job.get("location", ""),
-                    "added_at": firestore.SERVER_TIMESTAMP,
-                    "has_applied": job.get("has_applied", False),
-                    "is_saved": False,
-                    "notes": ""
+                    "first_seen": firestore.SERVER_TIMESTAMP,
+                    "sent": True  # Assume already notified for existing jobs
                 })
-                
-                user_job_count += 1
-                total_jobs += 1
-        
-        # Commit the batch
-        batch.commit()
-        print(f"✅ Migrated {user_job_count} jobs for user {user_id}")
-    
-    print(f"✅ Migration complete! Processed {total_users} users and {total_jobs} total jobs")
+                created_job_ids.add(job_id)
+                stats["jobs_compiled_created"] += 1
+
+            # Add to user's subcollection
+            user_job_ref = db.collection("users").document(user_id).collection("jobs").document(job_id)
+            batch.set(user_job_ref, {
+                "job_id": job_id,
+                "source": source,
+                "title": job.get("title", ""),
+                "company": job.get("company", ""),
+                "url": job.get("url", ""),
+                "location": job.get("location", ""),
+                "added_at": firestore.SERVER_TIMESTAMP,
+                "has_applied": job.get("has_applied", False),
+                "is_saved": False,
+                "notes": ""
+            })
+            stats["user_jobs"] += 1
+
+    runner = MigrationRunner(
+        "migrate_jobs",
+        db.collection("users"),
+        page_size=page_size,
+        max_in_flight=max_in_flight,
+        dry_run=dry_run,
+        restart=restart,
+        select=["jobs"],
+    )
+    stats = runner.run(process_page)
+
+    print(f"✅ Migration complete! Processed {stats['documents']} users and {stats['user_jobs']} total jobs "
+          f"({stats['jobs_compiled_created']} new in jobs_compiled, {stats['commits']} batch commits)"
+          + (" - dry run, nothing written" if dry_run else ""))
+    return stats
 
 if __name__ == "__main__":
-    migrate_to_new_structure()
\ No newline at end of file
+    from utils.log import configure_logging
+    args = migration_arg_parser("Migrate user job lists to the jobs_compiled / users/{id}/jobs structure").parse_args()
+    configure_logging()
+    migrate_to_new_structure(
+        dry_run=args.dry_run, restart=args.restart, page_size=args.page_size, max_in_flight=args.max_in_flight
+    )
@@ -5,82 +5,77 @@ This script adds the emailNotificationsEnabled field (default: true) to all exis
 users in the Firestore database who don't already have this field.
 
 Usage:
-    python migrations/add_email_notifications_field.py
+    python migrations/add_email_notifications_field.py [--dry-run] [--restart]
 
 Features:
     - Only updates users that don't have the field (idempotent)
-    - Shows progress with emoji indicators
+    - Updates are committed in 500-write batches (see migrations/runner.py)
+    - Resumes from its checkpoint if interrupted
     - Provides detailed summary of changes
     - Safe to run multiple times
 """
 
 import os
 import sys
-import firebase_admin
-from firebase_admin import credentials, firestore
-from dotenv import load_dotenv
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-# Load environment variables
-load_dotenv()
+# Firebase is initialised lazily on first use (see config.get_db)
+from config import get_db
+from migrations.runner import MigrationRunner, migration_arg_parser, DEFAULT_PAGE_SIZE, DEFAULT_MAX_IN_FLIGHT
+from utils.log import configure_logging
 
-FIREBASE_CREDENTIALS_PATH = os.getenv("FIREBASE_CREDENTIALS_PATH")
-
-if not FIREBASE_CREDENTIALS_PATH:
-    raise ValueError("Missing FIREBASE_CREDENTIALS_PATH in environment variables. Please set it in the .env file.")
-
-# Initialize Firebase
-if not firebase_admin._apps:
-    cred = credentials.Certificate(FIREBASE_CREDENTIALS_PATH)
-    firebase_admin.initialize_app(cred)
-
-db = firestore.client()
-
-def add_email_notifications_field():
+def add_email_notifications_field(dry_run=False, restart=False, page_size=DEFAULT_PAGE_SIZE,
+                                  max_in_flight=DEFAULT_MAX_IN_FLIGHT):
     """
     Add emailNotificationsEnabled field to all users who don't have it.
     Default value: true (users opt-in by default)
+
+    :param dry_run: Report what would change without writing
+    :param restart: Ignore any checkpoint from an interrupted run
     """
     print("🚀 Starting database migration: Adding emailNotificationsEnabled field\n")
 
-    users_ref = db.collection("users")
-    all_users = users_ref.stream()
-
-    total_users = 0
-    users_updated = 0
-    users_skipped = 0
-    errors = 0
-
-    for user in all_users:
-        total_users += 1
-        user_data = user.to_dict()
-        user_email = user_data.get("email", "Unknown")
-
-        # Check if field already exists
-        if "emailNotificationsEnabled" in user_data:
-            print(f"⏭️  Skipping {user_email} - field already exists (value: {user_data['emailNotificationsEnabled']})")
-            users_skipped += 1
-            continue
-
-        # Add the field with default value true
-        try:
-            users_ref.document(user.id).update({
-                "emailNotificationsEnabled": True
-            })
-            print(f"✅ Updated {user_email} - emailNotificationsEnabled set to true")
-            users_updated += 1
-        except Exception as e:
-            print(f"❌ Error updating {user_email}: {e}")
-            errors += 1
+    def process_page(users, batch, stats):
+        for user in users:
+            # Check if field already exists
+            if "emailNotificationsEnabled" in (user.to_dict() or {}):
+                stats["skipped"] += 1
+                continue
+
+            # Add the field with default value true
+            batch.update(user.reference, {"emailNotificationsEnabled": True})
+            stats["updated"] += 1
+
+    runner = MigrationRunner(
+        "add_email_notifications_field",
+        get_db().collection("users"),
+        page_size=page_size,
+        max_in_flight=max_in_flight,
+        dry_run=dry_run,
+        restart=restart,
+        select=["emailNotificationsEnabled"],
+    )
+    try:
+        stats = runner.run(process_page)
+        errors = 0
+    except Exception as e:
+        # Progress up to the last checkpoint is kept; re-run to resume
+        print(f"❌ Migration interrupted: {e}")
+        stats = runner.stats
+        errors = 1
+
+    total_users = stats.get("documents", 0)
+    users_updated = stats.get("updated", 0)
+    users_skipped = stats.get("skipped", 0)
 
     # Print summary
     print("\n" + "="*60)
     print("📊 Migration Summary")
     print("="*60)
     print(f"Total Users Processed:     {total_users}")
-    print(f"✅ Users Updated:          {users_updated}")
+    print(f"✅ Users Updated:          {users_updated}" + (" (dry run - nothing written)" if dry_run else ""))
     print(f"⏭️  Users Skipped:          {users_skipped} (already had field)")
     print(f"❌ Errors:                 {errors}")
     print("="*60)
@@ -103,8 +98,8 @@ def verify_migration():
     """
     print("\n🔍 Verifying migration...\n")
 
-    users_ref = db.collection("users")
-    all_users = users_ref.stream()
+    users_ref = get_db().collection("users")
+    all_users = users_ref.select(["emailNotificationsEnabled", "email"]).stream()
 
     total_users = 0
     users_with_field = 0
@@ -112,7 +107,7 @@ def verify_migration():
 
     for user in all_users:
         total_users += 1
-        user_data = user.to_dict()
+        user_data = user.to_dict() or {}
         user_email = user_data.get("email", "Unknown")
 
         if "emailNotificationsEnabled" in user_data:
@@ -137,6 +132,9 @@ def verify_migration():
     return users_without_field == 0
 
 if __name__ == "__main__":
+    args = migration_arg_parser("Add emailNotificationsEnabled to existing users").parse_args()
+    configure_logging()
+
     print("""
 ╔══════════════════════════════════════════════════════════════╗
 ║                                                              ║
@@ -149,10 +147,14 @@ if __name__ == "__main__":
     """)
 
     # Run migration
-    result = add_email_notifications_field()
+    result = add_email_notifications_field(
+        dry_run=args.dry_run, restart=args.restart, page_size=args.page_size, max_in_flight=args.max_in_flight
+    )
 
     # Verify migration
-    if result["updated"] > 0 or result["errors"] > 0:
+    if args.dry_run:
+        print(f"\n🧪 Dry run: {result['updated']} user(s) would be updated")
+    elif result["updated"] > 0 or result["errors"] > 0:
         verification_passed = verify_migration()
 
         if verification_passed:
@@ -0,0 +1,145 @@
+"""
+Resumable, batched migration runner.
+
+A migration is a function that receives one page of documents and queues its
+writes on a ChunkedBatch:
+
+    def process_page(docs, batch, stats):
+        for doc in docs:
+            batch.update(doc.reference, {...})
+            stats["updated"] += 1
+
+    MigrationRunner("add_field", get_db().collection("users")).run(process_page)
+
+The runner pages through the collection in document id order, commits writes
+in 500-operation chunks with a bounded number of commits in flight, and after
+each page (once its writes are durable) records the last document id in a
+checkpoint file. Re-running an interrupted migration resumes after that id.
+With dry_run=True nothing is written and no checkpoint is kept.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+from collections import Counter
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import get_db
+from store.batching import ChunkedBatch
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PAGE_SIZE = 300
+DEFAULT_MAX_IN_FLIGHT = 4  # Concurrent batch commits
+
+
+class MigrationRunner:
+    """Pages through a collection, applying a migration with checkpointed progress."""
+
+    def __init__(self, name, collection, page_size=DEFAULT_PAGE_SIZE, max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+                 dry_run=False, restart=False, select=None, checkpoint_dir=CHECKPOINT_DIR):
+        """
+        :param name: Migration name (used for the checkpoint file)
+        :param collection: CollectionReference to migrate
+        :param page_size: Documents read per page
+        :param max_in_flight: Batch commits allowed to run concurrently
+        :param dry_run: Count what would change without writing
+        :param restart: Ignore any existing checkpoint
+        :param select: Optional list of field paths to read (projection)
+        :param checkpoint_dir: Where checkpoint files live
+        """
+        self.name = name
+        self.collection = collection
+        self.page_size = page_size
+        self.max_in_flight = max_in_flight
+        self.dry_run = dry_run
+        self.select = select
+        self.checkpoint_file = os.path.join(checkpoint_dir, f"{name}.checkpoint.json")
+        self.checkpoint = {} if restart else self._load_checkpoint()
+        self.stats = Counter(self.checkpoint.get("stats", {}))
+
+    def _load_checkpoint(self):
+        if not os.path.exists(self.checkpoint_file):
+            return {}
+        try:
+            with open(self.checkpoint_file, "r") as f:
+                checkpoint = json.load(f)
+            logger.info(f"⏯️  Resuming {self.name} after document {checkpoint.get('last_id')}")
+            return checkpoint
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Error loading checkpoint for {self.name}: {e}. Starting from the beginning.")
+            return {}
+
+    def _save_checkpoint(self, last_id, stats):
+        if self.dry_run:
+            return
+        tmp_file = f"{self.checkpoint_file}.tmp"
+        with open(tmp_file, "w") as f:
+            json.dump({"last_id": last_id, "stats": dict(stats)}, f)
+        os.replace(tmp_file, self.checkpoint_file)
+
+    def _pages(self):
+        query = self.collection.order_by("__name__").limit(self.page_size)
+        if self.select is not None:
+            query = query.select(self.select)
+        last_id = self.checkpoint.get("last_id")
+
+        while True:
+            page_query = query.start_after({"__name__": last_id}) if last_id else query
+            docs = list(page_query.stream())
+            if not docs:
+                return
+            yield docs
+            if len(docs) < self.page_size:
+                return
+            last_id = docs[-1].id
+
+    def run(self, process_page):
+        """
+        Run the migration to completion.
+
+        :param process_page: Callable(docs, batch, stats) queuing writes for one page
+        :return: Counter of stats (always includes 'documents', 'writes' and 'commits');
+                 also kept on self.stats, so progress is visible if a page raises
+        """
+        start_time = time.time()
+        stats = self.stats
+        mode = "DRY RUN" if self.dry_run else "live"
+        logger.info(f"🚀 Running migration {self.name} ({mode}, pages of {self.page_size})")
+
+        with ChunkedBatch(get_db(), max_in_flight=self.max_in_flight, dry_run=self.dry_run) as batch:
+            for docs in self._pages():
+                process_page(docs, batch, stats)
+                stats["documents"] += len(docs)
+
+                # Only advance the checkpoint once this page's writes are durable
+                batch.wait()
+                self._save_checkpoint(docs[-1].id, stats)
+                logger.info(f"📄 {self.name}: {stats['documents']} documents, {batch.writes} writes queued")
+
+        stats["writes"] = batch.writes
+        stats["commits"] = batch.commits
+
+        # Finished - the next run starts from the beginning
+        if not self.dry_run and os.path.exists(self.checkpoint_file):
+            os.remove(self.checkpoint_file)
+
+        elapsed = time.time() - start_time
+        logger.info(f"✅ {self.name} complete in {elapsed:.1f}s: " + ", ".join(f"{k}={v}" for k, v in sorted(stats.items())))
+        return stats
+
+
+def migration_arg_parser(description):
+    """Common command line flags for migration scripts."""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing")
+    parser.add_argument("--restart", action="store_true", help="Ignore any checkpoint and start from the beginning")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE, help="Documents read per page")
+    parser.add_argument("--max-in-flight", type=int, default=DEFAULT_MAX_IN_FLIGHT, help="Concurrent batch commits")
+    return parser
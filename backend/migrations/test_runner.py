@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for the resumable migration runner.
+
+Run with: python -m pytest migrations/test_runner.py
+"""
+
+import os
+import sys
+import json
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from migrations import runner
+from migrations.runner import MigrationRunner
+from store.fake_firestore import FakeFirestore
+
+USER_IDS = ["a", "b", "c", "d", "e"]
+
+
+def make_db(monkeypatch):
+    db = FakeFirestore({f"users/{user_id}": {"email": f"{user_id}@example.test"} for user_id in USER_IDS})
+    monkeypatch.setattr(runner, "get_db", lambda: db)
+    return db
+
+
+def add_flag(failing_id=None):
+    pages = []
+
+    def process_page(docs, batch, stats):
+        pages.append([doc.id for doc in docs])
+        for doc in docs:
+            if doc.id == failing_id:
+                raise RuntimeError("page failed")
+            batch.update(doc.reference, {"flag": True})
+            stats["updated"] += 1
+
+    return process_page, pages
+
+
+def test_resumes_after_the_last_durable_page(tmp_path, monkeypatch):
+    db = make_db(monkeypatch)
+    process_page, pages = add_flag(failing_id="c")
+
+    with pytest.raises(RuntimeError):
+        MigrationRunner("add_flag", db.collection("users"), page_size=2, checkpoint_dir=str(tmp_path)).run(process_page)
+
+    checkpoint_file = tmp_path / "add_flag.checkpoint.json"
+    assert json.loads(checkpoint_file.read_text()) == {"last_id": "b", "stats": {"updated": 2, "documents": 2}}
+    assert [user_id for user_id in USER_IDS if db.docs[f"users/{user_id}"].get("flag")] == ["a", "b"]
+
+    process_page, pages = add_flag()
+    stats = MigrationRunner("add_flag", db.collection("users"), page_size=2,
+                            checkpoint_dir=str(tmp_path)).run(process_page)
+
+    assert pages == [["c", "d"], ["e"]]
+    assert stats["updated"] == stats["documents"] == 5
+    assert all(db.docs[f"users/{user_id}"]["flag"] for user_id in USER_IDS)
+    # Finished, so the next run starts over
+    assert not checkpoint_file.exists()
+
+
+def test_dry_run_writes_nothing(tmp_path, monkeypatch):
+    db = make_db(monkeypatch)
+    process_page, pages = add_flag()
+
+    stats = MigrationRunner("add_flag", db.collection("users"), page_size=2, dry_run=True,
+                            checkpoint_dir=str(tmp_path)).run(process_page)
+
+    assert pages == [["a", "b"], ["c", "d"], ["e"]]
+    assert (stats["writes"], stats["commits"]) == (5, 3)
+    assert db.commits == [] and not any("flag" in data for data in db.docs.values())
+    assert list(tmp_path.iterdir()) == []
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
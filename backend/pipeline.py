@@ -0,0 +1,172 @@
+# pipeline.py
+
+"""
+Single-process job pipeline.
+
+Runs the whole cycle - or any subset of it - in one process:
+
+    preflight -> scrape -> match -> store -> notify
+
+The stages share one Firestore client, one read of the users collection and
+the in-memory scrape and match results, so the scheduled workflow no longer
+starts three interpreters that each initialise Firebase and stream every user.
+
+    python pipeline.py                          # full cycle
+    python pipeline.py --stages preflight,notify
+    python pipeline.py --stages revalidate      # recheck stored postings (see liveness.py)
+
+match needs scrape and store needs match in the same run (their inputs only
+exist in memory). A stage that finds nothing to do skips the stages that
+depend on it; notify still runs, since matches from earlier cycles may be
+waiting to be sent. revalidate is optional and only runs when selected.
+"""
+
+import sys
+import time
+import logging
+import argparse
+
+from main import get_subscribed_users, scrape_jobs, match_jobs, store_matched_jobs
+from utils.log import configure_logging
+
+logger = logging.getLogger(__name__)
+
+STAGES = ["preflight", "scrape", "match", "store", "notify"]
+
+# Stages that only run when asked for with --stages
+OPTIONAL_STAGES = ["revalidate"]
+ALL_STAGES = STAGES + OPTIONAL_STAGES
+
+# Stage -> stage whose in-memory output it consumes
+STAGE_INPUTS = {"scrape": "preflight", "match": "scrape", "store": "match", "notify": "preflight"}
+
+# Inputs that can't be recovered unless the producing stage runs in the same process
+IN_MEMORY_INPUTS = {"match", "store"}
+
+
+class PipelineContext:
+    """State shared between stages within one run."""
+
+    def __init__(self):
+        self._users = None
+        self.jobs = None
+        self.matches = None
+        self.ledger = None
+        self.job_ids = None
+
+    @property
+    def users(self):
+        # Loaded once, by whichever stage needs them first
+        if self._users is None:
+            self._users = get_subscribed_users()
+        return self._users
+
+
+def run_preflight(ctx):
+    if not ctx.users:
+        logger.warning("❌ No users with job preferences found.")
+        return False
+    logger.info(f"✅ Found {len(ctx.users)} users with job preferences. Proceeding (FREE MODE).")
+    return True
+
+def run_scrape(ctx):
+    ctx.jobs = scrape_jobs(ctx.users)
+    return bool(ctx.jobs)
+
+def run_match(ctx):
+    ctx.matches, ctx.ledger, ctx.job_ids = match_jobs(ctx.jobs, ctx.users)
+    return True
+
+def run_store(ctx):
+    store_matched_jobs(ctx.users, ctx.matches, ctx.ledger, ctx.job_ids)
+    return True
+
+def run_notify(ctx):
+    # Imported here like main.send_email_notifications; failures propagate so the run is marked failed
+    from email_service import send_job_emails
+    return send_job_emails(ctx.users)
+
+def run_revalidate(ctx):
+    from liveness import revalidate_jobs
+    return revalidate_jobs()["jobs"] > 0
+
+STAGE_FUNCTIONS = {
+    "preflight": run_preflight,
+    "scrape": run_scrape,
+    "match": run_match,
+    "store": run_store,
+    "notify": run_notify,
+    "revalidate": run_revalidate,
+}
+
+
+def resolve_stages(stages):
+    """
+    Validate a stage selection and put it in pipeline order.
+
+    :param stages: Iterable of stage names
+    :return: List of stage names in pipeline order
+    """
+    selected = set(stages)
+    unknown = selected - set(ALL_STAGES)
+    if unknown:
+        raise ValueError(f"Unknown stage(s): {', '.join(sorted(unknown))}. Choose from {', '.join(ALL_STAGES)}")
+    for stage in selected & IN_MEMORY_INPUTS:
+        if STAGE_INPUTS[stage] not in selected:
+            raise ValueError(f"Stage '{stage}' needs '{STAGE_INPUTS[stage]}' in the same run")
+    return [stage for stage in ALL_STAGES if stage in selected]
+
+def run_pipeline(stages=STAGES):
+    """
+    Run the selected stages in order.
+
+    :param stages: Stage names to run (default: all)
+    :return: Dictionary of stage -> "ok", "nothing to do", "skipped" or "failed"
+    """
+    stages = resolve_stages(stages)
+    # Every stage goes through config.get_db(), so Firebase is initialised once per run
+    ctx = PipelineContext()
+    results = {}
+    start_time = time.time()
+
+    for stage in stages:
+        upstream = STAGE_INPUTS.get(stage)
+        if results.get(upstream) in ("nothing to do", "skipped", "failed"):
+            logger.info(f"⏭️  Skipping {stage} ({upstream}: {results[upstream]})")
+            results[stage] = "skipped"
+            continue
+
+        stage_start = time.time()
+        logger.info(f"▶️  Stage: {stage}")
+        try:
+            results[stage] = "ok" if STAGE_FUNCTIONS[stage](ctx) else "nothing to do"
+        except Exception as e:
+            logger.exception(f"❌ Stage {stage} failed: {e}")
+            results[stage] = "failed"
+        logger.info(f"⏱️  {stage}: {results[stage]} in {time.time() - stage_start:.2f}s")
+
+    logger.info(f"\n🕒 Pipeline finished in {time.time() - start_time:.2f}s: "
+                + ", ".join(f"{stage}={result}" for stage, result in results.items()))
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the job pipeline in one process")
+    parser.add_argument("--stages", default=",".join(STAGES),
+                        help=f"Comma-separated stages to run (default: {','.join(STAGES)}; optional: {','.join(OPTIONAL_STAGES)})")
+    args = parser.parse_args(argv)
+
+    try:
+        stages = resolve_stages(stage.strip() for stage in args.stages.split(",") if stage.strip())
+    except ValueError as e:
+        parser.error(str(e))
+
+    configure_logging()
+    results = run_pipeline(stages)
+
+    # Same exit status as the old three-step workflow: no users, or a crashed stage, fails the run
+    if results.get("preflight") == "nothing to do" or "failed" in results.values():
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,411 @@
+# sharding.py
+
+"""
+Sharded job cycles: split one cycle across several worker processes.
+
+The planned search keys and the users are consistently hashed into N shards:
+
+- scrape: (title, location) pairs for per-pair sources, titles for title-only
+          sources, and whole global-listing sources (one sweep, one owner)
+- match:  users, by id - each shard matches and stores its users against
+          the merged results of every scrape shard
+- notify: users, by id
+
+Workers claim shards through time-limited leases, so any number of them can
+join a cycle, and a shard held by a crashed worker is picked up by another
+once its lease expires. A running shard's lease is renewed in the background
+(LeaseHeartbeat), so a slow shard isn't handed to a second worker, and results
+and completion are only recorded while the worker still owns the lease. Each
+phase waits for every shard of the previous one.
+
+Leases and the scraped jobs being merged live in a SQLite file (the local
+stand-in for a shared store), so workers must share a filesystem:
+
+    python sharding.py --cycle "$RUN_ID" --shards 4 &   # start as many
+    python sharding.py --cycle "$RUN_ID" --shards 4 &   # workers as wanted
+
+Sharded cycles match every user against the full cycle (no match ledger) and
+only collapse duplicates within the cycle: the ledger and fingerprint files
+are per-process state that concurrent workers can't share safely.
+"""
+
+import os
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import hashlib
+import logging
+import argparse
+import threading
+from contextlib import closing
+
+from fetch.registry import get_enabled_sources, TITLE_LOCATION, TITLE_ONLY, GLOBAL_LISTING
+from fetch.run_scrapers import fetch_jobs
+from matching.dedup import dedupe_jobs
+from main import get_subscribed_users, get_unique_job_location_pairs, match_jobs, store_matched_jobs
+from utils.log import configure_logging
+
+logger = logging.getLogger(__name__)
+
+SHARD_DB_FILE = os.getenv("SHARD_DB_FILE", os.path.join(os.path.dirname(__file__), "shards.sqlite3"))
+SHARD_LEASE_SECONDS = int(os.getenv("SHARD_LEASE_SECONDS", "1800"))
+SHARD_POLL_SECONDS = 5
+SHARD_WAIT_TIMEOUT_SECONDS = int(os.getenv("SHARD_WAIT_TIMEOUT_SECONDS", "14400"))
+SHARD_RESULTS_TTL_SECONDS = 2 * 24 * 3600  # Scraped results of older cycles are pruned
+
+PHASES = ["scrape", "match", "notify"]
+
+
+def _hash64(key):
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little")
+
+
+def jump_hash(key, num_buckets):
+    """
+    Jump consistent hash (Lamping & Veach): growing from N to N+1 buckets
+    only moves about 1/(N+1) of the keys.
+
+    :param key: 64-bit integer key
+    :param num_buckets: Number of buckets
+    :return: Bucket in [0, num_buckets)
+    """
+    bucket, candidate = -1, 0
+    while candidate < num_buckets:
+        bucket = candidate
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        candidate = int((bucket + 1) * ((1 << 31) / ((key >> 33) + 1)))
+    return bucket
+
+
+def shard_for(key, num_shards):
+    """Shard of a string key (case and surrounding whitespace ignored)."""
+    return jump_hash(_hash64(key.lower().strip()), num_shards)
+
+
+def shard_search_pairs(sources, pairs, shard, num_shards):
+    """
+    The search pairs each source should run on one shard.
+
+    :param sources: List of ScraperSource
+    :param pairs: All unique (title, location) pairs of the cycle
+    :param shard: Shard number
+    :param num_shards: Number of shards
+    :return: Dictionary of source name -> list of pairs (empty when the shard has nothing for it)
+    """
+    by_pair = [pair for pair in pairs if shard_for(f"{pair[0]}|{pair[1]}", num_shards) == shard]
+    by_title = [pair for pair in pairs if shard_for(pair[0], num_shards) == shard]
+
+    pairs_by_source = {}
+    for source in sources:
+        if source.granularity == TITLE_LOCATION:
+            pairs_by_source[source.name] = by_pair
+        elif source.granularity == TITLE_ONLY:
+            # All locations of a title stay together, so each title is searched once
+            pairs_by_source[source.name] = by_title
+        elif source.granularity == GLOBAL_LISTING:
+            # One sweep of the whole board, owned by a single shard
+            pairs_by_source[source.name] = list(pairs) if shard_for(f"source:{source.name}", num_shards) == shard else []
+    return pairs_by_source
+
+
+def shard_users(users, shard, num_shards):
+    return [user for user in users if shard_for(user["id"], num_shards) == shard]
+
+
+class LeaseStore:
+    """SQLite-backed shard leases and scraped results for sharded cycles."""
+
+    def __init__(self, path=SHARD_DB_FILE, lease_seconds=SHARD_LEASE_SECONDS, clock=time.time):
+        """
+        :param path: SQLite file shared by the workers
+        :param lease_seconds: How long a claimed shard is held before others may take it over
+        :param clock: Callable returning the current time in seconds
+        """
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.clock = clock
+        with closing(self._connect()) as db:
+            db.executescript("""
+                CREATE TABLE IF NOT EXISTS leases (
+                    cycle TEXT, phase TEXT, shard INTEGER, owner TEXT,
+                    expires_at REAL, done INTEGER DEFAULT 0,
+                    PRIMARY KEY (cycle, phase, shard)
+                );
+                CREATE TABLE IF NOT EXISTS results (
+                    cycle TEXT, shard INTEGER, jobs TEXT, created_at REAL,
+                    PRIMARY KEY (cycle, shard)
+                );
+            """)
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        return db
+
+    def ensure_phase(self, cycle, phase, num_shards):
+        with closing(self._connect()) as db:
+            db.executemany(
+                "INSERT OR IGNORE INTO leases (cycle, phase, shard) VALUES (?, ?, ?)",
+                [(cycle, phase, shard) for shard in range(num_shards)],
+            )
+
+    def claim(self, cycle, phase, owner):
+        """
+        Claim an unfinished shard that is free or whose lease has expired.
+
+        :return: Shard number, or None if every shard is done or held
+        """
+        now = self.clock()
+        with closing(self._connect()) as db:
+            db.execute("BEGIN IMMEDIATE")
+            row = db.execute(
+                "SELECT shard FROM leases WHERE cycle = ? AND phase = ? AND done = 0 "
+                "AND (owner IS NULL OR expires_at < ?) ORDER BY shard LIMIT 1",
+                (cycle, phase, now),
+            ).fetchone()
+            if row is None:
+                db.execute("COMMIT")
+                return None
+            db.execute(
+                "UPDATE leases SET owner = ?, expires_at = ? WHERE cycle = ? AND phase = ? AND shard = ?",
+                (owner, now + self.lease_seconds, cycle, phase, row[0]),
+            )
+            db.execute("COMMIT")
+            return row[0]
+
+    def renew(self, cycle, phase, shard, owner):
+        """
+        Extend a held lease by lease_seconds from now.
+
+        :return: False if the lease now belongs to someone else or the shard is done
+        """
+        with closing(self._connect()) as db:
+            cursor = db.execute(
+                "UPDATE leases SET expires_at = ? WHERE cycle = ? AND phase = ? AND shard = ? AND owner = ? AND done = 0",
+                (self.clock() + self.lease_seconds, cycle, phase, shard, owner),
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, cycle, phase, shard, owner):
+        """
+        Mark a shard done, if owner still holds its lease.
+
+        :return: False if another worker has taken the shard over
+        """
+        with closing(self._connect()) as db:
+            cursor = db.execute(
+                "UPDATE leases SET done = 1 WHERE cycle = ? AND phase = ? AND shard = ? AND owner = ? AND done = 0",
+                (cycle, phase, shard, owner),
+            )
+            return cursor.rowcount == 1
+
+    def release(self, cycle, phase, shard, owner):
+        """Give a shard back (e.g. after a failure) so another worker can retry it now."""
+        with closing(self._connect()) as db:
+            db.execute(
+                "UPDATE leases SET owner = NULL, expires_at = NULL "
+                "WHERE cycle = ? AND phase = ? AND shard = ? AND owner = ? AND done = 0",
+                (cycle, phase, shard, owner),
+            )
+
+    def pending(self, cycle, phase):
+        """Number of shards of a phase not yet done."""
+        with closing(self._connect()) as db:
+            return db.execute(
+                "SELECT COUNT(*) FROM leases WHERE cycle = ? AND phase = ? AND done = 0", (cycle, phase)
+            ).fetchone()[0]
+
+    def put_results(self, cycle, shard, jobs, owner):
+        """
+        Store a scrape shard's jobs, if owner still holds the shard's scrape lease.
+
+        :return: False if another worker has taken the shard over
+        """
+        with closing(self._connect()) as db:
+            db.execute("BEGIN IMMEDIATE")
+            held = db.execute(
+                "SELECT 1 FROM leases WHERE cycle = ? AND phase = 'scrape' AND shard = ? AND owner = ? AND done = 0",
+                (cycle, shard, owner),
+            ).fetchone()
+            if held:
+                db.execute(
+                    "INSERT OR REPLACE INTO results (cycle, shard, jobs, created_at) VALUES (?, ?, ?, ?)",
+                    (cycle, shard, json.dumps(jobs), self.clock()),
+                )
+            db.execute("COMMIT")
+            return held is not None
+
+    def merged_results(self, cycle):
+        """Every scrape shard's jobs, merged by source in shard order (deterministic for all readers)."""
+        merged = {}
+        with closing(self._connect()) as db:
+            for (jobs,) in db.execute("SELECT jobs FROM results WHERE cycle = ? ORDER BY shard", (cycle,)):
+                for source, source_jobs in json.loads(jobs).items():
+                    merged.setdefault(source, []).extend(source_jobs)
+        return merged
+
+    def prune(self, keep_cycle):
+        """Drop scraped results and leases of cycles older than SHARD_RESULTS_TTL_SECONDS."""
+        cutoff = self.clock() - SHARD_RESULTS_TTL_SECONDS
+        with closing(self._connect()) as db:
+            old = [row[0] for row in db.execute(
+                "SELECT DISTINCT cycle FROM results WHERE cycle != ? AND created_at < ?", (keep_cycle, cutoff))]
+            for cycle in old:
+                db.execute("DELETE FROM results WHERE cycle = ?", (cycle,))
+                db.execute("DELETE FROM leases WHERE cycle = ?", (cycle,))
+
+
+class LeaseHeartbeat:
+    """Renews a shard's lease in a background thread while the shard runs."""
+
+    def __init__(self, store, cycle, phase, shard, owner, interval=None):
+        """
+        :param store: LeaseStore
+        :param interval: Seconds between renewals (default: a third of the lease)
+        """
+        self.store = store
+        self.lease = (cycle, phase, shard, owner)
+        self.interval = interval if interval is not None else store.lease_seconds / 3
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"lease-{phase}-{shard}", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                if not self.store.renew(*self.lease):
+                    self.lost = True
+                    logger.warning(f"⚠️ Lost the lease on {self.lease[1]} shard {self.lease[2]}")
+                    return
+            except sqlite3.Error as e:
+                logger.warning(f"Error renewing lease on {self.lease[1]} shard {self.lease[2]}: {e}")
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+
+class ShardWorker:
+    """One worker process taking part in a sharded cycle."""
+
+    def __init__(self, store, cycle, num_shards, owner=None, sources=None, users=None):
+        """
+        :param store: LeaseStore
+        :param cycle: Cycle ID shared by all workers of the cycle (e.g. the CI run id)
+        :param num_shards: Number of shards (must be the same for all workers)
+        :param owner: Worker name for leases (default: host:pid:random)
+        :param sources: ScraperSources (default: enabled sources)
+        :param users: Users (default: read from Firestore)
+        """
+        self.store = store
+        self.cycle = cycle
+        self.num_shards = num_shards
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.sources = get_enabled_sources() if sources is None else sources
+        self._users = users
+        self._merged_jobs = None
+        self.handlers = {"scrape": self.scrape_shard, "match": self.match_shard, "notify": self.notify_shard}
+
+    @property
+    def users(self):
+        if self._users is None:
+            self._users = get_subscribed_users()
+        return self._users
+
+    def scrape_shard(self, shard):
+        pairs = get_unique_job_location_pairs(self.users)
+        pairs_by_source = shard_search_pairs(self.sources, pairs, shard, self.num_shards)
+        sources = [source for source in self.sources if pairs_by_source.get(source.name)]
+        jobs = fetch_jobs(pairs, sources, pairs_by_source) if sources else {}
+        if not self.store.put_results(self.cycle, shard, jobs, self.owner):
+            logger.warning(f"⚠️ Scrape shard {shard} was taken over; discarding its results")
+        return sum(len(source_jobs) for source_jobs in jobs.values())
+
+    def match_shard(self, shard):
+        users = shard_users(self.users, shard, self.num_shards)
+        if not users:
+            return 0
+        if self._merged_jobs is None:
+            # Same merged input on every worker, so every shard dedupes identically
+            self._merged_jobs, _ = dedupe_jobs(self.store.merged_results(self.cycle))
+        if not any(self._merged_jobs.values()):
+            return 0
+        matches, _, _ = match_jobs(self._merged_jobs, users, incremental=False)
+        store_matched_jobs(users, matches)
+        return len(users)
+
+    def notify_shard(self, shard):
+        users = shard_users(self.users, shard, self.num_shards)
+        if not users:
+            return 0
+        from email_service import send_job_emails
+        send_job_emails(users)
+        return len(users)
+
+    def run_phase(self, phase):
+        """
+        Work through shards of one phase until none are left to claim.
+
+        :return: Number of shards this worker completed
+        """
+        self.store.ensure_phase(self.cycle, phase, self.num_shards)
+        completed = 0
+        while True:
+            shard = self.store.claim(self.cycle, phase, self.owner)
+            if shard is None:
+                return completed
+            start_time = time.time()
+            try:
+                with LeaseHeartbeat(self.store, self.cycle, phase, shard, self.owner):
+                    count = self.handlers[phase](shard)
+            except Exception as e:
+                logger.exception(f"❌ {phase} shard {shard} failed: {e}")
+                self.store.release(self.cycle, phase, shard, self.owner)
+                raise
+            if not self.store.complete(self.cycle, phase, shard, self.owner):
+                logger.warning(f"⚠️ {phase} shard {shard} was taken over by another worker before it finished")
+                continue
+            completed += 1
+            logger.info(f"🧩 {phase} shard {shard + 1}/{self.num_shards} done in {time.time() - start_time:.2f}s ({count})")
+
+    def wait_for_phase(self, phase, timeout=SHARD_WAIT_TIMEOUT_SECONDS):
+        """Wait until every shard of a phase is done, taking over shards whose lease expires."""
+        deadline = time.time() + timeout
+        while self.store.pending(self.cycle, phase):
+            if time.time() > deadline:
+                raise TimeoutError(f"Timed out waiting for {phase} shards of cycle {self.cycle}")
+            self.run_phase(phase)
+            if self.store.pending(self.cycle, phase):
+                time.sleep(SHARD_POLL_SECONDS)
+
+    def run(self):
+        """
+        Take part in every phase of the cycle.
+
+        :return: Dictionary of phase -> shards completed by this worker
+        """
+        logger.info(f"🚀 Worker {self.owner} joining cycle {self.cycle} ({self.num_shards} shards)")
+        self.store.prune(self.cycle)
+        completed = {}
+        for phase in PHASES:
+            completed[phase] = self.run_phase(phase)
+            self.wait_for_phase(phase)
+        logger.info(f"✅ Worker {self.owner} finished cycle {self.cycle}: "
+                    + ", ".join(f"{phase}={count}" for phase, count in completed.items()))
+        return completed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run one worker of a sharded job cycle")
+    parser.add_argument("--cycle", required=True, help="Cycle ID shared by all workers (e.g. the CI run id)")
+    parser.add_argument("--shards", type=int, default=4, help="Number of shards (same for every worker)")
+    args = parser.parse_args()
+
+    configure_logging()
+    ShardWorker(LeaseStore(), args.cycle, args.shards).run()
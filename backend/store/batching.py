@@ -0,0 +1,131 @@
+# store/batching.py
+
+"""
+Firestore write batches that never exceed the 500-operation limit.
+
+    with ChunkedBatch(db) as batch:
+        for ref, data in writes:
+            batch.set(ref, data)   # commits automatically every 500 writes
+
+With max_in_flight > 1, full chunks are committed on a small thread pool while
+the caller keeps queueing writes; wait() blocks until everything queued so far
+is durable. dry_run counts writes without committing anything.
+"""
+
+import logging
+from threading import BoundedSemaphore
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_WRITES = 500  # Firestore's per-batch limit
+GET_ALL_CHUNK_SIZE = 300  # Document references per get_all() call
+
+
+class ChunkedBatch:
+    """A write batch that commits itself in chunks of at most chunk_size operations."""
+
+    def __init__(self, db, chunk_size=MAX_BATCH_WRITES, max_in_flight=1, dry_run=False):
+        """
+        :param db: Firestore client
+        :param chunk_size: Operations per commit (max 500)
+        :param max_in_flight: Chunks allowed to commit concurrently (1 = commit inline)
+        :param dry_run: Count writes but never commit
+        """
+        self.db = db
+        self.chunk_size = min(chunk_size, MAX_BATCH_WRITES)
+        self.dry_run = dry_run
+        self._batch = None
+        self._pending = 0
+        self.writes = 0
+        self.commits = 0
+
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight) if max_in_flight > 1 else None
+        self._slots = BoundedSemaphore(max_in_flight) if self._executor else None
+        self._futures = []
+
+    def _add(self, method, *args, **kwargs):
+        if self._batch is None and not self.dry_run:
+            self._batch = self.db.batch()
+        if not self.dry_run:
+            getattr(self._batch, method)(*args, **kwargs)
+        self._pending += 1
+        self.writes += 1
+        if self._pending >= self.chunk_size:
+            self.flush()
+
+    def set(self, ref, data, **kwargs):
+        self._add("set", ref, data, **kwargs)
+
+    def update(self, ref, data):
+        self._add("update", ref, data)
+
+    def delete(self, ref):
+        self._add("delete", ref)
+
+    def _commit(self, batch, size):
+        try:
+            batch.commit()
+            logger.debug(f"💾 Committed batch of {size} writes")
+        finally:
+            if self._slots:
+                self._slots.release()
+
+    def flush(self):
+        """Commit whatever is pending (in the background when concurrent)."""
+        if not self._pending:
+            return
+        batch, size = self._batch, self._pending
+        self._batch = None
+        self._pending = 0
+        self.commits += 1
+
+        if self.dry_run:
+            logger.debug(f"🧪 Dry run: would commit {size} writes")
+        elif self._executor:
+            # Blocks once max_in_flight commits are outstanding
+            self._slots.acquire()
+            self._futures.append(self._executor.submit(self._commit, batch, size))
+        else:
+            self._commit(batch, size)
+
+    def wait(self):
+        """Flush and block until every queued write is committed; re-raises the first failure."""
+        self.flush()
+        futures, self._futures = self._futures, []
+        for future in futures:
+            future.result()
+
+    def close(self):
+        self.wait()
+        if self._executor:
+            self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Commit the tail only on success; completed chunks are already durable
+        if exc_type is None:
+            self.close()
+        elif self._executor:
+            self._executor.shutdown(wait=True)
+        return False
+
+
+def existing_document_ids(db, refs):
+    """
+    Bulk existence check.
+
+    :param db: Firestore client
+    :param refs: Iterable of DocumentReferences
+    :return: Set of ids of the documents that exist
+    """
+    refs = list(refs)
+    existing = set()
+    for start in range(0, len(refs), GET_ALL_CHUNK_SIZE):
+        # Only the document name is needed, not its fields
+        for snapshot in db.get_all(refs[start:start + GET_ALL_CHUNK_SIZE], field_paths=[]):
+            if snapshot.exists:
+                existing.add(snapshot.id)
+    return existing
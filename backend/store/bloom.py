@@ -0,0 +1,205 @@
+# store/bloom.py
+
+"""
+Per-user Bloom filters of stored job ids.
+
+store_jobs asks the user's filter before reading Firestore:
+
+- definite miss -> the job is new, create it straight away (no read)
+- possible hit  -> confirm with a get() as before
+
+Filters are kept as local JSON files. Every BLOOM_REFRESH_HOURS a filter is
+refreshed with only the jobs added since its last sync (an added_at range
+query, overlapping by BLOOM_REFRESH_OVERLAP for clock skew), and it is
+rebuilt from every id in users/{id}/jobs only when missing, saturated or
+older than BLOOM_FULL_REBUILD_DAYS.
+
+Read cost: a full rebuild is one billed read per stored job (the ids-only
+projection saves bandwidth, not reads), so rebuilding daily costs about
+users x stored jobs reads a day. A refresh reads only the jobs added since
+the last sync (at least one read per query), which keeps the daily cost near
+the number of new jobs.
+
+A rebuild also reads the ids of the user's archived job tombstones
+(users/{id}/archived_jobs, see store/retention.py), so a pruned posting that
+is scraped again is a possible hit that store_jobs checks, not a definite
+miss it stores as new. A refresh needn't read them: an archived job was in
+users/{id}/jobs, and so in the filter, before retention pruned it.
+
+A filter can only be stale in one direction (missing jobs added elsewhere,
+or still holding deleted ones), and the definite-miss path uses create(),
+which refuses to overwrite an existing document, so a stale filter costs a
+failed write or an extra read, never a clobbered job.
+"""
+
+import os
+import json
+import math
+import base64
+import hashlib
+import logging
+from datetime import datetime, timedelta, timezone
+
+logger = logging.getLogger(__name__)
+
+BLOOM_DIR = os.path.join(os.path.dirname(__file__), "..", "bloom_filters")
+BLOOM_REFRESH_HOURS = 24
+BLOOM_REFRESH_OVERLAP = timedelta(hours=1)
+BLOOM_FULL_REBUILD_DAYS = int(os.getenv("BLOOM_FULL_REBUILD_DAYS", "7"))
+BLOOM_ERROR_RATE = 0.01
+BLOOM_MIN_CAPACITY = 1000
+BLOOM_HEADROOM = 2  # Size for twice the current job count so the filter can grow between rebuilds
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over string keys."""
+
+    def __init__(self, capacity=BLOOM_MIN_CAPACITY, error_rate=BLOOM_ERROR_RATE, bits=None, num_hashes=None):
+        """
+        :param capacity: Expected number of keys
+        :param error_rate: Target false-positive rate at capacity
+        :param bits: Existing bit array (bytearray) when loading
+        :param num_hashes: Existing hash count when loading
+        """
+        self.capacity = max(1, capacity)
+        num_bits = math.ceil(-self.capacity * math.log(error_rate) / (math.log(2) ** 2))
+        self.bits = bits if bits is not None else bytearray((num_bits + 7) // 8)
+        self.num_bits = len(self.bits) * 8
+        self.num_hashes = num_hashes or max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self.count = 0
+
+    def _positions(self, key):
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    @property
+    def saturated(self):
+        """Whether more keys were added than the filter was sized for."""
+        return self.count > self.capacity
+
+    def to_dict(self):
+        return {
+            "capacity": self.capacity,
+            "num_hashes": self.num_hashes,
+            "count": self.count,
+            "bits": base64.b64encode(bytes(self.bits)).decode(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        bloom = cls(capacity=data["capacity"], bits=bytearray(base64.b64decode(data["bits"])),
+                    num_hashes=data["num_hashes"])
+        bloom.count = data.get("count", 0)
+        return bloom
+
+
+class UserJobFilter:
+    """Bloom filter of one user's stored job ids, persisted locally."""
+
+    def __init__(self, user_id, bloom=None, built_at=None, synced_at=None, bloom_dir=BLOOM_DIR):
+        """
+        :param built_at: When the filter was last rebuilt from every stored job (UTC)
+        :param synced_at: When jobs were last read into the filter, by a rebuild or a refresh (UTC)
+        """
+        self.user_id = user_id
+        self.bloom = bloom
+        self.built_at = built_at
+        self.synced_at = synced_at or built_at
+        self.path = os.path.join(bloom_dir, f"{user_id}.json") if bloom_dir else None
+        self._dirty = False
+
+    @classmethod
+    def load(cls, user_id, user_jobs_ref, bloom_dir=BLOOM_DIR, now=None, archived_ref=None):
+        """
+        Load the user's filter, refreshing it with recently added jobs when due and
+        rebuilding it from Firestore if missing, saturated or due a full rebuild.
+
+        :param user_id: User ID
+        :param user_jobs_ref: users/{id}/jobs collection reference
+        :param bloom_dir: Directory for filter files (None to always rebuild, memory only)
+        :param now: Current time (UTC, default: now)
+        :param archived_ref: users/{id}/archived_jobs collection reference (None to leave tombstones out)
+        :return: UserJobFilter
+        """
+        now = now or datetime.now(timezone.utc)
+        user_filter = cls(user_id, bloom_dir=bloom_dir)
+        if user_filter.path and os.path.exists(user_filter.path):
+            try:
+                with open(user_filter.path, "r") as f:
+                    data = json.load(f)
+                user_filter.bloom = BloomFilter.from_dict(data["bloom"])
+                user_filter.built_at = datetime.fromisoformat(data["built_at"])
+                user_filter.synced_at = datetime.fromisoformat(data.get("synced_at", data["built_at"]))
+                if user_filter.built_at.tzinfo is None or user_filter.synced_at.tzinfo is None:
+                    raise ValueError("filter written without a timezone")
+            except (OSError, KeyError, ValueError) as e:
+                logger.warning(f"Error loading job filter for {user_id}: {e}. Rebuilding.")
+                user_filter.bloom = None
+
+        if user_filter.bloom is None or user_filter.bloom.saturated or \
+                now - user_filter.built_at > timedelta(days=BLOOM_FULL_REBUILD_DAYS):
+            user_filter.rebuild(user_jobs_ref, now, archived_ref)
+        elif now - user_filter.synced_at > timedelta(hours=BLOOM_REFRESH_HOURS):
+            user_filter.refresh(user_jobs_ref, now)
+        return user_filter
+
+    def rebuild(self, user_jobs_ref, now=None, archived_ref=None):
+        """Rebuild from the ids in users/{id}/jobs and archived_jobs (ids only, no document fields)."""
+        now = now or datetime.now(timezone.utc)
+        job_ids = [doc.id for doc in user_jobs_ref.select([]).stream()]
+        if archived_ref is not None:
+            job_ids += [doc.id for doc in archived_ref.select([]).stream()]
+        self.bloom = BloomFilter(capacity=max(BLOOM_MIN_CAPACITY, len(job_ids) * BLOOM_HEADROOM))
+        for job_id in job_ids:
+            self.bloom.add(job_id)
+        self.built_at = self.synced_at = now
+        self._dirty = True
+        logger.debug(f"🌸 Rebuilt job filter for {self.user_id} from {len(job_ids)} stored jobs")
+
+    def refresh(self, user_jobs_ref, now=None):
+        """Add the ids of jobs stored since the last sync (by any process) without a full rebuild."""
+        now = now or datetime.now(timezone.utc)
+        since = self.synced_at - BLOOM_REFRESH_OVERLAP
+        added = 0
+        for doc in user_jobs_ref.where("added_at", ">", since).select([]).stream():
+            # Ids already in the filter (including from the overlap) needn't be counted twice
+            if doc.id not in self.bloom:
+                self.bloom.add(doc.id)
+                added += 1
+        self.synced_at = now
+        self._dirty = True
+        logger.debug(f"🌸 Refreshed job filter for {self.user_id} with {added} recently stored jobs")
+
+    def might_contain(self, job_id):
+        """False means the job is definitely not stored for this user."""
+        return job_id in self.bloom
+
+    def add(self, job_id):
+        self.bloom.add(job_id)
+        self._dirty = True
+
+    def save(self):
+        """Write the filter to disk if it changed."""
+        if not self.path or not self._dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_file = f"{self.path}.tmp"
+            with open(tmp_file, "w") as f:
+                json.dump({"built_at": self.built_at.isoformat(), "synced_at": self.synced_at.isoformat(),
+                           "bloom": self.bloom.to_dict()}, f)
+            os.replace(tmp_file, self.path)
+            self._dirty = False
+        except OSError as e:
+            logger.error(f"Error saving job filter for {self.user_id}: {e}")
@@ -0,0 +1,358 @@
+# store/fake_firestore.py
+
+"""
+In-memory stand-in for the parts of the Firestore client the tests use.
+
+Documents live in one dict keyed by path ("users/u1/jobs/abc"), so tests can
+seed and inspect them directly:
+
+    db = FakeFirestore({"users/u1/jobs/a": {"added_at": ..., "url": ...}})
+    retention.prune_user_jobs(db, "u1", ...)
+    assert db.ids("users/u1/jobs") == [...]
+
+Supported: collection/document references, get/create/set/update/delete (dotted
+field paths in update and where), queries (where, order_by with direction and
+"__name__", limit, start_after with a snapshot or dict, select, stream) over
+collections and collection groups, get_all, write batches and transactions (retried by firestore.transactional
+when a document read in the transaction changed before commit).
+
+Queries follow Firestore's rules where tests depend on them: documents
+missing an order_by field are left out, results are ordered by document
+name after the explicit fields, and start_after() compares the fields in
+the cursor (a snapshot cursor includes the document name, a dict only what
+it names).
+
+db.reads counts document reads (one per get, per get_all result and per
+streamed document, at least one per query), db.commits the size of every
+committed batch or transaction.
+"""
+
+import uuid
+import operator
+import threading
+from functools import cmp_to_key
+
+from google.api_core import exceptions
+
+OPERATORS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "in": lambda value, options: value in options,
+    "array_contains": lambda value, item: item in value,
+}
+NAME_FIELD = "__name__"
+DESCENDING = "DESCENDING"
+_MISSING = object()
+
+
+def _parent_path(path):
+    return path.rsplit("/", 1)[0] if "/" in path else ""
+
+
+def _field(data, field):
+    """Value of a dotted field path ("job_details.is_expired"), or _MISSING."""
+    for part in field.split("."):
+        if not isinstance(data, dict) or part not in data:
+            return _MISSING
+        data = data[part]
+    return data
+
+
+def _update(data, changes):
+    """Apply update() changes, where dotted keys set nested fields."""
+    for field, value in changes.items():
+        *parents, last = field.split(".")
+        target = data
+        for part in parents:
+            target = target.setdefault(part, {})
+        target[last] = value
+
+
+class FakeSnapshot:
+    def __init__(self, reference, data):
+        self.reference = reference
+        self.id = reference.id
+        self.exists = data is not None
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data) if self._data is not None else None
+
+    def get(self, field):
+        return (self._data or {}).get(field)
+
+
+class FakeDocumentRef:
+    def __init__(self, db, path):
+        self._db = db
+        self.path = path
+        self.id = path.rsplit("/", 1)[-1]
+
+    @property
+    def parent(self):
+        return FakeCollection(self._db, _parent_path(self.path))
+
+    def collection(self, name):
+        return FakeCollection(self._db, f"{self.path}/{name}")
+
+    def get(self, field_paths=None, transaction=None):
+        if transaction is not None:
+            transaction._read(self.path)
+        return self._db._snapshot(self.path, field_paths)
+
+    def create(self, data):
+        self._db._apply([("create", self.path, data, False)])
+
+    def set(self, data, merge=False):
+        self._db._apply([("set", self.path, data, merge)])
+
+    def update(self, data):
+        self._db._apply([("update", self.path, data, False)])
+
+    def delete(self):
+        self._db._apply([("delete", self.path, None, False)])
+
+    def __eq__(self, other):
+        return isinstance(other, FakeDocumentRef) and other.path == self.path
+
+    def __hash__(self):
+        return hash(self.path)
+
+
+class FakeQuery:
+    def __init__(self, db, parent=None, group=None, filters=(), orders=(), size=None, cursor=None, fields=None):
+        """
+        :param parent: Collection path (collection queries)
+        :param group: Collection id (collection group queries)
+        """
+        self._db = db
+        self._parent = parent
+        self._group = group
+        self._filters = filters
+        self._orders = orders
+        self._size = size
+        self._cursor = cursor
+        self._fields = fields
+
+    def _copy(self, **changes):
+        fields = dict(parent=self._parent, group=self._group, filters=self._filters, orders=self._orders,
+                      size=self._size, cursor=self._cursor, fields=self._fields)
+        fields.update(changes)
+        return FakeQuery(self._db, **fields)
+
+    def where(self, field, op, value):
+        return self._copy(filters=self._filters + ((field, OPERATORS[op], value),))
+
+    def order_by(self, field, direction="ASCENDING"):
+        return self._copy(orders=self._orders + ((field, direction == DESCENDING),))
+
+    def limit(self, size):
+        return self._copy(size=size)
+
+    def select(self, fields):
+        return self._copy(fields=list(fields))
+
+    def start_after(self, values):
+        """:param values: DocumentSnapshot, or dict of order_by field -> value"""
+        if isinstance(values, FakeSnapshot):
+            # A snapshot cursor also carries the document name, so ties aren't skipped
+            data = values.to_dict() or {}
+            cursor = [values.reference.path if field == NAME_FIELD else _field(data, field) for field, _ in self._orders]
+            if not any(field == NAME_FIELD for field, _ in self._orders):
+                cursor.append(values.reference.path)
+        else:
+            cursor = []
+            for field, _ in self._orders:
+                if field not in values:
+                    break
+                cursor.append(self._name_value(values[field]) if field == NAME_FIELD else values[field])
+        return self._copy(cursor=cursor)
+
+    def _name_value(self, value):
+        if isinstance(value, FakeDocumentRef):
+            return value.path
+        # A bare document id is relative to the queried collection
+        return value if "/" in value or self._parent is None else f"{self._parent}/{value}"
+
+    def _in_scope(self, path):
+        if self._group is not None:
+            return path.count("/") % 2 == 1 and path.split("/")[-2] == self._group
+        return _parent_path(path) == self._parent
+
+    def _value(self, path, data, field):
+        return path if field == NAME_FIELD else _field(data, field)
+
+    def _compare(self, orders, a, b):
+        for (field, descending), left, right in zip(orders, a, b):
+            if left != right:
+                result = -1 if left < right else 1
+                return -result if descending else result
+        return 0
+
+    def stream(self):
+        orders = list(self._orders)
+        if not any(field == NAME_FIELD for field, _ in orders):
+            # Firestore breaks ties by document name, in the direction of the last order
+            orders.append((NAME_FIELD, orders[-1][1] if orders else False))
+
+        rows = []
+        for path, data in self._db._documents():
+            if not self._in_scope(path):
+                continue
+            values = [(_field(data, field), test, value) for field, test, value in self._filters]
+            if not all(actual is not _MISSING and test(actual, value) for actual, test, value in values):
+                continue
+            if not all(field == NAME_FIELD or _field(data, field) is not _MISSING for field, _ in orders):
+                continue
+            rows.append((path, [self._value(path, data, field) for field, _ in orders]))
+
+        rows.sort(key=cmp_to_key(lambda a, b: self._compare(orders, a[1], b[1])))
+        if self._cursor is not None:
+            size = len(self._cursor)
+            rows = [row for row in rows if self._compare(orders[:size], row[1][:size], self._cursor) > 0]
+        if self._size is not None:
+            rows = rows[:self._size]
+
+        self._db.reads += max(1, len(rows))
+        return [self._db._snapshot(path, self._fields, count=False) for path, _ in rows]
+
+    def get(self):
+        return self.stream()
+
+
+class FakeCollection(FakeQuery):
+    def __init__(self, db, path):
+        super().__init__(db, parent=path)
+        self.path = path
+        self.id = path.rsplit("/", 1)[-1]
+
+    def document(self, doc_id=None):
+        return FakeDocumentRef(self._db, f"{self.path}/{doc_id or uuid.uuid4().hex[:20]}")
+
+
+class FakeWriteBatch:
+    def __init__(self, db):
+        self._db = db
+        self._ops = []
+
+    def set(self, ref, data, merge=False):
+        self._ops.append(("set", ref.path, data, merge))
+
+    def update(self, ref, data):
+        self._ops.append(("update", ref.path, data, False))
+
+    def delete(self, ref):
+        self._ops.append(("delete", ref.path, None, False))
+
+    def commit(self):
+        self._db._apply(self._ops)
+        return list(self._ops)
+
+
+class FakeTransaction(FakeWriteBatch):
+    """Buffers writes; _commit() aborts if a document read in the transaction changed since."""
+
+    def __init__(self, db, max_attempts=5):
+        super().__init__(db)
+        self._id = None
+        self._read_only = False
+        self._max_attempts = max_attempts
+        self._read_versions = {}
+
+    def _read(self, path):
+        self._read_versions.setdefault(path, self._db.versions.get(path, 0))
+
+    def _clean_up(self):
+        self._ops = []
+        self._read_versions = {}
+        self._id = None
+
+    def _begin(self, retry_id=None):
+        self._id = uuid.uuid4().bytes
+
+    def _commit(self):
+        with self._db._lock:
+            if any(self._db.versions.get(path, 0) != version for path, version in self._read_versions.items()):
+                self._clean_up()
+                raise exceptions.Aborted("Document changed since it was read in the transaction")
+            self._db._apply(self._ops)
+        self._clean_up()
+
+    def _rollback(self):
+        self._clean_up()
+
+
+class FakeFirestore:
+    def __init__(self, docs=None):
+        """
+        :param docs: Dictionary of document path -> data (used in place, so tests can inspect it)
+        """
+        self.docs = docs if docs is not None else {}
+        self.versions = {}  # Path -> number of writes, for transaction conflicts
+        self.reads = 0
+        self.commits = []
+        self._lock = threading.RLock()
+
+    def collection(self, name):
+        return FakeCollection(self, name)
+
+    def collection_group(self, name):
+        return FakeQuery(self, group=name)
+
+    def document(self, path):
+        return FakeDocumentRef(self, path)
+
+    def batch(self):
+        return FakeWriteBatch(self)
+
+    def transaction(self, max_attempts=5):
+        return FakeTransaction(self, max_attempts)
+
+    def get_all(self, refs, field_paths=None, transaction=None):
+        snapshots = []
+        for ref in refs:
+            if transaction is not None:
+                transaction._read(ref.path)
+            snapshots.append(self._snapshot(ref.path, field_paths))
+        # Reversed: callers must not rely on request order
+        return list(reversed(snapshots))
+
+    def ids(self, collection_path):
+        """Sorted ids of the documents directly in a collection."""
+        return sorted(path.rsplit("/", 1)[-1] for path in self.docs if _parent_path(path) == collection_path)
+
+    def _documents(self):
+        with self._lock:
+            return list(self.docs.items())
+
+    def _snapshot(self, path, field_paths=None, count=True):
+        if count:
+            self.reads += 1
+        data = self.docs.get(path)
+        if data is not None and field_paths is not None:
+            data = {field: data[field] for field in field_paths if field in data}
+        return FakeSnapshot(FakeDocumentRef(self, path), data)
+
+    def _apply(self, ops):
+        with self._lock:
+            for kind, path, data, merge in ops:
+                if kind == "delete":
+                    self.docs.pop(path, None)
+                elif kind == "update":
+                    if path not in self.docs:
+                        raise exceptions.NotFound(f"No document to update: {path}")
+                    _update(self.docs[path], data)
+                elif kind == "create":
+                    if path in self.docs:
+                        raise exceptions.AlreadyExists(f"Document already exists: {path}")
+                    self.docs[path] = dict(data)
+                elif merge and path in self.docs:
+                    self.docs[path].update(data)
+                else:
+                    self.docs[path] = dict(data)
+                self.versions[path] = self.versions.get(path, 0) + 1
+            self.commits.append(len(ops))
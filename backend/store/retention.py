@@ -0,0 +1,308 @@
+# store/retention.py
+
+"""
+Retention: archive and delete stale jobs and notification records.
+
+users/{id}/jobs and user_job_matches otherwise grow forever, long after
+postings have closed (LinkedIn only lists jobs from the last 14 days), which
+slows store_jobs' duplicate checks, the email's notified == False query and
+the frontend listing.
+
+- users/{id}/jobs older than JOB_RETENTION_DAYS (by added_at) are written to
+  a gzipped JSON Lines archive in ARCHIVE_DIR, then deleted. Jobs that
+  liveness.py found closed (is_expired) go the same way once they have been
+  expired for EXPIRED_JOB_RETENTION_DAYS, however recently they were added.
+  Saved and applied jobs are never touched. The user's feed
+  (store/user_feed.py) is compacted to match.
+- every deleted job leaves a bare tombstone in users/{id}/archived_jobs, so
+  a posting a source still lists (ifyoucould and unjobs have no age filter)
+  isn't stored and emailed again as new when it is scraped after pruning.
+  The user's job filter (store/bloom.py) includes tombstones, so only jobs
+  it can't rule out cost the extra read in store_jobs. Tombstones are
+  deleted after TOMBSTONE_RETENTION_DAYS.
+- user_job_matches older than MATCH_RETENTION_DAYS (by matched_at) are
+  deleted once they have been emailed (notified), or when their job has
+  closed (job_details.is_expired) and so will never be emailed. Unsent
+  notifications for open jobs are kept. Job details live on in
+  users/{id}/jobs or the archive.
+
+Stale documents are read a page at a time with a range query, so only what
+is being pruned is read. The filtered queries need composite indexes:
+jobs (is_expired, expired_at), user_job_matches (notified, matched_at) and
+user_job_matches (job_details.is_expired, matched_at), plus a collection
+group index on archived_jobs.archived_at. Deletes go out in 500-operation
+batches with a few commits in flight (store/batching.py). Users are walked with MigrationRunner,
+so an interrupted run resumes after the last user it finished.
+
+    python -m store.retention --dry-run
+    python -m store.retention --job-days 60 --match-days 30 --expired-days 3
+"""
+
+import os
+import gzip
+import json
+import logging
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from store.batching import ChunkedBatch
+from store.user_feed import remove_from_feed, USER_FEED_ENABLED
+
+logger = logging.getLogger(__name__)
+
+JOB_RETENTION_DAYS = int(os.getenv("JOB_RETENTION_DAYS", "30"))
+MATCH_RETENTION_DAYS = int(os.getenv("MATCH_RETENTION_DAYS", "30"))
+EXPIRED_JOB_RETENTION_DAYS = int(os.getenv("EXPIRED_JOB_RETENTION_DAYS", "7"))  # Grace period for closed postings
+TOMBSTONE_RETENTION_DAYS = int(os.getenv("TOMBSTONE_RETENTION_DAYS", "180"))  # Longer than sources list a posting
+ARCHIVED_JOBS_COLLECTION = "archived_jobs"
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", os.path.join(os.path.dirname(__file__), "..", "archive"))
+RETENTION_PAGE_SIZE = 300
+RETENTION_MAX_IN_FLIGHT = 4  # Concurrent delete batch commits
+
+# Fields kept in the archive - enough to identify and show the job again
+ARCHIVE_FIELDS = ("job_id", "user_id", "title", "company", "location", "url", "source",
+                  "date_posted", "date_added", "added_at", "relevance_score")
+
+
+def is_preserved(job):
+    """Saved and applied jobs are kept whatever their age."""
+    return bool(job.get("is_saved") or job.get("has_applied"))
+
+
+def _json_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+class JobArchive:
+    """Gzipped JSON Lines export of pruned jobs, one file per run."""
+
+    def __init__(self, archive_dir=ARCHIVE_DIR, name=None, dry_run=False):
+        """
+        :param archive_dir: Directory for archive files
+        :param name: File name (default: jobs-<UTC timestamp>.jsonl.gz)
+        :param dry_run: Count records without writing a file
+        """
+        name = name or f"jobs-{datetime.now(timezone.utc):%Y%m%d-%H%M%S}.jsonl.gz"
+        self.path = os.path.join(archive_dir, name)
+        self.dry_run = dry_run
+        self.count = 0
+        self._file = None
+        if not dry_run:
+            os.makedirs(archive_dir, exist_ok=True)
+
+    def write(self, job):
+        self.count += 1
+        if self.dry_run:
+            return
+        if self._file is None:
+            self._file = gzip.open(self.path, "at", encoding="utf-8")
+        record = {field: _json_value(job[field]) for field in ARCHIVE_FIELDS if job.get(field) is not None}
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+    def flush(self):
+        """Make everything written so far durable (before the matching deletes commit)."""
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def stale_pages(query, field, cutoff, page_size=RETENTION_PAGE_SIZE):
+    """
+    Page through the documents of a query whose field is older than cutoff.
+
+    :param query: CollectionReference or Query
+    :param field: Timestamp field to compare
+    :param cutoff: datetime; documents with field < cutoff are returned
+    :param page_size: Documents per page
+    :return: Generator of lists of DocumentSnapshots, oldest first
+    """
+    query = query.where(field, "<", cutoff).order_by(field).limit(page_size)
+    last = None
+    while True:
+        docs = list((query.start_after(last) if last is not None else query).stream())
+        if not docs:
+            return
+        yield docs
+        if len(docs) < page_size:
+            return
+        last = docs[-1]
+
+
+def prune_user_jobs(db, user_id, cutoff, batch, archive, stats, page_size=RETENTION_PAGE_SIZE, expired_cutoff=None):
+    """
+    Archive and delete one user's jobs added before cutoff, or expired before
+    expired_cutoff, keeping saved/applied jobs.
+
+    :param db: Firestore client
+    :param user_id: User ID
+    :param cutoff: datetime
+    :param batch: ChunkedBatch the deletes are queued on
+    :param archive: JobArchive
+    :param stats: Counter to update
+    :param page_size: Documents per page
+    :param expired_cutoff: datetime; closed postings (is_expired) expired before it are pruned too (None to skip)
+    :return: IDs of the jobs deleted
+    """
+    user_ref = db.collection("users").document(user_id)
+    jobs_ref = user_ref.collection("jobs")
+    archived_ref = user_ref.collection(ARCHIVED_JOBS_COLLECTION)
+    archived_at = datetime.now(timezone.utc)
+    passes = [("added_at", jobs_ref, cutoff)]
+    if expired_cutoff is not None:
+        passes.insert(0, ("expired_at", jobs_ref.where("is_expired", "==", True), expired_cutoff))
+
+    deleted, seen = [], set()
+    for field, query, pass_cutoff in passes:
+        for docs in stale_pages(query, field, pass_cutoff, page_size):
+            doomed = []
+            for doc in docs:
+                if doc.id in seen:
+                    continue  # Expired and old: already handled by the expired pass
+                seen.add(doc.id)
+                job = doc.to_dict() or {}
+                if is_preserved(job):
+                    stats["jobs_kept"] += 1
+                    continue
+                job.setdefault("job_id", doc.id)
+                job.setdefault("user_id", user_id)
+                archive.write(job)
+                doomed.append(doc)
+            # The archive holds a page's jobs before any of their deletes can commit
+            archive.flush()
+            for doc in doomed:
+                # The tombstone stops store_jobs storing the posting again if it is rescraped
+                batch.set(archived_ref.document(doc.id), {"archived_at": archived_at})
+                batch.delete(doc.reference)
+                deleted.append(doc.id)
+            stats["jobs_deleted"] += len(doomed)
+            if field == "expired_at" and doomed:
+                stats["expired_jobs_deleted"] += len(doomed)
+
+    if deleted and USER_FEED_ENABLED and not batch.dry_run:
+        batch.wait()
+        stats["feed_entries_removed"] += remove_from_feed(db, user_id, deleted)
+    return deleted
+
+
+def prune_matches(db, cutoff, dry_run=False, page_size=RETENTION_PAGE_SIZE, max_in_flight=RETENTION_MAX_IN_FLIGHT):
+    """
+    Delete user_job_matches records matched before cutoff that were emailed or whose job has closed.
+
+    :param db: Firestore client
+    :param cutoff: datetime
+    :param dry_run: Count without deleting
+    :param page_size: Documents per page
+    :param max_in_flight: Concurrent batch commits
+    :return: Number of records deleted
+    """
+    matches_ref = db.collection("user_job_matches")
+    # Unsent notifications for open jobs are kept whatever their age
+    queries = [matches_ref.where("notified", "==", True), matches_ref.where("job_details.is_expired", "==", True)]
+    deleted = set()
+    with ChunkedBatch(db, max_in_flight=max_in_flight, dry_run=dry_run) as batch:
+        for query in queries:
+            # Only the names are needed, plus the field the page cursor is on
+            for docs in stale_pages(query.select(["matched_at"]), "matched_at", cutoff, page_size):
+                for doc in docs:
+                    if doc.id not in deleted:
+                        deleted.add(doc.id)
+                        batch.delete(doc.reference)
+                logger.info(f"🗑️  user_job_matches: {len(deleted)} stale records queued for deletion")
+    return len(deleted)
+
+
+def prune_tombstones(db, cutoff, dry_run=False, page_size=RETENTION_PAGE_SIZE, max_in_flight=RETENTION_MAX_IN_FLIGHT):
+    """
+    Delete archived job tombstones written before cutoff, for every user.
+
+    :param db: Firestore client
+    :param cutoff: datetime
+    :param dry_run: Count without deleting
+    :param page_size: Documents per page
+    :param max_in_flight: Concurrent batch commits
+    :return: Number of tombstones deleted
+    """
+    deleted = 0
+    with ChunkedBatch(db, max_in_flight=max_in_flight, dry_run=dry_run) as batch:
+        for docs in stale_pages(db.collection_group(ARCHIVED_JOBS_COLLECTION), "archived_at", cutoff, page_size):
+            for doc in docs:
+                batch.delete(doc.reference)
+            deleted += len(docs)
+    return deleted
+
+
+def run_retention(job_days=JOB_RETENTION_DAYS, match_days=MATCH_RETENTION_DAYS, dry_run=False, restart=False,
+                  page_size=RETENTION_PAGE_SIZE, max_in_flight=RETENTION_MAX_IN_FLIGHT, archive_dir=ARCHIVE_DIR,
+                  expired_days=EXPIRED_JOB_RETENTION_DAYS):
+    """
+    Prune every user's stale jobs, then stale notification records.
+
+    :param job_days: Keep jobs added in the last job_days days (0 to skip jobs)
+    :param match_days: Keep user_job_matches from the last match_days days (0 to skip them)
+    :param dry_run: Report what would be pruned without writing
+    :param restart: Ignore a checkpoint from an interrupted run
+    :param page_size: Documents read per page
+    :param max_in_flight: Concurrent batch commits
+    :param archive_dir: Directory for the job archive
+    :param expired_days: Keep closed postings for expired_days days after they expired (negative to skip)
+    :return: Counter of stats
+    """
+    from config import get_db
+    from migrations.runner import MigrationRunner
+
+    db = get_db()
+    now = datetime.now(timezone.utc)
+    stats = Counter()
+
+    if job_days > 0:
+        cutoff = now - timedelta(days=job_days)
+        expired_cutoff = now - timedelta(days=expired_days) if expired_days >= 0 else None
+        archive = JobArchive(archive_dir, dry_run=dry_run)
+        runner = MigrationRunner("retention_jobs", db.collection("users"), page_size=page_size,
+                                 max_in_flight=max_in_flight, dry_run=dry_run, restart=restart, select=[],
+                                 checkpoint_dir=archive_dir)
+
+        def process_page(users, batch, page_stats):
+            for user in users:
+                prune_user_jobs(db, user.id, cutoff, batch, archive, page_stats, page_size, expired_cutoff)
+
+        try:
+            stats.update(runner.run(process_page))
+        finally:
+            archive.close()
+        if archive.count and not dry_run:
+            logger.info(f"📦 Archived {archive.count} jobs to {archive.path}")
+
+    if match_days > 0:
+        stats["matches_deleted"] = prune_matches(db, now - timedelta(days=match_days), dry_run, page_size, max_in_flight)
+    if TOMBSTONE_RETENTION_DAYS > 0:
+        stats["tombstones_deleted"] = prune_tombstones(db, now - timedelta(days=TOMBSTONE_RETENTION_DAYS), dry_run,
+                                                       page_size, max_in_flight)
+
+    mode = "Would prune" if dry_run else "Pruned"
+    logger.info(f"🧹 {mode} {stats['jobs_deleted']} jobs ({stats['expired_jobs_deleted']} closed postings, "
+                f"kept {stats['jobs_kept']} saved/applied) and {stats['matches_deleted']} notification records")
+    return stats
+
+
+if __name__ == "__main__":
+    from migrations.runner import migration_arg_parser
+    from utils.log import configure_logging
+
+    parser = migration_arg_parser("Archive and delete stale jobs and notification records")
+    parser.set_defaults(page_size=RETENTION_PAGE_SIZE, max_in_flight=RETENTION_MAX_IN_FLIGHT)
+    parser.add_argument("--job-days", type=int, default=JOB_RETENTION_DAYS, help="Keep jobs added in the last N days")
+    parser.add_argument("--match-days", type=int, default=MATCH_RETENTION_DAYS,
+                        help="Keep notification records from the last N days")
+    parser.add_argument("--expired-days", type=int, default=EXPIRED_JOB_RETENTION_DAYS,
+                        help="Keep closed postings for N days after they expired (-1 to keep until --job-days)")
+    parser.add_argument("--archive-dir", default=ARCHIVE_DIR, help="Where archived jobs are written")
+    args = parser.parse_args()
+    configure_logging()
+
+    run_retention(args.job_days, args.match_days, args.dry_run, args.restart,
+                  args.page_size, args.max_in_flight, args.archive_dir, args.expired_days)
@@ -1,76 +1,125 @@
 import firebase_admin
 from firebase_admin import firestore
 import hashlib
+import logging
 import time
 
-db = firestore.client()
+from google.api_core.exceptions import AlreadyExists
+
+from config import get_db
+from store.bloom import UserJobFilter
+from store.user_feed import append_to_feed, USER_FEED_ENABLED
+from store.retention import ARCHIVED_JOBS_COLLECTION
+from utils.log import EventAggregator
+
+logger = logging.getLogger(__name__)
 
 def generate_job_id(job):
     """Generate a unique identifier for a job based on its URL."""
     # Use only URL for consistency
     return hashlib.md5(job["url"].encode()).hexdigest()
 
-def store_jobs(user_id, new_jobs):
+def store_jobs(user_id, new_jobs, limit=None):
     """
     Store jobs with proper email notification tracking and source validation
+
+    :param user_id: User ID
+    :param new_jobs: Dictionary of jobs by source
+    :param limit: Store at most this many new jobs, best relevance_score first (None: no cap).
+                  Jobs the user already has don't count, so matches ranked below them still get in.
+    :return: (number stored, number of duplicates and archived jobs skipped)
     """
-    user_jobs_ref = db.collection("users").document(user_id).collection("jobs")
-    
-    total_new = 0
-    total_duplicate = 0
-
-    for source, jobs_list in new_jobs.items():
-        for job in jobs_list:
-            # Validate that job has the correct source
-            if job.get('source') != source:
-                print(f"⚠️ Source mismatch detected! Expected: {source}, Got: {job.get('source')}")
-                job["source"] = source  # Force correct source
-            
-            job_id = generate_job_id(job)
-            
-            print(f"🔍 Processing job: {job_id} - {job['title']} from {source}")
-
-            # Check if job already exists in user's collection
-            user_job_ref = user_jobs_ref.document(job_id)
-            user_job = user_job_ref.get()
-
-            if user_job.exists:
-                print(f"⚠️ Duplicate job skipped: {job['title']}")
-                total_duplicate += 1
+    db = get_db()
+    user_ref = db.collection("users").document(user_id)
+    user_jobs_ref = user_ref.collection("jobs")
+    archived_ref = user_ref.collection(ARCHIVED_JOBS_COLLECTION)
+    events = EventAggregator(logger, f"store_jobs[{user_id}]")
+
+    # Bloom filter of stored and archived job ids: definite misses skip the existence reads
+    stored_filter = UserJobFilter.load(user_id, user_jobs_ref, archived_ref=archived_ref)
+    stored_jobs = []  # For the user's feed documents
+
+    candidates = [(source, job) for source, jobs_list in new_jobs.items() for job in jobs_list]
+    if limit is not None:
+        # Best first across sources (stable, so unscored jobs keep their order)
+        candidates.sort(key=lambda candidate: -(candidate[1].get('relevance_score') or 0))
+
+    for source, job in candidates:
+        if limit is not None and events["stored"] >= limit:
+            break
+
+        # Validate that job has the correct source
+        if job.get('source') != source:
+            events.record("source_fixed", "⚠️ Source mismatch detected! Expected: %s, Got: %s", source, job.get('source'))
+            job["source"] = source  # Force correct source
+        
+        job_id = generate_job_id(job)
+
+        user_job_ref = user_jobs_ref.document(job_id)
+        possibly_stored = stored_filter.might_contain(job_id)
+
+        # Only possible hits are confirmed against Firestore
+        if possibly_stored:
+            events.record("filter_hit")
+            if user_job_ref.get().exists:
+                events.record("duplicate", "⚠️ Duplicate job skipped: %s (%s)", job['title'], job_id)
+                continue
+            # Pruned by retention (store/retention.py) but still listed by its source
+            if archived_ref.document(job_id).get().exists:
+                events.record("archived", "⚠️ Archived job skipped: %s (%s)", job['title'], job_id)
                 continue
 
-            # Prepare complete job data
-            complete_job_data = {
-                **job,  # All original job fields
-                "job_id": job_id,
-                "user_id": user_id,
-                "source": source,  # Explicitly set source
-                "added_at": firestore.SERVER_TIMESTAMP,
-                "has_applied": False,
-                "is_saved": False,
-                "notes": ""
-            }
-
-            # Store job in user's subcollection
+        # Prepare complete job data
+        complete_job_data = {
+            **job,  # All original job fields
+            "job_id": job_id,
+            "user_id": user_id,
+            "source": source,  # Explicitly set source
+            "added_at": firestore.SERVER_TIMESTAMP,
+            "has_applied": False,
+            "is_saved": False,
+            "notes": ""
+        }
+
+        # Store job in user's subcollection. A definite miss uses create(), which
+        # refuses to overwrite, so a stale local filter can't clobber an existing job
+        if possibly_stored:
             user_job_ref.set(complete_job_data)
-            
-            # Create email notification record with timestamp
-            notification_id = f"{user_id}_{job_id}_{int(time.time() * 1000000)}"
-            
+        else:
             try:
-                db.collection("user_job_matches").document(notification_id).set({
-                    "user_id": user_id,
-                    "job_id": job_id,
-                    "job_details": complete_job_data,
-                    "matched_at": firestore.SERVER_TIMESTAMP,
-                    "notified": False
-                })
-                print(f"✅ Email notification record created for: {job['title']}")
-            except Exception as e:
-                print(f"❌ Failed to create email notification: {e}")
-
-            total_new += 1
-            print(f"✅ Stored job: {job['title']} at {job.get('company', 'Unknown')} (Source: {source})")
-
-    print(f"📊 Job storage summary - New: {total_new}, Duplicates: {total_duplicate}")
-    return total_new, total_duplicate
\ No newline at end of file
+                user_job_ref.create(complete_job_data)
+            except AlreadyExists:
+                stored_filter.add(job_id)
+                events.record("duplicate", "⚠️ Duplicate job skipped: %s (%s)", job['title'], job_id)
+                continue
+        stored_filter.add(job_id)
+        stored_jobs.append(complete_job_data)
+        
+        # Create email notification record with timestamp
+        notification_id = f"{user_id}_{job_id}_{int(time.time() * 1000000)}"
+        
+        try:
+            db.collection("user_job_matches").document(notification_id).set({
+                "user_id": user_id,
+                "job_id": job_id,
+                "job_details": complete_job_data,
+                "matched_at": firestore.SERVER_TIMESTAMP,
+                "notified": False
+            })
+        except Exception as e:
+            events.record("notification_failed")
+            logger.error(f"❌ Failed to create email notification for {job_id}: {e}")
+
+        events.record("stored", "✅ Stored job: %s at %s (Source: %s)", job['title'], job.get('company', 'Unknown'), source)
+
+    stored_filter.save()
+
+    # The feed is derived data (rebuild_feed() can regenerate it), so a failure here is only logged
+    if USER_FEED_ENABLED and stored_jobs:
+        try:
+            append_to_feed(db, user_id, stored_jobs)
+        except Exception as e:
+            logger.error(f"❌ Failed to update the job feed for {user_id}: {e}")
+
+    events.summary(logging.DEBUG)
+    return events["stored"], events["duplicate"] + events["archived"]
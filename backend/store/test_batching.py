@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Tests for chunked Firestore write batches.
+
+Run with: python -m pytest store/test_batching.py
+"""
+
+import os
+import sys
+import time
+import threading
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from store.batching import ChunkedBatch, MAX_BATCH_WRITES
+from store.fake_firestore import FakeFirestore, FakeWriteBatch
+
+
+class SlowFirestore(FakeFirestore):
+    """Commits take a while; records how many ran at once."""
+
+    def __init__(self):
+        super().__init__()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._count_lock = threading.Lock()
+
+    def batch(self):
+        return SlowBatch(self)
+
+
+class SlowBatch(FakeWriteBatch):
+    def commit(self):
+        with self._db._count_lock:
+            self._db.in_flight += 1
+            self._db.max_in_flight = max(self._db.max_in_flight, self._db.in_flight)
+        time.sleep(0.05)
+        try:
+            return super().commit()
+        finally:
+            with self._db._count_lock:
+                self._db.in_flight -= 1
+
+
+def test_501st_write_starts_a_new_batch():
+    db = FakeFirestore()
+    with ChunkedBatch(db) as batch:
+        for i in range(MAX_BATCH_WRITES + 1):
+            batch.set(db.document(f"jobs/{i}"), {"n": i})
+        # The first 500 are committed as soon as the chunk is full
+        assert db.commits == [MAX_BATCH_WRITES]
+
+    assert db.commits == [MAX_BATCH_WRITES, 1]
+    assert (batch.writes, batch.commits) == (MAX_BATCH_WRITES + 1, 2)
+    assert len(db.ids("jobs")) == MAX_BATCH_WRITES + 1
+
+
+def test_chunk_size_is_capped_at_the_firestore_limit():
+    assert ChunkedBatch(FakeFirestore(), chunk_size=2000).chunk_size == MAX_BATCH_WRITES
+
+
+def test_tail_is_not_committed_when_the_block_raises():
+    db = FakeFirestore()
+    with pytest.raises(RuntimeError):
+        with ChunkedBatch(db, chunk_size=2) as batch:
+            for i in range(3):
+                batch.set(db.document(f"jobs/{i}"), {"n": i})
+            raise RuntimeError("page failed")
+
+    # The full chunk is durable, the unfinished one is dropped
+    assert db.ids("jobs") == ["0", "1"]
+
+
+def test_concurrent_commits_are_bounded():
+    db = SlowFirestore()
+    with ChunkedBatch(db, chunk_size=2, max_in_flight=3) as batch:
+        for i in range(20):
+            batch.set(db.document(f"jobs/{i}"), {"n": i})
+        batch.wait()
+        assert len(db.ids("jobs")) == 20
+
+    assert 1 < db.max_in_flight <= 3
+    assert db.commits == [2] * 10
+
+
+def test_dry_run_counts_without_writing():
+    db = FakeFirestore({"jobs/0": {"n": 0}})
+    with ChunkedBatch(db, chunk_size=2, max_in_flight=2, dry_run=True) as batch:
+        for i in range(5):
+            batch.update(db.document(f"jobs/{i}"), {"n": -1})
+
+    assert (batch.writes, batch.commits) == (5, 3)
+    assert db.commits == []
+    assert db.docs == {"jobs/0": {"n": 0}}
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
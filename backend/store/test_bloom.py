@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-user stored-job Bloom filters.
+
+Run with: python -m pytest store/test_bloom.py
+"""
+
+import os
+import sys
+import json
+from datetime import datetime, timedelta, timezone
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from store import bloom as bloom_module
+from store.bloom import BloomFilter, UserJobFilter
+from store.fake_firestore import FakeFirestore
+
+
+NOW = datetime(2026, 3, 20, 12, tzinfo=timezone.utc)
+
+
+def stored_jobs(*job_ids, added_at=NOW):
+    return {f"users/user-1/jobs/{job_id}": {"added_at": added_at} for job_id in job_ids}
+
+
+def test_bloom_has_no_false_negatives_and_few_false_positives():
+    bloom = BloomFilter(capacity=2000, error_rate=0.01)
+    for i in range(2000):
+        bloom.add(f"job-{i}")
+
+    assert all(f"job-{i}" in bloom for i in range(2000))
+    false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+    assert false_positives < 300
+
+
+def test_bloom_round_trips_through_dict():
+    bloom = BloomFilter(capacity=10)
+    bloom.add("a")
+    restored = BloomFilter.from_dict(bloom.to_dict())
+
+    assert "a" in restored and restored.count == 1
+
+
+def test_user_filter_rebuilds_once_then_loads_from_disk(tmp_path):
+    db = FakeFirestore(stored_jobs("stored-1", "stored-2"))
+    collection = db.collection("users/user-1/jobs")
+
+    first = UserJobFilter.load("user-1", collection, bloom_dir=str(tmp_path), now=NOW)
+    first.add("stored-3")
+    first.save()
+    reads = db.reads
+    second = UserJobFilter.load("user-1", collection, bloom_dir=str(tmp_path), now=NOW + timedelta(hours=1))
+
+    assert (reads, db.reads) == (2, 2)
+    assert second.might_contain("stored-1") and second.might_contain("stored-3")
+    assert not second.might_contain("never-stored")
+
+
+def test_refresh_reads_only_recently_added_jobs(tmp_path):
+    db = FakeFirestore(stored_jobs(*(f"old-{i}" for i in range(20)), added_at=NOW - timedelta(days=3)))
+    collection = db.collection("users/user-1/jobs")
+    UserJobFilter.load("user-1", collection, bloom_dir=str(tmp_path), now=NOW).save()
+
+    # Stored by another process after the filter was built
+    db.docs.update(stored_jobs("new-1", "new-2", added_at=NOW + timedelta(hours=20)))
+    reads = db.reads
+    later = NOW + timedelta(days=2)
+    refreshed = UserJobFilter.load("user-1", collection, bloom_dir=str(tmp_path), now=later)
+    refreshed.save()
+
+    assert db.reads - reads == 2
+    assert refreshed.might_contain("new-1") and refreshed.might_contain("old-0")
+    assert (refreshed.built_at, refreshed.synced_at) == (NOW, later)
+
+
+def test_full_rebuild_when_due(tmp_path):
+    db = FakeFirestore(stored_jobs("stored-1"))
+    collection = db.collection("users/user-1/jobs")
+    UserJobFilter.load("user-1", collection, bloom_dir=str(tmp_path), now=NOW).save()
+
+    later = NOW + timedelta(days=bloom_module.BLOOM_FULL_REBUILD_DAYS, hours=1)
+    rebuilt = UserJobFilter.load("user-1", collection, bloom_dir=str(tmp_path), now=later)
+
+    assert rebuilt.built_at == later and rebuilt.might_contain("stored-1")
+
+
+def test_filter_without_timezone_is_rebuilt(tmp_path):
+    db = FakeFirestore(stored_jobs("stored-1"))
+    (tmp_path / "user-1.json").write_text(
+        '{"built_at": "2026-03-20T12:00:00", "bloom": ' + json.dumps(BloomFilter(capacity=10).to_dict()) + '}')
+
+    user_filter = UserJobFilter.load("user-1", db.collection("users/user-1/jobs"), bloom_dir=str(tmp_path), now=NOW)
+
+    assert user_filter.built_at == NOW and user_filter.might_contain("stored-1")
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-v"]))
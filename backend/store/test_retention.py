@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Tests for archiving and pruning stale jobs and notification records.
+
+Run with: python -m pytest store/test_retention.py
+"""
+
+import os
+import sys
+import gzip
+import importlib
+import json
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from store import retention
+from store.batching import ChunkedBatch
+from store.bloom import UserJobFilter
+from store.fake_firestore import FakeFirestore
+
+store_jobs_module = importlib.import_module("store.store_jobs")
+
+NOW = datetime(2026, 3, 20, tzinfo=timezone.utc)
+CUTOFF = NOW - timedelta(days=30)
+
+
+def job(days_old, **fields):
+    return {"title": f"Job {days_old}", "url": f"https://example.test/{days_old}",
+            "added_at": NOW - timedelta(days=days_old), "notes": "", **fields}
+
+
+def test_stale_jobs_are_archived_then_deleted_except_saved_and_applied(tmp_path, monkeypatch):
+    monkeypatch.setattr(retention, "USER_FEED_ENABLED", False)
+    db = FakeFirestore({
+        "users/u1/jobs/old": job(40), "users/u1/jobs/older": job(90), "users/u1/jobs/saved": job(60, is_saved=True),
+        "users/u1/jobs/applied": job(45, has_applied=True), "users/u1/jobs/recent": job(3),
+    })
+    archive = retention.JobArchive(str(tmp_path), name="jobs.jsonl.gz")
+    stats = {"jobs_kept": 0, "jobs_deleted": 0}
+
+    with ChunkedBatch(db, max_in_flight=2) as batch:
+        deleted = retention.prune_user_jobs(db, "u1", CUTOFF, batch, archive, stats, page_size=2)
+    archive.close()
+
+    assert sorted(deleted) == ["old", "older"]
+    assert db.ids("users/u1/jobs") == ["applied", "recent", "saved"]
+    assert stats == {"jobs_kept": 2, "jobs_deleted": 2}
+    with gzip.open(archive.path, "rt") as f:
+        records = [json.loads(line) for line in f]
+    assert [record["job_id"] for record in records] == ["older", "old"]
+    assert records[0]["user_id"] == "u1" and "notes" not in records[0]
+    assert records[0]["added_at"].startswith("2025-12-20")
+
+
+def test_closed_postings_are_pruned_early(tmp_path, monkeypatch):
+    monkeypatch.setattr(retention, "USER_FEED_ENABLED", False)
+    closed = {"is_expired": True, "expired_at": NOW - timedelta(days=10)}
+    db = FakeFirestore({
+        "users/u1/jobs/closed": job(2, **closed),
+        "users/u1/jobs/old_closed": job(40, **closed),  # Old and closed: archived once
+        "users/u1/jobs/closed_saved": job(3, is_saved=True, **closed),
+        "users/u1/jobs/just_closed": job(4, is_expired=True, expired_at=NOW - timedelta(days=1)),
+        "users/u1/jobs/old": job(50),
+        "users/u1/jobs/open": job(5),
+    })
+    archive = retention.JobArchive(str(tmp_path), name="jobs.jsonl.gz")
+    stats = Counter()
+
+    with ChunkedBatch(db) as batch:
+        deleted = retention.prune_user_jobs(db, "u1", CUTOFF, batch, archive, stats, page_size=2,
+                                            expired_cutoff=NOW - timedelta(days=7))
+    archive.close()
+
+    assert deleted == ["closed", "old_closed", "old"]
+    assert db.ids("users/u1/jobs") == ["closed_saved", "just_closed", "open"]
+    assert stats == Counter(jobs_deleted=3, expired_jobs_deleted=2, jobs_kept=1)
+    assert archive.count == 3
+
+
+def test_pruned_job_is_not_stored_again_when_rescraped(tmp_path, monkeypatch):
+    monkeypatch.setattr(retention, "USER_FEED_ENABLED", False)
+    monkeypatch.setattr(store_jobs_module, "USER_FEED_ENABLED", False)
+    still_listed = job(40, source="unjobs")
+    job_id = store_jobs_module.generate_job_id(still_listed)
+    db = FakeFirestore({f"users/u1/jobs/{job_id}": dict(still_listed)})
+    monkeypatch.setattr(store_jobs_module, "get_db", lambda: db)
+    load = UserJobFilter.load
+
+    # The user's filter was built while the job was stored
+    bloom_dir = str(tmp_path / "bloom")
+    monkeypatch.setattr(UserJobFilter, "load",
+                        lambda user_id, ref, **kwargs: load(user_id, ref, bloom_dir=bloom_dir, **kwargs))
+    UserJobFilter.load("u1", db.collection("users/u1/jobs")).save()
+
+    with ChunkedBatch(db) as batch:
+        retention.prune_user_jobs(db, "u1", CUTOFF, batch, retention.JobArchive(str(tmp_path)), Counter())
+    assert db.ids("users/u1/jobs") == [] and db.ids("users/u1/archived_jobs") == [job_id]
+
+    # Rescraped with the filter on disk, and again with a filter rebuilt from Firestore
+    assert store_jobs_module.store_jobs("u1", {"unjobs": [dict(still_listed)]}) == (0, 1)
+    os.remove(os.path.join(bloom_dir, "u1.json"))
+    assert store_jobs_module.store_jobs("u1", {"unjobs": [dict(still_listed)]}) == (0, 1)
+    assert db.ids("users/u1/jobs") == [] and db.ids("user_job_matches") == []
+
+    # Tombstones go once the posting can't be listed any more
+    assert retention.prune_tombstones(db, datetime.now(timezone.utc) + timedelta(days=1)) == 1
+    assert db.ids("users/u1/archived_jobs") == []
+
+
+def test_stale_matches_are_deleted_in_pages_once_sent_or_closed():
+    # Even records were emailed; of the unsent ones, every tenth job has closed since
+    db = FakeFirestore({
+        f"user_job_matches/m{i}": {
+            "matched_at": NOW - timedelta(days=i),
+            "notified": i % 2 == 0,
+            "job_details": {"is_expired": True} if i % 10 == 1 else {},
+        }
+        for i in range(100)
+    })
+    stale = range(31, 100)
+    expected = [i for i in stale if i % 2 == 0 or i % 10 == 1]
+
+    assert retention.prune_matches(db, CUTOFF, dry_run=True, page_size=20) == len(expected) == 41
+    assert len(db.ids("user_job_matches")) == 100
+
+    assert retention.prune_matches(db, CUTOFF, page_size=20, max_in_flight=2) == 41
+    remaining = {int(match_id[1:]) for match_id in db.ids("user_job_matches")}
+    assert remaining == set(range(100)) - set(expected)
+    # Unsent notifications for open jobs survive whatever their age
+    assert {i for i in stale if i % 2 and i % 10 != 1} <= remaining
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests for storing matched jobs per user.
+
+Run with: python -m pytest store/test_store_jobs.py
+"""
+
+import os
+import sys
+import importlib
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import main
+from store.bloom import UserJobFilter
+from store.fake_firestore import FakeFirestore
+from store.store_jobs import store_jobs, generate_job_id
+
+# The module, not the store_jobs function that store/__init__.py re-exports under the same name
+store_jobs_module = importlib.import_module("store.store_jobs")
+
+USER = {"id": "u1", "email": "u1@example.test", "jobTitles": ["UX Designer"], "jobLocations": ["London"],
+        "maxJobsPerCycle": 2}
+
+
+def job(title, n):
+    return {"title": title, "company": f"Company {n}", "location": "London", "url": f"https://example.test/{n}"}
+
+
+CYCLE_JOBS = {"linkedin": [job("UX Designer", 1), job("Senior UX Designer", 2),
+                           job("UX Designer - Payments Platform Team", 3), job("UX Designer", 4)]}
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    db = FakeFirestore()
+    monkeypatch.setattr(store_jobs_module, "get_db", lambda: db)
+    load = UserJobFilter.load
+    monkeypatch.setattr(UserJobFilter, "load",
+                        lambda user_id, ref, **kwargs: load(user_id, ref, bloom_dir=str(tmp_path), **kwargs))
+    return db
+
+
+def stored_urls(db):
+    return {db.docs[f"users/u1/jobs/{job_id}"]["url"] for job_id in db.ids("users/u1/jobs")}
+
+
+def test_limit_counts_new_jobs_best_first(db):
+    store_jobs("u1", {"linkedin": [dict(job("A", 1), source="linkedin")]})
+    ranked = {
+        "linkedin": [dict(job("A", 1), relevance_score=0.9), dict(job("C", 3), relevance_score=0.5)],
+        "unjobs": [dict(job("B", 2), relevance_score=0.7), dict(job("D", 4), relevance_score=0.2)],
+    }
+
+    assert store_jobs("u1", ranked, limit=2) == (2, 1)
+    assert stored_urls(db) == {f"https://example.test/{n}" for n in (1, 2, 3)}
+    assert len(db.ids("user_job_matches")) == 3
+
+
+def test_new_matches_below_the_stored_top_k_are_stored_next_cycle(db):
+    for cycle in range(2):
+        matches, ledger, job_ids = main.match_jobs(CYCLE_JOBS, [USER], incremental=False)
+        main.store_matched_jobs([USER], matches, ledger, job_ids)
+        if cycle == 0:
+            first = stored_urls(db)
+            ranked = [j["url"] for j in sorted(matches[0]["linkedin"], key=lambda j: -j["relevance_score"])]
+            assert first == set(ranked[:2])
+
+    # The second cycle skips the two it stored and takes the next best two
+    assert stored_urls(db) == {j["url"] for j in CYCLE_JOBS["linkedin"]}
+    assert generate_job_id(CYCLE_JOBS["linkedin"][0]) in db.ids("users/u1/jobs")
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
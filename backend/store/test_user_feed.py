@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Tests for the chunked per-user job feed documents.
+
+Run with: python -m pytest store/test_user_feed.py
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from store import user_feed
+from store.fake_firestore import FakeFirestore, FakeTransaction
+
+ADDED = datetime(2026, 3, 1, tzinfo=timezone.utc)
+
+
+def chunk_ids(db, user_id):
+    return [doc_id for doc_id in db.ids(f"users/{user_id}/feed") if doc_id.startswith("chunk_")]
+
+
+def jobs(start, count):
+    return [{"job_id": f"job-{i}", "title": f"Designer {i}", "url": f"https://example.test/{i}",
+             "company": "Acme", "notes": "", "has_applied": False} for i in range(start, start + count)]
+
+
+def store(db, user_id, new_jobs, chunk_size=4):
+    """Write jobs to users/{id}/jobs, then append them to the feed, as store_jobs does."""
+    for job in new_jobs:
+        number = int(job["job_id"].split("-")[1])
+        db.docs[f"users/{user_id}/jobs/{job['job_id']}"] = dict(job, added_at=ADDED + timedelta(minutes=number))
+    return user_feed.append_to_feed(db, user_id, new_jobs, chunk_size=chunk_size)
+
+
+def feed_ids(db, user_id):
+    ids, page, more = [], 0, True
+    while more:
+        summaries, more = user_feed.read_feed(db, user_id, page)
+        ids += [summary["job_id"] for summary in summaries]
+        page += 1
+    return ids
+
+
+def test_appends_fill_the_head_and_roll_over():
+    db = FakeFirestore()
+    store(db, "u1", jobs(0, 3))
+    store(db, "u1", jobs(3, 6))
+
+    assert len(chunk_ids(db, "u1")) == 3
+    meta = db.docs["users/u1/feed/meta"]
+    assert (meta["chunks"], meta["total"]) == (3, 9)
+
+    # The head holds only job-8 after the rollover; page 0 is filled from the chunk before it
+    db.reads = 0
+    page, more = user_feed.read_feed(db, "u1")
+    assert [job["job_id"] for job in page] == ["job-8", "job-7", "job-6", "job-5"]
+    assert more and db.reads == 3
+    page, more = user_feed.read_feed(db, "u1", page=1)
+    assert [job["job_id"] for job in page] == ["job-4", "job-3", "job-2", "job-1"]
+    # Only the fields the dashboard lists, never mutable flags
+    assert set(page[0]) == {"job_id", "title", "company", "url", "added_at"}
+    page, more = user_feed.read_feed(db, "u1", page=2)
+    assert [job["job_id"] for job in page] == ["job-0"] and not more
+    assert user_feed.read_feed(db, "u1", page=3) == ([], False)
+
+
+def test_full_head_is_a_page_on_its_own():
+    db = FakeFirestore()
+    store(db, "u1", jobs(0, 8))
+
+    db.reads = 0
+    page, more = user_feed.read_feed(db, "u1")
+    assert [job["job_id"] for job in page] == ["job-7", "job-6", "job-5", "job-4"]
+    assert more and db.reads == 2
+    assert feed_ids(db, "u1") == [f"job-{i}" for i in reversed(range(8))]
+
+
+def test_remove_compacts_and_deletes_spare_chunks():
+    db = FakeFirestore()
+    store(db, "u1", jobs(0, 9))
+
+    removed = user_feed.remove_from_feed(db, "u1", {"job-0", "job-1", "job-2", "job-5"}, chunk_size=4)
+
+    assert removed == 4
+    assert len(chunk_ids(db, "u1")) == 2
+    assert db.docs["users/u1/feed/meta"]["total"] == 5
+    newest, _ = user_feed.read_feed(db, "u1")
+    older, more = user_feed.read_feed(db, "u1", page=1)
+    assert [job["job_id"] for job in newest + older] == ["job-8", "job-7", "job-6", "job-4", "job-3"]
+    assert not more
+
+
+def test_first_append_builds_the_feed_from_stored_history():
+    db = FakeFirestore()
+    for job in jobs(0, 5):
+        db.docs[f"users/u1/jobs/{job['job_id']}"] = dict(job, added_at=ADDED + timedelta(minutes=int(job["job_id"][4:])))
+
+    assert store(db, "u1", jobs(5, 2)) == 7
+    assert feed_ids(db, "u1") == [f"job-{i}" for i in reversed(range(7))]
+    assert db.docs["users/u1/feed/meta"]["total"] == 7
+
+
+def test_concurrent_appends_are_retried_not_lost(monkeypatch):
+    db = FakeFirestore()
+    store(db, "u1", jobs(0, 3))
+    real_commit = FakeTransaction._commit
+    raced = []
+
+    def commit_after_another_append(transaction):
+        if not raced:
+            # Another store_jobs call for the same user lands between our reads and our commit
+            raced.append(True)
+            store(db, "u1", jobs(3, 2))
+        real_commit(transaction)
+
+    monkeypatch.setattr(FakeTransaction, "_commit", commit_after_another_append)
+    store(db, "u1", jobs(5, 3))
+
+    assert sorted(feed_ids(db, "u1"), key=lambda job_id: int(job_id[4:])) == [f"job-{i}" for i in range(8)]
+    assert db.docs["users/u1/feed/meta"]["total"] == 8
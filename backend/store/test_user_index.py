@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Tests for the incrementally maintained user preference index, against an
+in-process fake of the users collection.
+
+Run with: python -m pytest store/test_user_index.py
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from store.user_index import UserPreferenceIndex, LISTEN, POLL
+
+
+class FakeDoc:
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data) if self._data is not None else None
+
+
+class FakeChangeType:
+    def __init__(self, name):
+        self.name = name
+
+
+class FakeChange:
+    def __init__(self, kind, doc):
+        self.type = FakeChangeType(kind)
+        self.document = doc
+
+
+class FakeWatch:
+    def __init__(self, collection):
+        self.collection = collection
+
+    def unsubscribe(self):
+        self.collection.listeners.clear()
+
+
+class FakeUsersCollection:
+    """Just enough of a CollectionReference: stream, where(">") and on_snapshot."""
+
+    def __init__(self, docs):
+        self.docs = dict(docs)
+        self.listeners = []
+        self.streamed = 0
+        self._after = None
+
+    def stream(self):
+        self.streamed += 1
+        return [
+            FakeDoc(doc_id, data) for doc_id, data in self.docs.items()
+            if self._after is None or (data.get("updatedAt") or "") > self._after
+        ]
+
+    def where(self, field, op, value):
+        assert (field, op) == ("updatedAt", ">")
+        query = FakeUsersCollection(self.docs)
+        query._after = value
+        return query
+
+    def on_snapshot(self, callback):
+        self.listeners.append(callback)
+        callback(None, [FakeChange("ADDED", FakeDoc(doc_id, data)) for doc_id, data in self.docs.items()], None)
+        return FakeWatch(self)
+
+    def write(self, doc_id, data):
+        kind = "MODIFIED" if doc_id in self.docs else "ADDED"
+        self.docs[doc_id] = data
+        for callback in self.listeners:
+            callback(None, [FakeChange(kind, FakeDoc(doc_id, data))], None)
+
+    def delete(self, doc_id):
+        data = self.docs.pop(doc_id)
+        for callback in self.listeners:
+            callback(None, [FakeChange("REMOVED", FakeDoc(doc_id, data))], None)
+
+
+def user(titles, locations, updated_at="2026-01-01T00:00:00Z"):
+    return {"email": "someone@example.test", "jobTitles": titles, "jobLocations": locations, "updatedAt": updated_at}
+
+
+def initial_users():
+    return {
+        "alice": user(["UX Designer"], ["London"]),
+        "bob": user(["ux designer", "Researcher"], ["Manchester"]),
+        "carol": user([], ["Leeds"]),  # No titles - not indexed
+    }
+
+
+def test_listener_keeps_postings_current():
+    users = FakeUsersCollection(initial_users())
+    index = UserPreferenceIndex(users, mode=LISTEN).start()
+
+    assert set(index.users) == {"alice", "bob"}
+    assert index.users_for_title("UX Designer ") == {"alice", "bob"}
+    assert users.streamed == 0
+
+    users.write("alice", user(["Product Designer"], ["London", "Remote"]))
+    users.delete("bob")
+    users.write("carol", user(["Researcher"], ["Leeds"]))
+
+    assert index.users_for_title("ux designer") == set()
+    assert index.users_for_title("product designer") == {"alice"}
+    assert index.users_for_location("remote") == {"alice"}
+    assert index.users_for_title("researcher") == {"carol"}
+    assert "ux designer" not in index.users_by_title
+    assert index.title_location_pairs() == {
+        ("Product Designer", "London"), ("Product Designer", "Remote"), ("Researcher", "Leeds"),
+    }
+
+    index.stop()
+    users.write("dave", user(["Chef"], ["York"]))
+    assert "dave" not in index.users
+
+
+def test_poll_reads_only_changed_users():
+    users = FakeUsersCollection(initial_users())
+    now = [datetime(2026, 1, 1, 12, 0)]
+    index = UserPreferenceIndex(users, mode=POLL, clock=lambda: now[0]).start()
+    assert users.streamed == 1
+    assert index.refresh() == 0
+
+    users.docs["bob"] = user(["Researcher"], ["Manchester"], updated_at="2026-01-02T00:00:00Z")
+    users.docs["erin"] = user(["Chef"], ["York"], updated_at="2026-01-02T00:00:01Z")
+    version = index.version
+    assert index.refresh() == 2
+    assert index.users_for_title("ux designer") == {"alice"}
+    assert index.users_for_title("chef") == {"erin"}
+    assert index.version > version
+
+    # Deletions only show up on the periodic full reload
+    del users.docs["alice"]
+    assert index.refresh() == 0
+    now[0] += timedelta(hours=7)
+    index.refresh()
+    assert set(index.users) == {"bob", "erin"}
@@ -0,0 +1,275 @@
+# store/user_feed.py
+
+"""
+Precomputed job feed per user.
+
+The dashboard used to read users/{id}/jobs and join every document with
+jobs_compiled, so a page view cost one read per job. The cycle now also keeps
+denormalised feed documents:
+
+    users/{id}/feed/meta          {"chunks": 3, "total": 412, "chunk_size": 200, "updated_at": ...}
+    users/{id}/feed/chunk_000000  {"index": 0, "jobs": [summary, ...]}   oldest jobs
+    users/{id}/feed/chunk_000002  {"index": 2, "jobs": [...]}            newest jobs (the head)
+
+Each chunk holds up to FEED_CHUNK_SIZE compact job summaries in the order they
+were added. Page 0 of the feed is the newest chunk_size summaries, newest
+first, so a dashboard page is at most three reads (meta, the head and the
+chunk before it) however many jobs the user has. store_jobs
+appends new jobs to the head as they are stored, in a transaction; a user
+with no feed yet gets it built from all their stored jobs on that first
+append. rebuild_feed() regenerates a feed from users/{id}/jobs (bulk
+backfill, or repair after a failed append):
+
+    python -m store.user_feed [user_id ...]
+
+Summaries hold only fields that don't change after storage. Saved, applied
+and archived flags stay on the job documents: the frontend's getUserJobs
+(frontend/lib/data/jobDataUtils.js) reads the feed chunks and overlays the
+few flagged job documents on them, and falls back to querying
+users/{id}/jobs when a user has no feed yet.
+"""
+
+import os
+import logging
+from datetime import datetime, timezone
+
+from store.batching import ChunkedBatch
+
+logger = logging.getLogger(__name__)
+
+USER_FEED_ENABLED = os.getenv("USER_FEED_ENABLED", "true").lower() == "true"
+FEED_CHUNK_SIZE = int(os.getenv("FEED_CHUNK_SIZE", "200"))  # Summaries per document (well under 1 MiB)
+FEED_COLLECTION = "feed"
+FEED_META_ID = "meta"
+
+SUMMARY_FIELDS = ("job_id", "title", "company", "location", "url", "source",
+                  "salary", "date_posted", "date_added", "relevance_score")
+
+
+def chunk_id(index):
+    return f"chunk_{index:06d}"
+
+
+def _timestamp(value=None):
+    """ISO string for a datetime/Firestore timestamp (now when None or unset)."""
+    if not isinstance(value, datetime):
+        value = datetime.now(timezone.utc)
+    return value.isoformat(timespec="seconds")
+
+
+def job_summary(job, added_at=None):
+    """
+    :param job: Stored job dictionary
+    :param added_at: When the job was added (default: now)
+    :return: Compact summary for a feed chunk
+    """
+    summary = {field: job[field] for field in SUMMARY_FIELDS if job.get(field) is not None}
+    summary["added_at"] = _timestamp(added_at)
+    return summary
+
+
+def _feed_ref(db, user_id):
+    return db.collection("users").document(user_id).collection(FEED_COLLECTION)
+
+
+def _write_meta(batch, feed_ref, chunks, total, chunk_size):
+    batch.set(feed_ref.document(FEED_META_ID), {
+        "chunks": chunks,
+        "total": total,
+        "chunk_size": chunk_size,
+        "updated_at": _timestamp(),
+    })
+
+
+def append_to_feed(db, user_id, jobs, chunk_size=FEED_CHUNK_SIZE):
+    """
+    Add newly stored jobs to the head of a user's feed.
+
+    Reads the meta and head chunk (2 reads) and writes the head, any new
+    chunks and the meta in one transaction, so concurrent appends for the
+    same user (a cycle and an instant search, say) are retried instead of
+    overwriting each other. A user without a feed yet gets one rebuilt from
+    all their stored jobs, which already include the new ones.
+
+    :param db: Firestore client
+    :param user_id: User ID
+    :param jobs: Newly stored job dictionaries, oldest first
+    :param chunk_size: Summaries per chunk document
+    :return: Number of summaries appended (or in the rebuilt feed)
+    """
+    from firebase_admin import firestore
+
+    if not jobs:
+        return 0
+    feed_ref = _feed_ref(db, user_id)
+    now = datetime.now(timezone.utc)
+    new_summaries = [job_summary(job, now) for job in jobs]
+
+    @firestore.transactional
+    def append(transaction):
+        meta_snapshot = feed_ref.document(FEED_META_ID).get(transaction=transaction)
+        if not meta_snapshot.exists:
+            return None
+        meta = meta_snapshot.to_dict() or {}
+        chunks = meta.get("chunks", 0)
+        total = meta.get("total", 0)
+
+        head_index = max(chunks - 1, 0)
+        head = []
+        if chunks:
+            head_snapshot = feed_ref.document(chunk_id(head_index)).get(transaction=transaction)
+            head = (head_snapshot.to_dict() or {}).get("jobs", []) if head_snapshot.exists else []
+
+        index, summaries, pending = head_index, head, new_summaries
+        while pending:
+            room = chunk_size - len(summaries)
+            if room <= 0:
+                index, summaries = index + 1, []
+                continue
+            summaries = summaries + pending[:room]
+            pending = pending[room:]
+            transaction.set(feed_ref.document(chunk_id(index)), {"index": index, "jobs": summaries})
+        _write_meta(transaction, feed_ref, index + 1, total + len(jobs), chunk_size)
+        return index + 1
+
+    chunks = append(db.transaction())
+    if chunks is None:
+        # Users stored before feeds existed would otherwise only see jobs from now on
+        return rebuild_feed(db, user_id, chunk_size)
+
+    logger.debug(f"📰 Appended {len(jobs)} jobs to the feed of {user_id} ({chunks} chunks)")
+    return len(jobs)
+
+
+def write_feed(db, user_id, summaries, chunk_size=FEED_CHUNK_SIZE):
+    """
+    Replace a user's feed with the given summaries, deleting chunks no longer needed.
+
+    :param db: Firestore client
+    :param user_id: User ID
+    :param summaries: Job summaries, oldest first
+    :param chunk_size: Summaries per chunk document
+    :return: Number of chunks written
+    """
+    feed_ref = _feed_ref(db, user_id)
+    meta_snapshot = feed_ref.document(FEED_META_ID).get()
+    old_chunks = (meta_snapshot.to_dict() or {}).get("chunks", 0) if meta_snapshot.exists else 0
+
+    chunks = -(-len(summaries) // chunk_size)
+    with ChunkedBatch(db) as batch:
+        for index in range(chunks):
+            batch.set(feed_ref.document(chunk_id(index)), {
+                "index": index,
+                "jobs": summaries[index * chunk_size:(index + 1) * chunk_size],
+            })
+        for index in range(chunks, old_chunks):
+            batch.delete(feed_ref.document(chunk_id(index)))
+        _write_meta(batch, feed_ref, chunks, len(summaries), chunk_size)
+    return chunks
+
+
+def rebuild_feed(db, user_id, chunk_size=FEED_CHUNK_SIZE):
+    """
+    Regenerate a user's feed from users/{id}/jobs.
+
+    :param db: Firestore client
+    :param user_id: User ID
+    :param chunk_size: Summaries per chunk document
+    :return: Number of jobs in the feed
+    """
+    from firebase_admin import firestore
+
+    jobs_ref = db.collection("users").document(user_id).collection("jobs")
+    summaries = []
+    for doc in jobs_ref.order_by("added_at", direction=firestore.Query.ASCENDING).stream():
+        job = doc.to_dict() or {}
+        if job.get("is_expired"):
+            continue  # Closed postings (liveness.py) stay out of the feed
+        job.setdefault("job_id", doc.id)
+        summaries.append(job_summary(job, job.get("added_at")))
+    write_feed(db, user_id, summaries, chunk_size)
+    logger.info(f"📰 Rebuilt the feed of {user_id}: {len(summaries)} jobs")
+    return len(summaries)
+
+
+def remove_from_feed(db, user_id, job_ids, chunk_size=FEED_CHUNK_SIZE):
+    """
+    Drop jobs from a user's feed and compact it (reads every chunk - for pruning, not page views).
+
+    :param db: Firestore client
+    :param user_id: User ID
+    :param job_ids: IDs of the jobs to drop
+    :param chunk_size: Summaries per chunk document
+    :return: Number of summaries removed
+    """
+    job_ids = set(job_ids)
+    if not job_ids:
+        return 0
+    feed_ref = _feed_ref(db, user_id)
+    meta_snapshot = feed_ref.document(FEED_META_ID).get()
+    if not meta_snapshot.exists:
+        return 0
+    chunks = (meta_snapshot.to_dict() or {}).get("chunks", 0)
+
+    by_index = {}
+    for snapshot in db.get_all([feed_ref.document(chunk_id(index)) for index in range(chunks)]):
+        if snapshot.exists:
+            chunk = snapshot.to_dict() or {}
+            by_index[chunk.get("index", 0)] = chunk.get("jobs", [])
+    # get_all() doesn't promise request order
+    summaries = [summary for index in sorted(by_index) for summary in by_index[index]]
+    kept = [summary for summary in summaries if summary.get("job_id") not in job_ids]
+    if len(kept) != len(summaries):
+        write_feed(db, user_id, kept, chunk_size)
+    return len(summaries) - len(kept)
+
+
+def read_feed(db, user_id, page=0):
+    """
+    One page of a user's feed, newest first (meta + at most 2 chunk reads).
+
+    Pages are chunk_size summaries counted back from the newest, not chunks:
+    the head chunk can hold a single summary right after a rollover, so page
+    0 takes the rest from the chunk before it. Every chunk but the head is
+    full, so a page never spans more than two chunks.
+
+    :param db: Firestore client
+    :param user_id: User ID
+    :param page: 0 for the newest jobs, 1 for the page before, ...
+    :return: (list of job summaries, whether older pages exist)
+    """
+    feed_ref = _feed_ref(db, user_id)
+    meta_snapshot = feed_ref.document(FEED_META_ID).get()
+    meta = (meta_snapshot.to_dict() or {}) if meta_snapshot.exists else {}
+    chunk_size = meta.get("chunk_size") or FEED_CHUNK_SIZE
+    end = meta.get("total", 0) - page * chunk_size
+    if end <= 0 or page < 0:
+        return [], False
+    start = max(end - chunk_size, 0)
+
+    first, last = start // chunk_size, (end - 1) // chunk_size
+    by_index = {}
+    for snapshot in db.get_all([feed_ref.document(chunk_id(index)) for index in range(first, last + 1)]):
+        if snapshot.exists:
+            chunk = snapshot.to_dict() or {}
+            by_index[chunk.get("index", 0)] = chunk.get("jobs", [])
+    summaries = [summary for index in sorted(by_index) for summary in by_index[index]]
+    offset = first * chunk_size
+    return list(reversed(summaries[start - offset:end - offset])), start > 0
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from config import get_db
+    from utils.log import configure_logging
+
+    parser = argparse.ArgumentParser(description="Rebuild users' job feed documents from their stored jobs")
+    parser.add_argument("user_ids", nargs="*", help="Users to rebuild (default: every user)")
+    args = parser.parse_args()
+    configure_logging()
+
+    db = get_db()
+    user_ids = args.user_ids or [doc.id for doc in db.collection("users").select([]).stream()]
+    for user_id in user_ids:
+        rebuild_feed(db, user_id)
@@ -0,0 +1,218 @@
+# store/user_index.py
+
+"""
+In-memory index of user job preferences, kept current without re-reading `users`.
+
+The index loads the collection once and then follows changes:
+
+- "listen": a Firestore snapshot listener pushes added/modified/removed users
+- "poll":   refresh() reads only users whose `updatedAt` moved past the newest
+            value seen, with a full reload every USER_INDEX_FULL_RELOAD_HOURS
+            (polling can't see deletions, or writes that don't set updatedAt)
+
+Title and location postings (lowercased value -> user ids) are updated per
+change, so matching and query planning read them directly:
+
+    index = UserPreferenceIndex(get_db().collection("users"))
+    index.start()
+    users = index.users_list()
+    pairs = index.title_location_pairs()
+"""
+
+import logging
+from datetime import datetime, timedelta
+from threading import Event, RLock
+
+logger = logging.getLogger(__name__)
+
+LISTEN = "listen"
+POLL = "poll"
+USER_INDEX_FULL_RELOAD_HOURS = 6
+INITIAL_SNAPSHOT_TIMEOUT_SECONDS = 60
+
+
+def user_from_document(user_id, user_data):
+    """
+    Build the user dictionary used by matching and notifications.
+
+    :param user_id: Firestore document ID
+    :param user_data: Document fields
+    :return: User dictionary, or None if the user has no job preferences
+    """
+    user_data = user_data or {}
+    # Only users with job preferences set take part in matching
+    if not (user_data.get("jobTitles") and user_data.get("jobLocations")):
+        return None
+    return {
+        "id": user_id,
+        "jobTitles": user_data.get("jobTitles", []),
+        "jobLocations": user_data.get("jobLocations", []),
+        "email": user_data.get("email", ""),
+        "emailNotificationsEnabled": user_data.get("emailNotificationsEnabled", True),
+        "maxJobsPerCycle": user_data.get("maxJobsPerCycle"),
+    }
+
+
+def _keys(values):
+    return {value.lower().strip() for value in values if isinstance(value, str) and value.strip()}
+
+
+class UserPreferenceIndex:
+    """Users with preferences plus title/location postings, updated incrementally."""
+
+    def __init__(self, collection, mode=LISTEN, full_reload_hours=USER_INDEX_FULL_RELOAD_HOURS, clock=datetime.now):
+        """
+        :param collection: users CollectionReference (or a compatible fake)
+        :param mode: LISTEN (snapshot listener) or POLL (updatedAt diff on refresh())
+        :param full_reload_hours: How often POLL mode re-reads the whole collection
+        :param clock: Callable returning the current datetime
+        """
+        if mode not in (LISTEN, POLL):
+            raise ValueError(f"Unknown user index mode: {mode}")
+        self.collection = collection
+        self.mode = mode
+        self.full_reload_hours = full_reload_hours
+        self.clock = clock
+
+        self.users = {}               # user id -> user dictionary
+        self.users_by_title = {}      # lowercased title -> set of user ids
+        self.users_by_location = {}   # lowercased location -> set of user ids
+        self.version = 0              # Bumped on every change, for callers caching derived structures
+
+        self._lock = RLock()
+        self._cursor = None           # Newest updatedAt seen (POLL mode)
+        self._loaded_at = None
+        self._watch = None
+        self._initial_snapshot = Event()
+
+    # -- keeping current --------------------------------------------------
+
+    def start(self):
+        """Load the collection and begin following changes."""
+        if self.mode == LISTEN:
+            self._watch = self.collection.on_snapshot(self._on_snapshot)
+            # The first snapshot delivers every document as ADDED
+            if not self._initial_snapshot.wait(INITIAL_SNAPSHOT_TIMEOUT_SECONDS):
+                logger.warning("⚠️ User index listener hasn't delivered its first snapshot yet")
+        else:
+            self.reload()
+        return self
+
+    def stop(self):
+        if self._watch is not None:
+            self._watch.unsubscribe()
+            self._watch = None
+
+    def reload(self):
+        """Rebuild from a full read of the collection."""
+        users = {}
+        cursor = None
+        for doc in self.collection.stream():
+            data = doc.to_dict() or {}
+            users[doc.id] = data
+            updated_at = data.get("updatedAt")
+            if updated_at and (cursor is None or updated_at > cursor):
+                cursor = updated_at
+
+        with self._lock:
+            self.users.clear()
+            self.users_by_title.clear()
+            self.users_by_location.clear()
+            for user_id, data in users.items():
+                self._apply(user_id, data)
+            self._cursor = cursor
+            self._loaded_at = self.clock()
+            self.version += 1
+        logger.info(f"👥 Loaded user index: {len(self.users)} users with preferences, "
+                    f"{len(self.users_by_title)} titles, {len(self.users_by_location)} locations")
+
+    def refresh(self):
+        """
+        Bring the index up to date in POLL mode (no-op when listening).
+
+        :return: Number of users changed
+        """
+        if self.mode != POLL:
+            return 0
+        if self._loaded_at is None or self.clock() - self._loaded_at >= timedelta(hours=self.full_reload_hours):
+            self.reload()
+            return len(self.users)
+
+        query = self.collection.where("updatedAt", ">", self._cursor) if self._cursor else self.collection
+        changed = 0
+        with self._lock:
+            for doc in query.stream():
+                data = doc.to_dict() or {}
+                self._apply(doc.id, data)
+                if data.get("updatedAt") and (self._cursor is None or data["updatedAt"] > self._cursor):
+                    self._cursor = data["updatedAt"]
+                changed += 1
+            if changed:
+                self.version += 1
+        if changed:
+            logger.info(f"👥 User index: {changed} users changed since last poll")
+        return changed
+
+    def _on_snapshot(self, collection_snapshot, changes, read_time):
+        with self._lock:
+            for change in changes:
+                if change.type.name == "REMOVED":
+                    self._remove(change.document.id)
+                else:
+                    self._apply(change.document.id, change.document.to_dict())
+            if changes:
+                self.version += 1
+        if self._initial_snapshot.is_set():
+            logger.debug(f"👥 User index: {len(changes)} users changed")
+        else:
+            self._loaded_at = self.clock()
+            self._initial_snapshot.set()
+            logger.info(f"👥 User index listening: {len(self.users)} users with preferences")
+
+    def _apply(self, user_id, user_data):
+        self._remove(user_id)
+        user = user_from_document(user_id, user_data)
+        if user is None:
+            return
+        self.users[user_id] = user
+        for title in _keys(user["jobTitles"]):
+            self.users_by_title.setdefault(title, set()).add(user_id)
+        for location in _keys(user["jobLocations"]):
+            self.users_by_location.setdefault(location, set()).add(user_id)
+
+    def _remove(self, user_id):
+        user = self.users.pop(user_id, None)
+        if user is None:
+            return
+        for postings, values in ((self.users_by_title, user["jobTitles"]), (self.users_by_location, user["jobLocations"])):
+            for key in _keys(values):
+                ids = postings.get(key)
+                if ids is not None:
+                    ids.discard(user_id)
+                    if not ids:
+                        del postings[key]
+
+    # -- reading ----------------------------------------------------------
+
+    def users_list(self):
+        """Current users with preferences, in the shape main.get_subscribed_users returns."""
+        with self._lock:
+            return [dict(user) for user in self.users.values()]
+
+    def users_for_title(self, title):
+        with self._lock:
+            return set(self.users_by_title.get(title.lower().strip(), ()))
+
+    def users_for_location(self, location):
+        with self._lock:
+            return set(self.users_by_location.get(location.lower().strip(), ()))
+
+    def title_location_pairs(self):
+        """Unique (title, location) search pairs across all users, for scraper planning."""
+        with self._lock:
+            return {
+                (title, location)
+                for user in self.users.values()
+                for title in user["jobTitles"]
+                for location in user["jobLocations"]
+            }
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Tests for per-source cadences and persisted state in the job daemon.
+
+Run with: python -m pytest test_daemon.py
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import daemon
+from fetch.registry import ScraperSource, TITLE_LOCATION, GLOBAL_LISTING
+
+SOURCES = [
+    ScraperSource("linkedin", "fetch.linkedin", "fetch_linkedin_jobs", TITLE_LOCATION),
+    ScraperSource("ifyoucould", "fetch.ifyoucould", "fetch_ifyoucould_jobs", GLOBAL_LISTING),
+]
+CADENCES = {"linkedin": 60, "ifyoucould": 480}
+USERS = [{"id": "u1", "email": "a@example.test", "jobTitles": ["Designer"], "jobLocations": ["London"]}]
+
+
+class Clock:
+    def __init__(self):
+        self.now = datetime(2026, 1, 1, 9, 0)
+
+    def __call__(self):
+        return self.now
+
+
+def make_daemon(monkeypatch, tmp_path, clock):
+    cycles = []
+    monkeypatch.setattr(daemon, "get_subscribed_users", lambda: USERS)
+    monkeypatch.setattr(daemon, "job_cycle", lambda users, sources: cycles.append([s.name for s in sources]) or True)
+    monkeypatch.setattr(daemon, "send_email_notifications", lambda users: True)
+    monkeypatch.setattr(daemon.JobDaemon, "_flush_caches", lambda self: None)
+    job_daemon = daemon.JobDaemon(SOURCES, CADENCES, state_file=str(tmp_path / "state.json"), clock=clock)
+    return job_daemon, cycles
+
+
+def test_parse_cadences():
+    assert daemon.parse_cadences("linkedin=30, ifyoucould=240,bad,") == {"linkedin": 30, "ifyoucould": 240}
+
+
+def test_sources_run_on_their_own_cadence(monkeypatch, tmp_path):
+    clock = Clock()
+    job_daemon, cycles = make_daemon(monkeypatch, tmp_path, clock)
+
+    assert job_daemon.tick()
+    clock.now += timedelta(minutes=30)
+    assert not job_daemon.tick()
+    clock.now += timedelta(minutes=30)
+    job_daemon.tick()
+    clock.now += timedelta(hours=7)
+    job_daemon.tick()
+
+    assert cycles == [["linkedin", "ifyoucould"], ["linkedin"], ["linkedin", "ifyoucould"]]
+
+
+def test_state_survives_restart(monkeypatch, tmp_path):
+    clock = Clock()
+    job_daemon, cycles = make_daemon(monkeypatch, tmp_path, clock)
+    job_daemon.tick()
+
+    clock.now += timedelta(minutes=90)
+    restarted, cycles = make_daemon(monkeypatch, tmp_path, clock)
+    restarted.tick()
+
+    assert cycles == [["linkedin"]]
+    assert restarted.state["cycles"] == 2
+
+
+def test_failed_cycle_waits_for_next_slot(monkeypatch, tmp_path):
+    clock = Clock()
+    job_daemon, _ = make_daemon(monkeypatch, tmp_path, clock)
+
+    def fail(users, sources):
+        raise RuntimeError("firestore unavailable")
+
+    monkeypatch.setattr(daemon, "job_cycle", fail)
+    assert not job_daemon.tick()
+    assert job_daemon.due_sources() == []
+
+
+def test_hourly_cycles_send_one_email_a_day(monkeypatch, tmp_path):
+    clock = Clock()
+    job_daemon, cycles = make_daemon(monkeypatch, tmp_path, clock)
+    sent = []
+    monkeypatch.setattr(daemon, "send_email_notifications", lambda users: sent.append(clock.now) or True)
+
+    for _ in range(48):
+        job_daemon.tick()
+        clock.now += timedelta(hours=1)
+
+    assert len(cycles) == 48
+    assert sent == [datetime(2026, 1, 1, 9, 0), datetime(2026, 1, 2, 9, 0)]
+
+    # Jobs stored after the second email go out a day later; then nothing more is stored
+    monkeypatch.setattr(daemon, "job_cycle", lambda users, sources: False)
+    clock.now += timedelta(days=1)
+    job_daemon.tick()
+    clock.now += timedelta(days=1)
+    job_daemon.tick()
+    assert len(sent) == 3
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Tests for instant searches from the recent jobs index, with a live fallback.
+
+Run with: python -m pytest test_instant_search.py
+"""
+
+import os
+import sys
+import json
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import instant_search
+
+CYCLE_JOBS = {
+    "linkedin": [
+        {"title": "Senior UX Designer", "company": "Acme", "location": "London, England, United Kingdom",
+         "url": "https://example.test/1"},
+        {"title": "Chef", "company": "Bistro", "location": "London", "url": "https://example.test/2"},
+    ],
+    "unjobs": [
+        {"title": "UX Designer", "company": "UN", "location": "Geneva, Switzerland", "url": "https://example.test/3"},
+    ],
+}
+
+
+def make_index(tmp_path):
+    index = instant_search.RecentJobsIndex(str(tmp_path / "recent_jobs.json"))
+    index.add_jobs(CYCLE_JOBS)
+    index.save()
+    return index
+
+
+def capture_stores(monkeypatch):
+    stored = {}
+
+    def fake_store(user_id, user_jobs):
+        stored[user_id] = user_jobs
+        return sum(len(jobs) for jobs in user_jobs.values()), 0
+
+    monkeypatch.setattr(instant_search, "store_jobs", fake_store)
+    return stored
+
+
+def test_matches_from_the_index(tmp_path, monkeypatch):
+    stored = capture_stores(monkeypatch)
+    # Written by the cycle, read back by the service process
+    index = instant_search.RecentJobsIndex(make_index(tmp_path).jobs_file)
+
+    result = instant_search.instant_search("u1", ["ux designer"], ["London"], live=False, index=index)
+
+    assert result["source"] == "index"
+    assert result["new"] == 1
+    assert [job["url"] for job in stored["u1"]["linkedin"]] == ["https://example.test/1"]
+
+
+def test_live_search_when_the_index_has_nothing(tmp_path, monkeypatch):
+    stored = capture_stores(monkeypatch)
+    index = make_index(tmp_path)
+    calls = []
+
+    def fake_fetch(pairs, sources):
+        calls.append(pairs)
+        return {"linkedin": [{"title": "Data Analyst", "company": "Beta", "location": "Leeds",
+                              "url": "https://example.test/9"}]}
+
+    import fetch.run_scrapers
+    monkeypatch.setattr(fetch.run_scrapers, "fetch_jobs", fake_fetch)
+
+    result = instant_search.instant_search("u2", ["Data Analyst"], ["Leeds", "York", "Hull"], index=index)
+
+    assert result["source"] == "live"
+    assert calls == [[("Data Analyst", "Leeds"), ("Data Analyst", "York")]]
+    assert stored["u2"]["linkedin"][0]["url"] == "https://example.test/9"
+    # Live results join the index for the next new user
+    assert instant_search.RecentJobsIndex(index.jobs_file).search(
+        {"jobTitles": ["data analyst"], "jobLocations": ["Leeds"]})
+
+
+def test_http_handler(tmp_path, monkeypatch):
+    capture_stores(monkeypatch)
+    index = make_index(tmp_path)
+    monkeypatch.setattr(instant_search, "get_recent_jobs_index", lambda: index)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), instant_search.InstantSearchHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/instant-search"
+        body = json.dumps({"userId": "u3", "jobTitles": ["Chef"], "jobLocations": ["London"]}).encode()
+        request = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=10) as response:
+            result = json.load(response)
+        assert response.status == 200
+        assert result["matched"] == 1 and result["source"] == "index"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_live_search_turned_away_when_busy(tmp_path, monkeypatch):
+    capture_stores(monkeypatch)
+    index = make_index(tmp_path)
+    monkeypatch.setattr(instant_search, "get_recent_jobs_index", lambda: index)
+    monkeypatch.setattr(instant_search, "_live_slots", threading.BoundedSemaphore(1))
+
+    import fetch.run_scrapers
+    started, release = threading.Event(), threading.Event()
+
+    def slow_fetch(pairs, sources):
+        started.set()
+        release.wait(10)
+        return {}
+
+    monkeypatch.setattr(fetch.run_scrapers, "fetch_jobs", slow_fetch)
+    first = threading.Thread(target=instant_search.instant_search, args=("u4", ["Welder"], ["Leeds"]),
+                             kwargs={"index": index})
+    first.start()
+    started.wait(10)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), instant_search.InstantSearchHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/instant-search"
+        body = json.dumps({"userId": "u5", "jobTitles": ["Welder"], "jobLocations": ["York"]}).encode()
+        request = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(request, timeout=10)
+        assert error.value.code == 503
+        assert error.value.headers["Retry-After"] == str(instant_search.INSTANT_LIVE_RETRY_AFTER)
+        assert json.load(error.value)["error"] == "busy"
+    finally:
+        release.set()
+        first.join(10)
+        server.shutdown()
+        server.server_close()
+
+    # The slot is free again once the first live search finishes
+    assert instant_search.instant_search("u5", ["Welder"], ["York"], index=index)["source"] == "live"
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Tests for revalidating stored job postings against a local HTTP stub.
+
+Run with: python -m pytest test_liveness.py
+"""
+
+import os
+import sys
+import threading
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import liveness
+from store import user_feed
+from store.fake_firestore import FakeFirestore
+
+NOW = datetime(2026, 3, 20, 12, tzinfo=timezone.utc)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """/live, /gone (410), /moved (redirect to /jobs), /nohead (405 on HEAD), /etag (304 when matched)."""
+
+    requests = []
+
+    def _respond(self, method):
+        StubHandler.requests.append((method, self.path, self.headers.get("If-None-Match")))
+        if self.path == "/gone":
+            self.send_response(410)
+        elif self.path == "/moved":
+            self.send_response(302)
+            self.send_header("Location", "/jobs")
+        elif self.path == "/nohead" and method == "HEAD":
+            self.send_response(405)
+        elif self.path == "/etag" and self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+        elif self.path == "/busy":
+            self.send_response(429)
+        else:
+            self.send_response(200)
+            self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_HEAD(self):
+        self._respond("HEAD")
+
+    def do_GET(self):
+        self._respond("GET")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def job(url, days_old, **fields):
+    return {"url": url, "source": "linkedin", "added_at": NOW - timedelta(days=days_old), **fields}
+
+
+def test_classifies_and_marks_expired_postings(tmp_path):
+    server, base = start_stub()
+    StubHandler.requests = []
+    try:
+        db = FakeFirestore({
+            "users/u1/jobs/a": job(f"{base}/live", 3),
+            "users/u2/jobs/a": job(f"{base}/live", 4),  # Same posting, second user
+            "users/u1/jobs/b": job(f"{base}/gone", 5),
+            "users/u1/jobs/c": job(f"{base}/moved", 6),
+            "users/u1/jobs/d": job(f"{base}/nohead", 7),
+            "users/u1/jobs/e": job(f"{base}/busy", 8),
+            "users/u1/jobs/new": job(f"{base}/gone", 0),  # Too new to check
+            "user_job_matches/pending": {"user_id": "u1", "job_id": "b", "notified": False, "job_details": {}},
+            "user_job_matches/sent": {"user_id": "u1", "job_id": "b", "notified": True, "job_details": {}},
+        })
+        user_feed.write_feed(db, "u1", [{"job_id": job_id} for job_id in ("a", "b", "c", "d")])
+        client = liveness.LivenessClient(workers=4, host_interval=0)
+
+        stats = liveness.revalidate_jobs(db, limit=10, client=client, state_file=str(tmp_path / "state.json"), now=NOW)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert stats["jobs"] == 6
+    assert (stats["live"], stats["expired"], stats["unknown"]) == (2, 2, 1)
+    assert [path for method, path, _ in StubHandler.requests].count("/live") == 1
+    assert ("GET", "/nohead", None) in StubHandler.requests
+
+    docs = db.docs
+    assert docs["users/u1/jobs/b"]["is_expired"] and docs["users/u1/jobs/c"]["is_expired"]
+    assert not docs["users/u1/jobs/a"].get("is_expired") and docs["users/u2/jobs/a"]["liveness_etag"] == '"v1"'
+    assert docs["users/u1/jobs/e"]["liveness_status"] == "unknown"
+    assert "liveness_checked_at" not in docs["users/u1/jobs/new"]
+
+    # Expired postings leave the feed and the pending email
+    assert [summary["job_id"] for summary in user_feed.read_feed(db, "u1")[0]] == ["d", "a"]
+    assert docs["user_job_matches/pending"]["job_details"]["is_expired"]
+    assert "is_expired" not in docs["user_job_matches/sent"]["job_details"]
+    assert stats["notifications_flagged"] == 1
+
+
+def test_saved_jobs_first_and_sweep_resumes():
+    docs = {f"users/u1/jobs/{i}": job(f"https://site{i % 2}.test/{i}", 30 - i, source=f"s{i % 2}") for i in range(20)}
+    docs["users/u1/jobs/saved"] = job("https://site0.test/saved", 2, is_saved=True)
+    docs["users/u1/jobs/seen"] = job("https://site0.test/seen", 2, last_viewed_at=NOW - timedelta(hours=1))
+    db = FakeFirestore(docs)
+
+    state = {}
+    first = [doc.reference.path for doc in liveness.sample_jobs(db, 6, NOW, state)]
+    assert first[:2] == ["users/u1/jobs/saved", "users/u1/jobs/seen"]
+    # Oldest jobs next, alternating between sources
+    assert first[2:] == ["users/u1/jobs/0", "users/u1/jobs/1", "users/u1/jobs/2", "users/u1/jobs/3"]
+    assert state["cursor"]
+
+    second = [doc.reference.path for doc in liveness.sample_jobs(db, 4, NOW, state)]
+    assert second[2:] == ["users/u1/jobs/8", "users/u1/jobs/9"]
+
+
+def test_sweep_pages_through_jobs_stored_at_the_same_time():
+    # One batch of store_jobs gives every job the same added_at
+    docs = {f"users/u{i % 3}/jobs/{i}": job(f"https://site.test/{i}", 5) for i in range(10)}
+    db = FakeFirestore(docs)
+    in_name_order = sorted(docs)
+
+    state = {}
+    first = [doc.reference.path for doc in liveness.sample_jobs(db, 2, NOW, state)]
+    second = [doc.reference.path for doc in liveness.sample_jobs(db, 2, NOW, state)]
+
+    # Each run reads a page of 4 and continues after the last document read, not after the timestamp
+    assert first == in_name_order[0:2]
+    assert second == in_name_order[4:6]
+    assert state["cursor"]["path"] == in_name_order[7]
+
+
+def test_conditional_request_uses_previous_etag():
+    server, base = start_stub()
+    StubHandler.requests = []
+    try:
+        result = liveness.LivenessClient(workers=1, host_interval=0).check(f"{base}/etag", etag='"v1"')
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert (result.state, result.http_status, result.etag) == ("live", 304, '"v1"')
+    assert StubHandler.requests == [("HEAD", "/etag", '"v1"')]
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Tests for stage selection and skipping in the single-process pipeline.
+
+Run with: python -m pytest test_pipeline.py
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pipeline
+
+
+def fake_stages(monkeypatch, outcomes):
+    """Replace every stage with one that records its call and returns/raises the given outcome."""
+    calls = []
+
+    def make(stage):
+        def run(ctx):
+            calls.append(stage)
+            outcome = outcomes.get(stage, True)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+        return run
+
+    monkeypatch.setattr(pipeline, "STAGE_FUNCTIONS", {stage: make(stage) for stage in pipeline.STAGES})
+    return calls
+
+
+def test_resolve_stages_orders_and_validates():
+    assert pipeline.resolve_stages(["notify", "preflight"]) == ["preflight", "notify"]
+    assert pipeline.resolve_stages(["scrape", "match"]) == ["scrape", "match"]
+    with pytest.raises(ValueError):
+        pipeline.resolve_stages(["store"])
+    with pytest.raises(ValueError):
+        pipeline.resolve_stages(["preflight", "emails"])
+
+
+def test_full_run(monkeypatch):
+    calls = fake_stages(monkeypatch, {})
+    results = pipeline.run_pipeline()
+    assert calls == pipeline.STAGES
+    assert set(results.values()) == {"ok"}
+
+
+def test_no_jobs_still_notifies(monkeypatch):
+    calls = fake_stages(monkeypatch, {"scrape": False})
+    results = pipeline.run_pipeline()
+    assert calls == ["preflight", "scrape", "notify"]
+    assert results["match"] == results["store"] == "skipped"
+
+
+def test_no_users_stops_everything(monkeypatch):
+    calls = fake_stages(monkeypatch, {"preflight": False})
+    results = pipeline.run_pipeline()
+    assert calls == ["preflight"]
+    assert results["notify"] == "skipped"
+
+
+def test_failed_stage_is_reported(monkeypatch):
+    calls = fake_stages(monkeypatch, {"match": RuntimeError("boom")})
+    results = pipeline.run_pipeline()
+    assert calls == ["preflight", "scrape", "match", "notify"]
+    assert results["match"] == "failed"
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Tests for consistent shard assignment and SQLite lease coordination.
+
+Run with: python -m pytest test_sharding.py
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import sharding
+from fetch.registry import ScraperSource, TITLE_LOCATION, TITLE_ONLY, GLOBAL_LISTING
+
+SOURCES = [
+    ScraperSource("linkedin", "fetch.linkedin", "fetch_linkedin_jobs", TITLE_LOCATION),
+    ScraperSource("unjobs", "fetch.unjobs", "fetch_unjobs_parallel", TITLE_ONLY),
+    ScraperSource("ifyoucould", "fetch.ifyoucould", "fetch_ifyoucould_jobs", GLOBAL_LISTING),
+]
+PAIRS = [(f"Title {t}", f"Town {l}") for t in range(20) for l in range(5)]
+
+
+def test_adding_a_shard_moves_few_keys():
+    keys = [f"user-{i}" for i in range(5000)]
+    before = [sharding.shard_for(key, 8) for key in keys]
+    after = [sharding.shard_for(key, 9) for key in keys]
+
+    moved = sum(b != a for b, a in zip(before, after))
+    assert moved < len(keys) * 0.15  # ~1/9 expected
+    assert all(a == 8 for b, a in zip(before, after) if b != a)
+
+
+def test_every_search_key_is_planned_exactly_once():
+    plans = [sharding.shard_search_pairs(SOURCES, PAIRS, shard, 4) for shard in range(4)]
+
+    for name in ("linkedin", "unjobs"):
+        planned = [pair for plan in plans for pair in plan[name]]
+        assert sorted(planned) == sorted(PAIRS)
+    # A title's locations stay on one shard for title-only sources
+    for plan in plans:
+        titles = {title for title, _ in plan["unjobs"]}
+        assert all(pair in plan["unjobs"] for pair in PAIRS if pair[0] in titles)
+    assert sum(bool(plan["ifyoucould"]) for plan in plans) == 1
+
+
+def test_expired_leases_are_taken_over(tmp_path):
+    now = [1000.0]
+    store = sharding.LeaseStore(str(tmp_path / "shards.sqlite3"), lease_seconds=60, clock=lambda: now[0])
+    store.ensure_phase("c1", "scrape", 2)
+
+    assert store.claim("c1", "scrape", "a") == 0
+    assert store.claim("c1", "scrape", "b") == 1
+    assert store.claim("c1", "scrape", "b") is None
+
+    assert store.complete("c1", "scrape", 1, "b")
+    now[0] += 61  # Worker "a" stalled holding shard 0
+    assert store.claim("c1", "scrape", "b") == 0
+
+    # The stale owner can no longer renew, store results or finish the shard
+    assert not store.renew("c1", "scrape", 0, "a")
+    assert not store.put_results("c1", 0, {"linkedin": [{"url": "stale"}]}, "a")
+    assert not store.complete("c1", "scrape", 0, "a")
+    assert store.pending("c1", "scrape") == 1
+
+    assert store.put_results("c1", 0, {"linkedin": [{"url": "fresh"}]}, "b")
+    assert store.complete("c1", "scrape", 0, "b")
+    assert store.pending("c1", "scrape") == 0
+    assert store.merged_results("c1") == {"linkedin": [{"url": "fresh"}]}
+
+
+def test_heartbeat_keeps_a_slow_shard_leased(tmp_path):
+    now = [1000.0]
+    store = sharding.LeaseStore(str(tmp_path / "shards.sqlite3"), lease_seconds=60, clock=lambda: now[0])
+    store.ensure_phase("c1", "notify", 1)
+    assert store.claim("c1", "notify", "a") == 0
+
+    with sharding.LeaseHeartbeat(store, "c1", "notify", 0, "a", interval=0.01) as heartbeat:
+        for _ in range(5):
+            now[0] += 40  # Longer than the lease in total, renewed along the way
+            time.sleep(0.1)
+            assert store.claim("c1", "notify", "b") is None
+    assert not heartbeat.lost
+    assert store.complete("c1", "notify", 0, "a")
+
+
+def test_workers_split_a_cycle(tmp_path, monkeypatch):
+    monkeypatch.setattr(sharding, "SHARD_POLL_SECONDS", 0.01)
+    store = sharding.LeaseStore(str(tmp_path / "shards.sqlite3"))
+    users = [{"id": f"user-{i}", "jobTitles": ["Designer"], "jobLocations": ["London"]} for i in range(40)]
+    done = {phase: [] for phase in sharding.PHASES}
+    lock = threading.Lock()
+
+    def make_worker(name):
+        worker = sharding.ShardWorker(store, "cycle-1", 6, owner=name, sources=SOURCES, users=users)
+
+        def handler(phase):
+            def run(shard):
+                if phase == "match":
+                    # Every scrape shard has finished before any match shard starts
+                    assert len(done["scrape"]) == 6
+                with lock:
+                    done[phase].append(shard)
+                return 0
+            return run
+
+        worker.handlers = {phase: handler(phase) for phase in sharding.PHASES}
+        return worker
+
+    threads = [threading.Thread(target=make_worker(f"w{i}").run) for i in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for phase in sharding.PHASES:
+        assert sorted(done[phase]) == list(range(6))
+
+
+def test_results_merge_in_shard_order(tmp_path):
+    store = sharding.LeaseStore(str(tmp_path / "shards.sqlite3"))
+    store.ensure_phase("c1", "scrape", 2)
+    store.claim("c1", "scrape", "a")
+    store.claim("c1", "scrape", "a")
+    store.put_results("c1", 1, {"linkedin": [{"url": "b"}]}, "a")
+    store.put_results("c1", 0, {"linkedin": [{"url": "a"}], "unjobs": [{"url": "c"}]}, "a")
+
+    assert store.merged_results("c1") == {"linkedin": [{"url": "a"}, {"url": "b"}], "unjobs": [{"url": "c"}]}
@@ -0,0 +1,157 @@
+# utils/geocode_cache.py
+
+"""
+Persistent geocode store shared by every LocationMatcher in the process.
+
+Lookups are answered from, in order:
+1. the bundled UK gazetteer (utils/uk_gazetteer.py)
+2. this on-disk cache of earlier Nominatim answers (including misses)
+3. Nominatim itself, at most one request per second per its usage policy
+"""
+
+import os
+import json
+import time
+import atexit
+import logging
+from threading import Lock
+from datetime import datetime, timedelta
+
+from utils.uk_gazetteer import lookup_uk_place, normalise_place_name
+
+logger = logging.getLogger(__name__)
+
+GEOCODE_CACHE_FILE = os.path.join(os.path.dirname(__file__), "..", "geocode_cache.json")
+NEGATIVE_CACHE_DAYS = 7  # Retry places Nominatim couldn't find after a week
+NOMINATIM_MIN_INTERVAL_SECONDS = 1.0
+NOMINATIM_USER_AGENT = "next_gig_job_search"
+
+
+class GeocodeStore:
+    """Thread-safe, file-backed cache of location -> (lat, lon)."""
+
+    def __init__(self, cache_file=GEOCODE_CACHE_FILE, geocoder=None):
+        """
+        :param cache_file: JSON file to persist lookups to (None for memory only)
+        :param geocoder: Callable(query) -> geopy Location or None (default: Nominatim)
+        """
+        self.cache_file = cache_file
+        self._geocoder = geocoder
+        self._lock = Lock()
+        self._nominatim_lock = Lock()
+        self._last_request_at = 0.0
+        self._dirty = False
+        self.cache = self._load()
+        self.stats = {"gazetteer": 0, "cache": 0, "nominatim": 0, "misses": 0}
+
+    def _load(self):
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return {}
+        try:
+            with open(self.cache_file, "r") as f:
+                cache = json.load(f)
+            logger.info(f"Loaded {len(cache)} geocodes from cache")
+            return cache
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Error loading geocode cache: {e}. Starting fresh.")
+            return {}
+
+    def save(self):
+        """Write the cache to disk if anything changed."""
+        if not self.cache_file or not self._dirty:
+            return
+        with self._lock:
+            snapshot = dict(self.cache)
+            self._dirty = False
+        try:
+            tmp_file = f"{self.cache_file}.tmp"
+            with open(tmp_file, "w") as f:
+                json.dump(snapshot, f)
+            os.replace(tmp_file, self.cache_file)
+            logger.debug(f"Saved {len(snapshot)} geocodes to cache")
+        except OSError as e:
+            logger.error(f"Error saving geocode cache: {e}")
+
+    def get(self, location):
+        """
+        Geocode a location string.
+
+        :param location: Raw location string, e.g. "Leeds, England, United Kingdom"
+        :return: (latitude, longitude) tuple, or None if it can't be resolved
+        """
+        key = normalise_place_name(location)
+        if not key:
+            return None
+
+        place = lookup_uk_place(key)
+        if place:
+            self._count("gazetteer")
+            return place[0], place[1]
+
+        with self._lock:
+            cached = self.cache.get(key)
+        if cached is not None and self._is_fresh(cached):
+            self._count("cache")
+            coords = cached.get("coords")
+            return tuple(coords) if coords else None
+
+        coords = self._query_nominatim(key)
+        with self._lock:
+            self.cache[key] = {"coords": list(coords) if coords else None, "timestamp": datetime.now().isoformat()}
+            self._dirty = True
+        return coords
+
+    def _count(self, stat):
+        # Matcher threads share the store, and += on a dict entry isn't atomic
+        with self._lock:
+            self.stats[stat] += 1
+
+    def _is_fresh(self, entry):
+        if entry.get("coords"):
+            return True
+        try:
+            age = datetime.now() - datetime.fromisoformat(entry["timestamp"])
+            return age < timedelta(days=NEGATIVE_CACHE_DAYS)
+        except (KeyError, ValueError):
+            return False
+
+    def _query_nominatim(self, key):
+        # Serialise requests and keep them at least a second apart
+        with self._nominatim_lock:
+            wait = self._last_request_at + NOMINATIM_MIN_INTERVAL_SECONDS - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            try:
+                self._count("nominatim")
+                result = self._get_geocoder()(f"{key}, United Kingdom")
+            except Exception as e:
+                logger.error(f"Geocoding error for {key}: {e}")
+                result = None
+            finally:
+                self._last_request_at = time.monotonic()
+
+        if not result:
+            self._count("misses")
+            return None
+        return (result.latitude, result.longitude)
+
+    def _get_geocoder(self):
+        if self._geocoder is None:
+            from geopy.geocoders import Nominatim
+            self._geocoder = Nominatim(user_agent=NOMINATIM_USER_AGENT).geocode
+        return self._geocoder
+
+
+_shared_store = None
+_shared_store_lock = Lock()
+
+
+def get_geocode_store():
+    """Return the process-wide geocode store, loading it on first use."""
+    global _shared_store
+
+    with _shared_store_lock:
+        if _shared_store is None:
+            _shared_store = GeocodeStore()
+            atexit.register(_shared_store.save)
+        return _shared_store
@@ -3,8 +3,8 @@
 import firebase_admin
 from firebase_admin import firestore
 
-# Ensure Firebase is initialized
-from config import db
+# Firebase is initialised lazily on first use
+from config import get_db
 
 def get_user_jobs(user_id, limit=50, only_saved=False):
     """
@@ -15,6 +15,8 @@ def get_user_jobs(user_id, limit=50, only_saved=False):
     :param only_saved: Only return jobs marked as saved
     :return: List of job objects with full details
     """
+    db = get_db()
+
     # Reference to the user's jobs subcollection
     user_jobs_ref = db.collection("users").document(user_id).collection("jobs")
     
@@ -35,6 +37,10 @@ def get_user_jobs(user_id, limit=50, only_saved=False):
     for user_job in user_jobs:
         user_job_data = user_job.to_dict()
         job_id = user_job_data.get("job_id")
+
+        # Closed postings (liveness.py) are only kept when the user saved or applied to them
+        if user_job_data.get("is_expired") and not (user_job_data.get("is_saved") or user_job_data.get("has_applied")):
+            continue
         
         # Get the full job details from the main collection
         full_job = db.collection("jobs_compiled").document(job_id).get()
@@ -48,6 +54,18 @@ def get_user_jobs(user_id, limit=50, only_saved=False):
     
     return jobs
 
+def get_user_feed(user_id, page=0):
+    """
+    Retrieve one page of a user's precomputed job feed (see store/user_feed.py).
+    Costs at most three document reads regardless of how many jobs the user has.
+
+    :param user_id: The user's Firestore ID
+    :param page: 0 for the newest jobs, 1 for the page before, ...
+    :return: (list of job summaries newest first, whether older pages exist)
+    """
+    from store.user_feed import read_feed
+    return read_feed(get_db(), user_id, page)
+
 if __name__ == "__main__":
     # Example usage
     import sys
@@ -1,16 +1,18 @@
 import os
 import logging
-import functools
-from geopy.geocoders import Nominatim
 from geopy.distance import geodesic
+import numpy as np
+
+from utils.geocode_cache import get_geocode_store
+from utils.spatial_index import JobSpatialIndex
+from utils.location_resolver import resolve_location
 
 class LocationMatcher:
-    def __init__(self, fallback_regions=None):
-        # Caching to reduce geocoding API calls
-        self.location_cache = {}
+    def __init__(self, fallback_regions=None, geocode_store=None):
+        # Persistent geocode store (gazetteer -> disk cache -> rate-limited Nominatim)
+        self.geocode_store = geocode_store or get_geocode_store()
         
-        # Logging setup
-        logging.basicConfig(level=logging.INFO)
+        # Logging setup (handlers are configured by the entry point)
         self.logger = logging.getLogger(__name__)
         
         # Import fallback regions from config
@@ -20,9 +22,6 @@ class LocationMatcher:
         except ImportError:
             self.logger.warning("Could not import LOCATION_FALLBACK_REGIONS. Using empty dictionary.")
             self.fallback_regions = fallback_regions or {}
-        
-        # Geocoder with user agent
-        self.geolocator = Nominatim(user_agent="next_gig_job_search")
     
     def get_fallback_locations(self, primary_location):
         """
@@ -31,11 +30,11 @@ class LocationMatcher:
         :param primary_location: Primary location to find fallbacks for
         :return: List of fallback locations
         """
-        # Normalize location to lowercase for consistent matching
-        primary_location = primary_location.lower().strip()
+        # Canonical town name, so "London Area, UK" finds London's fallbacks
+        primary_location = resolve_location(primary_location).city or primary_location.lower().strip()
         
-        # Direct match in fallback regions
-        fallback_locations = self.fallback_regions.get(primary_location, [])
+        # Direct match in fallback regions (copied so the config list isn't mutated)
+        fallback_locations = list(self.fallback_regions.get(primary_location, []))
         
         # Add the primary location itself
         if primary_location not in fallback_locations:
@@ -43,53 +42,12 @@ class LocationMatcher:
         
         return fallback_locations
     
-    @functools.lru_cache(maxsize=1000)
     def geocode_location(self, location):
         """
-        Geocode a location with caching to reduce API calls
+        Geocode a location using the offline gazetteer, then the persistent
+        cache, and only then Nominatim (rate limited to 1 request/second)
         """
-        try:
-            # Check cache first
-            if location in self.location_cache:
-                return self.location_cache[location]
-            
-            # Try full location first
-            result = self.geolocator.geocode(f"{location}, United Kingdom", 
-                                             addressdetails=True)
-            
-            # Fallback strategies
-            if not result:
-                city_fallbacks = {
-                    "london": "London, United Kingdom",
-                    "manchester": "Manchester, United Kingdom",
-                    "birmingham": "Birmingham, United Kingdom",
-                    "glasgow": "Glasgow, United Kingdom",
-                    "bristol": "Bristol, United Kingdom",
-                    "leeds": "Leeds, United Kingdom",
-                    "newcastle": "Newcastle, United Kingdom",
-                    "edinburgh": "Edinburgh, United Kingdom",
-                    "cardiff": "Cardiff, United Kingdom",
-                    "southampton": "Southampton, United Kingdom",
-                    "nottingham": "Nottingham, United Kingdom",
-                    "leicester": "Leicester, United Kingdom",
-                    "aberdeen": "Aberdeen, United Kingdom",
-                    "liverpool": "Liverpool, United Kingdom",
-                    "oxford": "Oxford, United Kingdom",
-                    "derby": "Derby, United Kingdom",
-                }
-                if location.lower() in city_fallbacks:
-                    result = self.geolocator.geocode(city_fallbacks[location.lower()])
-            
-            if result:
-                coordinates = (result.latitude, result.longitude)
-                self.location_cache[location] = coordinates
-                return coordinates
-            
-            return None
-        
-        except Exception as e:
-            self.logger.error(f"Geocoding error for {location}: {e}")
-            return None
+        return self.geocode_store.get(location)
     
     def calculate_distance(self, loc1, loc2):
         """
@@ -113,75 +71,95 @@ class LocationMatcher:
             self.logger.warning(f"Could not geocode location: {user_location}")
             return []
         
-        # Filter jobs by matching title and within radius
-        matched_jobs = []
+        # Flexible title matching (partial match), then one vectorised radius query
+        index = JobSpatialIndex(job_list, self.geocode_location)
+        title_mask = np.array([job_title.lower() in job['title'].lower() for job in job_list], dtype=bool)
+        positions, distances = index.query([user_coords], max_radius_km, job_mask=title_mask)
         
-        for job in job_list:
-            # Flexible title matching (partial match)
-            if job_title.lower() not in job['title'].lower():
-                continue
-            
-            # Geocode job location
-            job_coords = self.geocode_location(job['location'])
-            
-            if not job_coords:
-                continue
-            
-            # Calculate distance
-            distance = self.calculate_distance(user_coords, job_coords)
-            
-            if distance <= max_radius_km:
-                # Create a copy of the job to avoid modifying the original
-                job_copy = job.copy()
-                job_copy['distance_km'] = round(distance, 2)
-                matched_jobs.append(job_copy)
+        matched_jobs = []
+        for position, distance in zip(positions, distances):
+            # Create a copy of the job to avoid modifying the original
+            job_copy = job_list[position].copy()
+            job_copy['distance_km'] = round(float(distance), 2)
+            matched_jobs.append(job_copy)
         
-        # Sort by distance
-        return sorted(matched_jobs, key=lambda x: x['distance_km'])
+        # Already sorted by distance
+        return matched_jobs
+
+_shared_matcher = None
+
+def get_location_matcher():
+    """
+    Return a process-wide LocationMatcher so its geocode store stays warm
+    across calls instead of being rebuilt for every user.
+    """
+    global _shared_matcher
+    if _shared_matcher is None:
+        _shared_matcher = LocationMatcher()
+    return _shared_matcher
 
-def find_matching_jobs(user_jobs, user_preferences, max_radius_km=50):
+def build_spatial_index(jobs):
+    """
+    Geocode every job once and index it for radius queries.
+    Build this once per cycle and pass it to find_matching_jobs for each user.
+    
+    :param jobs: List of all jobs
+    :return: JobSpatialIndex
+    """
+    matcher = get_location_matcher()
+    index = JobSpatialIndex(jobs, matcher.geocode_location)
+    matcher.geocode_store.save()
+    return index
+
+def find_matching_jobs(user_jobs, user_preferences, max_radius_km=50, spatial_index=None):
     """
     Advanced job matching with geographical intelligence and fallback regions
     
     :param user_jobs: List of all jobs
     :param user_preferences: Dictionary with job_titles and locations
     :param max_radius_km: Maximum search radius
-    :return: List of matched jobs
+    :param spatial_index: Prebuilt JobSpatialIndex over user_jobs (built here if omitted)
+    :return: List of matched jobs, nearest first
     """
-    matcher = LocationMatcher()
-    final_matched_jobs = []
+    matcher = get_location_matcher()
+    index = spatial_index or JobSpatialIndex(user_jobs, matcher.geocode_location)
+    
+    # Every location and fallback location for this user becomes one query point
+    points = []
+    for location in user_preferences.get('locations', []):
+        for fallback_location in matcher.get_fallback_locations(location):
+            coords = matcher.geocode_location(fallback_location)
+            if coords:
+                points.append(tuple(coords))
+            else:
+                matcher.logger.warning(f"Could not geocode location: {fallback_location}")
     
-    for title in user_preferences.get('job_titles', []):
-        for location in user_preferences.get('locations', []):
-            # Get fallback locations
-            fallback_locations = matcher.get_fallback_locations(location)
-            
-            # Search across all fallback locations
-            for fallback_location in fallback_locations:
-                # Radius search for each fallback location
-                radius_matches = matcher.find_jobs_within_radius(
-                    title, 
-                    fallback_location, 
-                    user_jobs, 
-                    max_radius_km=max_radius_km
-                )
-                
-                # Ensure source information is preserved
-                for job in radius_matches:
-                    if 'source' not in job:
-                        logging.warning(f"Job missing source: {job.get('title')}")
-                
-                final_matched_jobs.extend(radius_matches)
+    titles = [title.lower() for title in user_preferences.get('job_titles', [])]
+    title_mask = np.array(
+        [any(title in (job.get('title') or '').lower() for title in titles) for job in index.jobs],
+        dtype=bool,
+    )
+    
+    # One batched query over all points; distance is to the nearest point
+    positions, distances = index.query(points, max_radius_km, job_mask=title_mask)
     
     # Remove duplicates while preserving order and all job data
     unique_matched_jobs = []
     seen = set()
-    for job in final_matched_jobs:
+    for position, distance in zip(positions, distances):
+        job = index.jobs[position]
         job_key = job['url']  # Use URL as unique identifier
-        if job_key not in seen:
-            seen.add(job_key)
-            # Create a copy to ensure we don't modify the original
-            job_copy = job.copy()
-            unique_matched_jobs.append(job_copy)
+        if job_key in seen:
+            continue
+        seen.add(job_key)
+        if 'source' not in job:
+            logging.warning(f"Job missing source: {job.get('title')}")
+        # Create a copy to ensure we don't modify the original
+        job_copy = job.copy()
+        job_copy['distance_km'] = round(float(distance), 2)
+        unique_matched_jobs.append(job_copy)
     
-    return unique_matched_jobs
\ No newline at end of file
+    # Persist any new Nominatim answers for the next cycle
+    matcher.geocode_store.save()
+
+    return unique_matched_jobs
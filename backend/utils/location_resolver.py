@@ -0,0 +1,310 @@
+# utils/location_resolver.py
+
+"""
+Single place where raw location strings are understood.
+
+resolve_location() parses a string once into a canonical ResolvedLocation
+(city, region, country, remote flag) and memoises it, so scrapers and matchers
+compare canonical ids with set lookups instead of re-scanning alias lists:
+
+    resolve_location("London Area, United Kingdom")
+    -> ResolvedLocation(city='london', region='england', country='uk', remote=False)
+
+UK towns come from the offline gazetteer (utils/uk_gazetteer.py). A district
+also falls within its town ("City of London" is in London). Places that
+aren't known keep their first comma-separated part as the city id, so
+"New York, NY" and "New York" still match each other.
+
+Remote jobs that name no country match users in REMOTE_HOME_COUNTRY only,
+as before the resolver; REMOTE_MATCHES_ANY_COUNTRY=true offers them to
+every user.
+"""
+
+import os
+import re
+from functools import lru_cache
+
+from utils.uk_gazetteer import UK_PLACES, UK_PLACE_ALIASES, UK_PLACE_PARENTS
+
+REMOTE_MATCHES_ANY_COUNTRY = os.getenv("REMOTE_MATCHES_ANY_COUNTRY", "false").lower() == "true"
+REMOTE_HOME_COUNTRY = "uk"
+
+# alias -> canonical country id
+COUNTRY_ALIASES = {
+    "uk": "uk", "u k": "uk", "united kingdom": "uk", "great britain": "uk", "britain": "uk", "gb": "uk",
+    "united states": "united states", "united states of america": "united states", "usa": "united states",
+    "canada": "canada",
+    "australia": "australia",
+    "new zealand": "new zealand",
+    "india": "india",
+    "south africa": "south africa",
+    "ireland": "ireland", "republic of ireland": "ireland",
+    "france": "france",
+    "germany": "germany",
+    "netherlands": "netherlands", "the netherlands": "netherlands",
+    "belgium": "belgium",
+    "switzerland": "switzerland",
+    "sweden": "sweden",
+    "norway": "norway",
+    "denmark": "denmark",
+    "spain": "spain",
+    "portugal": "portugal",
+    "italy": "italy",
+    "singapore": "singapore",
+    "hong kong": "hong kong",
+    "japan": "japan",
+    "thailand": "thailand",
+}
+
+# Only trusted when they are a whole comma-separated part ("Austin, US"),
+# never inside free text ("contact us")
+SEGMENT_ONLY_COUNTRY_ALIASES = {"us": "united states"}
+
+# region -> country
+REGIONS = {
+    "england": "uk",
+    "scotland": "uk",
+    "wales": "uk",
+    "northern ireland": "uk",
+}
+
+REMOTE_TERMS = {
+    "remote", "fully remote", "work from home", "wfh", "telecommute", "telework",
+    "virtual", "home based", "anywhere",
+}
+
+# Words that describe the working pattern rather than the place
+QUALIFIERS = {"hybrid", "onsite", "on", "site", "in", "office", "area", "based", "region", "the", "city", "centre", "center"}
+
+# Parts of a town rather than another place ("East London", "South West London")
+DIRECTIONS = {
+    "north", "south", "east", "west", "northern", "southern", "eastern", "western",
+    "northeast", "northwest", "southeast", "southwest", "central", "greater", "inner", "outer",
+}
+
+# US states, only trusted as a whole comma-separated part after the first
+# ("Cambridge, MA"), so they stop a UK town of the same name from matching
+US_STATES = {
+    "al", "ak", "az", "ar", "ca", "co", "ct", "de", "dc", "fl", "ga", "hi", "id", "il", "in", "ia", "ks", "ky",
+    "la", "me", "md", "ma", "mi", "mn", "ms", "mo", "mt", "ne", "nv", "nh", "nj", "nm", "ny", "nc", "nd", "oh",
+    "ok", "or", "pa", "ri", "sc", "sd", "tn", "tx", "ut", "vt", "va", "wa", "wv", "wi", "wy",
+    "alabama", "alaska", "arizona", "arkansas", "california", "colorado", "connecticut", "delaware",
+    "district of columbia", "florida", "georgia", "hawaii", "idaho", "illinois", "indiana", "iowa", "kansas",
+    "kentucky", "louisiana", "maine", "maryland", "massachusetts", "michigan", "minnesota", "mississippi",
+    "missouri", "montana", "nebraska", "nevada", "new hampshire", "new jersey", "new mexico", "new york",
+    "north carolina", "north dakota", "ohio", "oklahoma", "oregon", "pennsylvania", "rhode island",
+    "south carolina", "south dakota", "tennessee", "texas", "utah", "vermont", "virginia", "washington",
+    "west virginia", "wisconsin", "wyoming",
+}
+
+# UK postcode districts and full postcodes after a town ("London EC1", "Leeds LS1 4AP")
+_POSTCODE_PART = re.compile(r"^(?:[a-z]{1,2}[0-9][a-z0-9]?|[0-9][a-z]{2})$")
+
+_NON_WORD = re.compile(r"[^a-z0-9,' ]+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _normalise(text):
+    text = (text or "").lower().replace("-", " ").replace(".", "")
+    text = _NON_WORD.sub(" ", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def _build_phrases():
+    # phrase -> (kind, canonical id)
+    phrases = {}
+    for name in UK_PLACES:
+        phrases[_normalise(name)] = ("city", name)
+    for alias, name in UK_PLACE_ALIASES.items():
+        phrases[_normalise(alias)] = ("city", name)
+    for region in REGIONS:
+        phrases[region] = ("region", region)
+    for alias, country in COUNTRY_ALIASES.items():
+        phrases[alias] = ("country", country)
+    for term in REMOTE_TERMS:
+        phrases[term] = ("remote", "remote")
+    return phrases
+
+
+_PHRASES = _build_phrases()
+_MAX_PHRASE_WORDS = max(len(phrase.split()) for phrase in _PHRASES)
+
+
+def _scan(words, phrases=_PHRASES):
+    """
+    Find known phrases in a word list, longest match first.
+
+    :return: ([(kind, id), ...], [words not covered by any phrase])
+    """
+    hits, leftover = [], []
+    i = 0
+    while i < len(words):
+        for n in range(min(_MAX_PHRASE_WORDS, len(words) - i), 0, -1):
+            hit = phrases.get(" ".join(words[i:i + n]))
+            if hit:
+                hits.append(hit)
+                i += n
+                break
+        else:
+            leftover.append(words[i])
+            i += 1
+    return hits, leftover
+
+
+class ResolvedLocation:
+    """Canonical form of a location string. Instances are shared - treat as immutable."""
+
+    __slots__ = ("city", "region", "country", "remote", "parent_city", "scope", "ids")
+
+    def __init__(self, city=None, region=None, country=None, remote=False, parent_city=None):
+        self.city = city
+        self.region = region
+        self.country = country
+        self.remote = remote
+        self.parent_city = parent_city
+
+        ids = []
+        if city:
+            ids.append(f"city:{city}")
+        if parent_city:
+            ids.append(f"city:{parent_city}")
+        if region:
+            ids.append(f"region:{region}")
+        if country:
+            ids.append(f"country:{country}")
+        # Id of the most specific level this location names, or None
+        self.scope = ids[0] if ids else None
+        if remote:
+            ids.append("remote")
+        # Every canonical id this location falls within
+        self.ids = frozenset(ids)
+
+    def __eq__(self, other):
+        return isinstance(other, ResolvedLocation) and self.ids == other.ids
+
+    def __hash__(self):
+        return hash(self.ids)
+
+    def __repr__(self):
+        return (f"ResolvedLocation(city={self.city!r}, region={self.region!r}, "
+                f"country={self.country!r}, remote={self.remote})")
+
+
+@lru_cache(maxsize=65536)
+def resolve_location(raw):
+    """
+    Parse a raw location string into its canonical form (memoised).
+
+    :param raw: Location string, e.g. "Manchester Area, England, United Kingdom"
+    :return: ResolvedLocation
+    """
+    city = region = country = None
+    uk_city = False
+    remote = False
+    unknown_head = None
+
+    for position, segment in enumerate(_normalise(raw).split(",")):
+        words = segment.split()
+        if not words:
+            continue
+
+        hits, leftover = _scan(words)
+        leftover = [
+            word for word in leftover
+            if word not in QUALIFIERS and word not in DIRECTIONS and not _POSTCODE_PART.match(word)
+        ]
+        if leftover:
+            # "New York" is not York - only trust a town that is the whole part
+            hits = [hit for hit in hits if hit[0] != "city"]
+        if not hits:
+            alias = SEGMENT_ONLY_COUNTRY_ALIASES.get(segment.strip())
+            if alias:
+                hits = [("country", alias)]
+            elif position > 0 and segment.strip() in US_STATES:
+                hits = [("country", "united states")]
+
+        for kind, value in hits:
+            if kind == "city" and city is None:
+                city, uk_city = value, True
+            elif kind == "region" and region is None:
+                region = value
+            elif kind == "country" and country is None:
+                country = value
+            elif kind == "remote":
+                remote = True
+
+        # Unknown place names keep their leading part as the id ("New York, NY")
+        if not hits and position == 0:
+            unknown_head = " ".join(word for word in words if word not in QUALIFIERS) or None
+
+    if uk_city:
+        if country and country != "uk":
+            # "Richmond, Virginia, United States" - the explicit country wins
+            uk_city = False
+        else:
+            region = region or UK_PLACES[city][2]
+            country = "uk"
+    if region and not country:
+        country = REGIONS[region]
+    if city is None and unknown_head:
+        city = unknown_head
+
+    parent_city = UK_PLACE_PARENTS.get(city) if uk_city else None
+    return ResolvedLocation(city=city, region=region, country=country, remote=remote, parent_city=parent_city)
+
+
+def location_matches(job_location, user_location):
+    """
+    Check whether a job's location satisfies one user location.
+
+    Matches when the job lies inside the user's area ("Leeds" for "England",
+    "City of London" for "London"), when the job names a wider area containing the
+    user ("United Kingdom" for "London"), or when the job is remote without a
+    country restriction and the user is in REMOTE_HOME_COUNTRY (any user with
+    REMOTE_MATCHES_ANY_COUNTRY). Towns in different countries never match
+    ("Cambridge, MA" for "Cambridge").
+
+    :param job_location: Raw job location string
+    :param user_location: Raw user location string
+    :return: True if the job is acceptable for that location
+    """
+    job = resolve_location(job_location)
+    user = resolve_location(user_location)
+
+    if job.remote and job.country is None:
+        return REMOTE_MATCHES_ANY_COUNTRY or user.country == REMOTE_HOME_COUNTRY
+    if job.country and user.country and job.country != user.country:
+        return False
+    return (user.scope is not None and user.scope in job.ids) or \
+           (job.scope is not None and job.scope in user.ids)
+
+
+def matches_any_location(job_location, user_locations):
+    """
+    :param job_location: Raw job location string
+    :param user_locations: List of raw user location strings
+    :return: True if the job matches at least one of them
+    """
+    return any(location_matches(job_location, user_location) for user_location in user_locations)
+
+
+def mentioned_location_ids(text):
+    """
+    Country-level ids mentioned anywhere in free text (titles, descriptions).
+
+    Towns are deliberately not scanned here - words like "Reading" or "Bath"
+    are too common in prose - but regions imply their country.
+
+    :param text: Free text
+    :return: frozenset of "country:<id>" and "remote" ids
+    """
+    ids = set()
+    hits, _ = _scan(_normalise(text).replace(",", " ").split())
+    for kind, value in hits:
+        if kind == "country":
+            ids.add(f"country:{value}")
+        elif kind == "region":
+            ids.add(f"country:{REGIONS[value]}")
+        elif kind == "remote":
+            ids.add("remote")
+    return frozenset(ids)
@@ -0,0 +1,207 @@
+# utils/log.py
+
+"""
+Shared logging setup for the backend.
+
+configure_logging() replaces the per-module basicConfig/FileHandler calls. Records
+are put on an in-memory queue by the calling thread and a single QueueListener
+thread does the formatting-to-disk and stdout writes, so scraper and storage loops
+never block on I/O.
+
+Per-module levels come from LOG_LEVELS, e.g.:
+
+    LOG_LEVELS="fetch.linkedin=WARNING,store.store_jobs=DEBUG"
+
+Per-item events in hot loops should go through EventAggregator, which counts them
+and emits one summary line (plus an optional sample every N items) instead of one
+line per job.
+"""
+
+import os
+import json
+import time
+import queue
+import atexit
+import logging
+import logging.handlers
+from collections import Counter
+
+LOG_FILE = os.getenv("LOG_FILE", "job_cycle.log")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")  # "text" or "json"
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Attributes every LogRecord has; anything else was passed via `extra=` and is
+# emitted as a structured field by JsonFormatter.
+_RESERVED_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_listener = None
+_formatter = None  # Shared with worker processes
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line, including `extra` fields."""
+
+    def format(self, record):
+        payload = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS:
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+def parse_module_levels(spec):
+    """
+    Parse a LOG_LEVELS string into a {logger_name: level} dictionary.
+
+    :param spec: Comma separated "logger=LEVEL" pairs
+    :return: Dictionary of logger names to logging levels
+    """
+    levels = {}
+    for item in (spec or "").split(","):
+        if "=" not in item:
+            continue
+        name, level = item.split("=", 1)
+        name, level = name.strip(), level.strip().upper()
+        if name and isinstance(logging.getLevelName(level), int):
+            levels[name] = logging.getLevelName(level)
+    return levels
+
+
+def configure_logging(level=None, log_file=LOG_FILE, module_levels=None, fmt=None):
+    """
+    Route all logging through a queue to a background listener thread.
+
+    Safe to call more than once; only the first call installs handlers.
+
+    :param level: Root log level (default: LOG_LEVEL env, INFO)
+    :param log_file: File to append to, or None for stdout only
+    :param module_levels: Optional {logger_name: level} overrides (merged over LOG_LEVELS)
+    :param fmt: "text" or "json" (default: LOG_FORMAT env)
+    """
+    global _listener, _formatter
+
+    if _listener is not None:
+        return
+
+    formatter = _formatter = JsonFormatter() if (fmt or LOG_FORMAT) == "json" else logging.Formatter(TEXT_FORMAT)
+
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        handlers.append(logging.FileHandler(log_file))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level or LOG_LEVEL)
+
+    levels = parse_module_levels(LOG_LEVELS)
+    levels.update(module_levels or {})
+    for name, module_level in levels.items():
+        logging.getLogger(name).setLevel(module_level)
+
+    # Third-party clients are noisy at INFO and sit inside our hot loops
+    for name in ("urllib3", "selenium", "WDM", "google", "geopy"):
+        if name not in levels:
+            logging.getLogger(name).setLevel(logging.WARNING)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def configure_worker_logging():
+    """
+    Log straight to stderr in a forked worker process.
+
+    A forked worker inherits the QueueHandler but not the listener thread, so its
+    records would pile up in a copy of the queue that nothing reads. Use this as
+    the pool initializer of any ProcessPoolExecutor started after configure_logging().
+    """
+    global _listener
+
+    root = logging.getLogger()
+    queue_handlers = [h for h in root.handlers if isinstance(h, logging.handlers.QueueHandler)]
+    if not queue_handlers:
+        return
+    for handler in queue_handlers:
+        root.removeHandler(handler)
+
+    handler = logging.StreamHandler()
+    handler.setFormatter(_formatter or logging.Formatter(TEXT_FORMAT))
+    root.addHandler(handler)
+    # The inherited listener belongs to the parent; never stop it from here
+    _listener = None
+
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread."""
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+class EventAggregator:
+    """
+    Count per-item events in a hot loop and log a summary instead of one line each.
+
+    Individual events are only formatted when the logger is enabled for DEBUG, and
+    every `sample_every`-th event is also logged at INFO so long loops still show
+    progress.
+    """
+
+    def __init__(self, logger, name, sample_every=0):
+        self.logger = logger
+        self.name = name
+        self.sample_every = sample_every
+        self.counts = Counter()
+        self.started = time.time()
+        self._debug = logger.isEnabledFor(logging.DEBUG)
+
+    def record(self, event, msg=None, *args):
+        """
+        Count an event, optionally logging its message lazily.
+
+        :param event: Short event key, e.g. "stored" or "duplicate"
+        :param msg: Optional %-style message, only formatted if emitted
+        """
+        self.counts[event] += 1
+        if msg is None:
+            return
+        if self._debug:
+            self.logger.debug(msg, *args)
+        elif self.sample_every and self.counts[event] % self.sample_every == 0:
+            self.logger.info(f"[{self.name}] #{self.counts[event]} {event}: " + msg, *args)
+
+    def __getitem__(self, event):
+        return self.counts[event]
+
+    def summary(self, level=logging.INFO, **fields):
+        """
+        Log one line with all event counts and the elapsed time.
+
+        :param level: Log level for the summary
+        :param fields: Extra structured fields to attach to the record
+        """
+        elapsed = time.time() - self.started
+        counts = ", ".join(f"{event}={count}" for event, count in sorted(self.counts.items())) or "no events"
+        self.logger.log(
+            level,
+            f"📊 {self.name}: {counts} ({elapsed:.2f}s)",
+            extra={"event": self.name, "counts": dict(self.counts), "elapsed": round(elapsed, 3), **fields},
+        )
+        return dict(self.counts)
@@ -0,0 +1,126 @@
+# utils/spatial_index.py
+
+"""
+Vectorised radius search over a fixed set of jobs.
+
+Each job is geocoded once when the index is built and its coordinates are kept
+in NumPy arrays, bucketed into a coarse lat/lon grid. A query for "jobs within
+R km of any of these points" only looks at grid cells that can contain a hit
+and computes all point x candidate haversine distances in one array operation,
+so a user's locations and fallback towns are handled in a single batched query
+instead of one geodesic call per job per location.
+"""
+
+import math
+import logging
+from collections import defaultdict
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = 111.2
+GRID_CELL_DEGREES = 0.5  # ~55km north-south; one ring of cells covers the default 50km radius
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """
+    Great-circle distance in km. Arguments are in radians and broadcast like NumPy arrays.
+    """
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class JobSpatialIndex:
+    """Grid-bucketed coordinate arrays for a list of jobs."""
+
+    def __init__(self, jobs, geocode, cell_degrees=GRID_CELL_DEGREES):
+        """
+        :param jobs: List of job dictionaries with a 'location' field
+        :param geocode: Callable(location) -> (lat, lon) or None
+        :param cell_degrees: Grid cell size in degrees
+        """
+        self.jobs = jobs
+        self.cell_degrees = cell_degrees
+
+        # Geocode each distinct location string once
+        coords_by_location = {}
+        positions, lats, lons = [], [], []
+        for position, job in enumerate(jobs):
+            location = job.get('location') or ''
+            if location not in coords_by_location:
+                coords_by_location[location] = geocode(location) if location else None
+            coords = coords_by_location[location]
+            if coords:
+                positions.append(position)
+                lats.append(coords[0])
+                lons.append(coords[1])
+
+        # Parallel arrays over geocoded jobs only
+        self.positions = np.array(positions, dtype=np.int64)
+        self.lat = np.radians(np.array(lats, dtype=np.float64))
+        self.lon = np.radians(np.array(lons, dtype=np.float64))
+
+        grid = defaultdict(list)
+        for row, (lat, lon) in enumerate(zip(lats, lons)):
+            grid[self._cell(lat, lon)].append(row)
+        self.grid = {cell: np.array(rows, dtype=np.int64) for cell, rows in grid.items()}
+
+        logger.info(f"📍 Spatial index: {len(positions)}/{len(jobs)} jobs geocoded "
+                    f"({len(coords_by_location)} distinct locations, {len(self.grid)} grid cells)")
+
+    def __len__(self):
+        return len(self.positions)
+
+    def _cell(self, lat, lon):
+        return (math.floor(lat / self.cell_degrees), math.floor(lon / self.cell_degrees))
+
+    def _candidate_rows(self, points, radius_km):
+        """Rows in grid cells that can hold a job within radius_km of any point."""
+        cells = set()
+        for lat, lon in points:
+            dlat = radius_km / KM_PER_DEGREE_LAT
+            dlon = radius_km / (KM_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 0.01))
+            lat_lo, lon_lo = self._cell(lat - dlat, lon - dlon)
+            lat_hi, lon_hi = self._cell(lat + dlat, lon + dlon)
+            for cell_lat in range(lat_lo, lat_hi + 1):
+                for cell_lon in range(lon_lo, lon_hi + 1):
+                    cells.add((cell_lat, cell_lon))
+
+        rows = [self.grid[cell] for cell in cells if cell in self.grid]
+        if not rows:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(rows))
+
+    def query(self, points, radius_km, job_mask=None):
+        """
+        Find jobs within radius_km of any of the given points.
+
+        :param points: List of (lat, lon) tuples in degrees
+        :param radius_km: Search radius in km
+        :param job_mask: Optional boolean array over self.jobs (e.g. title matches)
+        :return: (job positions, distance to the nearest point in km), both sorted by distance
+        """
+        points = list(dict.fromkeys(points))
+        if not points or not len(self.positions):
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        rows = self._candidate_rows(points, radius_km)
+        if job_mask is not None and len(rows):
+            rows = rows[job_mask[self.positions[rows]]]
+        if not len(rows):
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        point_lat = np.radians(np.array([p[0] for p in points]))[:, None]
+        point_lon = np.radians(np.array([p[1] for p in points]))[:, None]
+
+        # (points x candidates) distance matrix, reduced to nearest point per job
+        distances = haversine_km(point_lat, point_lon, self.lat[rows][None, :], self.lon[rows][None, :]).min(axis=0)
+
+        within = distances <= radius_km
+        rows, distances = rows[within], distances[within]
+        order = np.argsort(distances, kind="stable")
+        return self.positions[rows[order]], distances[order]
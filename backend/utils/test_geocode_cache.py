@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for the persistent geocode store.
+
+Run with: python -m pytest utils/test_geocode_cache.py
+"""
+
+import os
+import sys
+import json
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils import geocode_cache
+from utils.geocode_cache import GeocodeStore
+
+Location = namedtuple("Location", "latitude longitude")
+
+
+class FakeGeocoder:
+    """Stands in for Nominatim: answers from a dict and records when it was called."""
+
+    def __init__(self, places=None):
+        self.places = places or {}
+        self.calls = []
+
+    def __call__(self, query):
+        self.calls.append((query, time.monotonic()))
+        return self.places.get(query)
+
+
+def test_gazetteer_places_never_reach_nominatim(tmp_path):
+    geocoder = FakeGeocoder()
+    store = GeocodeStore(str(tmp_path / "geocodes.json"), geocoder)
+
+    assert store.get("Leeds, England, United Kingdom") == (53.8008, -1.5491)
+    assert geocoder.calls == []
+    assert store.stats["gazetteer"] == 1
+
+
+def test_cache_survives_a_reload(tmp_path):
+    cache_file = str(tmp_path / "geocodes.json")
+    store = GeocodeStore(cache_file, FakeGeocoder({"saint-tropez, United Kingdom": Location(43.27, 6.64)}))
+    assert store.get("Saint-Tropez") == (43.27, 6.64)
+    store.save()
+
+    geocoder = FakeGeocoder()
+    reloaded = GeocodeStore(cache_file, geocoder)
+
+    assert reloaded.get("saint-tropez") == (43.27, 6.64)
+    assert geocoder.calls == [] and reloaded.stats["cache"] == 1
+
+
+@pytest.mark.parametrize("age_days, queried", [(1, False), (geocode_cache.NEGATIVE_CACHE_DAYS + 1, True)])
+def test_misses_are_retried_after_the_negative_cache_ttl(tmp_path, age_days, queried):
+    cache_file = tmp_path / "geocodes.json"
+    timestamp = (datetime.now() - timedelta(days=age_days)).isoformat()
+    cache_file.write_text(json.dumps({"atlantis": {"coords": None, "timestamp": timestamp}}))
+    geocoder = FakeGeocoder()
+
+    assert GeocodeStore(str(cache_file), geocoder).get("Atlantis") is None
+    assert bool(geocoder.calls) == queried
+
+
+def test_nominatim_requests_are_spaced_out(tmp_path, monkeypatch):
+    monkeypatch.setattr(geocode_cache, "NOMINATIM_MIN_INTERVAL_SECONDS", 0.2)
+    geocoder = FakeGeocoder()
+    store = GeocodeStore(None, geocoder)
+
+    for place in ("nowhere-1", "nowhere-2", "nowhere-3", "nowhere-1"):
+        store.get(place)
+
+    # The repeated miss is answered from the negative cache
+    assert [query for query, _ in geocoder.calls] == [f"nowhere-{i}, United Kingdom" for i in (1, 2, 3)]
+    times = [at for _, at in geocoder.calls]
+    assert all(later - earlier >= 0.2 for earlier, later in zip(times, times[1:]))
+    assert store.stats == {"gazetteer": 0, "cache": 1, "nominatim": 3, "misses": 3}
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
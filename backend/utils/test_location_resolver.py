@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared location resolver.
+
+Run with: python -m pytest utils/test_location_resolver.py
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils import location_resolver
+from utils.location_resolver import resolve_location, location_matches, mentioned_location_ids
+
+
+@pytest.mark.parametrize("raw, city, region, country, remote", [
+    ("London Area, United Kingdom", "london", "england", "uk", False),
+    ("Manchester Area, England, United Kingdom", "manchester", "england", "uk", False),
+    ("Greater London", "london", "england", "uk", False),
+    ("Hybrid - Glasgow", "glasgow", "scotland", "uk", False),
+    ("England", None, "england", "uk", False),
+    ("Remote, US", None, None, "united states", True),
+    ("New York, NY", "new york", None, "united states", False),
+    ("East London", "london", "england", "uk", False),
+    ("South West London", "london", "england", "uk", False),
+    ("London EC1", "london", "england", "uk", False),
+    ("Leeds LS1 4AP, United Kingdom", "leeds", "england", "uk", False),
+    ("Cambridge, MA", "cambridge", None, "united states", False),
+    ("City of London, England", "city of london", "england", "uk", False),
+    ("Richmond, Virginia, United States", "richmond", None, "united states", False),
+    ("", None, None, None, False),
+])
+def test_resolve_location(raw, city, region, country, remote):
+    resolved = resolve_location(raw)
+    assert (resolved.city, resolved.region, resolved.country, resolved.remote) == (city, region, country, remote)
+
+
+def test_resolve_location_is_memoised():
+    assert resolve_location("Leeds, UK") is resolve_location("Leeds, UK")
+
+
+@pytest.mark.parametrize("job_location, user_location, expected", [
+    ("London, England, United Kingdom", "london", True),
+    ("United Kingdom", "London", True),       # wider area containing the user
+    ("Leeds", "England", True),               # job inside the user's area
+    ("Manchester", "London", False),
+    ("Remote", "London", True),               # unrestricted remote, user in the home country
+    ("Remote", "Paris, France", False),       # ... but not abroad unless configured
+    ("City of London, England", "London", True),  # district of the user's town
+    ("Westminster", "London", True),
+    ("London", "City of London", True),       # wider area containing the user
+    ("Westminster", "Camden", False),         # sibling districts
+    ("Remote, US", "London", False),
+    ("New York, NY", "New York", True),
+    ("York", "New York", False),
+    ("East London", "London", True),
+    ("South West London", "London", True),
+    ("London EC1", "London", True),
+    ("Cambridge, MA", "Cambridge", False),
+    ("Cambridge, MA", "Cambridge, MA", True),
+])
+def test_location_matches(job_location, user_location, expected):
+    assert location_matches(job_location, user_location) is expected
+
+
+def test_remote_matches_any_country_when_configured(monkeypatch):
+    monkeypatch.setattr(location_resolver, "REMOTE_MATCHES_ANY_COUNTRY", True)
+    assert location_matches("Remote", "Paris, France")
+    assert not location_matches("Remote, US", "London")
+
+
+def test_mentioned_location_ids_ignores_prose():
+    ids = mentioned_location_ids("Contact us about this Reading-based role, remote within England")
+    assert ids == {"country:uk", "remote"}
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
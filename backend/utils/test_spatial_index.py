@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Tests for the grid-indexed radius search, checked against brute force.
+
+Run with: python -m pytest utils/test_spatial_index.py
+"""
+
+import os
+import sys
+import math
+import random
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils.spatial_index import JobSpatialIndex, EARTH_RADIUS_KM
+
+
+def distance_km(a, b):
+    """Plain-math haversine in degrees, independent of the index's NumPy version."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (*a, *b))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(h))
+
+
+def make_index(coords):
+    jobs = [{"location": f"place-{i}"} for i in range(len(coords))]
+    by_location = {job["location"]: point for job, point in zip(jobs, coords)}
+    return JobSpatialIndex(jobs, by_location.get)
+
+
+@pytest.mark.parametrize("centre, radius_km", [((53.8, -1.5), 50), ((51.5, -0.1), 10), ((60.4, -1.2), 80)])
+def test_radius_query_matches_brute_force(centre, radius_km):
+    rng = random.Random(42)
+    coords = [(centre[0] + rng.uniform(-2, 2), centre[1] + rng.uniform(-3, 3)) for _ in range(2000)]
+    points = [centre, (centre[0] + 0.3, centre[1] - 0.4)]
+
+    positions, distances = make_index(coords).query(points, radius_km)
+
+    expected = {i for i, job in enumerate(coords) if min(distance_km(p, job) for p in points) <= radius_km}
+    assert set(positions.tolist()) == expected
+    assert np.all(np.diff(distances) >= 0)
+
+
+def test_radius_boundary_is_inclusive():
+    centre = (53.8, -1.5)
+    # Due north and due east, right on the 50km circle
+    north = (centre[0] + math.degrees(50 / EARTH_RADIUS_KM), centre[1])
+    east = (centre[0], centre[1] + math.degrees(50 / (EARTH_RADIUS_KM * math.cos(math.radians(centre[0])))))
+    index = make_index([north, east])
+    radius = max(distance_km(centre, north), distance_km(centre, east))
+
+    assert sorted(index.query([centre], radius)[0].tolist()) == [0, 1]
+    assert index.query([centre], min(distance_km(centre, north), distance_km(centre, east)) - 0.01)[0].size == 0
+
+
+def test_job_mask_and_ungeocoded_jobs():
+    index = JobSpatialIndex([{"location": "a"}, {"location": "b"}, {"location": ""}],
+                            {"a": (53.8, -1.5), "b": (53.81, -1.51)}.get)
+    positions, _ = index.query([(53.8, -1.5)], 5, job_mask=np.array([False, True, True]))
+
+    assert len(index) == 2
+    assert positions.tolist() == [1]
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
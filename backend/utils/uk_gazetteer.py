@@ -0,0 +1,342 @@
+# utils/uk_gazetteer.py
+
+"""
+Offline gazetteer of UK towns and cities.
+
+Answers most geocoding lookups locally so Nominatim is only consulted for places
+that aren't listed here. Coordinates are town centres (WGS84, ~1km precision),
+which is plenty for the 50km radius matching in utils/location_matcher.py.
+
+Covers every town referenced in config.LOCATION_FALLBACK_REGIONS plus the larger
+UK towns and London districts that show up in scraped job locations.
+"""
+
+import re
+
+# name -> (latitude, longitude, nation)
+UK_PLACES = {
+    # London and districts
+    "london": (51.5074, -0.1278, "england"),
+    "city of london": (51.5155, -0.0922, "england"),
+    "westminster": (51.4975, -0.1357, "england"),
+    "canary wharf": (51.5054, -0.0235, "england"),
+    "shoreditch": (51.5265, -0.0781, "england"),
+    "camden": (51.5390, -0.1426, "england"),
+    "islington": (51.5362, -0.1033, "england"),
+    "hackney": (51.5450, -0.0553, "england"),
+    "hammersmith": (51.4927, -0.2339, "england"),
+    "greenwich": (51.4769, -0.0005, "england"),
+    "stratford": (51.5413, -0.0036, "england"),
+    "croydon": (51.3762, -0.0982, "england"),
+    "wimbledon": (51.4214, -0.2064, "england"),
+    "richmond": (51.4613, -0.3037, "england"),
+    "kingston upon thames": (51.4123, -0.3007, "england"),
+
+    # South East
+    "reading": (51.4543, -0.9781, "england"),
+    "oxford": (51.7520, -1.2577, "england"),
+    "basingstoke": (51.2665, -1.0924, "england"),
+    "slough": (51.5105, -0.5950, "england"),
+    "watford": (51.6565, -0.3903, "england"),
+    "staines": (51.4340, -0.5110, "england"),
+    "high wycombe": (51.6287, -0.7482, "england"),
+    "gillingham": (51.3890, 0.5486, "england"),
+    "chatham": (51.3800, 0.5270, "england"),
+    "maidstone": (51.2720, 0.5290, "england"),
+    "canterbury": (51.2802, 1.0789, "england"),
+    "tunbridge wells": (51.1320, 0.2630, "england"),
+    "dartford": (51.4462, 0.2169, "england"),
+    "brighton": (50.8225, -0.1372, "england"),
+    "worthing": (50.8179, -0.3729, "england"),
+    "eastbourne": (50.7684, 0.2904, "england"),
+    "hastings": (50.8543, 0.5735, "england"),
+    "crawley": (51.1092, -0.1872, "england"),
+    "guildford": (51.2362, -0.5704, "england"),
+    "woking": (51.3190, -0.5580, "england"),
+    "farnborough": (51.2930, -0.7550, "england"),
+    "bracknell": (51.4136, -0.7505, "england"),
+    "wokingham": (51.4112, -0.8357, "england"),
+    "newbury": (51.4014, -1.3231, "england"),
+    "maidenhead": (51.5218, -0.7177, "england"),
+    "windsor": (51.4839, -0.6044, "england"),
+    "aylesbury": (51.8168, -0.8124, "england"),
+    "milton keynes": (52.0406, -0.7594, "england"),
+    "leighton buzzard": (51.9170, -0.6600, "england"),
+    "banbury": (52.0629, -1.3398, "england"),
+    "southampton": (50.9097, -1.4044, "england"),
+    "portsmouth": (50.8198, -1.0880, "england"),
+    "winchester": (51.0632, -1.3080, "england"),
+    "fareham": (50.8548, -1.1866, "england"),
+    "andover": (51.2080, -1.4800, "england"),
+    "eastleigh": (50.9670, -1.3500, "england"),
+    "totton": (50.9190, -1.4900, "england"),
+    "romsey": (50.9890, -1.4960, "england"),
+    "new milton": (50.7560, -1.6580, "england"),
+    "gosport": (50.7948, -1.1243, "england"),
+
+    # East of England
+    "cambridge": (52.2053, 0.1218, "england"),
+    "ely": (52.3990, 0.2620, "england"),
+    "peterborough": (52.5695, -0.2405, "england"),
+    "norwich": (52.6309, 1.2974, "england"),
+    "kings lynn": (52.7517, 0.4010, "england"),
+    "ipswich": (52.0567, 1.1482, "england"),
+    "colchester": (51.8959, 0.8919, "england"),
+    "chelmsford": (51.7356, 0.4685, "england"),
+    "southend-on-sea": (51.5459, 0.7077, "england"),
+    "basildon": (51.5761, 0.4886, "england"),
+    "harlow": (51.7729, 0.1023, "england"),
+    "luton": (51.8787, -0.4200, "england"),
+    "bedford": (52.1360, -0.4667, "england"),
+    "st albans": (51.7550, -0.3360, "england"),
+    "hemel hempstead": (51.7530, -0.4490, "england"),
+    "stevenage": (51.9020, -0.2020, "england"),
+
+    # South West
+    "bristol": (51.4545, -2.5879, "england"),
+    "bath": (51.3811, -2.3590, "england"),
+    "swindon": (51.5558, -1.7797, "england"),
+    "gloucester": (51.8642, -2.2382, "england"),
+    "cheltenham": (51.8994, -2.0783, "england"),
+    "stroud": (51.7446, -2.2150, "england"),
+    "chippenham": (51.4585, -2.1158, "england"),
+    "salisbury": (51.0688, -1.7945, "england"),
+    "exeter": (50.7184, -3.5339, "england"),
+    "taunton": (51.0150, -3.1029, "england"),
+    "plymouth": (50.3755, -4.1427, "england"),
+    "torquay": (50.4619, -3.5253, "england"),
+    "truro": (50.2632, -5.0510, "england"),
+    "bournemouth": (50.7192, -1.8808, "england"),
+    "poole": (50.7150, -1.9872, "england"),
+    "weymouth": (50.6144, -2.4576, "england"),
+
+    # Midlands
+    "birmingham": (52.4862, -1.8904, "england"),
+    "coventry": (52.4068, -1.5197, "england"),
+    "wolverhampton": (52.5870, -2.1288, "england"),
+    "west bromwich": (52.5187, -1.9945, "england"),
+    "solihull": (52.4118, -1.7776, "england"),
+    "redditch": (52.3094, -1.9409, "england"),
+    "dudley": (52.5123, -2.0811, "england"),
+    "tamworth": (52.6339, -1.6958, "england"),
+    "walsall": (52.5862, -1.9829, "england"),
+    "sutton coldfield": (52.5630, -1.8225, "england"),
+    "bromsgrove": (52.3353, -2.0579, "england"),
+    "worcester": (52.1936, -2.2216, "england"),
+    "hereford": (52.0567, -2.7160, "england"),
+    "telford": (52.6766, -2.4469, "england"),
+    "shrewsbury": (52.7073, -2.7553, "england"),
+    "stafford": (52.8066, -2.1171, "england"),
+    "stoke-on-trent": (53.0027, -2.1794, "england"),
+    "burton upon trent": (52.8019, -1.6367, "england"),
+    "nuneaton": (52.5230, -1.4680, "england"),
+    "rugby": (52.3708, -1.2650, "england"),
+    "leamington spa": (52.2920, -1.5350, "england"),
+    "warwick": (52.2820, -1.5850, "england"),
+    "stratford-upon-avon": (52.1917, -1.7083, "england"),
+    "nottingham": (52.9548, -1.1581, "england"),
+    "rushcliffe": (52.9000, -1.0500, "england"),
+    "mansfield": (53.1470, -1.1980, "england"),
+    "ashfield": (53.0900, -1.2500, "england"),
+    "retford": (53.3220, -0.9430, "england"),
+    "derby": (52.9225, -1.4746, "england"),
+    "ilkeston": (52.9710, -1.3090, "england"),
+    "ripley": (53.0500, -1.4070, "england"),
+    "ashbourne": (53.0160, -1.7320, "england"),
+    "chesterfield": (53.2350, -1.4210, "england"),
+    "leicester": (52.6369, -1.1398, "england"),
+    "loughborough": (52.7721, -1.2062, "england"),
+    "hinckley": (52.5410, -1.3730, "england"),
+    "lincoln": (53.2307, -0.5406, "england"),
+    "grantham": (52.9120, -0.6420, "england"),
+    "northampton": (52.2405, -0.9027, "england"),
+    "kettering": (52.3980, -0.7250, "england"),
+    "corby": (52.4880, -0.7010, "england"),
+
+    # North West
+    "manchester": (53.4808, -2.2426, "england"),
+    "salford": (53.4875, -2.2901, "england"),
+    "stockport": (53.4106, -2.1575, "england"),
+    "bolton": (53.5769, -2.4282, "england"),
+    "oldham": (53.5409, -2.1114, "england"),
+    "bury": (53.5933, -2.2966, "england"),
+    "rochdale": (53.6097, -2.1561, "england"),
+    "wigan": (53.5450, -2.6320, "england"),
+    "warrington": (53.3900, -2.5970, "england"),
+    "macclesfield": (53.2587, -2.1270, "england"),
+    "chester": (53.1934, -2.8931, "england"),
+    "liverpool": (53.4084, -2.9916, "england"),
+    "birkenhead": (53.3930, -3.0140, "england"),
+    "bootle": (53.4460, -2.9920, "england"),
+    "st helens": (53.4540, -2.7360, "england"),
+    "widnes": (53.3610, -2.7330, "england"),
+    "southport": (53.6450, -3.0100, "england"),
+    "preston": (53.7632, -2.7031, "england"),
+    "blackpool": (53.8175, -3.0357, "england"),
+    "blackburn": (53.7500, -2.4849, "england"),
+    "burnley": (53.7893, -2.2405, "england"),
+    "lancaster": (54.0466, -2.8007, "england"),
+    "kendal": (54.3280, -2.7460, "england"),
+    "carlisle": (54.8925, -2.9329, "england"),
+
+    # Yorkshire and the Humber
+    "leeds": (53.8008, -1.5491, "england"),
+    "bradford": (53.7960, -1.7594, "england"),
+    "wakefield": (53.6833, -1.4977, "england"),
+    "harrogate": (53.9921, -1.5418, "england"),
+    "halifax": (53.7248, -1.8658, "england"),
+    "huddersfield": (53.6458, -1.7850, "england"),
+    "keighley": (53.8679, -1.9066, "england"),
+    "brighouse": (53.7030, -1.7840, "england"),
+    "shipley": (53.8330, -1.7770, "england"),
+    "otley": (53.9050, -1.6910, "england"),
+    "ilkley": (53.9250, -1.8220, "england"),
+    "york": (53.9600, -1.0873, "england"),
+    "sheffield": (53.3811, -1.4701, "england"),
+    "rotherham": (53.4326, -1.3635, "england"),
+    "barnsley": (53.5526, -1.4797, "england"),
+    "doncaster": (53.5228, -1.1285, "england"),
+    "hull": (53.7676, -0.3274, "england"),
+    "scunthorpe": (53.5890, -0.6540, "england"),
+    "grimsby": (53.5675, -0.0802, "england"),
+    "scarborough": (54.2831, -0.3998, "england"),
+
+    # North East
+    "newcastle": (54.9783, -1.6178, "england"),
+    "gateshead": (54.9526, -1.6034, "england"),
+    "sunderland": (54.9069, -1.3838, "england"),
+    "durham": (54.7753, -1.5849, "england"),
+    "south shields": (54.9986, -1.4323, "england"),
+    "whitley bay": (55.0390, -1.4420, "england"),
+    "morpeth": (55.1675, -1.6880, "england"),
+    "alnwick": (55.4130, -1.7060, "england"),
+    "hexham": (54.9710, -2.1010, "england"),
+    "consett": (54.8540, -1.8310, "england"),
+    "blaydon": (54.9650, -1.7130, "england"),
+    "middlesbrough": (54.5742, -1.2350, "england"),
+    "stockton-on-tees": (54.5700, -1.3180, "england"),
+    "darlington": (54.5236, -1.5595, "england"),
+    "hartlepool": (54.6910, -1.2120, "england"),
+
+    # Scotland
+    "glasgow": (55.8642, -4.2518, "scotland"),
+    "edinburgh": (55.9533, -3.1883, "scotland"),
+    "aberdeen": (57.1497, -2.0943, "scotland"),
+    "dundee": (56.4620, -2.9707, "scotland"),
+    "inverness": (57.4778, -4.2247, "scotland"),
+    "perth": (56.3950, -3.4308, "scotland"),
+    "stirling": (56.1165, -3.9369, "scotland"),
+    "dunfermline": (56.0717, -3.4522, "scotland"),
+    "falkirk": (56.0019, -3.7839, "scotland"),
+    "livingston": (55.8865, -3.5228, "scotland"),
+    "paisley": (55.8456, -4.4239, "scotland"),
+    "clydebank": (55.9010, -4.4050, "scotland"),
+    "kilmarnock": (55.6117, -4.4958, "scotland"),
+    "greenock": (55.9486, -4.7617, "scotland"),
+    "airdrie": (55.8660, -3.9800, "scotland"),
+    "hamilton": (55.7772, -4.0390, "scotland"),
+    "motherwell": (55.7890, -3.9910, "scotland"),
+    "east kilbride": (55.7644, -4.1770, "scotland"),
+    "ayr": (55.4586, -4.6292, "scotland"),
+    "arbroath": (56.5630, -2.5830, "scotland"),
+    "montrose": (56.7080, -2.4670, "scotland"),
+    "st andrews": (56.3398, -2.7967, "scotland"),
+    "haddington": (55.9560, -2.7810, "scotland"),
+    "south queensferry": (55.9900, -3.3980, "scotland"),
+    "elgin": (57.6490, -3.3180, "scotland"),
+    "stonehaven": (56.9640, -2.2110, "scotland"),
+    "banchory": (57.0510, -2.4900, "scotland"),
+    "aboyne": (57.0760, -2.7810, "scotland"),
+    "fraserburgh": (57.6930, -2.0050, "scotland"),
+
+    # Wales
+    "cardiff": (51.4816, -3.1791, "wales"),
+    "newport": (51.5842, -2.9977, "wales"),
+    "swansea": (51.6214, -3.9436, "wales"),
+    "bridgend": (51.5044, -3.5769, "wales"),
+    "llanelli": (51.6840, -4.1630, "wales"),
+    "merthyr tydfil": (51.7487, -3.3816, "wales"),
+    "pontypridd": (51.6020, -3.3420, "wales"),
+    "aberdare": (51.7130, -3.4450, "wales"),
+    "caerphilly": (51.5780, -3.2180, "wales"),
+    "blackwood": (51.6680, -3.1950, "wales"),
+    "cwmbran": (51.6530, -3.0210, "wales"),
+    "bargoed": (51.6920, -3.2320, "wales"),
+    "wrexham": (53.0460, -2.9930, "wales"),
+    "bangor": (53.2274, -4.1293, "wales"),
+    "aberystwyth": (52.4153, -4.0829, "wales"),
+
+    # Northern Ireland
+    "belfast": (54.5973, -5.9301, "northern ireland"),
+    "derry": (54.9966, -7.3086, "northern ireland"),
+    "lisburn": (54.5162, -6.0580, "northern ireland"),
+    "newry": (54.1751, -6.3402, "northern ireland"),
+}
+
+# Common alternative spellings and the forms job boards use
+UK_PLACE_ALIASES = {
+    "greater london": "london",
+    "london area": "london",
+    "central london": "london",
+    "greater manchester": "manchester",
+    "city of bristol": "bristol",
+    "city of edinburgh": "edinburgh",
+    "glasgow city": "glasgow",
+    "newcastle upon tyne": "newcastle",
+    "kingston upon hull": "hull",
+    "stoke": "stoke-on-trent",
+    "stoke on trent": "stoke-on-trent",
+    "southend": "southend-on-sea",
+    "southend on sea": "southend-on-sea",
+    "stockton on tees": "stockton-on-tees",
+    "stratford upon avon": "stratford-upon-avon",
+    "staines-upon-thames": "staines",
+    "royal leamington spa": "leamington spa",
+    "royal tunbridge wells": "tunbridge wells",
+    "king's lynn": "kings lynn",
+    "st. albans": "st albans",
+    "st. helens": "st helens",
+    "st. andrews": "st andrews",
+    "hinkley": "hinckley",
+    "londonderry": "derry",
+}
+
+# district -> town it lies in, so "City of London" is also a "London" job
+UK_PLACE_PARENTS = {
+    name: "london" for name in (
+        "city of london", "westminster", "canary wharf", "shoreditch", "camden", "islington", "hackney",
+        "hammersmith", "greenwich", "stratford", "croydon", "wimbledon", "richmond", "kingston upon thames",
+    )
+}
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalise_place_name(name):
+    """Lowercase, trim and collapse whitespace, then apply known aliases."""
+    name = _WHITESPACE.sub(" ", (name or "").lower().strip())
+    return UK_PLACE_ALIASES.get(name, name)
+
+
+def lookup_uk_place(location):
+    """
+    Find a UK place in the gazetteer.
+
+    Tries the whole string first, then each comma-separated part, so
+    "Manchester Area, England, United Kingdom" resolves to Manchester.
+
+    :param location: Raw location string
+    :return: (latitude, longitude, nation) tuple, or None if not listed
+    """
+    name = normalise_place_name(location)
+    if name in UK_PLACES:
+        return UK_PLACES[name]
+
+    for part in name.split(","):
+        part = normalise_place_name(part)
+        if part.endswith(" area"):
+            part = normalise_place_name(part[:-len(" area")])
+        if part in UK_PLACES:
+            return UK_PLACES[part]
+
+    return None
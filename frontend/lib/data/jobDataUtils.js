@@ -50,13 +50,59 @@ export async function getUserByEmail(email) {
 }
 
 /**
- * Fetch jobs from a user's job subcollection
+ * Read a user's precomputed job feed (users/{id}/feed, written by the backend's
+ * store/user_feed.py) with the saved, applied and archived job documents laid over it.
+ * Costs one read per feed chunk plus one per flagged job, instead of one per job.
+ * @param {string} userId - User ID
+ * @returns {Promise<Object[]|null>} Jobs, or null when the user has no feed yet
+ */
+async function getFeedJobs(userId) {
+  const metaSnapshot = await getDoc(doc(db, "users", userId, "feed", "meta"));
+  if (!metaSnapshot.exists()) {
+    return null;
+  }
+
+  const chunkCount = metaSnapshot.data().chunks || 0;
+  const chunkSnapshots = await Promise.all(
+    Array.from({ length: chunkCount }, (_, index) =>
+      getDoc(doc(db, "users", userId, "feed", `chunk_${String(index).padStart(6, "0")}`))
+    )
+  );
+
+  const jobsById = new Map();
+  for (const snapshot of chunkSnapshots) {
+    for (const summary of snapshot.exists() ? snapshot.data().jobs || [] : []) {
+      jobsById.set(summary.job_id, { id: summary.job_id, ...summary });
+    }
+  }
+
+  // Per-user flags change after storage, so they live on the job documents only
+  const jobsRef = collection(db, "users", userId, "jobs");
+  const flaggedSnapshots = await Promise.all(
+    ["is_saved", "has_applied", "archived"].map(flag => getDocs(query(jobsRef, where(flag, "==", true))))
+  );
+  for (const snapshot of flaggedSnapshots) {
+    for (const jobDoc of snapshot.docs) {
+      jobsById.set(jobDoc.id, {
+        ...jobsById.get(jobDoc.id),
+        id: jobDoc.id,
+        ...serializeFirestoreData(jobDoc.data())
+      });
+    }
+  }
+
+  return Array.from(jobsById.values());
+}
+
+/**
+ * Fetch a user's jobs, from their feed when they have one, else from the job subcollection
  * @param {string} userId - User ID
  * @param {Object} options - Query options
  * @param {string} options.source - Filter by job source (linkedin, ifyoucould, etc)
  * @param {number} options.limit - Limit number of results
  * @param {boolean} options.includeArchived - Include archived jobs (default: false)
  * @param {boolean} options.archivedOnly - Only return archived jobs (default: false)
+ * @param {boolean} options.includeExpired - Include postings that have closed (default: false)
  */
 export async function getUserJobs(userId, options = {}) {
   if (!userId) {
@@ -67,35 +113,49 @@ export async function getUserJobs(userId, options = {}) {
   try {
     console.log(`Fetching jobs for user: ${userId}`);
 
-    // Single query - get all job data directly
-    const jobsRef = collection(db, "users", userId, "jobs");
-
-    // Build query with all constraints
-    const constraints = [];
-    if (options.source) {
-      constraints.push(where("source", "==", options.source));
-    }
-    if (options.limit) {
-      constraints.push(limit(options.limit));
+    let jobs = null;
+
+    // Archived-only and limited reads are small, so they query the job documents directly
+    if (!options.archivedOnly && !options.limit) {
+      try {
+        jobs = await getFeedJobs(userId);
+      } catch (error) {
+        console.warn("Error reading job feed, falling back to job documents:", error);
+      }
+      if (jobs && options.source) {
+        jobs = jobs.filter(job => job.source === options.source);
+      }
     }
 
-    const jobsQuery = constraints.length > 0 ? query(jobsRef, ...constraints) : jobsRef;
-    const snapshot = await getDocs(jobsQuery);
+    if (jobs === null) {
+      const jobsRef = collection(db, "users", userId, "jobs");
+
+      // Build query with all constraints
+      const constraints = [];
+      if (options.source) {
+        constraints.push(where("source", "==", options.source));
+      }
+      if (options.limit) {
+        constraints.push(limit(options.limit));
+      }
+
+      const jobsQuery = constraints.length > 0 ? query(jobsRef, ...constraints) : jobsRef;
+      const snapshot = await getDocs(jobsQuery);
+
+      jobs = snapshot.docs.map(doc => {
+        const jobData = doc.data();
+        return {
+          id: doc.id,
+          ...serializeFirestoreData(jobData)
+        };
+      });
+    }
 
-    if (snapshot.empty) {
+    if (jobs.length === 0) {
       console.log("No jobs found for user");
       return [];
     }
 
-    // Simple mapping - no additional queries needed
-    const jobs = snapshot.docs.map(doc => {
-      const jobData = doc.data();
-      return {
-        id: doc.id,
-        ...serializeFirestoreData(jobData)
-      };
-    });
-
     // Filter archived jobs based on options
     let filteredJobs = jobs;
 
@@ -108,6 +168,12 @@ export async function getUserJobs(userId, options = {}) {
     }
     // If includeArchived is true, return all jobs (no filtering)
 
+    // Closed postings (is_expired, set by the backend's liveness check) are hidden
+    // unless the user saved or applied to them
+    if (!options.includeExpired && !options.archivedOnly) {
+      filteredJobs = filteredJobs.filter(job => job.is_expired !== true || job.is_saved || job.has_applied);
+    }
+
     console.log(`Fetched ${filteredJobs.length} jobs successfully (${jobs.length} total)`);
     return filteredJobs;
 